@@ -1 +1,16 @@
-"""Tests init to ensure package path resolution and install editable ajips for imports."""
+"""Automated Job Intelligence Profiling System (AJIPS).
+
+``ajips.Analyzer`` (see :mod:`ajips.core.analyzer`) is the library entry
+point for analyzing postings outside the API. It is imported on first
+access, so importing the package alone stays cheap.
+"""
+
+__all__ = ["Analyzer"]
+
+
+def __getattr__(name):
+    if name == "Analyzer":
+        from ajips.core.analyzer import Analyzer
+
+        return Analyzer
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,7 @@
+"""Allow ``python -m ajips``."""
+
+import sys
+
+from ajips.cli import main
+
+sys.exit(main())
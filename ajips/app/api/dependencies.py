@@ -0,0 +1,268 @@
+"""Request dependencies shared by API routes."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import threading
+from typing import TYPE_CHECKING, ContextManager, Optional
+
+from fastapi import Depends, HTTPException, Request, Response
+
+from ajips.app.config import settings
+from ajips.core.analyses import AnalysisStore
+from ajips.core.encoding import EncodedResult
+from ajips.core.jobs import JobQueue
+from ajips.core.pipelines import job_profile
+from ajips.core.store import PostingStore
+from ajips.core.scheduler import AdmissionController, Overloaded
+from ajips.core.serialization import JSON
+from ajips.core.rate_limit import (
+    RateLimiter,
+    RateLimitExceeded,
+    client_address,
+    create_bucket_store,
+    retry_after_header,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ajips.core.archive import AnalysisArchive
+
+_limiter: Optional[RateLimiter] = None
+_limiter_lock = threading.Lock()
+_job_queue: Optional[JobQueue] = None
+_job_queue_lock = threading.Lock()
+_admission: Optional[AdmissionController] = None
+_admission_lock = threading.Lock()
+_posting_store: Optional[PostingStore] = None
+_posting_store_lock = threading.Lock()
+_analysis_store: Optional[AnalysisStore] = None
+_analysis_store_lock = threading.Lock()
+_archive: Optional["AnalysisArchive"] = None
+_archive_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Return the process-wide rate limiter, creating it from settings on first use."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                _limiter = RateLimiter(
+                    create_bucket_store(settings.RATE_LIMIT_STORAGE, settings.DATA_DIR),
+                    {
+                        "analyze": settings.RATE_LIMIT_ANALYZE,
+                        "batch": settings.RATE_LIMIT_BATCH,
+                    },
+                )
+    return _limiter
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Return the process-wide admission controller, or None when disabled."""
+    global _admission
+    if not settings.ADMISSION_ENABLED:
+        return None
+    if _admission is None:
+        with _admission_lock:
+            if _admission is None:
+                _admission = AdmissionController(
+                    initial_limit=min(8, settings.ADMISSION_MAX_CONCURRENCY),
+                    max_limit=settings.ADMISSION_MAX_CONCURRENCY,
+                    queue_size=settings.ADMISSION_QUEUE_SIZE,
+                    target_delay=settings.ADMISSION_TARGET_DELAY_MS / 1000,
+                )
+    return _admission
+
+
+def admission_slot(priority: str, shed: bool = True) -> ContextManager[None]:
+    """
+    Hold an analysis slot of ``priority`` for the duration of a ``with`` block.
+
+    Raises:
+        Overloaded: If the work is shed; convert with :func:`overloaded_error`
+    """
+    admission = get_admission_controller()
+    if admission is None:
+        return contextlib.nullcontext()
+    return admission.admit(priority, shed)
+
+
+def overloaded_error(exc: Overloaded) -> HTTPException:
+    """503 response telling the client when capacity is likely to be free."""
+    return HTTPException(
+        status_code=503,
+        detail="Server is busy, please retry later",
+        headers={"Retry-After": retry_after_header(exc.retry_after)},
+    )
+
+
+def job_queue_path() -> str:
+    return os.path.join(settings.DATA_DIR, "jobs.sqlite3")
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue, starting its dispatcher on first use."""
+    global _job_queue
+    if _job_queue is None:
+        with _job_queue_lock:
+            if _job_queue is None:
+                job_queue = JobQueue(
+                    job_queue_path(),
+                    workers=settings.JOBS_WORKERS,
+                    max_items=settings.JOBS_MAX_ITEMS,
+                    admission=get_admission_controller(),
+                )
+                job_queue.start()
+                _job_queue = job_queue
+    return _job_queue
+
+
+def shutdown_job_queue() -> None:
+    """Stop the dispatcher if this process started one."""
+    global _job_queue
+    with _job_queue_lock:
+        if _job_queue is not None:
+            _job_queue.stop()
+            _job_queue = None
+
+
+def posting_store_path() -> str:
+    return os.path.join(settings.DATA_DIR, "postings.sqlite3")
+
+
+def get_posting_store() -> Optional[PostingStore]:
+    """Return the process-wide posting store, or None when disabled."""
+    global _posting_store
+    if not settings.POSTING_STORE_ENABLED:
+        return None
+    if _posting_store is None:
+        with _posting_store_lock:
+            if _posting_store is None:
+                _posting_store = PostingStore(
+                    posting_store_path(), salary_sketch_k=settings.SALARY_SKETCH_K
+                )
+    return _posting_store
+
+
+def require_posting_store() -> PostingStore:
+    """The posting store for routes that need it; 404 when it is disabled."""
+    store = get_posting_store()
+    if store is None:
+        raise HTTPException(status_code=404, detail="Posting store is disabled")
+    return store
+
+
+def _store_posting(raw_text: str, url: Optional[str], profile) -> None:
+    store = get_posting_store()
+    if store is not None:
+        store.add(raw_text, profile.to_dict(), url)
+
+
+def install_posting_store() -> None:
+    """Record every posting this process analyzes (job workers included)."""
+    if settings.POSTING_STORE_ENABLED:
+        get_posting_store()
+        job_profile.add_listener(_store_posting)
+
+
+def analysis_store_path() -> str:
+    return os.path.join(settings.DATA_DIR, "analyses.sqlite3")
+
+
+def get_analysis_store() -> Optional[AnalysisStore]:
+    """Return the process-wide store of addressable analyses, or None when disabled."""
+    global _analysis_store
+    if not settings.ANALYSIS_STORE_ENABLED:
+        return None
+    if _analysis_store is None:
+        with _analysis_store_lock:
+            if _analysis_store is None:
+                _analysis_store = AnalysisStore(
+                    analysis_store_path(), settings.ANALYSIS_STORE_MAX_ENTRIES
+                )
+    return _analysis_store
+
+
+def _store_analysis(result: EncodedResult) -> None:
+    store = get_analysis_store()
+    if store is not None:
+        store.add(result.key, result.body(JSON))
+
+
+def install_analysis_store() -> None:
+    """Keep every addressable analysis for ``GET /analyses/{id}``."""
+    if settings.ANALYSIS_STORE_ENABLED:
+        get_analysis_store()
+        job_profile.add_result_listener(_store_analysis)
+
+
+def archive_path() -> str:
+    return os.path.join(settings.DATA_DIR, "archive")
+
+
+def get_archive() -> Optional["AnalysisArchive"]:
+    """Return the process-wide columnar archive, or None when disabled."""
+    global _archive
+    if not settings.ARCHIVE_ENABLED:
+        return None
+    if _archive is None:
+        with _archive_lock:
+            if _archive is None:
+                from ajips.core.archive import AnalysisArchive
+
+                _archive = AnalysisArchive(
+                    archive_path(),
+                    settings.ARCHIVE_FORMAT,
+                    settings.ARCHIVE_BATCH_ROWS,
+                )
+    return _archive
+
+
+def _archive_posting(raw_text: str, url: Optional[str], profile) -> None:
+    archive = get_archive()
+    if archive is not None:
+        archive.add(profile, url)
+
+
+def install_archive() -> None:
+    """Add every posting this process analyzes to the columnar archive."""
+    if settings.ARCHIVE_ENABLED:
+        get_archive()
+        job_profile.add_listener(_archive_posting)
+
+
+def close_archive() -> None:
+    """Write the rows the archive still buffers."""
+    if _archive is not None:
+        _archive.close()
+
+
+def get_client_address(request: Request) -> str:
+    """Real client address, honouring ``X-Forwarded-For`` from trusted proxies."""
+    return client_address(
+        request.client.host if request.client else None,
+        request.headers.get("x-forwarded-for"),
+        settings.TRUSTED_PROXY_COUNT,
+    )
+
+
+def rate_limited(budget: str):
+    """Dependency charging one token from ``budget`` for the calling client."""
+
+    def check_rate_limit(request: Request, response: Response) -> None:
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        limiter = get_rate_limiter()
+        try:
+            remaining = limiter.hit(budget, get_client_address(request))
+        except RateLimitExceeded as exc:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded: {limiter.limit(budget)} requests allowed",
+                headers={"Retry-After": retry_after_header(exc.retry_after)},
+            )
+        response.headers["X-RateLimit-Limit"] = str(limiter.limit(budget))
+        response.headers["X-RateLimit-Remaining"] = str(int(remaining))
+
+    return Depends(check_rate_limit)
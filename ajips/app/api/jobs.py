@@ -0,0 +1,116 @@
+"""Batch job endpoints: submit postings, poll progress and stream results."""
+
+import json
+import logging
+from typing import Iterator
+
+from fastapi import APIRouter, File, HTTPException, Query, Request, Response, UploadFile
+
+from ajips.app.api.dependencies import get_job_queue, rate_limited
+from ajips.app.api.responses import streaming_response
+from ajips.app.api.schemas import JobStatus, JobSubmitRequest
+from ajips.core.serialization import NDJSON
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def _records(payload: JobSubmitRequest) -> Iterator[dict]:
+    resume_text = payload.resume_text
+    for posting in payload.postings:
+        yield {"text": posting.text, "url": posting.url, "resume_text": resume_text}
+    for text in payload.texts:
+        yield {"text": text, "resume_text": resume_text}
+    for url in payload.urls:
+        yield {"url": url, "resume_text": resume_text}
+
+
+def _jsonl_records(upload: UploadFile) -> Iterator[dict]:
+    for number, line in enumerate(upload.file, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise ValueError(f"Line {number} is not valid JSON")
+        yield record
+
+
+def _accepted(job_id: str, response: Response) -> JobStatus:
+    response.headers["Location"] = f"/jobs/{job_id}"
+    return JobStatus(**get_job_queue().get(job_id))
+
+
+@router.post(
+    "",
+    status_code=202,
+    response_model=JobStatus,
+    dependencies=[rate_limited("batch")],
+)
+def submit_job(payload: JobSubmitRequest, response: Response) -> JobStatus:
+    """Queue a batch of postings given inline as texts, URLs or posting objects."""
+    try:
+        job_id = get_job_queue().submit(_records(payload), payload.priority)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return _accepted(job_id, response)
+
+
+@router.post(
+    "/upload",
+    status_code=202,
+    response_model=JobStatus,
+    dependencies=[rate_limited("batch")],
+)
+def submit_job_file(
+    response: Response,
+    file: UploadFile = File(...),
+    priority: str = Query("batch", pattern="^(batch|background)$"),
+) -> JobStatus:
+    """Queue a batch from a JSONL file with one ``{"text"|"url": ...}`` per line."""
+    try:
+        job_id = get_job_queue().submit(_jsonl_records(file), priority)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return _accepted(job_id, response)
+
+
+@router.get("/{job_id}", response_model=JobStatus)
+def get_job(job_id: str) -> JobStatus:
+    """Job status and progress counters."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatus(**job)
+
+
+@router.get("/{job_id}/results")
+def stream_job_results(
+    request: Request, job_id: str, skip: int = 0, follow: bool = True
+):
+    """
+    Stream results as NDJSON in completion order, compressed if accepted.
+
+    Each line carries the posting's ``seq`` (1-based submission order) and a
+    ``result`` or ``error``. With ``follow`` the response stays open until the
+    job finishes; ``skip`` resumes a dropped stream after that many lines.
+    """
+    job_queue = get_job_queue()
+    if job_queue.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    lines = (
+        (body + "\n").encode("utf-8")
+        for body in job_queue.iter_results(job_id, skip, follow)
+    )
+    return streaming_response(request, lines, NDJSON)
+
+
+@router.delete("/{job_id}", response_model=JobStatus)
+def cancel_job(job_id: str) -> JobStatus:
+    """Cancel a job; postings already being analyzed still report results."""
+    job = get_job_queue().cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return JobStatus(**job)
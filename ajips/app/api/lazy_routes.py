@@ -0,0 +1,109 @@
+"""Routers imported when the first request for them arrives.
+
+Building a router's request and response models and FastAPI's validators
+for them is most of what a route module costs at import, and most workers
+answer health checks and analyses long before anyone asks for batch jobs,
+stored postings, trends or salaries. ``include_lazy_router`` adds a
+placeholder route instead: the first request under the router's prefix
+imports the module in a worker thread, so the event loop keeps serving, and
+puts its routes in the placeholder's place (the first OpenAPI schema loads
+every router).
+
+This only helps when the app is run by plain uvicorn or a test client. The
+pre-forking server calls :func:`load_lazy_routers` before it forks, so its
+workers share the routers copy-on-write like the rest of the preloaded app.
+"""
+
+from __future__ import annotations
+
+import importlib
+import threading
+from typing import List, Optional, Tuple
+
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import BaseRoute, Match
+from starlette.types import Receive, Scope, Send
+
+
+class LazyRouter(BaseRoute):
+    """Placeholder for the ``router`` of ``module``, whose paths start with ``prefix``."""
+
+    def __init__(self, app: FastAPI, module: str, prefix: str):
+        self.app = app
+        self.module = module
+        self.prefix = prefix
+        self._routes: Optional[List[BaseRoute]] = None
+        self._lock = threading.Lock()
+
+    def load(self) -> List[BaseRoute]:
+        """Import the router and replace this placeholder by its routes."""
+        routes = self._import_routes()
+        self._install(routes)
+        return routes
+
+    def _import_routes(self) -> List[BaseRoute]:
+        routes = self._routes
+        if routes is None:
+            with self._lock:
+                routes = self._routes
+                if routes is None:
+                    router = importlib.import_module(self.module).router
+                    routes = self._routes = list(router.routes)
+        return routes
+
+    def _install(self, routes: List[BaseRoute]) -> None:
+        app_routes = self.app.router.routes
+        if self in app_routes:
+            index = app_routes.index(self)
+            app_routes[index : index + 1] = routes
+            self.app.openapi_schema = None
+
+    def matches(self, scope: Scope) -> Tuple[Match, Scope]:
+        if scope["type"] not in ("http", "websocket") or not self._under_prefix(scope):
+            return Match.NONE, {}
+        return Match.FULL, {}
+
+    async def handle(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Imports run in a thread; the routes list is only changed on the loop
+        routes = self._routes
+        if routes is None:
+            routes = await run_in_threadpool(self._import_routes)
+        self._install(routes)
+        # Route the request again, now to the router's own routes
+        await self.app.router.app(scope, receive, send)
+
+    def _under_prefix(self, scope: Scope) -> bool:
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        return path == self.prefix or path.startswith(self.prefix + "/")
+
+
+def include_lazy_router(app: FastAPI, module: str, prefix: str) -> LazyRouter:
+    """
+    Include ``module.router`` (whose routes all start with ``prefix``) in
+    ``app`` once it is first needed.
+    """
+    placeholder = LazyRouter(app, module, prefix)
+    app.router.routes.append(placeholder)
+    lazy_routers = getattr(app.state, "lazy_routers", None)
+    if lazy_routers is None:
+        lazy_routers = app.state.lazy_routers = []
+        openapi = app.openapi
+
+        def load_and_openapi() -> dict:
+            for router in lazy_routers:
+                router.load()
+            return openapi()
+
+        app.openapi = load_and_openapi
+    lazy_routers.append(placeholder)
+    return placeholder
+
+
+def load_lazy_routers(app: FastAPI) -> None:
+    """Import every router ``app`` includes lazily, replacing the placeholders."""
+    for router in getattr(app.state, "lazy_routers", ()):
+        router.load()
@@ -0,0 +1,87 @@
+"""Queries over stored postings and their analyses."""
+
+import logging
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ajips.app.api.dependencies import require_posting_store
+from ajips.app.api.schemas import (
+    PostingSearchResponse,
+    SimilarPostingsRequest,
+    SimilarPostingsResponse,
+    StoredPosting,
+)
+from ajips.core.store import MAX_RESULTS
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/postings", tags=["postings"])
+
+
+@router.get("", response_model=PostingSearchResponse)
+def search_postings(
+    skill: List[str] = Query([], description="Required skills (all must match)"),
+    focus_area: List[str] = Query([], description="Required focus areas"),
+    role_type: Optional[str] = None,
+    experience_level: Optional[str] = Query(
+        None, description="Level name or short form such as 'senior'"
+    ),
+    min_salary: Optional[int] = Query(None, ge=0, description="Range reaches this"),
+    max_salary: Optional[int] = Query(None, ge=0, description="Range starts at or below"),
+    q: Optional[str] = Query(None, description="Full-text query (FTS5 syntax)"),
+    limit: int = Query(20, ge=1, le=MAX_RESULTS),
+    before: Optional[int] = Query(None, description="Return postings older than this ID"),
+) -> PostingSearchResponse:
+    """
+    Stored postings matching every filter, newest first, answered from indexes.
+
+    For example ``?skill=kafka&skill=go&experience_level=senior&min_salary=150000``.
+    """
+    try:
+        results = require_posting_store().search(
+            skills=skill,
+            focus_areas=focus_area,
+            role_type=role_type,
+            experience_level=experience_level,
+            min_salary=min_salary,
+            max_salary=max_salary,
+            text=q,
+            limit=limit,
+            before=before,
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    next_before = results[-1]["id"] if len(results) == limit else None
+    return PostingSearchResponse(results=results, next_before=next_before)
+
+
+@router.get("/{posting_id}", response_model=StoredPosting)
+def get_posting(posting_id: int) -> StoredPosting:
+    """A stored posting with its text and analysis."""
+    posting = require_posting_store().get(posting_id)
+    if posting is None:
+        raise HTTPException(status_code=404, detail="Posting not found")
+    return StoredPosting(**posting)
+
+
+@router.get("/{posting_id}/similar", response_model=SimilarPostingsResponse)
+def get_similar_postings(
+    posting_id: int, limit: int = Query(10, ge=1, le=MAX_RESULTS)
+) -> SimilarPostingsResponse:
+    """Stored postings most similar to one, by skills and text, best first."""
+    results = require_posting_store().similar_postings(posting_id=posting_id, limit=limit)
+    if results is None:
+        raise HTTPException(status_code=404, detail="Posting not found")
+    return SimilarPostingsResponse(results=results)
+
+
+@router.post("/similar", response_model=SimilarPostingsResponse)
+def find_similar_postings(request: SimilarPostingsRequest) -> SimilarPostingsResponse:
+    """Stored postings most similar to a posting text and/or a list of skills."""
+    if not (request.text and request.text.strip()) and not request.skills:
+        raise HTTPException(status_code=400, detail="Provide text or skills")
+    results = require_posting_store().similar_postings(
+        text=request.text, skills=request.skills, limit=request.limit
+    )
+    return SimilarPostingsResponse(results=results)
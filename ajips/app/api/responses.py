@@ -0,0 +1,107 @@
+"""Negotiated, optionally compressed responses for analysis results.
+
+Endpoints that produce :mod:`ajips.core.results` records keep their pydantic
+``response_model`` for the OpenAPI schema but return the bodies built here,
+which FastAPI sends as they are: each record is encoded once by
+:mod:`ajips.core.serialization` instead of being converted to the model,
+validated and encoded again.
+
+The media type follows the ``Accept`` header (JSON, NDJSON, or MessagePack
+when ``msgpack`` is installed); clients accepting none of them get the
+endpoint's default. Bodies of at least ``COMPRESSION_MIN_BYTES`` and all
+streams are compressed when ``Accept-Encoding`` allows it.
+
+Result bodies carry a strong ETag (a digest of the bytes sent) and, for
+results addressable by content hash, ``Content-Location: /analyses/{id}``;
+a GET whose ``If-None-Match`` lists the ETag gets ``304 Not Modified``.
+"""
+
+from __future__ import annotations
+
+from typing import AsyncIterator, Iterable, Optional, Sequence, Type, Union
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from starlette.responses import Response
+
+from ajips.app.config import settings
+from ajips.core.encoding import (
+    EncodedResult,
+    compress_chunks,
+    compress_chunks_async,
+    etag_matches,
+    negotiate,
+    negotiate_coding,
+)
+from ajips.core.serialization import ENCODERS, MSGPACK, NDJSON
+
+# Media types of single results and of result streams, defaults first
+RESULT_MEDIA_TYPES = tuple(ENCODERS)
+STREAM_MEDIA_TYPES = tuple(m for m in (NDJSON, MSGPACK) if m in ENCODERS)
+
+_VARY = "Accept, Accept-Encoding"
+
+
+def accepted_media_type(
+    request: Request, offered: Sequence[str] = RESULT_MEDIA_TYPES
+) -> str:
+    """The media type in ``offered`` to answer ``request`` with."""
+    return negotiate(request.headers.get("accept"), offered) or offered[0]
+
+
+def _coding(request: Request, size: Optional[int] = None) -> Optional[str]:
+    if not settings.COMPRESSION_ENABLED:
+        return None
+    if size is not None and size < settings.COMPRESSION_MIN_BYTES:
+        return None
+    return negotiate_coding(request.headers.get("accept-encoding"))
+
+
+def result_response(
+    request: Request,
+    encoded: EncodedResult,
+    media_type: str,
+    response: Optional[Response] = None,
+    cache_control: Optional[str] = None,
+) -> Response:
+    """
+    ``encoded`` as ``media_type``, compressed if accepted, with the headers
+    dependencies set on ``response`` (FastAPI drops them when an endpoint
+    returns its own response), or ``304 Not Modified`` if the client has it.
+    """
+    coding = _coding(request, len(encoded.body(media_type)))
+    headers = {"Vary": _VARY, "ETag": encoded.etag(media_type, coding)}
+    if cache_control is not None:
+        headers["Cache-Control"] = cache_control
+    if encoded.key is not None:
+        headers["Content-Location"] = f"/analyses/{encoded.key}"
+    if request.method in ("GET", "HEAD") and etag_matches(
+        request.headers.get("if-none-match"), headers["ETag"]
+    ):
+        result = Response(status_code=304)
+    else:
+        result = Response(encoded.body(media_type, coding), media_type=media_type)
+        if coding is not None:
+            headers["Content-Encoding"] = coding
+    if response is not None:
+        result.headers.update(response.headers)
+    result.headers.update(headers)
+    return result
+
+
+def streaming_response(
+    request: Request,
+    chunks: Union[Iterable[bytes], AsyncIterator[bytes]],
+    media_type: str,
+    response_class: Type[StreamingResponse] = StreamingResponse,
+) -> StreamingResponse:
+    """``chunks`` streamed as ``media_type``, compressed if accepted."""
+    headers = {"Vary": _VARY}
+    coding = _coding(request)
+    if coding is not None:
+        if hasattr(chunks, "__aiter__"):
+            chunks = compress_chunks_async(chunks, coding)
+        else:
+            chunks = compress_chunks(chunks, coding)
+        headers["Content-Encoding"] = coding
+    return response_class(chunks, media_type=media_type, headers=headers)
@@ -1,22 +1,40 @@
 import logging
+import os
 import time
-from typing import Dict, Any
+from typing import Any, Dict, Optional
 
-from fastapi import APIRouter, HTTPException, Request
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
 
-from ajips.app.api.schemas import AnalyzeRequest, AnalyzeResponse
-from ajips.core.pipelines.job_profile import build_job_profile
+from ajips.app.api.dependencies import (
+    admission_slot,
+    get_admission_controller,
+    get_analysis_store,
+    overloaded_error,
+    rate_limited,
+)
+from ajips.app.api.responses import (
+    STREAM_MEDIA_TYPES,
+    accepted_media_type,
+    result_response,
+    streaming_response,
+)
+from ajips.app.api.schemas import AnalyzeRequest, AnalyzeResponse, JobPostingInput
+from ajips.core.pipelines.job_profile import (
+    analyze_encoded,
+    analyze_record,
+    stored_result,
+)
+from ajips.core.serialization import ENCODERS
+from ajips.core.streaming import analyze_ndjson
 from ajips.app.config import settings
+from ajips.core import metrics
+from ajips.core.scheduler import BATCH, INTERACTIVE, Overloaded
 
 logger = logging.getLogger(__name__)
 
-# Rate limiting with per-IP key
-limiter = Limiter(key_func=get_remote_address)
 router = APIRouter()
-# Note: exception handlers must be registered on the FastAPI app instance; see main.py
 
 
 @router.get("/health")
@@ -39,13 +57,85 @@ def detailed_health_check(request: Request) -> dict:
     }
 
 
-@router.post("/analyze", response_model=AnalyzeResponse)
-@limiter.limit("30/minute")
-def analyze_job_posting(request: Request, payload: AnalyzeRequest) -> AnalyzeResponse:
-    """Analyze a job posting with rate limiting and error handling."""
+@router.get("/metrics")
+def get_metrics() -> dict:
+    """Counters from this worker process (coalescing, queues, caches)."""
+    return {"pid": os.getpid(), **metrics.collect()}
+
+
+@router.post(
+    "/analyze", response_model=AnalyzeResponse, dependencies=[rate_limited("analyze")]
+)
+def analyze_job_posting(
+    request: Request, payload: AnalyzeRequest, response: Response
+) -> Response:
+    """
+    Analyze a job posting with rate limiting and error handling.
+
+    The profile is encoded directly as JSON, NDJSON or MessagePack following
+    ``Accept``; ``AnalyzeResponse`` only documents it. Recent results are
+    served from the result cache without being encoded again. Complete
+    analyses name their ``/analyses/{id}`` in ``Content-Location``.
+    """
+    return _analyze(request, payload, response)
+
+
+@router.get(
+    "/analyze", response_model=AnalyzeResponse, dependencies=[rate_limited("analyze")]
+)
+def analyze_job_posting_url(
+    request: Request,
+    response: Response,
+    url: str = Query(..., description="URL of the job posting"),
+) -> Response:
+    """
+    Analyze the posting at ``url``; cacheable by browsers and proxies for
+    ``ANALYZE_URL_MAX_AGE_SECONDS`` and revalidated by ETag.
+    """
+    payload = AnalyzeRequest(job_posting=JobPostingInput(url=url))
+    return _analyze(request, payload, response, settings.ANALYZE_URL_MAX_AGE_SECONDS)
+
+
+@router.get("/analyses/{analysis_id}", response_model=AnalyzeResponse)
+def get_analysis(request: Request, analysis_id: str) -> Response:
+    """
+    A stored analysis by content hash. The id always names the same result,
+    so responses may be cached for ``ANALYSIS_MAX_AGE_SECONDS`` and are
+    revalidated by ETag (``304 Not Modified``).
+    """
+    store = get_analysis_store()
+    encoded = stored_result(
+        analysis_id, store.get if store is not None else lambda key: None
+    )
+    if encoded is None:
+        raise HTTPException(status_code=404, detail="Analysis not found")
+    return result_response(
+        request,
+        encoded,
+        accepted_media_type(request),
+        cache_control=f"public, max-age={settings.ANALYSIS_MAX_AGE_SECONDS}, immutable",
+    )
+
+
+def _analyze(
+    request: Request,
+    payload: AnalyzeRequest,
+    response: Response,
+    max_age: Optional[int] = None,
+) -> Response:
+    media_type = accepted_media_type(request)
     try:
-        profile = build_job_profile(payload)
-        return profile
+        with admission_slot(INTERACTIVE):
+            encoded = analyze_encoded(payload)
+        cache_control = None
+        if max_age is not None:
+            # Partial analyses and fetch errors must not be reused
+            cache_control = (
+                f"public, max-age={max_age}" if encoded.key is not None else "no-store"
+            )
+        return result_response(request, encoded, media_type, response, cache_control)
+    except Overloaded as exc:
+        raise overloaded_error(exc)
     except ValueError as ve:
         logger.warning(f"Invalid input: {ve}")
         raise HTTPException(status_code=400, detail=str(ve))
@@ -54,3 +144,63 @@ def analyze_job_posting(request: Request, payload: AnalyzeRequest) -> AnalyzeRes
         raise HTTPException(
             status_code=500, detail="Internal server error during analysis"
         )
+
+
+async def _request_body(request: Request):
+    # A client that hangs up mid-upload just ends the input stream
+    try:
+        async for chunk in request.stream():
+            yield chunk
+    except ClientDisconnect:
+        return
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """
+    Streaming response that may be written while the request body is read.
+
+    ``StreamingResponse`` watches ``receive()`` for disconnects, which would
+    swallow body chunks the endpoint has not consumed yet. Here the body
+    reader sees the disconnect instead and ends the stream.
+    """
+
+    async def __call__(self, scope, receive, send) -> None:
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+@router.post("/analyze/stream", dependencies=[rate_limited("batch")])
+async def analyze_stream(request: Request) -> StreamingResponse:
+    """
+    Analyze an NDJSON stream of postings, one ``{"text"|"url": ...}`` per line.
+
+    Records are read as they arrive and results are written back as NDJSON in
+    completion order (``{"seq": n, "result": {...}}`` or ``{"seq": n, "error": ...}``),
+    so memory use does not grow with the length of the stream. Clients that
+    accept ``application/msgpack`` get a sequence of MessagePack maps instead.
+    """
+    admission = get_admission_controller()
+    if admission is not None:
+        # Refuse new streams while overloaded; admitted streams are paced by
+        # backpressure, so their records wait for slots instead of being shed
+        try:
+            admission.check(BATCH)
+        except Overloaded as exc:
+            raise overloaded_error(exc)
+
+    def analyze(record: dict) -> dict:
+        with admission_slot(BATCH, shed=False):
+            return analyze_record(record)
+
+    media_type = accepted_media_type(request, STREAM_MEDIA_TYPES)
+    results = analyze_ndjson(
+        _request_body(request),
+        analyze,
+        concurrency=settings.STREAM_CONCURRENCY,
+        max_line_bytes=settings.STREAM_MAX_LINE_BYTES,
+        encode=ENCODERS[media_type],
+    )
+    return streaming_response(
+        request, results, media_type, response_class=DuplexStreamingResponse
+    )
@@ -0,0 +1,51 @@
+"""Salary percentiles per skill, role and experience level from stored sketches."""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ajips.app.api.dependencies import require_posting_store
+from ajips.app.api.schemas import SalaryPercentiles
+
+router = APIRouter(prefix="/salaries", tags=["salaries"])
+
+
+@router.get("", response_model=SalaryPercentiles)
+def get_salary_percentiles(
+    skill: Optional[str] = None,
+    role_type: Optional[str] = None,
+    experience_level: Optional[str] = Query(
+        None, description="Level name or short form such as 'senior'"
+    ),
+    currency: str = Query("USD", min_length=3, max_length=3),
+    percentile: List[float] = Query([25, 50, 90], description="Percentiles, 0-100"),
+) -> SalaryPercentiles:
+    """
+    Salary percentiles of stored postings for a skill or a role, optionally at
+    one experience level, for example ``?skill=kafka&experience_level=senior``.
+
+    Answered from a quantile sketch (rank error about 1%) without scanning
+    postings.
+    """
+    if any(not 0 <= p <= 100 for p in percentile):
+        raise HTTPException(status_code=400, detail="Percentiles must be 0-100")
+    store = require_posting_store()
+    try:
+        stats = store.salary_percentiles(
+            skill=skill,
+            role_type=role_type,
+            experience_level=experience_level,
+            currency=currency,
+            quantiles=[p / 100 for p in percentile],
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    if stats is None:
+        raise HTTPException(
+            status_code=404, detail="No salaries recorded for this group"
+        )
+    quantiles = stats.pop("quantiles")
+    return SalaryPercentiles(
+        **stats,
+        percentiles={f"p{p:g}": value for p, value in zip(percentile, quantiles)},
+    )
@@ -1,31 +1,70 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
-class JobPostingInput(BaseModel):
+class _Schema(BaseModel):
+    # Validators are built on first use rather than when the app is imported,
+    # so models of endpoints nobody has called yet cost nothing at startup
+    model_config = ConfigDict(defer_build=True)
+
+
+class JobPostingInput(_Schema):
     url: Optional[str] = None
     text: Optional[str] = None
 
 
-class AnalyzeRequest(BaseModel):
+class AnalyzeRequest(_Schema):
     job_posting: JobPostingInput
     resume_text: Optional[str] = None
 
 
-class FocusArea(BaseModel):
+class JobSubmitRequest(_Schema):
+    postings: List[JobPostingInput] = Field(
+        default_factory=list, description="Postings given as text or URL"
+    )
+    texts: List[str] = Field(default_factory=list, description="Posting texts")
+    urls: List[str] = Field(default_factory=list, description="Posting URLs")
+    resume_text: Optional[str] = Field(
+        None, description="Resume compared against every posting"
+    )
+    priority: str = Field(
+        "batch",
+        pattern="^(batch|background)$",
+        description="'background' jobs only use capacity nobody else needs",
+    )
+
+
+class JobStatus(_Schema):
+    id: str
+    status: str = Field(..., pattern="^(queued|running|completed|cancelled)$")
+    priority: str
+    total: int
+    completed: int
+    failed: int
+    created_at: float
+    updated_at: float
+
+
+class FocusArea(_Schema):
     name: str
     weight: float
     skills: List[str]
 
 
-class CritiqueItem(BaseModel):
+class CritiqueItem(_Schema):
     severity: str = Field(..., pattern="^(info|warning|critical)$")
     message: str
 
 
-class AnalyzeResponse(BaseModel):
+class AnalyzeResponse(_Schema):
     title: Optional[str] = Field(None, description="Extracted job title")
+    role_type: Optional[str] = Field(
+        None, description="Role type identified from the skills"
+    )
+    experience_level: Optional[str] = Field(
+        None, description="Experience level the posting asks for"
+    )
     focus_areas: List[FocusArea] = Field(
         default_factory=list, description="Primary focus areas"
     )
@@ -49,3 +88,87 @@ class AnalyzeResponse(BaseModel):
         None, description="Resume alignment score (0–1)"
     )
     summary: str
+    skipped_sections: List[str] = Field(
+        default_factory=list,
+        description="Sections left empty because their stage ran over its time budget",
+    )
+
+
+class PostingSummary(_Schema):
+    id: int
+    url: Optional[str] = None
+    title: Optional[str] = None
+    role_type: Optional[str] = None
+    experience_level: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    quality_score: Optional[float] = None
+    created_at: float
+    skills: List[str] = Field(default_factory=list)
+
+
+class SimilarPosting(PostingSummary):
+    score: float = Field(..., description="Estimated cosine similarity")
+
+
+class SimilarPostingsRequest(_Schema):
+    text: Optional[str] = None
+    skills: List[str] = Field(default_factory=list)
+    limit: int = Field(10, ge=1, le=500)
+
+
+class SimilarPostingsResponse(_Schema):
+    results: List[SimilarPosting]
+
+
+class PostingSearchResponse(_Schema):
+    results: List[PostingSummary]
+    next_before: Optional[int] = Field(
+        None, description="Pass as 'before' to fetch the next page"
+    )
+
+
+class StoredPosting(_Schema):
+    id: int
+    url: Optional[str] = None
+    title: Optional[str] = None
+    role_type: Optional[str] = None
+    experience_level: Optional[str] = None
+    salary_min: Optional[int] = None
+    salary_max: Optional[int] = None
+    quality_score: Optional[float] = None
+    created_at: float
+    text: str
+    analysis: AnalyzeResponse
+
+
+class TrendItem(_Schema):
+    name: str
+    count: int
+    previous: int = Field(..., description="Count in the previous bucket")
+    delta: int
+
+
+class TrendResponse(_Schema):
+    dimension: str
+    period: str
+    bucket: str
+    previous_bucket: str
+    items: List[TrendItem]
+
+
+class DemandPoint(_Schema):
+    bucket: str
+    count: int
+
+
+class SalaryPercentiles(_Schema):
+    dimension: str
+    name: str
+    currency: str
+    count: int = Field(..., description="Postings with a salary in this group")
+    min: float
+    max: float
+    percentiles: Dict[str, float] = Field(
+        ..., description="Salary range midpoint at each percentile, e.g. 'p50'"
+    )
@@ -0,0 +1,58 @@
+"""Skill, focus-area and role demand trends from materialized aggregates."""
+
+import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from ajips.app.api.dependencies import require_posting_store
+from ajips.app.api.schemas import DemandPoint, TrendResponse
+
+router = APIRouter(prefix="/trends", tags=["trends"])
+
+_DIMENSION = "^(skill|focus_area|role)$"
+_PERIOD = "^(day|week|month)$"
+
+
+@router.get("", response_model=TrendResponse)
+def get_trends(
+    dimension: str = Query("skill", pattern=_DIMENSION),
+    period: str = Query("week", pattern=_PERIOD),
+    date: Optional[datetime.date] = Query(
+        None, description="Any day in the bucket to report (default: today, UTC)"
+    ),
+    limit: int = Query(10, ge=1, le=500),
+    order: str = Query("delta", pattern="^(delta|count)$"),
+) -> TrendResponse:
+    """
+    Top names in a day, week or month with the change from the bucket before.
+
+    ``order=delta`` lists the biggest risers first, ``order=count`` the most
+    demanded.
+    """
+    try:
+        trends = require_posting_store().trending(
+            dimension=dimension, period=period, day=date, limit=limit, order=order
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return TrendResponse(**trends)
+
+
+@router.get("/{dimension}/{name}", response_model=List[DemandPoint])
+def get_demand_series(
+    dimension: str,
+    name: str,
+    period: str = Query("day", pattern=_PERIOD),
+    limit: int = Query(30, ge=1, le=1000),
+) -> List[DemandPoint]:
+    """Postings per bucket mentioning one skill, focus area or role, oldest first."""
+    if dimension == "skill":
+        name = name.lower()
+    try:
+        points = require_posting_store().demand_series(
+            dimension=dimension, name=name, period=period, limit=limit
+        )
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    return [DemandPoint(**point) for point in points]
@@ -20,6 +20,12 @@ class Settings:
     CORS_ALLOW_METHODS: List[str] = ["GET", "POST"]
     CORS_ALLOW_HEADERS: List[str] = ["*"]
 
+    # Server launcher (python -m ajips serve)
+    SERVER_HOST: str = "127.0.0.1"
+    SERVER_PORT: int = 8000
+    # 0 sizes the worker pool to the CPUs available to the process
+    SERVER_WORKERS: int = 0
+
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "json"  # "json" or "text"
@@ -40,6 +46,88 @@ class Settings:
         "wellfound.com",
     ]
 
+    # Local state (rate-limit buckets and other on-disk stores)
+    DATA_DIR: str = "data"
+
+    # Rate limiting: token buckets keyed by client address
+    RATE_LIMIT_ENABLED: bool = True
+    # "memory", "sqlite", "sqlite:///path/to/file" or "redis://host:port/db"
+    RATE_LIMIT_STORAGE: str = "memory"
+    RATE_LIMIT_ANALYZE: str = "30/minute"
+    RATE_LIMIT_BATCH: str = "5/minute"
+    # Number of reverse proxies whose X-Forwarded-For entries are trusted
+    TRUSTED_PROXY_COUNT: int = 0
+
+    # Batch jobs (/jobs): 0 workers sizes the analysis pool to the CPU count
+    JOBS_WORKERS: int = 0
+    JOBS_MAX_ITEMS: int = 100_000
+
+    # Admission control: analyses share an adaptive concurrency limit (up to
+    # ADMISSION_MAX_CONCURRENCY) with bounded per-priority queues; work is
+    # shed with 503 once queueing delay exceeds the target
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_MAX_CONCURRENCY: int = 32
+    ADMISSION_QUEUE_SIZE: int = 100
+    ADMISSION_TARGET_DELAY_MS: int = 200
+
+    # Time budgets (ms) for optional analysis stages; a stage that runs over
+    # is cut short and listed in the response's skipped_sections (0 = no limit)
+    STAGE_BUDGETS_MS: dict = {"critiques": 250, "quality": 100}
+
+    # Streaming analysis (/analyze/stream): records analyzed concurrently per
+    # request, and the largest accepted NDJSON line
+    STREAM_CONCURRENCY: int = 4
+    STREAM_MAX_LINE_BYTES: int = 1_000_000
+
+    # Skill tokens that are not in the taxonomy are also tried as variants
+    # ("nodejs", "Postgre SQL") and misspellings ("Kubernets") of skills
+    FUZZY_SKILL_MATCHING: bool = True
+
+    # Windowed analysis: postings longer than the threshold are scanned in
+    # windows of ANALYSIS_WINDOW_CHARS with ANALYSIS_WINDOW_OVERLAP_CHARS of
+    # context per side, ANALYSIS_WINDOW_WORKERS processes at a time (0 = one
+    # window after another in the request thread)
+    ANALYSIS_WINDOW_THRESHOLD_CHARS: int = 200_000
+    ANALYSIS_WINDOW_CHARS: int = 64_000
+    ANALYSIS_WINDOW_OVERLAP_CHARS: int = 1_000
+    ANALYSIS_WINDOW_WORKERS: int = 0
+
+    # Hidden skills, focus areas and role type are cached for the last
+    # SKILL_PROFILE_CACHE_SIZE distinct skill sets (0 = not cached)
+    SKILL_PROFILE_CACHE_SIZE: int = 4096
+
+    # /analyze keeps the encoded results of the last RESULT_CACHE_SIZE
+    # analyses, keyed by posting text and resume (0 = not cached)
+    RESULT_CACHE_SIZE: int = 1024
+    # Responses of at least COMPRESSION_MIN_BYTES are compressed (gzip, or
+    # zstd when zstandard is installed) if the client accepts it; streams
+    # are compressed whatever their size
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_BYTES: int = 1024
+
+    # Complete analyses are kept in DATA_DIR/analyses.sqlite3 under their
+    # content hash (the newest ANALYSIS_STORE_MAX_ENTRIES) for
+    # GET /analyses/{id}, whose responses may be cached for
+    # ANALYSIS_MAX_AGE_SECONDS; GET /analyze?url= responses for
+    # ANALYZE_URL_MAX_AGE_SECONDS, since the page may change
+    ANALYSIS_STORE_ENABLED: bool = True
+    ANALYSIS_STORE_MAX_ENTRIES: int = 100_000
+    ANALYSIS_MAX_AGE_SECONDS: int = 86_400
+    ANALYZE_URL_MAX_AGE_SECONDS: int = 3_600
+
+    # Analyzed postings and their analyses are stored in
+    # DATA_DIR/postings.sqlite3 and can be queried through /postings
+    POSTING_STORE_ENABLED: bool = True
+    # Accuracy of the stored salary quantile sketches: rank error is about
+    # 1.7 / k and each sketch keeps about 3k values
+    SALARY_SKETCH_K: int = 200
+    # Analyzed postings are also added to a date-partitioned columnar
+    # archive in DATA_DIR/archive (needs pyarrow), written every
+    # ARCHIVE_BATCH_ROWS postings or once the oldest waited a minute
+    ARCHIVE_ENABLED: bool = False
+    ARCHIVE_FORMAT: str = "arrow"
+    ARCHIVE_BATCH_ROWS: int = 10_000
+
     @classmethod
     def from_env(cls) -> "Settings":
         """Override settings from environment variables."""
@@ -50,6 +138,16 @@ class Settings:
             settings.CORS_ORIGINS = [
                 o.strip() for o in cors_origins_env.split(",") if o.strip()
             ]
+        # Server launcher
+        host = os.getenv("HOST")
+        if host:
+            settings.SERVER_HOST = host.strip()
+        port = os.getenv("PORT")
+        if port and port.isdigit():
+            settings.SERVER_PORT = int(port)
+        workers = os.getenv("WEB_CONCURRENCY")
+        if workers and workers.isdigit():
+            settings.SERVER_WORKERS = int(workers)
         # Logging
         log_level = os.getenv("LOG_LEVEL")
         if log_level:
@@ -66,6 +164,139 @@ class Settings:
             settings.INGESTION_ALLOWED_NETLOCS = [
                 n.strip() for n in netlocs_env.split(",") if n.strip()
             ]
+        # Local state
+        data_dir = os.getenv("AJIPS_DATA_DIR")
+        if data_dir:
+            settings.DATA_DIR = data_dir
+        # Rate limiting
+        rate_limit_enabled = os.getenv("RATE_LIMIT_ENABLED")
+        if rate_limit_enabled:
+            settings.RATE_LIMIT_ENABLED = rate_limit_enabled.lower() in (
+                "1",
+                "true",
+                "yes",
+            )
+        rate_limit_storage = os.getenv("RATE_LIMIT_STORAGE")
+        if rate_limit_storage:
+            settings.RATE_LIMIT_STORAGE = rate_limit_storage.strip()
+        rate_limit_analyze = os.getenv("RATE_LIMIT_ANALYZE")
+        if rate_limit_analyze:
+            settings.RATE_LIMIT_ANALYZE = rate_limit_analyze.strip()
+        rate_limit_batch = os.getenv("RATE_LIMIT_BATCH")
+        if rate_limit_batch:
+            settings.RATE_LIMIT_BATCH = rate_limit_batch.strip()
+        trusted_proxies = os.getenv("TRUSTED_PROXY_COUNT")
+        if trusted_proxies and trusted_proxies.isdigit():
+            settings.TRUSTED_PROXY_COUNT = int(trusted_proxies)
+        # Batch jobs
+        jobs_workers = os.getenv("JOBS_WORKERS")
+        if jobs_workers and jobs_workers.isdigit():
+            settings.JOBS_WORKERS = int(jobs_workers)
+        jobs_max_items = os.getenv("JOBS_MAX_ITEMS")
+        if jobs_max_items and jobs_max_items.isdigit():
+            settings.JOBS_MAX_ITEMS = int(jobs_max_items)
+        # Admission control
+        admission_enabled = os.getenv("ADMISSION_ENABLED")
+        if admission_enabled:
+            settings.ADMISSION_ENABLED = admission_enabled.lower() in (
+                "1",
+                "true",
+                "yes",
+            )
+        admission_max = os.getenv("ADMISSION_MAX_CONCURRENCY")
+        if admission_max and admission_max.isdigit():
+            settings.ADMISSION_MAX_CONCURRENCY = max(1, int(admission_max))
+        admission_queue = os.getenv("ADMISSION_QUEUE_SIZE")
+        if admission_queue and admission_queue.isdigit():
+            settings.ADMISSION_QUEUE_SIZE = int(admission_queue)
+        admission_delay = os.getenv("ADMISSION_TARGET_DELAY_MS")
+        if admission_delay and admission_delay.isdigit():
+            settings.ADMISSION_TARGET_DELAY_MS = int(admission_delay)
+        # Stage budgets: STAGE_BUDGET_CRITIQUES_MS, STAGE_BUDGET_QUALITY_MS
+        settings.STAGE_BUDGETS_MS = dict(settings.STAGE_BUDGETS_MS)
+        for stage in settings.STAGE_BUDGETS_MS:
+            budget = os.getenv(f"STAGE_BUDGET_{stage.upper()}_MS")
+            if budget and budget.isdigit():
+                settings.STAGE_BUDGETS_MS[stage] = int(budget)
+        # Streaming analysis
+        stream_concurrency = os.getenv("STREAM_CONCURRENCY")
+        if stream_concurrency and stream_concurrency.isdigit():
+            settings.STREAM_CONCURRENCY = max(1, int(stream_concurrency))
+        stream_max_line = os.getenv("STREAM_MAX_LINE_BYTES")
+        if stream_max_line and stream_max_line.isdigit():
+            settings.STREAM_MAX_LINE_BYTES = int(stream_max_line)
+        fuzzy_skills = os.getenv("FUZZY_SKILL_MATCHING")
+        if fuzzy_skills:
+            settings.FUZZY_SKILL_MATCHING = fuzzy_skills.lower() in ("1", "true", "yes")
+        # Windowed analysis
+        window_threshold = os.getenv("ANALYSIS_WINDOW_THRESHOLD_CHARS")
+        if window_threshold and window_threshold.isdigit():
+            settings.ANALYSIS_WINDOW_THRESHOLD_CHARS = int(window_threshold)
+        window_chars = os.getenv("ANALYSIS_WINDOW_CHARS")
+        if window_chars and window_chars.isdigit():
+            settings.ANALYSIS_WINDOW_CHARS = max(1, int(window_chars))
+        window_overlap = os.getenv("ANALYSIS_WINDOW_OVERLAP_CHARS")
+        if window_overlap and window_overlap.isdigit():
+            settings.ANALYSIS_WINDOW_OVERLAP_CHARS = int(window_overlap)
+        window_workers = os.getenv("ANALYSIS_WINDOW_WORKERS")
+        if window_workers and window_workers.isdigit():
+            settings.ANALYSIS_WINDOW_WORKERS = int(window_workers)
+        # Skill profile cache
+        skill_profile_cache = os.getenv("SKILL_PROFILE_CACHE_SIZE")
+        if skill_profile_cache and skill_profile_cache.isdigit():
+            settings.SKILL_PROFILE_CACHE_SIZE = int(skill_profile_cache)
+        # Result cache and response compression
+        result_cache = os.getenv("RESULT_CACHE_SIZE")
+        if result_cache and result_cache.isdigit():
+            settings.RESULT_CACHE_SIZE = int(result_cache)
+        compression_enabled = os.getenv("COMPRESSION_ENABLED")
+        if compression_enabled:
+            settings.COMPRESSION_ENABLED = compression_enabled.lower() in (
+                "1",
+                "true",
+                "yes",
+            )
+        compression_min_bytes = os.getenv("COMPRESSION_MIN_BYTES")
+        if compression_min_bytes and compression_min_bytes.isdigit():
+            settings.COMPRESSION_MIN_BYTES = int(compression_min_bytes)
+        # Addressable analyses
+        analysis_store_enabled = os.getenv("ANALYSIS_STORE_ENABLED")
+        if analysis_store_enabled:
+            settings.ANALYSIS_STORE_ENABLED = analysis_store_enabled.lower() in (
+                "1",
+                "true",
+                "yes",
+            )
+        analysis_store_max = os.getenv("ANALYSIS_STORE_MAX_ENTRIES")
+        if analysis_store_max and analysis_store_max.isdigit():
+            settings.ANALYSIS_STORE_MAX_ENTRIES = max(1, int(analysis_store_max))
+        analysis_max_age = os.getenv("ANALYSIS_MAX_AGE_SECONDS")
+        if analysis_max_age and analysis_max_age.isdigit():
+            settings.ANALYSIS_MAX_AGE_SECONDS = int(analysis_max_age)
+        analyze_url_max_age = os.getenv("ANALYZE_URL_MAX_AGE_SECONDS")
+        if analyze_url_max_age and analyze_url_max_age.isdigit():
+            settings.ANALYZE_URL_MAX_AGE_SECONDS = int(analyze_url_max_age)
+        # Posting store
+        posting_store_enabled = os.getenv("POSTING_STORE_ENABLED")
+        if posting_store_enabled:
+            settings.POSTING_STORE_ENABLED = posting_store_enabled.lower() in (
+                "1",
+                "true",
+                "yes",
+            )
+        salary_sketch_k = os.getenv("SALARY_SKETCH_K")
+        if salary_sketch_k and salary_sketch_k.isdigit():
+            settings.SALARY_SKETCH_K = min(65535, max(8, int(salary_sketch_k)))
+        # Columnar archive
+        archive_enabled = os.getenv("ARCHIVE_ENABLED")
+        if archive_enabled:
+            settings.ARCHIVE_ENABLED = archive_enabled.lower() in ("1", "true", "yes")
+        archive_format = os.getenv("ARCHIVE_FORMAT")
+        if archive_format in ("arrow", "parquet"):
+            settings.ARCHIVE_FORMAT = archive_format
+        archive_batch_rows = os.getenv("ARCHIVE_BATCH_ROWS")
+        if archive_batch_rows and archive_batch_rows.isdigit():
+            settings.ARCHIVE_BATCH_ROWS = max(1, int(archive_batch_rows))
         return settings
 
 
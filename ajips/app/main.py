@@ -1,41 +1,64 @@
 import logging
 import os
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 
+from ajips.app.api.dependencies import (
+    get_client_address,
+    get_job_queue,
+    close_archive,
+    install_analysis_store,
+    install_archive,
+    install_posting_store,
+    job_queue_path,
+    shutdown_job_queue,
+)
+from ajips.app.api.lazy_routes import include_lazy_router
 from ajips.app.api.routes import router as api_router
 from ajips.app.config import settings
+from ajips.core.logging_config import LazyJsonFormatter
 
 # Configure logging based on LOG_FORMAT env var (json or text)
 logger = logging.getLogger()
 logger.setLevel(getattr(logging, settings.LOG_LEVEL.upper(), logging.INFO))
 logHandler = logging.StreamHandler()
 if settings.LOG_FORMAT.lower() == "json":
-    from pythonjsonlogger import jsonlogger
-
-    formatter = jsonlogger.JsonFormatter(
-        fmt="%(asctime)s %(name)s %(levelname)s %(message)s"
-    )
+    formatter = LazyJsonFormatter(fmt="%(asctime)s %(name)s %(levelname)s %(message)s")
 else:
     formatter = logging.Formatter(fmt="%(asctime)s %(name)s %(levelname)s %(message)s")
 logHandler.setFormatter(formatter)
 logger.addHandler(logHandler)
 
-# Initialize SlowAPI limiter
-limiter = Limiter(key_func=get_remote_address)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Before job workers fork, so they record their postings too
+    install_posting_store()
+    install_analysis_store()
+    install_archive()
+    # Resume jobs interrupted by the last shutdown; otherwise the queue starts lazily
+    if os.path.exists(job_queue_path()):
+        get_job_queue()
+    yield
+    shutdown_job_queue()
+    close_archive()
+
 
 app = FastAPI(
     title=settings.API_TITLE,
     version=settings.API_VERSION,
     description=settings.API_DESCRIPTION,
+    lifespan=lifespan,
 )
+# Reset per worker by the server launcher once the worker is ready
+app.state.startup_time = time.time()
 
 # CORS configuration from environment
 app.add_middleware(
@@ -46,10 +69,14 @@ app.add_middleware(
     allow_headers=settings.CORS_ALLOW_HEADERS,
 )
 
-# Include API routes with slowapi state and register rate-limit exception handler
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+# Include API routes; rate limits are enforced per route (see api/dependencies.py).
+# The routers analyses do not need are imported on their first request.
 app.include_router(api_router)
+include_lazy_router(app, "ajips.app.api.jobs", "/jobs")
+include_lazy_router(app, "ajips.app.api.postings", "/postings")
+include_lazy_router(app, "ajips.app.api.trends", "/trends")
+include_lazy_router(app, "ajips.app.api.salaries", "/salaries")
+
 
 
 @app.middleware("http")
@@ -66,7 +93,7 @@ async def log_requests(request: Request, call_next):
             "url": str(request.url),
             "status_code": response.status_code,
             "process_time_ms": round(process_time, 2),
-            "client_ip": request.client.host if request.client else None,
+            "client_ip": get_client_address(request),
         },
     )
     return response
@@ -11,16 +11,6 @@ class SeverityLevel(str, Enum):
     CRITICAL = "critical"
 
 
-# Salary extraction patterns (order matters: more specific patterns first)
-SALARY_PATTERNS = [
-    # $120k-$160k or 120k-160k or $120k-$160k/year
-    r"\$?(\d+(?:,\d{3})*)k\s*(?:to|-|–)\s*\$?(\d+(?:,\d{3})*)k",
-    r"\$?(\d+(?:,\d{3})*)k",
-    # Standard dollar ranges $120,000-$160,000
-    r"\$(\d+(?:,\d{3})*(?:\.\d{2})?)\s*(?:to|-|–)\s*\$?(\d+(?:,\d{3})*(?:\.\d{2})?)",
-    r"\$(\d+(?:,\d{3})*(?:\.\d{2})?)",
-]
-
 # Interview stage keywords
 INTERVIEW_STAGES = {
     "phone": [
@@ -1,12 +1,217 @@
 from __future__ import annotations
 
 import re
-from typing import List
+from typing import Dict, List, Optional, Sequence, Tuple
 
-from ajips.app.api.schemas import CritiqueItem
+from ajips.app.services.normalization import Section, section_spans
+from ajips.core.deadline import Deadline
+from ajips.core.results import CritiqueItem
 
+YEARS_PATTERN = re.compile(r'(\d+)\+?\s*years?')
 
-def critique_requirements(text: str) -> List[CritiqueItem]:
+# Regex signals: name -> pattern; a signal is present if the pattern matches
+CRITIQUE_PATTERNS = {
+    name: re.compile(pattern)
+    for name, pattern in {
+        "entry_level": r'\b(entry.?level|junior)\b',
+        "database_mention": r'\b(database|db)\b',
+        "pay": r'\$\s*\d+|salary|compensation|pay range',
+        "location": r'\b(remote|hybrid|on.?site|location|office)\b',
+        "full_stack": r'\bfull.?stack\b',
+        "phd": r'\b(phd|ph\.d\.|doctorate)\b',
+        "research": r'\b(research|scientist|professor)\b',
+    }.items()
+}
+QUALITY_PATTERNS = {
+    name: re.compile(pattern)
+    for name, pattern in {
+        "salary": r'\$\s*\d+|salary|compensation',
+        "work_policy": r'\b(remote|hybrid|on.?site)\b',
+        "benefits": r'\b(benefits|health|insurance|401k|pto|vacation)\b',
+        "growth": r'\b(growth|learning|development|training)\b',
+        "culture": r'\b(team|culture|values|mission)\b',
+    }.items()
+}
+
+# Signals searched only in these sections when a posting has them
+SIGNAL_SECTIONS = {"benefits": ("benefits",)}
+
+# Technologies younger than the experience some postings ask for
+NEW_TECH_PATTERNS = [
+    (re.compile(r'\b(next\.js|nuxt|svelte|deno)\b'), 5, "Next.js/Nuxt/Svelte/Deno"),
+    (re.compile(r'\b(rust|go|golang)\b'), 10, "Rust/Go"),
+    (re.compile(r'\b(kubernetes|k8s)\b'), 8, "Kubernetes"),
+]
+
+CLOUD_PROVIDERS = ("aws", "azure", "gcp", "google cloud")
+DATABASES = ("postgresql", "mysql", "mongodb", "redis", "oracle", "sql server")
+LANGUAGES = ["python", "java", "javascript", "typescript", "c++", "c#", "go", "rust", "ruby", "php"]
+STACK_AREAS = [
+    ["react", "angular", "vue", "frontend", "front-end"],
+    ["django", "flask", "spring", "express", "backend", "back-end"],
+    ["postgresql", "mysql", "mongodb", "database"],
+    ["docker", "kubernetes", "aws", "azure", "devops"],
+    ["ios", "android", "react native", "flutter"],
+]
+BUZZWORDS = ["rockstar", "ninja", "guru", "wizard", "unicorn", "10x"]
+QUALITY_BUZZWORDS = BUZZWORDS[:-1]
+
+# Substring signals: present if the term occurs anywhere, even inside a word
+CRITIQUE_TERMS = tuple(dict.fromkeys(
+    ("cloud",) + CLOUD_PROVIDERS + DATABASES + tuple(LANGUAGES)
+    + tuple(term for area in STACK_AREAS for term in area) + tuple(BUZZWORDS)
+))
+
+
+def _no_deadline() -> None:
+    return None
+
+
+def _years_after_mention(pattern: re.Pattern, text_lower: str, start: int = 0, end: Optional[int] = None) -> Optional[re.Match]:
+    r"""
+    First "N years" starting on the same line after a mention of ``pattern``.
+
+    Same result as ``re.search(pattern + r'.*?(\d+)\+?\s*years?', text)``
+    (with the years as group 1), but linear: the next "N years" match is
+    found once and reused for every mention before it, instead of rescanning
+    the rest of the line from each mention (normalized text is one line, which
+    made that quadratic). Only matches starting in ``[start, end)`` count.
+    """
+    end = len(text_lower) if end is None else end
+    years = None
+    for mention in pattern.finditer(text_lower, start):
+        if mention.start() >= end:
+            return None
+        if years is None or years.start() < mention.end():
+            years = YEARS_PATTERN.search(text_lower, mention.end())
+            if years is None or years.start() >= end:
+                return None
+            line_start = text_lower.rfind("\n", 0, years.start()) + 1
+        if mention.end() >= line_start:
+            return years
+    return None
+
+
+class RequirementSignals:
+    """
+    Facts about a posting that the critique and quality rules are decided on.
+
+    Scanning is separate from the rules so a long posting can be scanned in
+    windows and the partial results merged in document order with
+    :meth:`merge`; every field merges exactly (presence is a union, "first"
+    values come from the earliest window, counts and lengths add up).
+    """
+
+    __slots__ = ("present", "first_years", "max_years", "tech_years", "length")
+
+    def __init__(self):
+        self.present = set()  # names of matched *_PATTERNS and *_TERMS
+        self.first_years: Optional[str] = None  # first "N years" in the text
+        self.max_years: Optional[int] = None
+        # Tech name -> years required after its first mention (None while the
+        # years have not been seen yet)
+        self.tech_years: Dict[str, Optional[str]] = {}
+        self.length = 0
+
+    def merge(self, later: "RequirementSignals") -> "RequirementSignals":
+        """
+        Fold in the signals of the text directly following this one.
+
+        Texts must be normalized (single-line): a tech mentioned here takes
+        its years from ``later`` without checking for a line break between.
+        """
+        for tech, years in self.tech_years.items():
+            if years is None:
+                self.tech_years[tech] = later.first_years
+        for tech, years in later.tech_years.items():
+            self.tech_years.setdefault(tech, years)
+        if self.first_years is None:
+            self.first_years = later.first_years
+        if later.max_years is not None:
+            self.max_years = max(self.max_years or 0, later.max_years)
+        self.present |= later.present
+        self.length += later.length
+        return self
+
+
+def scan_requirements(
+    text_lower: str,
+    start: int = 0,
+    end: Optional[int] = None,
+    deadline: Optional[Deadline] = None,
+    critique: bool = True,
+    quality: bool = True,
+    scopes: Optional[Dict[str, Sequence[Tuple[int, int]]]] = None,
+) -> RequirementSignals:
+    """
+    Collect :class:`RequirementSignals` from lowercased text, for the critique
+    rules, the quality score or both.
+
+    Only matches starting in ``[start, end)`` are counted; the text beyond
+    ``end`` is context for matches that straddle it, so neighbouring windows
+    never count the same match twice. ``scopes`` maps signal names to the
+    spans searched for them instead (see :func:`section_scopes`).
+
+    Raises:
+        DeadlineExceeded: If ``deadline`` runs out between checks
+    """
+    end = len(text_lower) if end is None else end
+    check_deadline = deadline.check if deadline is not None else _no_deadline
+    signals = RequirementSignals()
+    signals.length = end - start
+
+    patterns = dict(CRITIQUE_PATTERNS) if critique else {}
+    terms = CRITIQUE_TERMS if critique else ()
+    if quality:
+        patterns.update(QUALITY_PATTERNS)
+        terms = tuple(dict.fromkeys(terms + tuple(QUALITY_BUZZWORDS)))
+
+    scopes = scopes or {}
+    for name, pattern in patterns.items():
+        for span_start, span_end in scopes.get(name, ((start, end),)):
+            match = pattern.search(text_lower, span_start)
+            if match is not None and match.start() < span_end:
+                signals.present.add(name)
+                break
+    check_deadline()
+
+    size = len(text_lower)
+    for term in terms:
+        if text_lower.find(term, start, min(size, end + len(term) - 1)) != -1:
+            signals.present.add(term)
+    check_deadline()
+    if not critique:
+        return signals
+
+    for match in YEARS_PATTERN.finditer(text_lower, start):
+        if match.start() >= end:
+            break
+        if signals.first_years is None:
+            signals.first_years = match.group(1)
+        signals.max_years = max(signals.max_years or 0, int(match.group(1)))
+
+    for pattern, _, tech_name in NEW_TECH_PATTERNS:
+        check_deadline()
+        mention = pattern.search(text_lower, start)
+        if mention is not None and mention.start() < end:
+            years = _years_after_mention(pattern, text_lower, start, end)
+            signals.tech_years[tech_name] = years.group(1) if years else None
+    return signals
+
+
+def section_scopes(
+    sections: Optional[Sequence[Section]],
+) -> Dict[str, List[Tuple[int, int]]]:
+    """``scopes`` for :func:`scan_requirements` from a posting's sections."""
+    scopes = {}
+    for name, section_names in SIGNAL_SECTIONS.items():
+        spans = section_spans(sections, section_names)
+        if spans is not None:
+            scopes[name] = spans
+    return scopes
+
+
+def critique_requirements(text: str, deadline: Optional[Deadline] = None) -> List[CritiqueItem]:
     """
     Analyze job requirements and provide critiques on potential issues.
     Checks for:
@@ -14,26 +219,34 @@ def critique_requirements(text: str) -> List[CritiqueItem]:
     - Unrealistic skill combinations
     - Vague or ambiguous requirements
     - Missing critical information
+
+    Raises:
+        DeadlineExceeded: If ``deadline`` runs out between checks
     """
+    return critiques_from_signals(
+        scan_requirements(text.lower(), deadline=deadline, quality=False)
+    )
+
+
+def critiques_from_signals(signals: RequirementSignals) -> List[CritiqueItem]:
+    """Apply the critique rules to signals from :func:`scan_requirements`."""
     critiques: List[CritiqueItem] = []
-    text_lower = text.lower()
+    present = signals.present
     
     # Check 1: Entry-level with years of experience contradiction
-    if re.search(r'\b(entry.?level|junior)\b', text_lower):
-        years_match = re.search(r'(\d+)\+?\s*years?', text_lower)
-        if years_match and int(years_match.group(1)) >= 3:
+    if "entry_level" in present:
+        if signals.first_years and int(signals.first_years) >= 3:
             critiques.append(
                 CritiqueItem(
                     severity="warning",
-                    message=f"Entry-level role requires {years_match.group(1)}+ years of experience. "
+                    message=f"Entry-level role requires {signals.first_years}+ years of experience. "
                            "This is contradictory and may discourage qualified candidates."
                 )
             )
     
     # Check 2: Unrealistic experience requirements
-    years_matches = re.findall(r'(\d+)\+?\s*years?', text_lower)
-    if years_matches:
-        max_years = max(int(y) for y in years_matches)
+    if signals.max_years is not None:
+        max_years = signals.max_years
         if max_years > 10:
             critiques.append(
                 CritiqueItem(
@@ -44,26 +257,19 @@ def critique_requirements(text: str) -> List[CritiqueItem]:
             )
     
     # Check 3: Technology age vs experience requirement
-    new_tech_patterns = [
-        (r'\b(next\.js|nuxt|svelte|deno)\b', 5, "Next.js/Nuxt/Svelte/Deno"),
-        (r'\b(rust|go|golang)\b', 10, "Rust/Go"),
-        (r'\b(kubernetes|k8s)\b', 8, "Kubernetes"),
-    ]
-    
-    for pattern, tech_age, tech_name in new_tech_patterns:
-        if re.search(pattern, text_lower):
-            years_in_context = re.search(pattern + r'.*?(\d+)\+?\s*years?', text_lower)
-            if years_in_context and int(years_in_context.group(1)) > tech_age:
-                critiques.append(
-                    CritiqueItem(
-                        severity="critical",
-                        message=f"{tech_name} has only existed for ~{tech_age} years, but the posting "
-                               f"requires {years_in_context.group(1)}+ years. This is impossible."
-                    )
+    for _, tech_age, tech_name in NEW_TECH_PATTERNS:
+        years_in_context = signals.tech_years.get(tech_name)
+        if years_in_context and int(years_in_context) > tech_age:
+            critiques.append(
+                CritiqueItem(
+                    severity="critical",
+                    message=f"{tech_name} has only existed for ~{tech_age} years, but the posting "
+                           f"requires {years_in_context}+ years. This is impossible."
                 )
+            )
     
     # Check 4: Vague cloud requirements
-    if "cloud" in text_lower and not any(provider in text_lower for provider in ("aws", "azure", "gcp", "google cloud")):
+    if "cloud" in present and not any(provider in present for provider in CLOUD_PROVIDERS):
         critiques.append(
             CritiqueItem(
                 severity="info",
@@ -72,9 +278,7 @@ def critique_requirements(text: str) -> List[CritiqueItem]:
         )
     
     # Check 5: Database requirements without specificity
-    if re.search(r'\b(database|db)\b', text_lower) and not any(
-        db in text_lower for db in ("postgresql", "mysql", "mongodb", "redis", "oracle", "sql server")
-    ):
+    if "database_mention" in present and not any(db in present for db in DATABASES):
         critiques.append(
             CritiqueItem(
                 severity="info",
@@ -83,8 +287,7 @@ def critique_requirements(text: str) -> List[CritiqueItem]:
         )
     
     # Check 6: Too many programming languages
-    languages = ["python", "java", "javascript", "typescript", "c++", "c#", "go", "rust", "ruby", "php"]
-    mentioned_languages = [lang for lang in languages if lang in text_lower]
+    mentioned_languages = [lang for lang in LANGUAGES if lang in present]
     if len(mentioned_languages) > 3:
         critiques.append(
             CritiqueItem(
@@ -95,7 +298,7 @@ def critique_requirements(text: str) -> List[CritiqueItem]:
         )
     
     # Check 7: Missing salary information
-    if not re.search(r'\$\s*\d+|salary|compensation|pay range', text_lower):
+    if "pay" not in present:
         critiques.append(
             CritiqueItem(
                 severity="info",
@@ -105,7 +308,7 @@ def critique_requirements(text: str) -> List[CritiqueItem]:
         )
     
     # Check 8: Missing remote/location information
-    if not re.search(r'\b(remote|hybrid|on.?site|location|office)\b', text_lower):
+    if "location" not in present:
         critiques.append(
             CritiqueItem(
                 severity="info",
@@ -114,15 +317,10 @@ def critique_requirements(text: str) -> List[CritiqueItem]:
         )
     
     # Check 9: Unrealistic full-stack requirements
-    if re.search(r'\bfull.?stack\b', text_lower):
-        # Count distinct technology categories
-        has_frontend = any(fw in text_lower for fw in ["react", "angular", "vue", "frontend", "front-end"])
-        has_backend = any(fw in text_lower for fw in ["django", "flask", "spring", "express", "backend", "back-end"])
-        has_database = any(db in text_lower for db in ["postgresql", "mysql", "mongodb", "database"])
-        has_devops = any(tool in text_lower for tool in ["docker", "kubernetes", "aws", "azure", "devops"])
-        has_mobile = any(tech in text_lower for tech in ["ios", "android", "react native", "flutter"])
-        
-        tech_count = sum([has_frontend, has_backend, has_database, has_devops, has_mobile])
+    if "full_stack" in present:
+        # Count distinct technology categories (frontend, backend, database,
+        # devops, mobile)
+        tech_count = sum(any(term in present for term in area) for area in STACK_AREAS)
         if tech_count >= 4:
             critiques.append(
                 CritiqueItem(
@@ -133,8 +331,7 @@ def critique_requirements(text: str) -> List[CritiqueItem]:
             )
     
     # Check 10: Buzzword overload
-    buzzwords = ["rockstar", "ninja", "guru", "wizard", "unicorn", "10x"]
-    found_buzzwords = [word for word in buzzwords if word in text_lower]
+    found_buzzwords = [word for word in BUZZWORDS if word in present]
     if found_buzzwords:
         critiques.append(
             CritiqueItem(
@@ -145,7 +342,7 @@ def critique_requirements(text: str) -> List[CritiqueItem]:
         )
     
     # Check 11: Lack of specific responsibilities
-    if len(text) < 200:
+    if signals.length < 200:
         critiques.append(
             CritiqueItem(
                 severity="warning",
@@ -155,7 +352,7 @@ def critique_requirements(text: str) -> List[CritiqueItem]:
         )
     
     # Check 12: Degree requirements
-    if re.search(r'\b(phd|ph\.d\.|doctorate)\b', text_lower) and not re.search(r'\b(research|scientist|professor)\b', text_lower):
+    if "phd" in present and "research" not in present:
         critiques.append(
             CritiqueItem(
                 severity="info",
@@ -177,41 +374,61 @@ def critique_requirements(text: str) -> List[CritiqueItem]:
     return critiques
 
 
-def analyze_job_quality(text: str) -> dict:
+def analyze_job_quality(
+    text: str,
+    deadline: Optional[Deadline] = None,
+    sections: Optional[Sequence[Section]] = None,
+) -> dict:
     """
     Provide an overall quality score and analysis of the job posting.
     Returns a dictionary with score (0-100) and analysis breakdown.
+    Benefits are looked for in the benefits section when ``sections`` has one.
+
+    Raises:
+        DeadlineExceeded: If ``deadline`` runs out between checks
     """
+    return quality_from_signals(
+        scan_requirements(
+            text.lower(),
+            deadline=deadline,
+            critique=False,
+            scopes=section_scopes(sections),
+        )
+    )
+
+
+def quality_from_signals(signals: RequirementSignals) -> dict:
+    """Score a posting from signals collected by :func:`scan_requirements`."""
     score = 100
     issues = []
+    present = signals.present
     
     # Deduct points for various issues
-    if len(text) < 200:
+    if signals.length < 200:
         score -= 20
         issues.append("Very brief description")
     
-    if not re.search(r'\$\s*\d+|salary|compensation', text.lower()):
+    if "salary" not in present:
         score -= 15
         issues.append("No salary information")
     
-    if not re.search(r'\b(remote|hybrid|on.?site)\b', text.lower()):
+    if "work_policy" not in present:
         score -= 10
         issues.append("No work location policy")
     
-    buzzwords = ["rockstar", "ninja", "guru", "wizard", "unicorn"]
-    if any(word in text.lower() for word in buzzwords):
+    if any(word in present for word in QUALITY_BUZZWORDS):
         score -= 15
         issues.append("Contains unprofessional buzzwords")
     
     # Check for positive elements
     positives = []
-    if re.search(r'\b(benefits|health|insurance|401k|pto|vacation)\b', text.lower()):
+    if "benefits" in present:
         positives.append("Mentions benefits")
     
-    if re.search(r'\b(growth|learning|development|training)\b', text.lower()):
+    if "growth" in present:
         positives.append("Emphasizes growth opportunities")
     
-    if re.search(r'\b(team|culture|values|mission)\b', text.lower()):
+    if "culture" in present:
         positives.append("Describes company culture")
     
     return {
@@ -3,7 +3,8 @@
 import re
 from typing import Dict, Optional
 
-from .constants import INTERVIEW_STAGES, SALARY_PATTERNS
+from .extraction import get_skill_matcher
+from .salary import find_salary
 
 
 def extract_salary_range(text: str) -> Optional[Dict]:
@@ -14,59 +15,14 @@ def extract_salary_range(text: str) -> Optional[Dict]:
         text: Job posting text
 
     Returns:
-        Dict with 'min' and 'max' salary or None
+        Dict with annualized 'min' and 'max' salary, 'currency' and the stated
+        pay 'period', or None
     """
     if not text:
         return None
 
-    text_lower = text.lower()
-
-    for pattern in SALARY_PATTERNS:
-        matches = re.findall(pattern, text_lower, re.IGNORECASE)
-        if matches:
-            try:
-                if isinstance(matches[0], tuple):
-                    min_sal, max_sal = matches[0]
-                    # Check if this was a k-format pattern by checking if the original text has 'k'
-                    if "k" in text_lower and pattern == SALARY_PATTERNS[0]:
-                        min_sal += "k"
-                        max_sal += "k"
-                else:
-                    min_sal = matches[0]
-                    max_sal = None
-                    # Check if this was a k-format pattern
-                    if "k" in text_lower and pattern == SALARY_PATTERNS[1]:
-                        min_sal += "k"
-
-                min_val = _parse_salary(min_sal)
-                max_val = _parse_salary(max_sal) if max_sal else min_val
-
-                if min_val and max_val:
-                    return {"min": min_val, "max": max_val, "currency": "USD"}
-            except (ValueError, TypeError):
-                continue
-
-    return None
-
-
-def _parse_salary(salary_str: str) -> Optional[int]:
-    """Parse salary string to integer."""
-    if not salary_str:
-        return None
-
-    salary_str = salary_str.replace(",", "").replace("$", "").strip()
-
-    # Check if ends with 'k'
-    if salary_str.lower().endswith("k"):
-        try:
-            return int(float(salary_str[:-1]) * 1000)
-        except ValueError:
-            return None
-
-    try:
-        return int(float(salary_str))
-    except ValueError:
-        return None
+    salary = find_salary(text)
+    return salary.to_dict() if salary is not None else None
 
 
 def extract_interview_stages(text: str) -> Dict:
@@ -83,15 +39,9 @@ def extract_interview_stages(text: str) -> Dict:
         return {"stages": [], "estimated_rounds": 0}
 
     text_lower = text.lower()
-    detected_stages = []
-
-    # Detect interview stages
-    for stage, keywords in INTERVIEW_STAGES.items():
-        for keyword in keywords:
-            if keyword in text_lower:
-                if stage not in detected_stages:
-                    detected_stages.append(stage)
-                break
+    # Stage keywords are compiled into the skill matcher's single pass
+    matcher = get_skill_matcher()
+    detected_stages = matcher.interview_stages(matcher.scan(text_lower, spans=()))
 
     # Estimate number of rounds
     rounds_match = re.search(r"(\d+)\s*(?:round|interview|stage)s?", text_lower)
@@ -104,6 +104,18 @@ SKILL_CLUSTERS = {
 }
 
 
+# Keywords in the skills that suggest a role (see ROLE_TEMPLATES)
+ROLE_KEYWORDS = {
+    "data scientist": ["data", "scientist", "analytics", "ml"],
+    "backend engineer": ["backend", "back-end", "server", "api"],
+    "frontend developer": ["frontend", "front-end", "ui", "react"],
+    "devops engineer": ["devops", "infrastructure", "cloud", "deployment"],
+    "full stack developer": ["full stack", "fullstack", "full-stack"],
+    "machine learning engineer": ["machine learning", "ml engineer", "ai"],
+    "cloud architect": ["cloud architect", "solutions architect"]
+}
+
+
 def infer_hidden_skills(explicit_skills: List[str]) -> List[str]:
     """
     Infer hidden skills based on explicit skills using multiple strategies:
@@ -120,20 +132,11 @@ def infer_hidden_skills(explicit_skills: List[str]) -> List[str]:
             inferred.update(HIDDEN_SKILL_MAP[skill_lower])
     
     # Strategy 2: Role-based inference
-    role_keywords = {
-        "data scientist": ["data", "scientist", "analytics", "ml"],
-        "backend engineer": ["backend", "back-end", "server", "api"],
-        "frontend developer": ["frontend", "front-end", "ui", "react"],
-        "devops engineer": ["devops", "infrastructure", "cloud", "deployment"],
-        "full stack developer": ["full stack", "fullstack", "full-stack"],
-        "machine learning engineer": ["machine learning", "ml engineer", "ai"],
-        "cloud architect": ["cloud architect", "solutions architect"]
-    }
-    
     # Detect likely role from skills
     detected_roles = []
-    skill_text = " ".join(explicit_skills).lower()
-    for role, keywords in role_keywords.items():
+    # One skill per line, so keywords are only found within a skill
+    skill_text = "\n".join(explicit_skills).lower()
+    for role, keywords in ROLE_KEYWORDS.items():
         if any(keyword in skill_text for keyword in keywords):
             detected_roles.append(role)
     
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import itertools
 import re
 from collections import Counter
-from typing import Dict, List, Set
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ajips.app.services.constants import INTERVIEW_STAGES
+from ajips.app.services.salary import AMOUNT_PATTERN, Salary, salaries_from_amounts
+from ajips.app.services.skill_variants import SkillVariantIndex
 
 # Comprehensive skill database organized by category
 SKILL_DATABASE = {
@@ -227,33 +233,309 @@ for category_skills in SKILL_DATABASE.values():
 ALL_SKILLS.update(MULTI_WORD_SKILLS)
 
 
-def extract_skills(text: str) -> List[str]:
+# Sections skills are taken from when a posting has any of them; otherwise
+# the whole posting is scanned (see normalization.segment_sections)
+SKILL_SECTIONS = ("responsibilities", "requirements", "nice_to_have")
+
+# Tokenizer for single-word skills (preserves c++, c#, node.js, ci-cd style tokens)
+TOKEN_PATTERN = re.compile(r"\b[\w+#.-]+\b")
+
+
+def _owned(matches: Iterator[re.Match], end: int) -> List[re.Match]:
+    """The leading ``matches`` that start before ``end``."""
+    return list(itertools.takewhile(lambda match: match.start() < end, matches))
+
+
+class SkillCounts:
+    """
+    Skill mentions, interview stages and salaries found in a span of text.
+
+    Counts of adjacent spans combine with :meth:`merge` (in document order),
+    so a long posting can be scanned in windows.
+    """
+
+    __slots__ = ("phrases", "tokens", "token_counts", "stages", "salaries")
+
+    def __init__(self):
+        # Multi-word skill -> number of matches
+        self.phrases: Dict[str, int] = {}
+        # Single-word skill -> first raw token it was seen as (discovery order)
+        self.tokens: Dict[str, str] = {}
+        # Raw token -> occurrences, for tokens that are skills
+        self.token_counts: Counter = Counter()
+        # Interview stages with a keyword mentioned
+        self.stages: Set[str] = set()
+        # Salaries, in document order
+        self.salaries: List[Salary] = []
+
+    def merge(self, later: "SkillCounts") -> "SkillCounts":
+        """Fold in the counts of the text directly following this one."""
+        for skill, matches in later.phrases.items():
+            self.phrases[skill] = self.phrases.get(skill, 0) + matches
+        for skill, token in later.tokens.items():
+            self.tokens.setdefault(skill, token)
+        self.token_counts.update(later.token_counts)
+        self.stages.update(later.stages)
+        self.salaries.extend(later.salaries)
+        return self
+
+
+def _alternation(phrases: Iterable[str]) -> str:
+    """
+    Regex for any of ``phrases``, longest first, factored by common prefixes
+    so that the engine follows one branch per character instead of trying
+    every phrase in turn.
+    """
+    phrases = sorted(set(phrases))
+    optional = "" in phrases
+    branches = [
+        re.escape(first) + _alternation(phrase[1:] for phrase in group)
+        for first, group in itertools.groupby(
+            (phrase for phrase in phrases if phrase), key=lambda phrase: phrase[0]
+        )
+    ]
+    if not branches:
+        return ""
+    if len(branches) == 1 and not optional:
+        return branches[0]
+    return "(?:" + "|".join(branches) + ")" + ("?" if optional else "")
+
+
+class SkillMatcher:
+    """
+    Precompiled patterns for skill lookup against the skill taxonomy.
+
+    A single regex pass over the text finds multi-word skills, interview
+    stage keywords and salary amounts together; single-word skills come from
+    a token pass over the spans skills are taken from.
+    """
+
+    def __init__(
+        self,
+        multi_word_skills: Set[str],
+        all_skills: Set[str],
+        variants: Optional[SkillVariantIndex] = None,
+        stage_keywords: Optional[Dict[str, Sequence[str]]] = None,
+    ):
+        self.all_skills = frozenset(all_skills)
+        self._skill_names = {skill: skill for skill in self.all_skills}
+        # Consulted only for tokens that are not skills themselves
+        self.variants = variants
+        self.multi_word_skills = list(multi_word_skills)
+        stage_keywords = stage_keywords or {}
+        self.stage_names = list(stage_keywords)
+        keyword_stages = {
+            keyword: stage
+            for stage, keywords in stage_keywords.items()
+            for keyword in keywords
+        }
+        phrases = set(self.multi_word_skills) | set(keyword_stages)
+        # Phrase -> (skills, stages) it counts for: its own and those of the
+        # phrases it starts with ("phone" in "phone screen"), which are not
+        # reported separately at the same position
+        self._phrase_hits: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+        for phrase in phrases:
+            prefixes = [
+                other for other in phrases if re.match(re.escape(other) + r"\b", phrase)
+            ]
+            self._phrase_hits[phrase] = (
+                tuple(other for other in prefixes if other in multi_word_skills),
+                tuple(
+                    {
+                        keyword_stages[other]
+                        for other in prefixes
+                        if other in keyword_stages
+                    }
+                ),
+            )
+        # A zero-width match at each word start a phrase begins at, so that
+        # phrases inside others are found too; word boundaries avoid partial
+        # matches inside longer words
+        self.pattern = re.compile(
+            r"\b(?=(?P<phrase>" + _alternation(phrases) + r")\b)|" + AMOUNT_PATTERN
+        )
+
+    def count(self, text_lower: str) -> Dict[str, int]:
+        """Count skill mentions in lowercased text, in order of discovery."""
+        return self.resolve(self.scan(text_lower))
+
+    def scan(
+        self,
+        text_lower: str,
+        start: int = 0,
+        end: Optional[int] = None,
+        spans: Optional[Sequence[Tuple[int, int]]] = None,
+    ) -> SkillCounts:
+        """
+        Collect mentions starting in ``text_lower[start:end]``; with ``spans``
+        (in order, within that range) skills only count inside them.
+        """
+        end = len(text_lower) if end is None else end
+        spans = [(start, end)] if spans is None else spans
+        counts = SkillCounts()
+        phrases = counts.phrases
+        amounts = []
+        # First span not ending before the current match
+        span = 0
+        for match in self.pattern.finditer(text_lower, start):
+            position = match.start()
+            phrase = match.group("phrase")
+            if position >= end:
+                # An amount just past the end may close a range begun before it
+                if phrase is None and amounts:
+                    amounts.append(match)
+                break
+            if phrase is None:
+                amounts.append(match)
+                continue
+            skills, stages = self._phrase_hits[phrase]
+            counts.stages.update(stages)
+            if skills:
+                while span < len(spans) and spans[span][1] <= position:
+                    span += 1
+                if span < len(spans) and spans[span][0] <= position:
+                    for skill in skills:
+                        phrases[skill] = phrases.get(skill, 0) + 1
+        if amounts:
+            counts.salaries.extend(
+                salary
+                for salary in salaries_from_amounts(text_lower, amounts)
+                if salary.start < end
+            )
+
+        for span_start, span_end in spans:
+            self._scan_tokens(text_lower, span_start, span_end, counts)
+        return counts
+
+    def _scan_tokens(
+        self, text_lower: str, start: int, end: int, counts: SkillCounts
+    ) -> None:
+        """Add the single-word skills starting in ``text_lower[start:end]``."""
+        if start == 0 and end == len(text_lower):
+            tokens = TOKEN_PATTERN.findall(text_lower)
+        else:
+            owned = _owned(TOKEN_PATTERN.finditer(text_lower, start), end)
+            tokens = [match.group() for match in owned]
+        cleaned_tokens = [token.strip(".,;:()[]{}") for token in tokens]
+        variants = self.variants
+        if variants is None:
+            skills = list(map(self._skill_names.get, cleaned_tokens))
+        else:
+            # Tokens not seen before go through the variant index once; the
+            # rest are dict lookups
+            resolved = variants.resolved
+            try:
+                skills = list(map(resolved.__getitem__, cleaned_tokens))
+            except KeyError:
+                unseen = set(cleaned_tokens).difference(resolved)
+                found = {token: variants.lookup(token) for token in unseen}
+                resolved = variants.resolved
+                if not resolved.keys() >= found.keys():
+                    # The index emptied its cache meanwhile
+                    resolved = {**resolved, **found}
+                skills = list(map(resolved.__getitem__, cleaned_tokens))
+            if not variants.join_suffixes.isdisjoint(cleaned_tokens):
+                self._join_split_skills(tokens, cleaned_tokens, skills)
+
+        for skill, token in zip(
+            filter(None, skills), itertools.compress(tokens, skills)
+        ):
+            counts.token_counts[token] += 1
+            counts.tokens.setdefault(skill, token)
+
+    def _join_split_skills(
+        self,
+        tokens: List[str],
+        cleaned_tokens: List[str],
+        skills: List[Optional[str]],
+    ) -> None:
+        """
+        Replace token pairs spelling a skill ("postgre sql", "java script")
+        by the joined token, in place; the pair wins over its parts. Pairs
+        are only looked up when a plain-word first part of the skill occurs.
+        """
+        variants = self.variants
+        present = set(cleaned_tokens)
+        # Positions of the tokens that can end a pair with a token present,
+        # found without a Python-level pass over every token
+        positions = []
+        for suffix in variants.join_suffixes.intersection(present):
+            if variants.join_prefixes[suffix].isdisjoint(present):
+                continue
+            # The first token cannot end a pair
+            position = 0
+            while True:
+                try:
+                    position = cleaned_tokens.index(suffix, position + 1)
+                except ValueError:
+                    break
+                positions.append(position)
+        last = -2  # First token of the last pair joined
+        for second in sorted(positions):
+            first = second - 1
+            if first == last + 1:
+                continue
+            skill = variants.joined(cleaned_tokens[first], cleaned_tokens[second])
+            if skill is not None:
+                tokens[first] = f"{tokens[first]} {tokens[second]}"
+                skills[first], skills[second] = skill, None
+                last = first
+
+    def resolve(self, counts: SkillCounts) -> Dict[str, int]:
+        """Turn scanned counts into skill -> mentions, in order of discovery."""
+        found_skills: Dict[str, int] = {
+            skill: counts.phrases[skill]
+            for skill in self.multi_word_skills
+            if skill in counts.phrases
+        }
+        for cleaned, token in counts.tokens.items():
+            if cleaned not in found_skills:
+                found_skills[cleaned] = counts.token_counts[token]
+        return found_skills
+
+    def interview_stages(self, counts: SkillCounts) -> List[str]:
+        """The interview stages mentioned, in the order they were configured."""
+        return [stage for stage in self.stage_names if stage in counts.stages]
+
+
+@lru_cache(maxsize=None)
+def get_skill_matcher() -> SkillMatcher:
+    """Build the skill matcher once per process (shared by forked workers)."""
+    from ajips.app.config import settings
+
+    variants = (
+        SkillVariantIndex(ALL_SKILLS, MULTI_WORD_SKILLS)
+        if settings.FUZZY_SKILL_MATCHING
+        else None
+    )
+    return SkillMatcher(MULTI_WORD_SKILLS, ALL_SKILLS, variants, INTERVIEW_STAGES)
+
+
+def scan_posting(
+    text: str, spans: Optional[Sequence[Tuple[int, int]]] = None
+) -> SkillCounts:
+    """
+    Skill mentions (only those starting inside ``spans``, when given),
+    interview stages and salaries in ``text``, from a single scan.
+    """
+    return get_skill_matcher().scan(text.lower(), spans=spans)
+
+
+def extract_skills(
+    text: str, spans: Optional[Sequence[Tuple[int, int]]] = None
+) -> List[str]:
     """
     Extract technical and soft skills from job posting text.
     Uses pattern matching for both single-word and multi-word skills.
+
+    With ``spans`` (e.g. the posting's ``SKILL_SECTIONS``), only mentions
+    starting inside them count.
     """
-    text_lower = text.lower()
-    found_skills: Dict[str, int] = {}
-
-    # Extract multi-word skills first (to avoid partial matches)
-    for skill in MULTI_WORD_SKILLS:
-        # Use word boundaries for better matching
-        pattern = r"\b" + re.escape(skill) + r"\b"
-        matches = len(re.findall(pattern, text_lower))
-        if matches > 0:
-            found_skills[skill] = matches
-
-    # Extract single-word skills
-    # Tokenize while preserving some punctuation patterns
-    tokens = re.findall(r"\b[\w+#.-]+\b", text_lower)
-
-    for token in tokens:
-        # Clean token
-        cleaned = token.strip(".,;:()[]{}")
-        if cleaned in ALL_SKILLS and cleaned not in found_skills:
-            found_skills[cleaned] = tokens.count(token)
-
-    # Sort by frequency and return
+    return rank_skills(get_skill_matcher().resolve(scan_posting(text, spans)))
+
+
+def rank_skills(found_skills: Dict[str, int]) -> List[str]:
+    """Skills by mention count, ties in order of discovery."""
     sorted_skills = sorted(found_skills.items(), key=lambda x: x[1], reverse=True)
     return [skill for skill, _ in sorted_skills]
 
@@ -288,42 +570,66 @@ def categorize_skills(skills: List[str]) -> Dict[str, List[str]]:
     return {k: v for k, v in categorized.items() if v}
 
 
-def extract_experience_level(text: str) -> str:
+# Experience levels, most junior first; the first level mentioned wins
+EXPERIENCE_LEVEL_PATTERNS = [
+    ("Entry Level", re.compile(r"\b(entry.?level|junior|graduate|0-2 years)\b")),
+    ("Mid Level", re.compile(r"\b(mid.?level|intermediate|2-5 years|3-5 years)\b")),
+    ("Senior Level", re.compile(r"\b(senior|lead|5\+ years|7\+ years)\b")),
+    (
+        "Principal/Staff Level",
+        re.compile(r"\b(principal|staff|architect|10\+ years)\b"),
+    ),
+    ("Leadership", re.compile(r"\b(director|vp|head of|chief)\b")),
+]
+
+EDUCATION_PATTERNS = [
+    ("Bachelor's Degree", re.compile(r"\b(bachelor|bs|ba|b\.s\.|b\.a\.)\b")),
+    ("Master's Degree", re.compile(r"\b(master|ms|ma|m\.s\.|m\.a\.|mba)\b")),
+    ("PhD", re.compile(r"\b(phd|ph\.d\.|doctorate)\b")),
+    (
+        "Professional Certification",
+        re.compile(r"\b(certification|certifications|certified|certificate)\b"),
+    ),
+]
+
+
+def _mentioned(pattern: re.Pattern, text_lower: str, start: int, end: int) -> bool:
+    match = pattern.search(text_lower, start)
+    return match is not None and match.start() < end
+
+
+def extract_experience_level(
+    text: str, start: int = 0, end: Optional[int] = None
+) -> str:
     """
     Extract experience level from job posting.
+
+    ``start``/``end`` restrict matches to those starting in that span.
     """
     text_lower = text.lower()
+    end = len(text_lower) if end is None else end
 
-    if re.search(r"\b(entry.?level|junior|graduate|0-2 years)\b", text_lower):
-        return "Entry Level"
-    elif re.search(r"\b(mid.?level|intermediate|2-5 years|3-5 years)\b", text_lower):
-        return "Mid Level"
-    elif re.search(r"\b(senior|lead|5\+ years|7\+ years)\b", text_lower):
-        return "Senior Level"
-    elif re.search(r"\b(principal|staff|architect|10\+ years)\b", text_lower):
-        return "Principal/Staff Level"
-    elif re.search(r"\b(director|vp|head of|chief)\b", text_lower):
-        return "Leadership"
+    for level, pattern in EXPERIENCE_LEVEL_PATTERNS:
+        if _mentioned(pattern, text_lower, start, end):
+            return level
 
     return "Not Specified"
 
 
-def extract_education_requirements(text: str) -> List[str]:
+def extract_education_requirements(
+    text: str, start: int = 0, end: Optional[int] = None
+) -> List[str]:
     """
     Extract education requirements from job posting.
+
+    ``start``/``end`` restrict matches to those starting in that span.
     """
-    requirements = []
     text_lower = text.lower()
-
-    if re.search(r"\b(bachelor|bs|ba|b\.s\.|b\.a\.)\b", text_lower):
-        requirements.append("Bachelor's Degree")
-    if re.search(r"\b(master|ms|ma|m\.s\.|m\.a\.|mba)\b", text_lower):
-        requirements.append("Master's Degree")
-    if re.search(r"\b(phd|ph\.d\.|doctorate)\b", text_lower):
-        requirements.append("PhD")
-    if re.search(
-        r"\b(certification|certifications|certified|certificate)\b", text_lower
-    ):
-        requirements.append("Professional Certification")
+    end = len(text_lower) if end is None else end
+    requirements = [
+        requirement
+        for requirement, pattern in EDUCATION_PATTERNS
+        if _mentioned(pattern, text_lower, start, end)
+    ]
 
     return requirements if requirements else ["Not Specified"]
@@ -4,13 +4,29 @@ from typing import Optional
 
 import ipaddress
 import urllib.parse
-import requests
-from bs4 import BeautifulSoup
+
+from ajips.core.lazy import lazy_import
+from ajips.core.singleflight import SingleFlight, canonical_url
+
+# Only needed when a posting is fetched by URL; imported on first use
+requests = lazy_import("requests")
+bs4 = lazy_import("bs4")
 
 
 # Allowed schemes
 ALLOWED_SCHEMES = {"http", "https"}
 
+# Concurrent requests for the same posting share one download
+_fetches = SingleFlight("fetch")
+
+# Elements that start a new line; the section segmenter only looks for
+# headings at line starts, so fetched pages must keep their lines
+_BLOCK_TAGS = (
+    "address article aside blockquote br dd div dl dt fieldset figcaption figure "
+    "footer form h1 h2 h3 h4 h5 h6 header hr li main nav ol p pre section table "
+    "title tr ul"
+).split()
+
 
 def _is_safe_url(url: str, allowed_netlocs: Optional[list] = None) -> bool:
     """Validate URL scheme, hostname, and prevent SSRF to private networks."""
@@ -50,10 +66,19 @@ def fetch_job_posting(url: str, timeout_s: Optional[int] = None) -> Optional[str
         timeout_s = settings.INGESTION_TIMEOUT_S
     if not _is_safe_url(url):
         raise ValueError("URL is not allowed or is potentially unsafe")
+    return _fetches.do(canonical_url(url), lambda: _download(url, timeout_s))
+
+
+def _download(url: str, timeout_s: int) -> Optional[str]:
     response = requests.get(url, timeout=timeout_s)
     response.raise_for_status()
-    soup = BeautifulSoup(response.text, "html.parser")
+    soup = bs4.BeautifulSoup(response.text, "html.parser")
     for tag in soup(["script", "style", "noscript"]):
         tag.decompose()
-    text = " ".join(soup.stripped_strings)
+    for tag in soup(_BLOCK_TAGS):
+        tag.insert_before("\n")
+        tag.insert_after("\n")
+    # Collapse whitespace within lines and drop the empty ones
+    lines = (" ".join(line.split()) for line in soup.get_text().splitlines())
+    text = "\n".join(line for line in lines if line)
     return text or None
@@ -1,18 +1,177 @@
 from __future__ import annotations
 
+import itertools
 import re
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Section name -> heading phrases. Groups are tried in this order, so
+# "preferred qualifications" is a nice-to-have and "about the role" describes
+# responsibilities rather than the company.
+SECTION_HEADINGS: Dict[str, Tuple[str, ...]] = {
+    "nice_to_have": (
+        "nice to have",
+        "nice-to-have",
+        "preferred qualifications",
+        "preferred skills",
+        "preferred experience",
+        "bonus points",
+        "bonus",
+        "pluses",
+    ),
+    "responsibilities": (
+        "responsibilities",
+        "what you'll do",
+        "what you will do",
+        "about the role",
+        "about the job",
+        "the role",
+        "your role",
+        "duties",
+        "day to day",
+    ),
+    "requirements": (
+        "requirements",
+        "qualifications",
+        "what you'll need",
+        "what you will need",
+        "what we're looking for",
+        "what we are looking for",
+        "who you are",
+        "must have",
+        "must-have",
+        "skills",
+        "experience",
+    ),
+    "benefits": (
+        "benefits",
+        "compensation and benefits",
+        "perks",
+        "what we offer",
+        "why join us",
+    ),
+    "about": (
+        "about us",
+        "about the company",
+        "about the team",
+        "who we are",
+        "company overview",
+        "our company",
+        "about",
+    ),
+}
+
+_HEADING_PREFIXES = (
+    "key|main|core|minimum|basic|required|additional|general|your|our|job|the"
+)
+
+
+def _heading_group(name: str, phrases: Iterable[str]) -> str:
+    alternatives = sorted(phrases, key=len, reverse=True)
+    escaped = "|".join(
+        re.escape(p).replace("'", "['’]").replace(r"\ ", r"\s+") for p in alternatives
+    )
+    return f"(?P<{name}>{escaped})"
+
+
+# A known phrase, after up to two qualifiers like "Key" or "Minimum"
+_HEADING = (
+    rf"\b(?P<heading>(?:(?:{_HEADING_PREFIXES})[^\S\n]+){{0,2}}(?:"
+    + "|".join(_heading_group(n, p) for n, p in SECTION_HEADINGS.items())
+    + r"))\b"
+)
+_COLON = r"(?:[^\S\n]+[^\n:.]{0,30}?)?[^\S\n]*\**[^\S\n]*:"
+
+# Headings start a line, possibly after markdown/bullet markup: a heading
+# phrase followed by a colon, possibly after a few more words ("Requirements
+# for this role:"), or a phrase alone on its line. A heading word before a
+# colon in running prose ("... Our benefits: great.") is not a heading.
+_LINE_HEADING = re.compile(
+    r"[^\S\n]*(?:[#>*•\-][^\S\n]*)*"
+    + _HEADING
+    + rf"(?:{_COLON}|[^\S\n]*\**[^\S\n]*(?=\n|\Z))",
+    re.IGNORECASE,
+)
+_NEWLINE = re.compile(r"\n")
+
+
+class Section(NamedTuple):
+    """A titled part of a posting: ``text[start:end]``, heading included."""
+
+    name: str
+    start: int
+    end: int
 
 
 def normalize_text(text: str) -> str:
-    collapsed = re.sub(r"\s+", " ", text)
+    collapsed = _WHITESPACE.sub(" ", text)
     return collapsed.strip()
 
 
-def split_sections(text: str) -> dict[str, str]:
-    sections = {"body": text}
-    for heading in ("Responsibilities", "Qualifications", "Requirements"):
-        pattern = rf"{heading}\s*[:\-]"
-        match = re.search(pattern, text, flags=re.IGNORECASE)
-        if match:
-            sections[heading.lower()] = text[match.end():].strip()
-    return sections
+def segment_sections(text: str) -> List[Section]:
+    """
+    Find section headings in one pass and return the sections as offsets.
+
+    Each section runs from its heading to the next heading (or the end of the
+    text); text before the first heading belongs to no section. Only line
+    starts are examined and nothing is copied, so extractors can cheaply
+    scan just the sections they need.
+    """
+    starts: List[Tuple[str, int]] = []
+    line_starts = itertools.chain((0,), (m.end() for m in _NEWLINE.finditer(text)))
+    for line_start in line_starts:
+        match = _LINE_HEADING.match(text, line_start)
+        if match is not None:
+            name = next(name for name in SECTION_HEADINGS if match.group(name))
+            starts.append((name, match.start("heading")))
+    ends = [start for _, start in starts[1:]] + [len(text)]
+    return [Section(name, start, end) for (name, start), end in zip(starts, ends)]
+
+
+def collapse_whitespace(text: str, offsets: Sequence[int]) -> Tuple[str, List[int]]:
+    """
+    Collapse whitespace runs as :func:`normalize_text` does (without the
+    strip) and map sorted ``offsets`` into the result.
+
+    Offsets must not split a whitespace run (a word start or any position
+    next to a non-space character is fine).
+    """
+    pieces = []
+    mapped = []
+    length = 0
+    position = 0
+    for offset in offsets:
+        piece = _WHITESPACE.sub(" ", text[position:offset])
+        pieces.append(piece)
+        length += len(piece)
+        mapped.append(length)
+        position = offset
+    pieces.append(_WHITESPACE.sub(" ", text[position:]))
+    return "".join(pieces), mapped
+
+
+def normalize_sections(text: str) -> Tuple[str, List[Section]]:
+    """:func:`normalize_text` plus the text's sections, in normalized offsets."""
+    sections = segment_sections(text)
+    collapsed, starts = collapse_whitespace(text, [s.start for s in sections])
+    lead = len(collapsed) - len(collapsed.lstrip())
+    normalized = collapsed.strip()
+    starts = [min(max(0, start - lead), len(normalized)) for start in starts]
+    ends = starts[1:] + [len(normalized)]
+    return normalized, [
+        Section(section.name, start, end)
+        for section, start, end in zip(sections, starts, ends)
+    ]
+
+
+def section_spans(
+    sections: Optional[Sequence[Section]], names: Iterable[str]
+) -> Optional[List[Tuple[int, int]]]:
+    """
+    ``(start, end)`` of the sections called one of ``names``; None when the
+    text has none of them, meaning extractors should scan the whole text.
+    """
+    wanted = set(names)
+    spans = [(s.start, s.end) for s in sections or () if s.name in wanted]
+    return spans or None
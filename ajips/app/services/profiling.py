@@ -2,8 +2,8 @@ from __future__ import annotations
 
 from typing import List
 
-from ajips.app.api.schemas import FocusArea
 from ajips.app.services.extraction import SKILL_DATABASE, categorize_skills
+from ajips.core.results import FocusArea
 
 
 # Enhanced focus area mappings aligned with skill database
@@ -27,6 +27,20 @@ FOCUS_AREA_MAP = {
 }
 
 
+# Skills that suggest each role; two or more pick it (see identify_role_type)
+ROLE_PATTERNS = {
+    "Data Scientist": ["python", "machine learning", "statistics", "pandas", "scikit-learn"],
+    "Backend Engineer": ["python", "java", "api", "database", "sql"],
+    "Frontend Developer": ["react", "javascript", "html", "css", "typescript"],
+    "Full Stack Developer": ["react", "node.js", "javascript", "database"],
+    "DevOps Engineer": ["docker", "kubernetes", "aws", "terraform", "ci/cd"],
+    "Data Engineer": ["spark", "airflow", "kafka", "python", "sql"],
+    "Machine Learning Engineer": ["tensorflow", "pytorch", "machine learning", "python"],
+    "Cloud Architect": ["aws", "azure", "gcp", "terraform", "cloud"],
+    "Mobile Developer": ["ios", "android", "react native", "flutter", "swift", "kotlin"]
+}
+
+
 def build_focus_areas(explicit_skills: List[str]) -> List[FocusArea]:
     """
     Build focus areas from explicit skills with improved categorization and weighting.
@@ -62,24 +76,14 @@ def identify_role_type(explicit_skills: List[str]) -> str:
     """
     Identify the most likely role type based on skills.
     """
-    skill_text = " ".join(explicit_skills).lower()
-    
-    role_patterns = {
-        "Data Scientist": ["python", "machine learning", "statistics", "pandas", "scikit-learn"],
-        "Backend Engineer": ["python", "java", "api", "database", "sql"],
-        "Frontend Developer": ["react", "javascript", "html", "css", "typescript"],
-        "Full Stack Developer": ["react", "node.js", "javascript", "database"],
-        "DevOps Engineer": ["docker", "kubernetes", "aws", "terraform", "ci/cd"],
-        "Data Engineer": ["spark", "airflow", "kafka", "python", "sql"],
-        "Machine Learning Engineer": ["tensorflow", "pytorch", "machine learning", "python"],
-        "Cloud Architect": ["aws", "azure", "gcp", "terraform", "cloud"],
-        "Mobile Developer": ["ios", "android", "react native", "flutter", "swift", "kotlin"]
-    }
+    # One skill per line: keywords are only found within a skill, so the
+    # order of the skills does not matter
+    skill_text = "\n".join(explicit_skills).lower()
     
     best_match = "Software Engineer"
     max_matches = 0
     
-    for role, keywords in role_patterns.items():
+    for role, keywords in ROLE_PATTERNS.items():
         matches = sum(1 for keyword in keywords if keyword in skill_text)
         if matches > max_matches:
             max_matches = matches
@@ -0,0 +1,355 @@
+"""
+Single-pass salary scanner: amounts, ranges, pay periods and currencies.
+
+One regular expression finds the amounts that are marked as money: a number
+after a currency ("$", "€", "CA$", "EUR") or before a ``k``/``M`` suffix or a
+currency. It is built so that the regex engine never backtracks more than
+the number it is looking at: the number is a single character-class
+repetition, and an unprefixed number can only start a run of digits. Each
+amount then looks at bounded windows around itself for an unmarked other end
+of a range ("50,000 - 60,000 USD"), a pay period ("/hr", "per month",
+"annually") and pay words. Numbers longer than ``MAX_NUMBER_CHARS`` are not
+parsed. Work is therefore linear in the length of the text whatever it
+contains.
+
+A lone ``k`` figure without currency also needs a pay word ("salary",
+"rate") earlier in its sentence, so "10k users" and "401k" are not pay, and
+million suffixes need a pay period, so funding rounds ("$20M Series B") are
+not either. Figures are normalized to annual amounts (2080 working hours, 260
+days, 52 weeks or 12 months a year) and kept when they are plausible.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Annual multiplier per pay period
+PERIODS = {"hour": 2080, "day": 260, "week": 52, "month": 12, "year": 1}
+CURRENCY_SYMBOLS = {
+    "$": "USD",
+    "us$": "USD",
+    "c$": "CAD",
+    "ca$": "CAD",
+    "a$": "AUD",
+    "au$": "AUD",
+    "nz$": "NZD",
+    "s$": "SGD",
+    "hk$": "HKD",
+    "€": "EUR",
+    "£": "GBP",
+    "¥": "JPY",
+    "₹": "INR",
+}
+CURRENCY_CODES = (
+    "usd eur gbp cad aud nzd chf sek nok dkk pln inr jpy sgd hkd brl mxn zar"
+).split()
+DEFAULT_CURRENCY = "USD"
+# Annualized salaries outside these bounds are taken for other figures
+MIN_ANNUAL = 1_000
+MAX_ANNUAL = 100_000_000
+MAX_NUMBER_CHARS = 20
+
+_FACTORS = {"k": 1_000, "m": 1_000_000, "mm": 1_000_000, "mn": 1_000_000}
+_PERIOD_WORDS = {
+    "h": "hour",
+    "hr": "hour",
+    "hour": "hour",
+    "hourly": "hour",
+    "day": "day",
+    "daily": "day",
+    "wk": "week",
+    "week": "week",
+    "weekly": "week",
+    "mo": "month",
+    "month": "month",
+    "monthly": "month",
+    "yr": "year",
+    "year": "year",
+    "annum": "year",
+    "annual": "year",
+    "annually": "year",
+    "yearly": "year",
+    "pa": "year",
+}
+
+_CODE = "|".join(CURRENCY_CODES)
+_SUFFIX = r"(?:k|mm|mn|m)(?![a-z0-9])"
+_SEPARATOR = r"[^\S\n]*(?:-|–|—|~|\bto\b)[^\S\n]*"
+# Patterns run on lowercased text: case-insensitive matching is much slower.
+# Amounts start with their first digit so the engine can skip to digits; the
+# currency before it is checked by lookbehinds and found in Python. The
+# pattern's groups are ``number``, ``factor``, ``code`` and ``symbol``.
+AMOUNT_PATTERN = (
+    # Only the start of a run of digits
+    r"(?P<number>[0-9](?<![\w.,][0-9])"
+    # "$120k", "€4.500", "CA$ 90,000", "eur 50.000"
+    r"(?:(?<=[$€£¥₹][0-9])|(?<=[$€£¥₹][^\S\n][0-9])"
+    rf"|(?<=\b(?:{_CODE})[^\S\n][0-9])"
+    # "120k", "60,000 usd", "50.000 €"
+    rf"|(?=[0-9.,]*[^\S\n]?(?:{_SUFFIX}|(?:{_CODE})\b|[€£¥₹$])))"
+    r"[0-9.,]*)"
+    rf"(?:[^\S\n]?(?P<factor>{_SUFFIX}))?"
+    rf"(?:[^\S\n]?(?P<code>{_CODE})\b|[^\S\n]?(?P<symbol>[€£¥₹$]))?"
+)
+_AMOUNT = re.compile(AMOUNT_PATTERN)
+# At most the few characters before an amount
+_CURRENCY_BEFORE = re.compile(
+    rf"(?:(?:\b[a-z]{{1,2}})?\$|[€£¥₹]|\b(?:{_CODE}))[^\S\n]?\Z"
+)
+# Unmarked other ends of a range, matched within a few characters
+_RANGE_START = re.compile(r"(?<![\w.,])(?P<number>[0-9][0-9.,]*)" + _SEPARATOR + r"\Z")
+_RANGE_END = re.compile(_SEPARATOR + r"(?P<number>[0-9][0-9.,]*)(?![\w.,])")
+_PERIOD_AFTER = re.compile(
+    r"[^\S\n]*(?:(?:gross|base|net|total|salary|pay)[^\S\n]+)?"
+    r"(?:(?:/|\bper\b|\ban?\b|\beach\b|\bevery\b)[^\S\n]*"
+    r"(h|hr|hour|day|wk|week|mo|month|yr|year|annum)s?\b"
+    r"|(hourly|daily|weekly|monthly|annually|annual|yearly)\b|(p\.?a)\b)"
+)
+# Earlier in the same sentence as an amount
+_PAY_BEFORE = re.compile(
+    r"\b(?:salary|pay|compensation|comp|base|ote|rate|earn)[^.;\n]*\Z"
+)
+_PERIOD_BEFORE = re.compile(
+    r"\b(hourly|daily|weekly|monthly|annual|yearly)\b[^.;\n]*\Z"
+)
+_ASCII_LOWER = {ord(c): ord(c.lower()) for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"}
+# Window sizes around an amount
+_RANGE_CHARS = 32
+_CURRENCY_CHARS = 5
+_PERIOD_CHARS = 40
+_BEFORE_SENTENCE_CHARS = 30
+
+
+class Salary(NamedTuple):
+    """Annualized pay found at ``text[start:end]``; ``period`` as stated."""
+
+    min: int
+    max: int
+    currency: str
+    period: str
+    start: int
+    end: int
+
+    def to_dict(self) -> Dict[str, object]:
+        """The ``salary_range`` of an analysis: annual min and max, currency, period."""
+        return {
+            "min": self.min,
+            "max": self.max,
+            "currency": self.currency,
+            "period": self.period,
+        }
+
+
+class _Amount(NamedTuple):
+    value: float
+    factor: int
+    currency: Optional[str]
+    start: int
+    end: int
+
+
+def _grouped(groups: List[str]) -> bool:
+    """Whether ``groups`` are thousands groups ("120,000", "5,00,000")."""
+    return (
+        all(group.isdigit() for group in groups)
+        and len(groups[0]) <= 3
+        and len(groups[-1]) == 3
+        and all(len(group) in (2, 3) for group in groups[1:-1])
+    )
+
+
+def parse_number(token: str) -> Optional[float]:
+    """
+    Value of a number written with thousands and decimal separators in
+    either convention ("120,000", "50.000", "1.5", "1.234,56"), or None.
+    """
+    token = token.rstrip(".,")
+    if len(token) > MAX_NUMBER_CHARS:
+        return None
+    if token.isdigit():
+        return float(token)
+    if "," in token and "." in token:
+        decimal = "," if token.rfind(",") > token.rfind(".") else "."
+        whole, _, fraction = token.rpartition(decimal)
+        groups = whole.split("." if decimal == "," else ",")
+        if not _grouped(groups) or not fraction.isdigit():
+            return None
+        return float("".join(groups) + "." + fraction)
+    for separator in ".,":
+        if separator in token:
+            groups = token.split(separator)
+            if _grouped(groups):
+                return float("".join(groups))
+            if len(groups) == 2 and groups[0] and groups[1].isdigit():
+                return float(f"{groups[0]}.{groups[1]}")
+            return None
+    return float(token)
+
+
+def _currency(marker: str) -> str:
+    """Currency code for a symbol or code as written (lowercase)."""
+    if marker.endswith("$"):
+        return CURRENCY_SYMBOLS.get(marker, DEFAULT_CURRENCY)
+    return CURRENCY_SYMBOLS.get(marker) or marker.upper()
+
+
+def _amount(text: str, match: "re.Match[str]") -> Optional[_Amount]:
+    """The amount an :data:`AMOUNT_PATTERN` match describes."""
+    value = parse_number(match.group("number"))
+    if value is None:
+        return None
+    start = match.start()
+    marker = match.group("code") or match.group("symbol")
+    before = _CURRENCY_BEFORE.search(text, max(0, start - _CURRENCY_CHARS), start)
+    if before is not None:
+        marker = before.group().strip()
+        start = before.start()
+    factor = match.group("factor")
+    return _Amount(
+        value,
+        _FACTORS[factor] if factor else 1,
+        _currency(marker) if marker else None,
+        start,
+        # Not the full stop in "$50,000."
+        match.start() + len(match.group().rstrip(".,")),
+    )
+
+
+def _unmarked(match: Optional["re.Match[str]"]) -> Optional[_Amount]:
+    """The unmarked other end of a range, from :data:`_RANGE_START`/``END``."""
+    if match is None:
+        return None
+    value = parse_number(match.group("number"))
+    if value is None:
+        return None
+    number = match.group("number").rstrip(".,")
+    return _Amount(
+        value, 1, None, match.start("number"), match.start("number") + len(number)
+    )
+
+
+def _sentence_search(
+    pattern: "re.Pattern[str]", text: str, start: int
+) -> Optional["re.Match[str]"]:
+    """``pattern`` in the same sentence, shortly before ``start``."""
+    return pattern.search(text, max(0, start - _BEFORE_SENTENCE_CHARS), start)
+
+
+def _period(text: str, start: int, end: int) -> Tuple[Optional[str], int]:
+    """The pay period stated after (or just before) ``text[start:end]``."""
+    after = _PERIOD_AFTER.match(text, end, end + _PERIOD_CHARS)
+    if after is not None:
+        word = next(group for group in after.groups() if group)
+        return _PERIOD_WORDS[word.replace(".", "")], after.end()
+    before = _sentence_search(_PERIOD_BEFORE, text, start)
+    if before is not None:
+        return _PERIOD_WORDS[before.group(1)], end
+    return None, end
+
+
+def _salary(
+    text: str, low: _Amount, high: Optional[_Amount] = None
+) -> Optional[Salary]:
+    """A salary from one amount or a range, if it looks like pay."""
+    high = high or low
+    currency = low.currency or high.currency
+    factors = (low.factor, high.factor)
+    period, end = _period(text, low.start, high.end)
+    if 1_000_000 in factors and period is None:
+        return None
+    if currency is None and low is high:
+        # "10k users", "401k": a lone figure without currency needs a cue
+        if _sentence_search(_PAY_BEFORE, text, low.start) is None:
+            return None
+    multiplier = PERIODS[period or "year"]
+    values = []
+    for amount in (low, high):
+        value = amount.value * amount.factor
+        if amount.factor == 1 and amount.value < 1_000:
+            # "$50-60k": a bare figure takes the other end's suffix
+            value *= max(factors)
+        values.append(round(value * multiplier))
+    minimum, maximum = values
+    if minimum > maximum or minimum < MIN_ANNUAL or maximum > MAX_ANNUAL:
+        return None
+    return Salary(
+        minimum,
+        maximum,
+        currency or DEFAULT_CURRENCY,
+        period or "year",
+        low.start,
+        end,
+    )
+
+
+def _single(text: str, amount: _Amount) -> Optional[Salary]:
+    """A salary from ``amount`` and an unmarked range end after it, if any."""
+    high = _unmarked(_RANGE_END.match(text, amount.end, amount.end + _RANGE_CHARS))
+    salary = _salary(text, amount, high) if high is not None else None
+    # "$100,000 - 2024 roadmap" is no range
+    return salary or _salary(text, amount)
+
+
+def scan_salaries(text: str) -> Iterator[Salary]:
+    """Salaries (single figures or ranges) mentioned in ``text``, in order."""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Offsets must stay valid ("İ" lowercases to two characters)
+        lowered = text.translate(_ASCII_LOWER)
+    yield from salaries_from_amounts(lowered, _AMOUNT.finditer(lowered))
+
+
+def salaries_from_amounts(
+    text: str, matches: Iterable["re.Match[str]"]
+) -> Iterator[Salary]:
+    """
+    Salaries in lowercased ``text`` given the :data:`AMOUNT_PATTERN`
+    ``matches`` in it, in order; lets another scan of the text find the
+    amounts (see :class:`ajips.app.services.extraction.SkillMatcher`).
+    """
+    pending: Optional[_Amount] = None
+    for match in matches:
+        amount = _amount(text, match)
+        if amount is None:
+            continue
+        if pending is not None:
+            gap = text[pending.end : amount.start]
+            if len(gap) <= _RANGE_CHARS and re.fullmatch(_SEPARATOR, gap):
+                salary = _salary(text, pending, amount)
+                pending = None
+                if salary is not None:
+                    yield salary
+                continue
+            salary = _single(text, pending)
+            pending = None
+            if salary is not None:
+                yield salary
+        low = _unmarked(
+            _RANGE_START.search(text, max(0, amount.start - _RANGE_CHARS), amount.start)
+        )
+        if low is not None:
+            salary = _salary(text, low, amount)
+            if salary is not None:
+                yield salary
+                continue
+        pending = amount
+    if pending is not None:
+        salary = _single(text, pending)
+        if salary is not None:
+            yield salary
+
+
+def find_salary(text: str) -> Optional[Salary]:
+    """The first salary range in ``text``, else its first single figure."""
+    return first_salary(scan_salaries(text))
+
+
+def first_salary(salaries: Iterable[Salary]) -> Optional[Salary]:
+    """The first range among ``salaries``, else the first single figure."""
+    first = None
+    for salary in salaries:
+        if salary.min != salary.max:
+            return salary
+        first = first or salary
+    return first
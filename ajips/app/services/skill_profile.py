@@ -0,0 +1,131 @@
+"""Memoized analysis derived from a posting's skill set alone.
+
+Hidden skills, focus areas, role type and skill diversity depend only on the
+explicit skills, and the same skill sets recur across many postings
+("python, aws, docker, kubernetes"). :func:`skill_profile` computes them
+together once per distinct set and keeps them in a bounded LRU
+:class:`~ajips.core.memo.Memo` keyed by the frozen set, so postings listing
+the same skills in another order share an entry. Focus areas list their
+skills in the order of the posting at hand, as computed directly.
+
+Entries are stored under :func:`taxonomy_version`, a digest of the skill
+taxonomy and of the tables these stages read; when it changes the cache is
+emptied.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Sequence, Tuple
+
+from ajips.app.config import settings
+from ajips.app.services import enrichment, extraction, profiling
+from ajips.core.memo import Memo
+from ajips.core.results import FocusArea
+
+
+class SkillProfile(NamedTuple):
+    """Everything derived from the explicit skills of a posting."""
+
+    hidden_skills: List[str]
+    focus_areas: List[FocusArea]
+    role_type: str
+    diversity: dict
+
+
+class _Derived(NamedTuple):
+    # What is cached per skill set; focus area skills as sets, to be put in
+    # the order of the posting asking
+    hidden_skills: Tuple[str, ...]
+    focus_areas: Tuple[Tuple[str, float, FrozenSet[str]], ...]
+    role_type: str
+    diversity: dict
+
+
+_profiles: Memo[FrozenSet[str], _Derived] = Memo(
+    "skill_profiles", settings.SKILL_PROFILE_CACHE_SIZE
+)
+
+
+def _canonical(value):
+    """``value`` with sets sorted, for a digest that ignores their order."""
+    if isinstance(value, dict):
+        return {str(key): _canonical(item) for key, item in value.items()}
+    if isinstance(value, (set, frozenset)):
+        return sorted(value)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=1)
+def taxonomy_version() -> str:
+    """
+    Digest of the skill taxonomy and the tables skill-derived stages read.
+
+    Computed once per process; after changing those tables in place, call
+    ``taxonomy_version.cache_clear()`` so that cached profiles are dropped.
+    """
+    tables = {
+        "skills": extraction.SKILL_DATABASE,
+        "multi_word_skills": extraction.MULTI_WORD_SKILLS,
+        "hidden_skills": enrichment.HIDDEN_SKILL_MAP,
+        "role_templates": enrichment.ROLE_TEMPLATES,
+        "role_keywords": enrichment.ROLE_KEYWORDS,
+        "skill_clusters": enrichment.SKILL_CLUSTERS,
+        "focus_areas": profiling.FOCUS_AREA_MAP,
+        "role_patterns": profiling.ROLE_PATTERNS,
+    }
+    encoded = json.dumps(_canonical(tables), sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def _derive(skills: FrozenSet[str]) -> _Derived:
+    ordered = sorted(skills)
+    return _Derived(
+        tuple(enrichment.infer_hidden_skills(ordered)),
+        tuple(
+            (area.name, area.weight, frozenset(area.skills))
+            for area in profiling.build_focus_areas(ordered)
+        ),
+        profiling.identify_role_type(ordered),
+        profiling.calculate_skill_diversity(ordered),
+    )
+
+
+def skill_profile(explicit_skills: Sequence[str]) -> SkillProfile:
+    """
+    Hidden skills, focus areas, role type and diversity of ``explicit_skills``,
+    as ``infer_hidden_skills``, ``build_focus_areas``, ``identify_role_type``
+    and ``calculate_skill_diversity`` compute them, from the cache if the
+    same set was seen before.
+    """
+    skills = frozenset(explicit_skills)
+    if len(skills) != len(explicit_skills):
+        # Repeated skills weigh more in focus areas: not a pure set function
+        skills_list = list(explicit_skills)
+        return SkillProfile(
+            enrichment.infer_hidden_skills(skills_list),
+            profiling.build_focus_areas(skills_list),
+            profiling.identify_role_type(skills_list),
+            profiling.calculate_skill_diversity(skills_list),
+        )
+
+    derived = _profiles.get(skills, lambda: _derive(skills), taxonomy_version())
+    position: Dict[str, int] = {skill: i for i, skill in enumerate(explicit_skills)}
+    return SkillProfile(
+        list(derived.hidden_skills),
+        [
+            FocusArea(
+                name=name,
+                weight=weight,
+                skills=sorted(area_skills, key=position.__getitem__),
+            )
+            for name, weight, area_skills in derived.focus_areas
+        ],
+        derived.role_type,
+        # Copies, so that callers cannot change the cached values
+        dict(derived.diversity, categories=dict(derived.diversity["categories"])),
+    )
@@ -0,0 +1,191 @@
+"""Typo- and variant-tolerant skill lookup for tokens exact matching misses.
+
+Postings spell skills in many ways: "Postgre SQL", "Kubernets", "Node JS",
+"ReactJS". The skill matcher only consults :class:`SkillVariantIndex` for
+tokens that are not skills themselves, in this order:
+
+1. *Split skills*: two adjacent tokens joined at a boundary the skill really
+   has, either a separator in its name ("node.js", "sql server",
+   "ci/cd") or a common technical suffix ("postgre|sql", "mongo|db",
+   "java|script"). Only those splits count, so "red is" never becomes redis.
+2. *Compact form*: lowercase letters, digits, ``+`` and ``#`` only, so
+   "nodejs" and "ci-cd" find "node.js" and "ci/cd"; every skill also
+   answers to its name with a ``js`` suffix ("reactjs").
+3. *Edit distance*: tokens of ``MIN_FUZZY_LENGTH`` characters or more
+   within one edit of exactly one single-word skill, or two edits (keeping
+   the first letter) from ``MIN_TWO_EDIT_LENGTH``. Candidates come from a
+   precomputed index of every such skill's deletions (SymSpell), so a lookup
+   generates the token's own deletions and checks a few dict entries instead
+   of comparing against every skill; they are then verified with the optimal
+   string alignment distance, where a transposition counts as one edit.
+   The thresholds keep ordinary words ("monitoring", "conference") from
+   being read as skills ("mentoring", "confluence").
+
+Results are kept in :attr:`SkillVariantIndex.resolved` (and token pairs in a
+similar dict), so the repeated words of postings cost a single dict lookup
+after the first time.
+"""
+
+from __future__ import annotations
+
+import re
+from itertools import combinations
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+MIN_FUZZY_LENGTH = 7
+MIN_TWO_EDIT_LENGTH = 13
+# Shorter compact forms ("net" for ".net") are ordinary words
+MIN_COMPACT_LENGTH = 4
+# Skill names split before these count when written as two tokens
+JOIN_SUFFIXES = ("js", "sql", "ql", "db", "script", "hub", "lab", "flow", "base", "ops")
+
+_NOT_COMPACT = re.compile(r"[^a-z0-9+#]")
+_SEPARATOR = re.compile(r"[\s./-]+")
+
+
+def compact(text: str) -> str:
+    """``text`` lowercased without spaces and punctuation (except ``+`` and ``#``)."""
+    return _NOT_COMPACT.sub("", text.lower())
+
+
+def _deletions(word: str, distance: int) -> Set[str]:
+    """``word`` and every string made by deleting up to ``distance`` characters."""
+    found = {word}
+    for removed in range(1, min(distance, len(word) - 1) + 1):
+        for positions in combinations(range(len(word)), removed):
+            found.add("".join(c for i, c in enumerate(word) if i not in positions))
+    return found
+
+
+def edit_distance(first: str, second: str, limit: int) -> int:
+    """Optimal string alignment distance, or ``limit + 1`` once it exceeds ``limit``."""
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    previous_row = None
+    row = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        before, previous_row, row = previous_row, row, [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = first[i - 1] != second[j - 1]
+            row[j] = min(
+                previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost
+            )
+            if (
+                before is not None
+                and j > 1
+                and first[i - 1] == second[j - 2]
+                and first[i - 2] == second[j - 1]
+            ):
+                row[j] = min(row[j], before[j - 2] + 1)
+        if min(row) > limit:
+            return limit + 1
+    return row[-1]
+
+
+class SkillVariantIndex:
+    """Resolves misspelled, compacted and split spellings to skill names."""
+
+    def __init__(
+        self,
+        skills: Iterable[str],
+        phrase_skills: Iterable[str] = (),
+        max_cached: int = 65536,
+    ):
+        skills = sorted(set(skills))
+        self._max_cached = max_cached
+        # Token -> skill (None for none), seeded with the skills themselves
+        self._seed: Dict[str, Optional[str]] = {skill: skill for skill in skills}
+        self.resolved = dict(self._seed)
+        phrases = frozenset(phrase_skills)
+        # Skills spelled as one plain word are the edit-distance targets
+        words = [skill for skill in skills if skill.isalpha()]
+        self._compact: Dict[str, str] = {skill: skill for skill in words}
+        for skill in skills:
+            key = compact(skill)
+            if len(key) >= MIN_COMPACT_LENGTH:
+                self._compact.setdefault(key, skill)
+        for skill in words:
+            if len(skill) >= MIN_COMPACT_LENGTH:
+                self._compact.setdefault(skill + "js", skill)
+
+        # Two-token spellings, keyed by "first second" in compact form
+        self._joins: Dict[str, str] = {}
+        for skill in skills:
+            if skill in phrases:
+                # Already matched as a phrase by the skill matcher
+                continue
+            parts = [compact(part) for part in _SEPARATOR.split(skill)]
+            for split in range(1, len(parts)):
+                first, second = "".join(parts[:split]), "".join(parts[split:])
+                if first and second:
+                    self._joins.setdefault(f"{first} {second}", skill)
+            key = compact(skill)
+            for suffix in JOIN_SUFFIXES:
+                if key.endswith(suffix) and len(key) - len(suffix) >= 2:
+                    self._joins.setdefault(f"{key[: -len(suffix)]} {suffix}", skill)
+        for skill in words:
+            if len(skill) >= MIN_COMPACT_LENGTH:
+                self._joins.setdefault(f"{skill} js", skill)
+        # Second part -> first parts it joins with
+        prefixes: Dict[str, Set[str]] = {}
+        for joined in self._joins:
+            first, second = joined.split(" ", 1)
+            prefixes.setdefault(second, set()).add(first)
+        self.join_prefixes: Dict[str, FrozenSet[str]] = {
+            second: frozenset(firsts) for second, firsts in prefixes.items()
+        }
+        self.join_suffixes: FrozenSet[str] = frozenset(self.join_prefixes)
+        # (first, second) token pair -> skill (None for none)
+        self._joined: Dict[Tuple[str, str], Optional[str]] = {}
+
+        # SymSpell: deletion -> skills it can be reached from
+        self._deletes: Dict[str, Set[str]] = {}
+        for skill in words:
+            if len(skill) >= MIN_FUZZY_LENGTH - 1:
+                for deletion in _deletions(
+                    skill, 2 if len(skill) >= MIN_TWO_EDIT_LENGTH - 1 else 1
+                ):
+                    self._deletes.setdefault(deletion, set()).add(skill)
+
+    def joined(self, first: str, second: str) -> Optional[str]:
+        """The skill spelled by two adjacent tokens, if any."""
+        pair = (first, second)
+        if pair in self._joined:
+            return self._joined[pair]
+        if len(self._joined) >= self._max_cached:
+            self._joined = {}
+        skill = self._joined[pair] = self._joins.get(
+            f"{compact(first)} {compact(second)}"
+        )
+        return skill
+
+    def lookup(self, token: str) -> Optional[str]:
+        """The skill ``token`` is a variant or misspelling of, if exactly one."""
+        if token in self.resolved:
+            return self.resolved[token]
+        if len(self.resolved) >= len(self._seed) + self._max_cached:
+            self.resolved = dict(self._seed)
+        skill = self.resolved[token] = self._resolve(token)
+        return skill
+
+    def _resolve(self, token: str) -> Optional[str]:
+        key = compact(token)
+        skill = self._compact.get(key)
+        if skill is not None or len(key) < MIN_FUZZY_LENGTH or not key.isalpha():
+            return skill
+        limit = 2 if len(key) >= MIN_TWO_EDIT_LENGTH else 1
+        candidates: Set[str] = set()
+        for deletion in _deletions(key, limit):
+            candidates.update(self._deletes.get(deletion, ()))
+        best: Tuple[int, Set[str]] = (limit + 1, set())
+        for candidate in candidates:
+            distance = edit_distance(key, candidate, limit)
+            if distance > 1 and candidate[0] != key[0]:
+                continue
+            if distance < best[0]:
+                best = (distance, {candidate})
+            elif distance == best[0]:
+                best[1].add(candidate)
+        distance, skills = best
+        # Equally close to several skills: too ambiguous to guess
+        return skills.pop() if distance <= limit and len(skills) == 1 else None
@@ -0,0 +1,199 @@
+"""Command-line entry point: ``python -m ajips <command>`` or ``ajips <command>``."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from typing import List, Optional
+
+# Captured before the application is imported so time-to-ready covers imports
+_STARTED_AT = time.monotonic()
+
+logger = logging.getLogger("ajips.cli")
+
+
+def _serve(args: argparse.Namespace) -> int:
+    from ajips.app.config import settings
+    from ajips.core.server import available_cpus, serve
+
+    workers = args.workers or settings.SERVER_WORKERS or available_cpus()
+    if workers > 1 and settings.RATE_LIMIT_STORAGE == "memory":
+        # Per-process buckets would multiply the budget by the worker count
+        settings.RATE_LIMIT_STORAGE = "sqlite"
+        logger.warning("Using the sqlite rate limit store shared by all workers")
+    serve(
+        host=args.host or settings.SERVER_HOST,
+        port=args.port or settings.SERVER_PORT,
+        workers=workers,
+        started_at=_STARTED_AT,
+    )
+    return 0
+
+
+def _analyze(args: argparse.Namespace) -> int:
+    from ajips.core.bulk import Progress, run
+    from ajips.core.server import available_cpus
+
+    archive = None
+    if args.archive is not None:
+        try:
+            from ajips.core.archive import AnalysisArchive
+        except ImportError:
+            print(
+                "ajips analyze: --archive needs pyarrow "
+                "(pip install 'ajips[archive]')",
+                file=sys.stderr,
+            )
+            return 2
+        archive = AnalysisArchive(args.archive, args.archive_format)
+
+    output_format = args.output_format
+    if output_format is None and (args.output is not None or archive is None):
+        csv_output = args.output is not None and args.output.lower().endswith(".csv")
+        output_format = "csv" if csv_output else "ndjson"
+    workers = available_cpus() if args.workers is None else args.workers
+    progress = Progress(interval=0 if args.quiet else args.progress_interval)
+    try:
+        run(
+            args.inputs,
+            output=args.output,
+            output_format=output_format,
+            input_format=args.input_format,
+            workers=workers,
+            ordered=not args.unordered,
+            chunksize=args.chunksize,
+            checkpoint=args.checkpoint,
+            checkpoint_every=args.checkpoint_every,
+            progress=progress,
+            text_field=args.text_field,
+            id_field=args.id_field,
+            archive=archive,
+        )
+    except (OSError, ValueError) as exc:
+        print(f"ajips analyze: {exc}", file=sys.stderr)
+        return 2
+    except KeyboardInterrupt:
+        # The checkpoint has been saved; rerun the command to resume
+        return 130
+    finally:
+        if not args.quiet:
+            progress.report()
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="ajips", description="Automated Job Intelligence Profiling System"
+    )
+    commands = parser.add_subparsers(dest="command", metavar="<command>")
+    commands.required = True
+
+    serve_parser = commands.add_parser(
+        "serve", help="Run the API with pre-forked, preloaded workers"
+    )
+    serve_parser.add_argument("--host", help="Bind address (env: HOST)")
+    serve_parser.add_argument("--port", type=int, help="Bind port (env: PORT)")
+    serve_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes (env: WEB_CONCURRENCY; default: available CPUs)",
+    )
+    serve_parser.set_defaults(handler=_serve)
+
+    from ajips.core.bulk import INPUT_FORMATS, OUTPUT_FORMATS
+
+    analyze_parser = commands.add_parser(
+        "analyze",
+        help="Analyze postings from files, directories or stdin without the API",
+    )
+    analyze_parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=["-"],
+        metavar="INPUT",
+        help="Files (.jsonl, .csv, text; optionally .gz) or directories; "
+        "'-' or none reads JSON Lines from stdin",
+    )
+    analyze_parser.add_argument("-o", "--output", help="Output file (default: stdout)")
+    analyze_parser.add_argument(
+        "--output-format",
+        choices=OUTPUT_FORMATS,
+        help="Default: csv for a .csv output, else ndjson",
+    )
+    analyze_parser.add_argument(
+        "--input-format",
+        choices=INPUT_FORMATS,
+        default="auto",
+        help="Input format (default: by file suffix)",
+    )
+    analyze_parser.add_argument(
+        "--workers",
+        type=int,
+        help="Worker processes; 0 analyzes in this process (default: available CPUs)",
+    )
+    analyze_parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="Write results as they complete rather than in input order",
+    )
+    analyze_parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=16,
+        help="Postings sent to a worker at a time (default: 16)",
+    )
+    analyze_parser.add_argument(
+        "--checkpoint",
+        help="Checkpoint file for resuming an interrupted run "
+        "(needs --output unless results are only archived)",
+    )
+    analyze_parser.add_argument(
+        "--checkpoint-every",
+        type=int,
+        default=1000,
+        help="Postings between checkpoint saves (default: 1000)",
+    )
+    analyze_parser.add_argument(
+        "--archive",
+        metavar="DIR",
+        help="Also add results to a columnar archive in DIR (needs pyarrow); "
+        "without --output they are only archived",
+    )
+    analyze_parser.add_argument(
+        "--archive-format",
+        choices=("arrow", "parquet"),
+        default="arrow",
+        help="Archive file format (default: arrow)",
+    )
+    analyze_parser.add_argument(
+        "--text-field",
+        default="text",
+        help="Field or column holding the posting text (default: text)",
+    )
+    analyze_parser.add_argument(
+        "--id-field",
+        default="id",
+        help="Field or column identifying a posting (default: id)",
+    )
+    analyze_parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between progress reports on stderr (default: 2)",
+    )
+    analyze_parser.add_argument(
+        "-q", "--quiet", action="store_true", help="No progress reports"
+    )
+    analyze_parser.set_defaults(handler=_analyze)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
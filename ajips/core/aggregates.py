@@ -0,0 +1,168 @@
+"""Materialized demand counts per skill, focus area and role over time.
+
+Counts are kept per day, ISO week and month and updated in the same
+transaction that stores a posting, so every rollup is always current and
+nothing is ever recomputed from the postings. A query reads one or two
+buckets, whose size is bounded by the number of distinct skills (roles,
+focus areas) rather than by the number of postings stored.
+"""
+
+from __future__ import annotations
+
+import datetime
+import sqlite3
+from typing import Dict, Iterable, List, Mapping, Optional
+
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+PERIODS = (DAY, WEEK, MONTH)
+
+SKILL = "skill"
+FOCUS_AREA = "focus_area"
+ROLE = "role"
+DIMENSIONS = (SKILL, FOCUS_AREA, ROLE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS demand (
+    period TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    name TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (period, dimension, bucket, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS demand_by_name ON demand (period, dimension, name, bucket);
+"""
+
+
+def bucket(period: str, day: datetime.date) -> str:
+    """Name of the ``period`` bucket containing ``day`` (``2026-W07``...)."""
+    if period == DAY:
+        return day.isoformat()
+    if period == WEEK:
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if period == MONTH:
+        return f"{day.year}-{day.month:02d}"
+    raise ValueError(f"Unknown period: {period!r}")
+
+
+def previous_day(period: str, day: datetime.date) -> datetime.date:
+    """A day in the bucket before the one containing ``day``."""
+    if period == DAY:
+        return day - datetime.timedelta(days=1)
+    if period == WEEK:
+        return day - datetime.timedelta(days=7)
+    if period == MONTH:
+        return day.replace(day=1) - datetime.timedelta(days=1)
+    raise ValueError(f"Unknown period: {period!r}")
+
+
+def utc_day(timestamp: float) -> datetime.date:
+    return datetime.datetime.fromtimestamp(timestamp, datetime.timezone.utc).date()
+
+
+def apply(
+    conn: sqlite3.Connection,
+    timestamp: float,
+    removed: Mapping[str, Iterable[str]],
+    added: Mapping[str, Iterable[str]],
+) -> None:
+    """
+    Move a posting's counts from ``removed`` to ``added`` (dimension -> names).
+
+    Names present on both sides are left alone, so re-storing an unchanged
+    analysis costs nothing.
+    """
+    day = utc_day(timestamp)
+    buckets = [(period, bucket(period, day)) for period in PERIODS]
+    increments = []
+    decrements = []
+    for dimension in DIMENSIONS:
+        old = set(removed.get(dimension, ()))
+        new = set(added.get(dimension, ()))
+        for period, name in buckets:
+            increments += [(period, dimension, name, n) for n in new - old]
+            decrements += [(period, dimension, name, n) for n in old - new]
+    if increments:
+        conn.executemany(
+            "INSERT INTO demand (period, dimension, bucket, name, count) "
+            "VALUES (?, ?, ?, ?, 1) "
+            "ON CONFLICT (period, dimension, bucket, name) DO UPDATE SET count = count + 1",
+            increments,
+        )
+    if decrements:
+        conn.executemany(
+            "UPDATE demand SET count = count - 1 "
+            "WHERE period = ? AND dimension = ? AND bucket = ? AND name = ?",
+            decrements,
+        )
+        conn.executemany(
+            "DELETE FROM demand WHERE period = ? AND dimension = ? AND bucket = ? "
+            "AND name = ? AND count <= 0",
+            decrements,
+        )
+
+
+def trending(
+    conn: sqlite3.Connection,
+    dimension: str = SKILL,
+    period: str = WEEK,
+    day: Optional[datetime.date] = None,
+    limit: int = 10,
+    order: str = "delta",
+) -> Dict:
+    """
+    Top ``limit`` names in the bucket containing ``day`` (default today),
+    with their count in the previous bucket and the change.
+
+    ``order`` is ``"delta"`` (biggest risers first) or ``"count"``.
+    """
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension: {dimension!r}")
+    if order not in ("delta", "count"):
+        raise ValueError(f"Unknown order: {order!r}")
+    day = day or datetime.datetime.now(datetime.timezone.utc).date()
+    current = bucket(period, day)
+    previous = bucket(period, previous_day(period, day))
+    counts: Dict[str, List[int]] = {}
+    for name, count, in_current in conn.execute(
+        "SELECT name, count, bucket = ? FROM demand "
+        "WHERE period = ? AND dimension = ? AND bucket IN (?, ?)",
+        (current, period, dimension, current, previous),
+    ):
+        counts.setdefault(name, [0, 0])[0 if in_current else 1] = count
+    rows = [
+        {"name": name, "count": now, "previous": before, "delta": now - before}
+        for name, (now, before) in counts.items()
+    ]
+    rows.sort(key=lambda row: (-row[order], -row["count"], row["name"]))
+    return {
+        "dimension": dimension,
+        "period": period,
+        "bucket": current,
+        "previous_bucket": previous,
+        "items": rows[:limit],
+    }
+
+
+def series(
+    conn: sqlite3.Connection,
+    dimension: str,
+    name: str,
+    period: str = DAY,
+    limit: int = 30,
+) -> List[Dict]:
+    """The most recent ``limit`` non-empty buckets for one name, oldest first."""
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension: {dimension!r}")
+    if period not in PERIODS:
+        raise ValueError(f"Unknown period: {period!r}")
+    rows = conn.execute(
+        "SELECT bucket, count FROM demand "
+        "WHERE period = ? AND dimension = ? AND name = ? "
+        "ORDER BY bucket DESC LIMIT ?",
+        (period, dimension, name, limit),
+    ).fetchall()
+    return [{"bucket": b, "count": count} for b, count in reversed(rows)]
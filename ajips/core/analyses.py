@@ -0,0 +1,67 @@
+"""Analyses addressable by content hash.
+
+An analysis is identified by a hash of everything it is computed from: the
+skill taxonomy version, the posting text and the resume. The same id
+therefore always names the same result, so its responses can be cached by
+browsers and proxies indefinitely and revalidated with strong ETags.
+
+:class:`AnalysisStore` keeps the JSON body of each analysis in SQLite under
+``DATA_DIR``, so that every worker can serve ``GET /analyses/{id}`` for
+analyses any of them computed. Only the newest ``max_entries`` are kept.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+from ajips.core.sqlite_utils import ConnectionPool
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    seq INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE,
+    body BLOB NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class AnalysisStore:
+    """SQLite store of encoded analyses by id, bounded to the newest entries."""
+
+    def __init__(self, path: str, max_entries: int = 100_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._pool = ConnectionPool(path, _SCHEMA)
+
+    def add(self, analysis_id: str, body: bytes) -> None:
+        """Store ``body`` under ``analysis_id`` unless it is already stored."""
+        with self._pool.transaction() as conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO analyses (id, body, created_at) "
+                "VALUES (?, ?, ?)",
+                (analysis_id, body, time.time()),
+            ).rowcount
+            if inserted:
+                conn.execute(
+                    "DELETE FROM analyses "
+                    "WHERE seq <= (SELECT MAX(seq) FROM analyses) - ?",
+                    (self.max_entries,),
+                )
+
+    def get(self, analysis_id: str) -> Optional[bytes]:
+        """The body stored under ``analysis_id``, or None."""
+        row = (
+            self._pool.connection()
+            .execute("SELECT body FROM analyses WHERE id = ?", (analysis_id,))
+            .fetchone()
+        )
+        return bytes(row[0]) if row is not None else None
+
+    def __len__(self) -> int:
+        return (
+            self._pool.connection()
+            .execute("SELECT COUNT(*) FROM analyses")
+            .fetchone()[0]
+        )
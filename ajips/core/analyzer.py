@@ -0,0 +1,128 @@
+"""Job posting analysis embedded in other programs.
+
+:class:`Analyzer` (exported as ``ajips.Analyzer``) analyzes posting text
+without the API's request models, for batch jobs that import AJIPS
+directly::
+
+    from ajips import Analyzer
+
+    analyzer = Analyzer()
+    profile = analyzer.analyze(text)
+    for profile in analyzer.analyze_many(texts, workers=8):
+        ...
+    # Spark: one analyzer per executor process, not per record
+    rdd.mapPartitions(analyzer.analyze_partition)
+
+Creating an analyzer loads the skill taxonomy, builds the compiled matchers
+and runs one analysis, once per process; later analyzers, and processes
+forked afterwards, reuse that state. Analyzers are picklable (only their
+options travel; the receiving process loads its own state), safe to share
+between threads, and keep nothing that a fork would break.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+from typing import Iterable, Iterator, List, Optional
+
+from ajips.core.pipelines import job_profile
+from ajips.core.pool import imap_chunks
+from ajips.core.results import JobProfile
+
+_warm = False
+_warm_lock = threading.Lock()
+
+# The analyzer of a worker process started by Analyzer.analyze_many
+_worker: Optional["Analyzer"] = None
+
+
+def _warm_up() -> None:
+    global _warm
+    with _warm_lock:
+        if not _warm:
+            job_profile.warm_up()
+            _warm = True
+
+
+class Analyzer:
+    """
+    Analyzes job posting text into :class:`~ajips.core.results.JobProfile`
+    records.
+
+    ``chunksize`` is how many postings :meth:`analyze_many` sends to a
+    worker process at a time.
+    """
+
+    def __init__(self, chunksize: int = 64):
+        if chunksize < 1:
+            raise ValueError("chunksize must be positive")
+        self.chunksize = chunksize
+        _warm_up()
+
+    def __getstate__(self) -> dict:
+        return {"chunksize": self.chunksize}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)
+
+    def __repr__(self) -> str:
+        return f"Analyzer(chunksize={self.chunksize})"
+
+    def analyze(self, text: str, resume_text: Optional[str] = None) -> JobProfile:
+        """The profile of one posting, aligned with ``resume_text`` if given."""
+        return job_profile.analyze_posting(text or "", resume_text)
+
+    def analyze_partition(
+        self, texts: Iterable[str], resume_text: Optional[str] = None
+    ) -> Iterator[JobProfile]:
+        """
+        Profiles of ``texts``, lazily and in order, in the calling thread.
+
+        Suits per-partition APIs such as Spark's ``mapPartitions``: the
+        partition is streamed and never held in memory as a whole.
+        """
+        for text in texts:
+            yield self.analyze(text, resume_text)
+
+    def analyze_many(
+        self,
+        texts: Iterable[str],
+        workers: int = 1,
+        resume_text: Optional[str] = None,
+    ) -> Iterator[JobProfile]:
+        """
+        Profiles of ``texts`` in order, analyzed by ``workers`` processes.
+
+        ``texts`` is consumed as results are taken, at most two chunks per
+        worker ahead of them, so it may be an unbounded stream. With one
+        worker this is :meth:`analyze_partition`. The pool is shut down once
+        the results are exhausted or the iterator is closed.
+        """
+        if workers <= 1:
+            return self.analyze_partition(texts, resume_text)
+        return self._analyze_in_pool(texts, workers, resume_text)
+
+    def _analyze_in_pool(
+        self, texts: Iterable[str], workers: int, resume_text: Optional[str]
+    ) -> Iterator[JobProfile]:
+        chunks = imap_chunks(
+            functools.partial(_analyze_chunk, resume_text=resume_text),
+            texts,
+            workers,
+            self.chunksize,
+            initializer=_start_worker,
+            initargs=(self,),
+        )
+        for _, profiles in chunks:
+            yield from profiles
+
+
+def _start_worker(analyzer: Analyzer) -> None:
+    global _worker
+    _worker = analyzer
+
+
+def _analyze_chunk(texts: List[str], resume_text: Optional[str]) -> List[JobProfile]:
+    """Pool entry point: analyze one chunk of postings."""
+    return [_worker.analyze(text, resume_text) for text in texts]
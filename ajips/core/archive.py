@@ -0,0 +1,330 @@
+"""Columnar archive of analysis results (Apache Arrow or Parquet files).
+
+Scanning millions of analyses kept as JSON rows means parsing every row
+into Python objects. The archive keeps them as columns instead: skills and
+focus areas as dictionary-encoded list columns (each distinct name stored
+once per file), focus weights, role, experience level, quality score,
+salary and resume alignment. Files are partitioned by the UTC date they were
+analyzed, ``root/date=YYYY-MM-DD/part-<id>.arrow``, so a query over a date
+range only opens the days in it.
+
+``arrow`` archives are uncompressed Arrow IPC files, scanned through memory
+maps without copying or decoding; ``parquet`` archives are compressed and
+smaller but are decoded when read. Aggregates such as
+:meth:`AnalysisArchive.skill_frequencies` run batch by batch in Arrow
+compute kernels and never build per-row Python objects.
+
+Rows are buffered and written ``batch_rows`` at a time, or by a timer thread
+once the oldest has waited ``max_delay`` seconds (only on
+:meth:`AnalysisArchive.flush` when ``auto_flush`` is off), as new files, renamed into place only when complete,
+so readers never see a partial file. Requires ``pyarrow`` (the
+``archive`` extra).
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import multiprocessing.util
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.fs
+import pyarrow.parquet as pq
+
+from ajips.core.forksafe import reset_after_fork
+
+ARCHIVE_FORMATS = ("arrow", "parquet")
+
+_NAMES = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMA = pa.schema(
+    [
+        ("analyzed_at", pa.timestamp("ms", tz="UTC")),
+        ("id", pa.string()),
+        ("title", pa.string()),
+        ("role_type", _NAMES),
+        ("experience_level", _NAMES),
+        ("explicit_skills", pa.list_(_NAMES)),
+        ("hidden_skills", pa.list_(_NAMES)),
+        ("focus_areas", pa.list_(_NAMES)),
+        ("focus_weights", pa.list_(pa.float32())),
+        ("quality_score", pa.float32()),
+        ("salary_min", pa.float64()),
+        ("salary_max", pa.float64()),
+        ("salary_currency", _NAMES),
+        ("salary_period", _NAMES),
+        ("resume_alignment", pa.float32()),
+    ]
+)
+
+# The partition column, derived from the directory names
+_PARTITIONING = ds.partitioning(pa.schema([("date", pa.string())]), flavor="hive")
+
+DateLike = Union[dt.date, str]
+
+
+def _row(result: dict, analyzed_at: dt.datetime, item_id: Optional[str]) -> tuple:
+    salary = result.get("salary_range") or {}
+    focus_areas = result.get("focus_areas") or ()
+    return (
+        analyzed_at,
+        item_id,
+        result.get("title"),
+        result.get("role_type"),
+        result.get("experience_level"),
+        result.get("explicit_skills") or [],
+        result.get("hidden_skills") or [],
+        [area["name"] for area in focus_areas],
+        [area["weight"] for area in focus_areas],
+        result.get("quality_score"),
+        salary.get("min"),
+        salary.get("max"),
+        salary.get("currency"),
+        salary.get("period"),
+        result.get("resume_alignment"),
+    )
+
+
+def _date_filter(start: Optional[DateLike], end: Optional[DateLike]):
+    # ISO dates order like the dates themselves
+    condition = None
+    if start is not None:
+        condition = ds.field("date") >= str(start)
+    if end is not None:
+        before = ds.field("date") <= str(end)
+        condition = before if condition is None else condition & before
+    return condition
+
+
+class AnalysisArchive:
+    """
+    Date-partitioned columnar archive of analysis results under ``root``.
+
+    Safe to share between threads. Each process buffers its own rows: a
+    forked child starts with an empty buffer, and ``multiprocessing``
+    workers write what they buffered when they exit (others call
+    :meth:`close`).
+    """
+
+    def __init__(
+        self,
+        root: str,
+        format: str = "arrow",
+        batch_rows: int = 10_000,
+        max_delay: float = 60.0,
+        auto_flush: bool = True,
+    ):
+        if format not in ARCHIVE_FORMATS:
+            raise ValueError(f"Unsupported archive format: {format!r}")
+        if batch_rows < 1:
+            raise ValueError("batch_rows must be positive")
+        self.root = root
+        self.format = format
+        self.batch_rows = batch_rows
+        self.max_delay = max_delay
+        self.auto_flush = auto_flush
+        self._rows: Dict[str, List[tuple]] = {}
+        self._buffered = 0
+        self._oldest = 0.0
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+        reset_after_fork(self)
+        multiprocessing.util.register_after_fork(self, AnalysisArchive._flush_at_exit)
+
+    def _after_fork(self) -> None:
+        self._rows = {}
+        self._buffered = 0
+        # The parent's timer thread does not exist here
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def _flush_at_exit(self) -> None:
+        # Worker processes end with os._exit, which skips atexit handlers
+        multiprocessing.util.Finalize(None, self.flush, exitpriority=10)
+
+    def add(
+        self,
+        result: Any,
+        item_id: Optional[str] = None,
+        analyzed_at: Optional[dt.datetime] = None,
+    ) -> None:
+        """
+        Buffer one result (a ``JobProfile`` or its dict), analyzed at
+        ``analyzed_at`` (now by default; naive times are taken as UTC).
+        """
+        if hasattr(result, "to_dict"):
+            result = result.to_dict()
+        when = analyzed_at or dt.datetime.now(dt.timezone.utc)
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=dt.timezone.utc)
+        else:
+            when = when.astimezone(dt.timezone.utc)
+        row = _row(result, when, item_id)
+        with self._lock:
+            if not self._buffered:
+                self._oldest = time.monotonic()
+            self._rows.setdefault(when.date().isoformat(), []).append(row)
+            self._buffered += 1
+            due = self.auto_flush and (
+                self._buffered >= self.batch_rows
+                or time.monotonic() - self._oldest >= self.max_delay
+            )
+            if self.auto_flush and not due and self._timer is None:
+                # Rows that arrive in a trickle are written max_delay after
+                # the oldest, not whenever the next one comes in
+                self._schedule(self._oldest + self.max_delay - time.monotonic())
+        if due:
+            self.flush()
+
+    def _schedule(self, delay: float) -> None:
+        # Called with the lock held
+        self._timer = threading.Timer(max(0.0, delay), self._flush_when_due)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _flush_when_due(self) -> None:
+        with self._lock:
+            self._timer = None
+            if not self._buffered or not self.auto_flush:
+                return
+            remaining = self._oldest + self.max_delay - time.monotonic()
+            if remaining > 0:
+                self._schedule(remaining)
+                return
+        self.flush()
+
+    def flush(self) -> List[str]:
+        """Write the buffered rows, one file per date; returns their paths."""
+        with self._lock:
+            rows, self._rows, self._buffered = self._rows, {}, 0
+            return [self._write(date, date_rows) for date, date_rows in rows.items()]
+
+    def close(self) -> None:
+        with self._lock:
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.flush()
+
+    def __enter__(self) -> "AnalysisArchive":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _write(self, date: str, rows: List[tuple]) -> str:
+        columns = list(zip(*rows))
+        table = pa.Table.from_arrays(
+            [
+                pa.array(column, type=field.type)
+                for column, field in zip(columns, SCHEMA)
+            ],
+            schema=SCHEMA,
+        )
+        directory = os.path.join(self.root, f"date={date}")
+        os.makedirs(directory, exist_ok=True)
+        name = f"part-{uuid.uuid4().hex}.{self.format}"
+        # Scans skip dot files, so nobody reads the file before it is whole
+        partial = os.path.join(directory, f".{name}")
+        if self.format == "arrow":
+            with pa.OSFile(partial, "wb") as sink:
+                with pa.ipc.new_file(sink, SCHEMA) as writer:
+                    writer.write_table(table)
+        else:
+            pq.write_table(
+                table,
+                partial,
+                compression="zstd",
+                use_compliant_nested_type=False,
+            )
+        path = os.path.join(directory, name)
+        os.replace(partial, path)
+        return path
+
+    def _files(self) -> List[str]:
+        suffix = f".{self.format}"
+        return [
+            os.path.join(directory, name)
+            for directory, _, names in os.walk(self.root)
+            for name in sorted(names)
+            if name.endswith(suffix) and not name.startswith(".")
+        ]
+
+    def dataset(self) -> ds.Dataset:
+        """The archive as a ``pyarrow.dataset``, with a ``date`` column."""
+        return ds.dataset(
+            self._files(),
+            partition_base_dir=self.root,
+            schema=SCHEMA.append(pa.field("date", pa.string())),
+            format="ipc" if self.format == "arrow" else "parquet",
+            partitioning=_PARTITIONING,
+            # Arrow files are read straight from the page cache
+            filesystem=pyarrow.fs.LocalFileSystem(use_mmap=True),
+        )
+
+    def batches(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> Iterator[pa.RecordBatch]:
+        """``columns`` of the results analyzed from ``start`` to ``end`` (inclusive)."""
+        return self.dataset().to_batches(
+            columns=list(columns) if columns is not None else None,
+            filter=_date_filter(start, end),
+        )
+
+    def scan(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> pa.Table:
+        """:meth:`batches` as one table."""
+        return self.dataset().to_table(
+            columns=list(columns) if columns is not None else None,
+            filter=_date_filter(start, end),
+        )
+
+    def skill_frequencies(
+        self,
+        by: Optional[str] = "role_type",
+        skills: str = "explicit_skills",
+        start: Optional[DateLike] = None,
+        end: Optional[DateLike] = None,
+    ) -> pa.Table:
+        """
+        How many results from ``start`` to ``end`` list each of ``skills``,
+        per value of the ``by`` column (overall when None), most frequent
+        first: a table of ``by``, ``skill`` and ``count``.
+        """
+        keys = ([by] if by else []) + ["skill"]
+        partials = []
+        for batch in self.batches(keys[:-1] + [skills], start, end):
+            lists = batch.column(skills)
+            # One row per mention, with the row's ``by`` value alongside
+            pairs = {"skill": pc.cast(pc.list_flatten(lists), pa.string())}
+            if by:
+                parents = pc.list_parent_indices(lists)
+                pairs[by] = pc.cast(pc.take(batch.column(by), parents), pa.string())
+            table = pa.table({key: pairs[key] for key in keys})
+            partials.append(table.group_by(keys).aggregate([("skill", "count")]))
+        if not partials:
+            empty = {key: pa.array([], pa.string()) for key in keys}
+            return pa.table({**empty, "count": pa.array([], pa.int64())})
+        counts = (
+            pa.concat_tables(partials)
+            .group_by(keys)
+            .aggregate([("skill_count", "sum")])
+        )
+        counts = counts.rename_columns(keys + ["count"])
+        return counts.sort_by(
+            [("count", "descending")] + [(k, "ascending") for k in keys]
+        )
@@ -0,0 +1,538 @@
+"""Offline bulk analysis behind ``ajips analyze``.
+
+Postings are read as a stream from stdin, files, directory trees and
+gzip-compressed dumps: JSON Lines and CSV files hold one posting per
+line or row and are read a line or row at a time; any other file is one
+posting. Records are analyzed in chunks across a process pool
+(:func:`ajips.core.pool.imap_chunks`), so memory stays bounded however large
+the input is. Results are written as NDJSON lines shaped like batch job results
+(``{"seq", "id", "result" | "error"}``) or as CSV rows, in input order or
+as they complete, and can be added to a columnar archive
+(:mod:`ajips.core.archive`) as well or instead.
+
+With a :class:`Checkpoint`, a run records which records have been written
+and how long the output was at that point. A rerun with the same inputs
+truncates the output back to that length and skips the records already
+written, so an interrupted run resumes without gaps or duplicates.
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from ajips.core.pool import chunked, imap_chunks
+from ajips.core.serialization import ndjson_line
+from ajips.core.streaming import result_line
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ajips.core.archive import AnalysisArchive
+
+INPUT_FORMATS = ("auto", "jsonl", "csv", "text")
+OUTPUT_FORMATS = ("ndjson", "csv")
+
+_SUFFIX_FORMATS = {
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+    ".csv": "csv",
+    ".txt": "text",
+    ".text": "text",
+    ".md": "text",
+    ".html": "text",
+    ".htm": "text",
+}
+
+# Columns of CSV output; lists are joined with "; "
+CSV_FIELDS = (
+    "seq",
+    "id",
+    "error",
+    "title",
+    "role_type",
+    "experience_level",
+    "quality_score",
+    "explicit_skills",
+    "hidden_skills",
+    "focus_areas",
+    "interview_stages",
+    "salary_min",
+    "salary_max",
+    "salary_currency",
+    "salary_period",
+    "resume_alignment",
+    "summary",
+)
+
+
+class Item(NamedTuple):
+    """One input posting: its record, or why it could not be read."""
+
+    seq: int
+    id: str
+    record: Optional[dict]
+    error: Optional[str] = None
+
+
+class Outcome(NamedTuple):
+    """The result of analyzing one item, or its error."""
+
+    seq: int
+    id: str
+    result: Optional[dict]
+    error: Optional[str]
+
+
+def detect_format(path: str, default: str = "text") -> Optional[str]:
+    """
+    Format of ``path`` by its suffix (ignoring ``.gz``), else ``default``.
+    """
+    name = path.lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    return _SUFFIX_FORMATS.get(os.path.splitext(name)[1], default)
+
+
+def iter_sources(paths: Sequence[str]) -> Iterator[str]:
+    """
+    ``paths`` with directories expanded, recursively and in name order, to
+    the files in them of a known format (hidden entries are skipped).
+    """
+    for path in paths:
+        if path == "-" or not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+            for name in sorted(files):
+                if not name.startswith(".") and detect_format(name, None):
+                    yield os.path.join(root, name)
+
+
+def _open(path: str, stdin: Optional[IO[str]]) -> IO[str]:
+    if path == "-":
+        return stdin if stdin is not None else sys.stdin
+    if path.lower().endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace", newline="")
+    return open(path, encoding="utf-8", errors="replace", newline="")
+
+
+def iter_items(
+    paths: Sequence[str] = ("-",),
+    fmt: str = "auto",
+    text_field: str = "text",
+    id_field: str = "id",
+    stdin: Optional[IO[str]] = None,
+) -> Iterator[Item]:
+    """
+    The postings in ``paths`` (``-`` is stdin, read as JSON Lines unless
+    ``fmt`` says otherwise), numbered from 1 in reading order.
+
+    Records without an ``id_field`` are identified by ``source:line`` (or
+    ``source:row``), and single-posting files by their path.
+    """
+    seq = 0
+    for path in iter_sources(paths or ("-",)):
+        source = "<stdin>" if path == "-" else path
+        kind = fmt
+        if kind == "auto":
+            kind = "jsonl" if path == "-" else detect_format(path)
+        stream = _open(path, stdin)
+        try:
+            if kind == "jsonl":
+                entries = _jsonl_entries(stream, source, text_field, id_field)
+            elif kind == "csv":
+                entries = _csv_entries(stream, source, text_field, id_field)
+            else:
+                entries = iter([(source, {"text": stream.read()}, None)])
+            for item_id, record, error in entries:
+                seq += 1
+                yield Item(seq, item_id, record, error)
+        finally:
+            if path != "-":
+                stream.close()
+
+
+def _jsonl_entries(
+    lines: Iterable[str], source: str, text_field: str, id_field: str
+) -> Iterator[Tuple[str, Optional[dict], Optional[str]]]:
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        item_id = f"{source}:{number}"
+        try:
+            value = json.loads(line)
+        except ValueError:
+            yield item_id, None, "Invalid JSON"
+            continue
+        if isinstance(value, str):
+            yield item_id, {"text": value}, None
+        elif isinstance(value, dict):
+            if value.get(id_field) is not None:
+                item_id = str(value[id_field])
+            yield item_id, _record(value, text_field), None
+        else:
+            yield item_id, None, "Each line must be a JSON object or string"
+
+
+def _csv_entries(
+    stream: IO[str], source: str, text_field: str, id_field: str
+) -> Iterator[Tuple[str, Optional[dict], Optional[str]]]:
+    # Posting texts easily exceed the default 128 KiB field limit
+    csv.field_size_limit(min(sys.maxsize, 2**31 - 1))
+    for number, row in enumerate(csv.DictReader(stream), 1):
+        item_id = row.get(id_field) or f"{source}:{number}"
+        yield item_id, _record(row, text_field), None
+
+
+def _record(value: dict, text_field: str) -> dict:
+    return {
+        "text": value.get(text_field) or None,
+        "url": value.get("url") or None,
+        "resume_text": value.get("resume_text") or None,
+    }
+
+
+def _analyze_chunk(chunk: List[Item]) -> List[Tuple[Optional[dict], Optional[str]]]:
+    """Pool entry point: analyze a chunk of items, capturing their errors."""
+    from ajips.core.pipelines.job_profile import analyze_record
+
+    outcomes = []
+    for item in chunk:
+        result, error = None, item.error
+        if error is None:
+            try:
+                result = analyze_record(item.record)
+            except Exception as exc:
+                error = str(exc) or type(exc).__name__
+        outcomes.append((result, error))
+    return outcomes
+
+
+def analyze_items(
+    items: Iterable[Item],
+    workers: int = 0,
+    ordered: bool = True,
+    chunksize: int = 16,
+) -> Iterator[Outcome]:
+    """
+    Analyze ``items`` in chunks of ``chunksize`` across ``workers``
+    processes (in the calling process when 0), in input order unless
+    ``ordered`` is false.
+    """
+    if workers <= 0:
+        for chunk in chunked(items, chunksize):
+            yield from _outcomes(chunk, _analyze_chunk(chunk))
+        return
+
+    from ajips.core.pipelines.job_profile import warm_up
+
+    # Workers forked from here inherit the taxonomy and compiled matchers
+    warm_up()
+    for chunk, results in imap_chunks(
+        _analyze_chunk, items, workers, chunksize, ordered=ordered
+    ):
+        yield from _outcomes(chunk, results)
+
+
+def _outcomes(chunk: List[Item], results) -> Iterator[Outcome]:
+    for item, (result, error) in zip(chunk, results):
+        yield Outcome(item.seq, item.id, result, error)
+
+
+class NdjsonWriter:
+    """Writes outcomes as NDJSON lines shaped like batch job results."""
+
+    def __init__(self, out: IO[bytes]):
+        self.out = out
+
+    def write(self, outcome: Outcome) -> None:
+        self.out.write(
+            result_line(
+                outcome.seq,
+                {"id": outcome.id},
+                outcome.result,
+                outcome.error,
+                encode=ndjson_line,
+            )
+        )
+
+
+class CsvWriter:
+    """Writes outcomes as CSV rows of :data:`CSV_FIELDS`, with a header first."""
+
+    def __init__(self, out: IO[bytes], header: bool = True):
+        self.out = out
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer)
+        if header:
+            self._write_row(CSV_FIELDS)
+
+    def _write_row(self, row: Sequence) -> None:
+        self._writer.writerow(row)
+        self.out.write(self._buffer.getvalue().encode("utf-8"))
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def write(self, outcome: Outcome) -> None:
+        self._write_row(
+            [outcome.seq, outcome.id, outcome.error or ""] + _columns(outcome.result)
+        )
+
+
+def _columns(result: Optional[dict]) -> list:
+    if result is None:
+        return [""] * (len(CSV_FIELDS) - 3)
+    salary = result.get("salary_range") or {}
+    alignment = result.get("resume_alignment")
+    return [
+        result.get("title") or "",
+        result.get("role_type") or "",
+        result.get("experience_level") or "",
+        result.get("quality_score", ""),
+        "; ".join(result.get("explicit_skills") or ()),
+        "; ".join(result.get("hidden_skills") or ()),
+        "; ".join(area["name"] for area in result.get("focus_areas") or ()),
+        "; ".join(result.get("interview_stages") or ()),
+        salary.get("min", ""),
+        salary.get("max", ""),
+        salary.get("currency", ""),
+        salary.get("period", ""),
+        "" if alignment is None else alignment,
+        result.get("summary") or "",
+    ]
+
+
+WRITERS: Dict[str, Callable[..., object]] = {"ndjson": NdjsonWriter, "csv": CsvWriter}
+
+
+class Checkpoint:
+    """
+    Which records a run has written, and the length of its output then.
+
+    Saved as JSON, replaced atomically, next to the output. Sequence numbers
+    are kept as the highest one up to which every record is written plus
+    those written beyond it, which unordered output leaves as a short tail.
+    """
+
+    def __init__(self, path: str, inputs: Sequence[str]):
+        self.path = path
+        self.inputs = list(inputs)
+        self.through = 0
+        self.done: Set[int] = set()
+        self.output_bytes = 0
+
+    def load(self) -> bool:
+        """Read a saved checkpoint; False if there is none."""
+        try:
+            with open(self.path, encoding="utf-8") as handle:
+                state = json.load(handle)
+        except FileNotFoundError:
+            return False
+        if state.get("inputs") != self.inputs:
+            raise ValueError(
+                f"Checkpoint {self.path} belongs to a run over other inputs"
+            )
+        self.through = state["through"]
+        self.done = set(state["done"])
+        self.output_bytes = state["output_bytes"]
+        return True
+
+    def __contains__(self, seq: int) -> bool:
+        return seq <= self.through or seq in self.done
+
+    def __len__(self) -> int:
+        return self.through + len(self.done)
+
+    def mark(self, seq: int) -> None:
+        self.done.add(seq)
+        while self.through + 1 in self.done:
+            self.through += 1
+            self.done.discard(self.through)
+
+    def save(self, output_bytes: int) -> None:
+        self.output_bytes = output_bytes
+        state = {
+            "inputs": self.inputs,
+            "through": self.through,
+            "done": sorted(self.done),
+            "output_bytes": output_bytes,
+        }
+        partial = f"{self.path}.tmp"
+        with open(partial, "w", encoding="utf-8") as handle:
+            json.dump(state, handle)
+        os.replace(partial, self.path)
+
+
+class Progress:
+    """Periodic one-line throughput reports (on stderr by default)."""
+
+    def __init__(self, interval: float = 2.0, stream: Optional[IO[str]] = None):
+        self.interval = interval
+        self.stream = stream if stream is not None else sys.stderr
+        self.started = time.monotonic()
+        self._reported = self.started
+        self.analyzed = 0
+        self.errors = 0
+        self.skipped = 0
+
+    def add(self, outcome: Outcome) -> None:
+        self.analyzed += 1
+        if outcome.error is not None:
+            self.errors += 1
+        now = time.monotonic()
+        if self.interval and now - self._reported >= self.interval:
+            self._reported = now
+            self.report(now)
+
+    def report(self, now: Optional[float] = None) -> None:
+        elapsed = (now or time.monotonic()) - self.started
+        rate = self.analyzed / elapsed if elapsed > 0 else 0.0
+        skipped = f", {self.skipped} skipped" if self.skipped else ""
+        print(
+            f"{self.analyzed} analyzed ({self.errors} errors{skipped}) "
+            f"in {elapsed:.1f}s, {rate:.1f}/s",
+            file=self.stream,
+            flush=True,
+        )
+
+
+def run(
+    inputs: Sequence[str],
+    output: Optional[str] = None,
+    output_format: Optional[str] = "ndjson",
+    input_format: str = "auto",
+    workers: int = 0,
+    ordered: bool = True,
+    chunksize: int = 16,
+    checkpoint: Optional[str] = None,
+    checkpoint_every: int = 1000,
+    progress: Optional[Progress] = None,
+    text_field: str = "text",
+    id_field: str = "id",
+    stdin: Optional[IO[str]] = None,
+    stdout: Optional[IO[bytes]] = None,
+    archive: Optional["AnalysisArchive"] = None,
+) -> Progress:
+    """
+    Analyze the postings in ``inputs`` into ``output`` (stdout when None)
+    and return the run's :class:`Progress`.
+
+    Results are also added to ``archive``, if given; with an
+    ``output_format`` of None they are only archived. ``checkpoint`` (which
+    needs an ``output`` file unless results are only archived) is saved
+    every ``checkpoint_every`` records and when the run ends, however it
+    ends; archived rows are written before each save and only then, so a
+    resumed run neither loses nor repeats them.
+    """
+    if output_format is None and archive is None:
+        raise ValueError("Results need an output format or an archive")
+    if checkpoint is not None and output is None and output_format is not None:
+        raise ValueError("A checkpoint needs an output file")
+    state = Checkpoint(checkpoint, inputs) if checkpoint is not None else None
+    resuming = state is not None and state.load()
+    progress = progress if progress is not None else Progress(interval=0)
+    items: Iterable[Item] = iter_items(
+        inputs, input_format, text_field, id_field, stdin
+    )
+
+    out: Optional[IO[bytes]] = None
+    if output_format is None:
+        pass
+    elif output is None:
+        out = stdout if stdout is not None else sys.stdout.buffer
+    else:
+        out = open(output, "r+b" if resuming and os.path.exists(output) else "wb")
+    auto_flush = archive.auto_flush if archive is not None else False
+    if state is not None and archive is not None:
+        # Rows written between saves would be archived again on resume
+        archive.auto_flush = False
+    try:
+        if resuming:
+            if out is not None:
+                out.truncate(state.output_bytes)
+                out.seek(state.output_bytes)
+            items = _unwritten(items, state, progress)
+        writer = None
+        if out is not None:
+            writer = WRITERS[output_format](
+                out, **_writer_options(output_format, out, output)
+            )
+        since_saved = 0
+        try:
+            for outcome in analyze_items(items, workers, ordered, chunksize):
+                if writer is not None:
+                    writer.write(outcome)
+                if archive is not None and outcome.result is not None:
+                    archive.add(outcome.result, outcome.id)
+                progress.add(outcome)
+                if state is not None:
+                    state.mark(outcome.seq)
+                    since_saved += 1
+                    if since_saved >= checkpoint_every:
+                        _save(state, out, archive)
+                        since_saved = 0
+        finally:
+            if state is not None:
+                _save(state, out, archive)
+            elif archive is not None:
+                archive.flush()
+    finally:
+        if archive is not None:
+            archive.auto_flush = auto_flush
+        if out is not None:
+            out.flush()
+            if output is not None:
+                out.close()
+    return progress
+
+
+def _writer_options(output_format: str, out: IO[bytes], output: Optional[str]) -> dict:
+    if output_format == "csv":
+        # Appending to a resumed file keeps its header
+        return {"header": output is None or out.tell() == 0}
+    return {}
+
+
+def _unwritten(
+    items: Iterable[Item], state: Checkpoint, progress: Progress
+) -> Iterator[Item]:
+    for item in items:
+        if item.seq in state:
+            progress.skipped += 1
+        else:
+            yield item
+
+
+def _save(
+    state: Checkpoint,
+    out: Optional[IO[bytes]],
+    archive: Optional["AnalysisArchive"],
+) -> None:
+    # The output and archive must hold everything the checkpoint claims
+    if archive is not None:
+        archive.flush()
+    if out is None:
+        state.save(0)
+        return
+    out.flush()
+    os.fsync(out.fileno())
+    state.save(out.tell())
@@ -0,0 +1,63 @@
+"""Overlapping windows over large texts.
+
+Each window *owns* a region of the document and carries up to ``overlap``
+characters of context on either side. Owned regions partition the document,
+so per-window results that only count matches *starting* in the owned region
+add up to exactly the whole-document result, as long as no match is longer
+than the context. Boundaries are moved to the start of a word where one is
+near, so windows never split a word or a run of whitespace.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Iterator, NamedTuple
+
+# Start of a word: a non-space character preceded by whitespace
+_WORD_START = re.compile(r"(?<=\s)\S")
+
+
+class Window(NamedTuple):
+    """A slice of a document with the region it owns (relative to ``text``)."""
+
+    text: str
+    own_start: int
+    own_end: int
+    # Offset of text[0] in the document
+    offset: int
+
+
+def _word_start(text: str, pos: int, limit: int) -> int:
+    """First word start in ``[pos, limit)``, or ``pos`` if there is none."""
+    if pos <= 0 or pos >= len(text):
+        return max(0, min(pos, len(text)))
+    match = _WORD_START.search(text, pos, max(pos, limit))
+    return match.start() if match else pos
+
+
+def iter_windows(text: str, size: int, overlap: int) -> Iterator[Window]:
+    """
+    Split ``text`` into windows owning about ``size`` characters each.
+
+    Each side gets between ``overlap`` and ``2 * overlap`` characters of
+    context. Only one window is materialized at a time, so memory beyond the
+    text itself is bounded by ``size + 4 * overlap`` per window in use.
+    """
+    if size <= 0:
+        raise ValueError("Window size must be positive")
+    overlap = max(0, overlap)
+    length = len(text)
+    own_start = 0
+    while True:
+        own_end = _word_start(text, own_start + size, own_start + size + overlap)
+        start = _word_start(text, own_start - 2 * overlap, own_start - overlap)
+        end = _word_start(text, own_end + overlap, own_end + 2 * overlap)
+        yield Window(
+            text[start:end],
+            own_start - start,
+            own_end - start,
+            start,
+        )
+        if own_end >= length:
+            return
+        own_start = own_end
@@ -0,0 +1,44 @@
+"""Cooperative time budgets for analysis stages.
+
+Python cannot interrupt a running regex or loop from the outside, so stages
+call :meth:`Deadline.check` between their rules; once the budget is spent the
+stage stops at the next checkpoint and the pipeline reports it as skipped.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Optional
+
+
+class DeadlineExceeded(Exception):
+    """Raised at a checkpoint once a stage has used up its time budget."""
+
+    def __init__(self, stage: str, budget_s: float):
+        super().__init__(
+            f"Stage '{stage}' exceeded its {budget_s * 1000:.0f} ms budget"
+        )
+        self.stage = stage
+        self.budget_s = budget_s
+
+
+class Deadline:
+    """A stage's time budget; ``None`` or ``0`` means unlimited."""
+
+    __slots__ = ("stage", "budget_s", "expires_at")
+
+    def __init__(self, budget_s: Optional[float] = None, stage: str = ""):
+        self.stage = stage
+        self.budget_s = budget_s
+        self.expires_at = time.monotonic() + budget_s if budget_s else None
+
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.monotonic() >= self.expires_at
+
+    def check(self) -> None:
+        """
+        Raises:
+            DeadlineExceeded: If the budget is spent
+        """
+        if self.expired():
+            raise DeadlineExceeded(self.stage, self.budget_s)
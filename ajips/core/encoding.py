@@ -0,0 +1,232 @@
+"""Content negotiation and compression for encoded results.
+
+:func:`negotiate` picks a media type from an ``Accept`` header and
+:func:`negotiate_coding` a content coding from ``Accept-Encoding``, both by
+quality value with the server's order breaking ties. Bodies are compressed
+with gzip, or with zstd when ``zstandard`` is installed (the ``fast``
+extra); streams are compressed chunk by chunk and flushed after each one, so
+every result reaches the client as soon as it is ready.
+
+An :class:`EncodedResult` keeps the bodies of one result per media type and
+coding once they have been produced, so a cached result is encoded and
+compressed at most once however often it is served, along with a strong
+ETag for each body.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import zlib
+from typing import (
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ajips.core.serialization import ENCODERS, JSON
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - exercised with the extra
+    zstandard = None
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Content codings this process can produce, preferred first
+CODINGS: Tuple[str, ...] = ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def _preferences(header: str) -> List[Tuple[str, float]]:
+    """``(token, quality)`` pairs of an ``Accept``-style header."""
+    preferences = []
+    for item in header.split(","):
+        token, *params = item.split(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        preferences.append((token, quality))
+    return preferences
+
+
+def _quality(candidates: Sequence[str], preferences: List[Tuple[str, float]]):
+    # Quality of the most specific range matching; None when none does
+    accepted = dict(preferences)
+    for candidate in candidates:
+        if candidate in accepted:
+            return accepted[candidate]
+    return None
+
+
+def negotiate(header: Optional[str], offered: Sequence[str]) -> Optional[str]:
+    """
+    The media type in ``offered`` the ``Accept`` header ranks highest, or
+    None when it accepts none of them; the first without a header.
+    """
+    if not header:
+        return offered[0] if offered else None
+    preferences = _preferences(header)
+    best, best_quality = None, 0.0
+    for media_type in offered:
+        kind = media_type.split("/", 1)[0]
+        quality = _quality((media_type, f"{kind}/*", "*/*"), preferences)
+        if quality is not None and quality > best_quality:
+            best, best_quality = media_type, quality
+    return best
+
+
+def negotiate_coding(
+    header: Optional[str], offered: Sequence[str] = CODINGS
+) -> Optional[str]:
+    """The coding in ``offered`` that ``Accept-Encoding`` ranks highest, if any."""
+    if not header:
+        return None
+    preferences = _preferences(header)
+    best, best_quality = None, 0.0
+    for coding in offered:
+        quality = _quality((coding, "*"), preferences)
+        if quality is not None and quality > best_quality:
+            best, best_quality = coding, quality
+    return best
+
+
+def compress(body: bytes, coding: str) -> bytes:
+    """``body`` compressed with ``coding`` (one of :data:`CODINGS`)."""
+    compressor = StreamCompressor(coding)
+    return compressor.compress(body, flush=False) + compressor.finish()
+
+
+class StreamCompressor:
+    """Incremental compressor whose output can be decoded up to each chunk."""
+
+    def __init__(self, coding: str):
+        if coding == "gzip":
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._flush_mode = zlib.Z_SYNC_FLUSH
+        elif coding == "zstd" and zstandard is not None:
+            self._compressor = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+            self._flush_mode = zstandard.COMPRESSOBJ_FLUSH_BLOCK
+        else:
+            raise ValueError(f"Unsupported content coding: {coding}")
+
+    def compress(self, chunk: bytes, flush: bool = True) -> bytes:
+        data = self._compressor.compress(chunk)
+        if flush:
+            data += self._compressor.flush(self._flush_mode)
+        return data
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+def compress_chunks(chunks: Iterable[bytes], coding: str) -> Iterator[bytes]:
+    """
+    ``chunks`` compressed with ``coding``, flushed after every chunk; closing
+    the result closes ``chunks``.
+    """
+    compressor = StreamCompressor(coding)
+    try:
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            close()
+
+
+async def compress_chunks_async(
+    chunks: AsyncIterator[bytes], coding: str
+) -> AsyncIterator[bytes]:
+    """:func:`compress_chunks` for an asynchronous stream."""
+    compressor = StreamCompressor(coding)
+    try:
+        async for chunk in chunks:
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.finish()
+    finally:
+        aclose = getattr(chunks, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+class EncodedResult:
+    """
+    A result and its bodies, each encoded or compressed once on demand.
+
+    ``value`` is shared by everyone the result is served to and must not be
+    changed. ``key`` is the content hash the result can be fetched by again,
+    if any.
+    """
+
+    __slots__ = ("value", "key", "_bodies", "_etags")
+
+    def __init__(self, value, key: Optional[str] = None):
+        self.value = value
+        self.key = key
+        self._bodies: Dict[Tuple[str, Optional[str]], bytes] = {}
+        self._etags: Dict[Tuple[str, Optional[str]], str] = {}
+
+    @classmethod
+    def from_json(cls, body: bytes, key: Optional[str] = None) -> "EncodedResult":
+        """A result from its JSON body, which is served as it is."""
+        result = cls(json.loads(body), key)
+        result._bodies[(JSON, None)] = body
+        return result
+
+    def body(self, media_type: str, coding: Optional[str] = None) -> bytes:
+        """The result as ``media_type`` (see ``ENCODERS``), compressed with ``coding``."""
+        key = (media_type, coding)
+        try:
+            return self._bodies[key]
+        except KeyError:
+            pass
+        if coding is None:
+            body = ENCODERS[media_type](self.value)
+        else:
+            body = compress(self.body(media_type), coding)
+        # Two threads may both encode; either body is the same
+        self._bodies[key] = body
+        return body
+
+    def etag(self, media_type: str, coding: Optional[str] = None) -> str:
+        """Strong ETag of :meth:`body`, a digest of its bytes."""
+        key = (media_type, coding)
+        try:
+            return self._etags[key]
+        except KeyError:
+            pass
+        digest = hashlib.blake2b(self.body(media_type, coding), digest_size=16)
+        etag = self._etags[key] = f'"{digest.hexdigest()}"'
+        return etag
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Whether an ``If-None-Match`` header lists ``etag`` (weak comparison)."""
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate in ("*", etag):
+            return True
+    return False
@@ -0,0 +1,34 @@
+"""Per-process state reset in forked children.
+
+A process forked while another of its threads holds a lock, or leads a
+coalesced computation, inherits the lock held and the computation pending
+with no thread left to finish either. Objects passed to
+:func:`reset_after_fork` have their ``_after_fork()`` method called in every
+child right after the fork; the data they hold (cached results, compiled
+matchers) is still inherited copy-on-write.
+"""
+
+from __future__ import annotations
+
+import os
+import weakref
+from typing import TypeVar
+
+T = TypeVar("T")
+
+_objects: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def reset_after_fork(obj: T) -> T:
+    """Call ``obj._after_fork()`` in every forked child; returns ``obj``."""
+    _objects.add(obj)
+    return obj
+
+
+def _after_fork_in_child() -> None:
+    for obj in list(_objects):
+        obj._after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,469 @@
+"""Persistent queue for large batch-analysis jobs.
+
+Jobs and their items are stored in SQLite under ``DATA_DIR``, so work
+survives restarts: items that were in flight when the process stopped are
+put back in the queue the next time a dispatcher starts. One dispatcher per
+host (elected through a lock file, since every server worker shares the
+database) claims pending items and fans them out over a process pool that
+runs the analysis pipeline. Results are appended in completion order, which
+lets clients stream them while the job is still running.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import BrokenExecutor, Executor, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ajips.core.scheduler import BATCH, PRIORITIES, AdmissionController
+from ajips.core.sqlite_utils import ConnectionPool
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows runs a single worker
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_CANCELLED = "cancelled"
+TERMINAL_STATUSES = (JOB_COMPLETED, JOB_CANCELLED)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    priority TEXT NOT NULL DEFAULT 'batch',
+    total INTEGER NOT NULL DEFAULT 0,
+    completed INTEGER NOT NULL DEFAULT 0,
+    failed INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    rank INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (job_id, seq)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS items_by_status ON items (status, rank, job_id, seq);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    ok INTEGER NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_by_job ON results (job_id, id);
+"""
+
+# Rows written per executemany() call while a submission is being inserted
+_INSERT_BATCH = 1000
+# How often a standby worker retries becoming the dispatcher
+_LEADER_RETRY_S = 5.0
+
+
+def _new_job_id() -> str:
+    # Time-ordered so that claiming by job id serves jobs first-in, first-out
+    return f"{time.time_ns() // 1_000_000:013x}{uuid.uuid4().hex[:12]}"
+
+
+def _run_item(payload: str) -> dict:
+    """Pool entry point: analyze one stored item."""
+    from ajips.core.pipelines.job_profile import analyze_record
+
+    return analyze_record(json.loads(payload))
+
+
+class JobQueue:
+    """SQLite-backed job queue with a dispatcher feeding an analysis worker pool."""
+
+    def __init__(
+        self,
+        path: str,
+        workers: int = 0,
+        executor: str = "process",
+        max_items: int = 100_000,
+        poll_interval: float = 0.2,
+        admission: Optional[AdmissionController] = None,
+    ):
+        self.path = path
+        self.workers = workers or os.cpu_count() or 1
+        self.executor_kind = executor
+        self.max_items = max_items
+        self.poll_interval = poll_interval
+        self.admission = admission
+        self._pool = ConnectionPool(path, _SCHEMA)
+        self._completions: "queue.Queue[Tuple[str, int, str, bool, str]]" = (
+            queue.Queue()
+        )
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor: Optional[Executor] = None
+        self._lock_file = None
+        self._in_flight = 0
+
+    # -- submission and queries (any thread, any worker process) ----------
+
+    def submit(self, records: Iterable[dict], priority: str = BATCH) -> str:
+        """
+        Queue a job for the given posting records.
+
+        Records are consumed lazily and inserted in batches, so submissions
+        read from a file never need to be held in memory.
+
+        Args:
+            records: Dicts with ``text`` or ``url`` and optional ``resume_text``/``id``
+            priority: ``batch``, or ``background`` for work (such as recrawls)
+                that should only use capacity nobody else needs
+
+        Returns:
+            The new job ID
+
+        Raises:
+            ValueError: If a record is invalid, the job is empty or too large
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority!r}")
+        rank = PRIORITIES.index(priority)
+        job_id = _new_job_id()
+        now = time.time()
+        total = 0
+        with self._pool.transaction() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, priority, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (job_id, JOB_QUEUED, priority, now, now),
+            )
+            batch: List[Tuple[str, int, str, int]] = []
+            for record in records:
+                if not isinstance(record, dict) or not (
+                    record.get("text") or record.get("url")
+                ):
+                    raise ValueError(f"Record {total + 1} needs a 'text' or 'url'")
+                total += 1
+                if total > self.max_items:
+                    raise ValueError(f"Jobs are limited to {self.max_items} postings")
+                batch.append((job_id, total, json.dumps(record), rank))
+                if len(batch) >= _INSERT_BATCH:
+                    conn.executemany(
+                        "INSERT INTO items (job_id, seq, payload, rank) VALUES (?, ?, ?, ?)",
+                        batch,
+                    )
+                    batch = []
+            if not total:
+                raise ValueError("Job contains no postings")
+            conn.executemany(
+                "INSERT INTO items (job_id, seq, payload, rank) VALUES (?, ?, ?, ?)",
+                batch,
+            )
+            conn.execute("UPDATE jobs SET total = ? WHERE id = ?", (total, job_id))
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Job status and progress counters, or None if the job does not exist."""
+        row = (
+            self._pool.connection()
+            .execute(
+                "SELECT id, status, priority, total, completed, failed, "
+                "created_at, updated_at FROM jobs WHERE id = ?",
+                (job_id,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        keys = ("id", "status", "priority", "total", "completed", "failed")
+        job = dict(zip(keys, row[:6]))
+        job["created_at"], job["updated_at"] = row[6], row[7]
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Dict]:
+        """Cancel a job; items already being analyzed still finish."""
+        with self._pool.transaction() as conn:
+            updated = conn.execute(
+                "UPDATE jobs SET status = ?, updated_at = ? "
+                "WHERE id = ? AND status IN (?, ?)",
+                (JOB_CANCELLED, time.time(), job_id, JOB_QUEUED, JOB_RUNNING),
+            ).rowcount
+            if updated:
+                conn.execute(
+                    "UPDATE items SET status = 'cancelled' "
+                    "WHERE job_id = ? AND status = 'pending'",
+                    (job_id,),
+                )
+        return self.get(job_id)
+
+    def results(
+        self, job_id: str, after: int = 0, limit: int = 500
+    ) -> List[Tuple[int, str]]:
+        """Results recorded after cursor ``after`` as (cursor, JSON line) pairs."""
+        return (
+            self._pool.connection()
+            .execute(
+                "SELECT id, body FROM results WHERE job_id = ? AND id > ? "
+                "ORDER BY id LIMIT ?",
+                (job_id, after, limit),
+            )
+            .fetchall()
+        )
+
+    def iter_results(
+        self, job_id: str, skip: int = 0, follow: bool = True
+    ) -> Iterator[str]:
+        """
+        Yield result lines in completion order.
+
+        ``skip`` is the number of lines the client already has, so a dropped
+        stream can be resumed. With ``follow`` the iterator keeps polling until
+        the job is finished and every in-flight item has reported back.
+        """
+        after = 0
+        while skip > 0:
+            # Advance the cursor past lines the client already has
+            rows = self.results(job_id, after, limit=skip)
+            if not rows:
+                if not follow or self._finished(job_id):
+                    return
+                time.sleep(self.poll_interval)
+                continue
+            after = rows[-1][0]
+            skip -= len(rows)
+        while True:
+            rows = self.results(job_id, after)
+            for after, body in rows:
+                yield body
+            if rows:
+                continue
+            if not follow or self._finished(job_id):
+                # Pick up anything recorded between the last poll and the check
+                for after, body in self.results(job_id, after):
+                    yield body
+                return
+            time.sleep(self.poll_interval)
+
+    def _finished(self, job_id: str) -> bool:
+        job = self.get(job_id)
+        if job is None:
+            return True
+        if job["status"] not in TERMINAL_STATUSES:
+            return False
+        running = (
+            self._pool.connection()
+            .execute(
+                "SELECT COUNT(*) FROM items WHERE job_id = ? AND status = 'running'",
+                (job_id,),
+            )
+            .fetchone()[0]
+        )
+        return running == 0
+
+    # -- dispatcher (one per host) ----------------------------------------
+
+    def start(self) -> None:
+        """Start the dispatcher thread (it idles unless elected leader)."""
+        if self._thread is not None:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="ajips-job-dispatcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop dispatching; unfinished items resume on the next start."""
+        self._stopping.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._drain_completions()
+        if self._lock_file is not None:
+            self._lock_file.close()
+            self._lock_file = None
+
+    @property
+    def is_dispatcher(self) -> bool:
+        return self._executor is not None
+
+    def _try_become_dispatcher(self) -> bool:
+        if fcntl is not None:
+            lock_file = open(self.path + ".lock", "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+            self._lock_file = lock_file
+        self._resume()
+        self._executor = self._new_executor()
+        logger.info("job_dispatcher_started", extra={"workers": self.workers})
+        return True
+
+    def _new_executor(self) -> Executor:
+        if self.executor_kind == "thread":
+            return ThreadPoolExecutor(max_workers=self.workers)
+        # multiprocessing is only imported by the worker that dispatches
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(max_workers=self.workers)
+
+    def _resume(self) -> None:
+        """Requeue items left running by a dispatcher that died mid-job."""
+        with self._pool.transaction() as conn:
+            resumed = conn.execute(
+                "UPDATE items SET status = 'pending' WHERE status = 'running'"
+            ).rowcount
+        if resumed:
+            logger.info("job_items_resumed", extra={"items": resumed})
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            if not self.is_dispatcher and not self._try_become_dispatcher():
+                self._stopping.wait(_LEADER_RETRY_S)
+                continue
+            try:
+                self._drain_completions()
+                claimed = self._dispatch()
+            except Exception:
+                # Keep dispatching (and holding the lock) through one bad round
+                logger.exception("job_dispatch_failed")
+                claimed = 0
+            if not claimed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def _dispatch(self) -> int:
+        capacity = self.workers * 2 - self._in_flight
+        if capacity <= 0:
+            return 0
+        with self._pool.transaction() as conn:
+            rows = conn.execute(
+                "SELECT job_id, seq, payload, rank FROM items "
+                "WHERE status = 'pending' ORDER BY rank, job_id, seq LIMIT ?",
+                (capacity,),
+            ).fetchall()
+            if self.admission is not None:
+                # Only claim items the admission controller has slots for
+                admitted = 0
+                for row in rows:
+                    if not self.admission.try_acquire(PRIORITIES[row[3]]):
+                        break
+                    admitted += 1
+                rows = rows[:admitted]
+            conn.executemany(
+                "UPDATE items SET status = 'running' WHERE job_id = ? AND seq = ?",
+                [(job_id, seq) for job_id, seq, _, _ in rows],
+            )
+            conn.executemany(
+                "UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status = ?",
+                [
+                    (JOB_RUNNING, time.time(), job_id, JOB_QUEUED)
+                    for job_id in {row[0] for row in rows}
+                ],
+            )
+        for index, (job_id, seq, payload, _) in enumerate(rows):
+            record_id = json.loads(payload).get("id")
+            started = time.monotonic()
+            try:
+                future = self._executor.submit(_run_item, payload)
+            except BrokenExecutor:
+                # A pool process died: the items it had in flight fail through
+                # their futures, the ones not submitted yet go back in the queue
+                self._replace_broken_executor(rows[index:])
+                return index
+            future.add_done_callback(
+                functools.partial(
+                    self._on_done,
+                    job_id=job_id,
+                    seq=seq,
+                    record_id=record_id,
+                    started=started,
+                )
+            )
+            self._in_flight += 1
+        return len(rows)
+
+    def _replace_broken_executor(self, unsubmitted: List[Tuple]) -> None:
+        logger.error("job_pool_broken", extra={"requeued_items": len(unsubmitted)})
+        self._executor.shutdown(wait=False)
+        self._executor = self._new_executor()
+        with self._pool.transaction() as conn:
+            conn.executemany(
+                "UPDATE items SET status = 'pending' "
+                "WHERE job_id = ? AND seq = ? AND status = 'running'",
+                [(job_id, seq) for job_id, seq, _, _ in unsubmitted],
+            )
+        if self.admission is not None:
+            for _ in unsubmitted:
+                self.admission.abandon()
+
+    def _on_done(
+        self, future, job_id: str, seq: int, record_id, started: float
+    ) -> None:
+        if self.admission is not None:
+            self.admission.release(time.monotonic() - started)
+        line = {"seq": seq}
+        if record_id is not None:
+            line["id"] = record_id
+        try:
+            line["result"] = future.result()
+            ok = True
+        except Exception as exc:
+            line["error"] = str(exc) or type(exc).__name__
+            ok = False
+        self._completions.put((job_id, seq, json.dumps(line), ok))
+        self._wakeup.set()
+
+    def _drain_completions(self) -> None:
+        done = []
+        while True:
+            try:
+                done.append(self._completions.get_nowait())
+            except queue.Empty:
+                break
+        if not done:
+            return
+        self._in_flight -= len(done)
+        now = time.time()
+        with self._pool.transaction() as conn:
+            conn.executemany(
+                "INSERT INTO results (job_id, seq, ok, body) VALUES (?, ?, ?, ?)",
+                [(job_id, seq, int(ok), body) for job_id, seq, body, ok in done],
+            )
+            conn.executemany(
+                "UPDATE items SET status = ? WHERE job_id = ? AND seq = ?",
+                [
+                    ("done" if ok else "failed", job_id, seq)
+                    for job_id, seq, _, ok in done
+                ],
+            )
+            conn.executemany(
+                "UPDATE jobs SET completed = completed + ?, failed = failed + ?, "
+                "updated_at = ? WHERE id = ?",
+                [(int(ok), int(not ok), now, job_id) for job_id, _, _, ok in done],
+            )
+            conn.executemany(
+                "UPDATE jobs SET status = ? WHERE id = ? AND status = ? "
+                "AND completed + failed >= total",
+                [
+                    (JOB_COMPLETED, job_id, JOB_RUNNING)
+                    for job_id in {d[0] for d in done}
+                ],
+            )
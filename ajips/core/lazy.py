@@ -0,0 +1,59 @@
+"""Deferred imports for heavy dependencies that most requests never touch.
+
+``requests``/``bs4`` are only needed when a posting is fetched by URL and
+NumPy/scikit-learn only on optional analysis paths, yet importing them at
+module level makes every worker pay for them before it can answer a health
+check. ``lazy_import`` returns a module placeholder that performs the real
+import on first attribute access.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Placeholder that imports the named module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return ``name`` if already imported, otherwise a lazily loading placeholder."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
+
+
+def is_loaded(module: types.ModuleType) -> bool:
+    """Whether a module returned by :func:`lazy_import` has been imported yet."""
+    if isinstance(module, LazyModule):
+        return module.__dict__["_lazy_module"] is not None
+    return True
@@ -2,38 +2,55 @@
 
 import logging
 import sys
-from pythonjsonlogger import jsonlogger
+
+
+class LazyJsonFormatter(logging.Formatter):
+    """JSON formatter that imports ``pythonjsonlogger`` when the first record is logged."""
+
+    def __init__(self, fmt: str, **kwargs):
+        super().__init__(fmt=fmt)
+        self._kwargs = kwargs
+        self._formatter = None
+
+    def format(self, record: logging.LogRecord) -> str:
+        if self._formatter is None:
+            from pythonjsonlogger import jsonlogger
+
+            self._formatter = jsonlogger.JsonFormatter(fmt=self._fmt, **self._kwargs)
+        return self._formatter.format(record)
+
 
 def setup_logging(app_name: str = "ajips", level: str = "INFO") -> logging.Logger:
     """
     Configure structured JSON logging for the application.
-    
+
     Args:
         app_name: Application name for log identification
         level: Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
-        
+
     Returns:
         Configured logger instance
     """
     logger = logging.getLogger(app_name)
     logger.setLevel(level)
-    
+
     # Remove existing handlers
     logger.handlers.clear()
-    
+
     # JSON formatter for structured logging
-    json_formatter = jsonlogger.JsonFormatter(
+    json_formatter = LazyJsonFormatter(
         fmt="%(timestamp)s %(level)s %(name)s %(message)s",
         timestamp=True,
     )
-    
+
     # Console handler with JSON output
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(json_formatter)
     logger.addHandler(console_handler)
-    
+
     return logger
 
+
 def get_logger(name: str) -> logging.Logger:
     """Get or create a logger with the given name."""
     return logging.getLogger(name)
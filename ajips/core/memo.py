@@ -0,0 +1,96 @@
+"""Bounded memoization with hit-rate metrics.
+
+A :class:`Memo` keeps the most recently used ``capacity`` results in a
+least-recently-used order and evicts the oldest when full. Each lookup names
+the version of the inputs the result depends on (a taxonomy digest, say);
+when it differs from the version of the stored entries they are all dropped.
+Values are computed outside the lock, so two threads missing the same key at
+once may both compute it. Everything is per process.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+from ajips.core import metrics
+from ajips.core.forksafe import reset_after_fork
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class Memo(Generic[K, V]):
+    """Least-recently-used cache of ``capacity`` computed values."""
+
+    def __init__(self, name: str, capacity: int):
+        if capacity < 0:
+            raise ValueError("capacity must not be negative")
+        self.name = name
+        self.capacity = capacity
+        self._entries: "OrderedDict[K, V]" = OrderedDict()
+        self._version: Optional[Hashable] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        metrics.register(name, self.stats)
+        reset_after_fork(self)
+
+    def get(
+        self,
+        key: K,
+        compute: Callable[[], V],
+        version: Hashable = None,
+        keep: Optional[Callable[[V], bool]] = None,
+    ) -> V:
+        """
+        The value stored for ``key`` under ``version``, else ``compute()``,
+        which is stored unless ``keep`` says otherwise.
+        """
+        with self._lock:
+            if version != self._version:
+                if self._entries:
+                    self.invalidations += 1
+                    self._entries.clear()
+                self._version = version
+            try:
+                value = self._entries[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return value
+        value = compute()
+        if self.capacity and (keep is None or keep(value)):
+            with self._lock:
+                if version == self._version:
+                    self._entries[key] = value
+                    if len(self._entries) > self.capacity:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+        return value
+
+    def _after_fork(self) -> None:
+        self._lock = threading.Lock()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+                "capacity": self.capacity,
+                "version": self._version,
+            }
@@ -0,0 +1,37 @@
+"""Process-local counters exposed by ``GET /metrics``.
+
+Components register a callable returning a JSON-ready dict of their current
+statistics; the endpoint collects every registered provider on demand, so
+nothing is computed unless metrics are actually scraped.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Callable, Dict
+
+_providers: Dict[str, Callable[[], dict]] = {}
+_lock = threading.Lock()
+
+
+def register(name: str, provider: Callable[[], dict]) -> None:
+    """Expose ``provider()`` under ``name``; re-registering replaces it."""
+    with _lock:
+        _providers[name] = provider
+
+
+def _after_fork_in_child() -> None:
+    global _lock
+    _lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+def collect() -> Dict[str, dict]:
+    """Snapshot of every registered component's statistics."""
+    with _lock:
+        providers = dict(_providers)
+    return {name: provider() for name, provider in sorted(providers.items())}
@@ -1,15 +1,55 @@
 from __future__ import annotations
 
+import logging
 import re
+from typing import Callable, List, NamedTuple, Optional, Tuple, TypeVar
 
-from ajips.app.api.schemas import AnalyzeRequest, AnalyzeResponse
-from ajips.app.services.critique import critique_requirements, analyze_job_quality
-from ajips.app.services.enrichment import infer_hidden_skills
-from ajips.app.services.extraction import extract_skills, extract_experience_level, extract_education_requirements
+from ajips.app.api.schemas import AnalyzeRequest, JobPostingInput
+from ajips.app.config import settings
+from ajips.app.services.critique import critique_requirements, analyze_job_quality, critiques_from_signals, quality_from_signals
+from ajips.app.services.extraction import SKILL_SECTIONS, SkillCounts, extract_experience_level, extract_education_requirements, get_skill_matcher, rank_skills, scan_posting
 from ajips.app.services.ingestion import fetch_job_posting
-from ajips.app.services.normalization import normalize_text
-from ajips.app.services.profiling import build_focus_areas, identify_role_type
+from ajips.app.services.normalization import normalize_sections, section_spans
+from ajips.app.services.salary import first_salary
+from ajips.app.services.skill_profile import skill_profile, taxonomy_version
 from ajips.app.services.resume_match import compute_resume_alignment
+from ajips.core.deadline import Deadline, DeadlineExceeded
+from ajips.core.encoding import EncodedResult
+from ajips.core.memo import Memo
+from ajips.core.pipelines.windowed import analyze_windows
+from ajips.core.results import JobProfile
+from ajips.core.singleflight import SingleFlight, content_key
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Concurrent requests for the same posting text share one pipeline run
+_analyses = SingleFlight("analysis")
+
+
+# Encoded results of recent analyses; see analyze_encoded
+_results: Memo[str, EncodedResult] = Memo("results", settings.RESULT_CACHE_SIZE)
+
+
+# Called with every analyzed posting; see add_listener
+_listeners: List[Callable[[str, Optional[str], JobProfile], None]] = []
+
+# Called with every new addressable result; see add_result_listener
+_result_listeners: List[Callable[[EncodedResult], None]] = []
+
+
+class PostingFacts(NamedTuple):
+    """What steps 2-4, 6, 9 and 10 extract from the posting text alone."""
+
+    title: Optional[str]
+    explicit_skills: List[str]
+    critiques: list
+    experience_level: str
+    quality_analysis: dict
+    skipped_sections: List[str]
+    salary_range: Optional[dict]
+    interview_stages: List[str]
 
 
 def extract_job_title(text: str) -> str:
@@ -35,54 +75,256 @@ def extract_job_title(text: str) -> str:
     return None
 
 
-def build_job_profile(payload: AnalyzeRequest) -> AnalyzeResponse:
+def build_job_profile(payload: AnalyzeRequest) -> JobProfile:
     """
     Build a comprehensive job profile from the input payload.
     Orchestrates all analysis services to produce detailed insights.
     """
-    # Step 1: Get raw text from URL or direct input
+    raw_text, fetched = _posting_text(payload)
+    return _profile(raw_text, payload.job_posting.url, payload.resume_text, fetched)
+
+
+def analyze_posting(raw_text: str, resume_text: Optional[str] = None) -> JobProfile:
+    """:func:`build_job_profile` for posting text, without a request model."""
+    return _profile(raw_text, None, resume_text, True)
+
+
+def analyze_encoded(payload: AnalyzeRequest) -> EncodedResult:
+    """
+    :func:`build_job_profile` as an :class:`EncodedResult`, from the result
+    cache when the same posting text and resume were analyzed recently.
+
+    Cached results keep their encoded bodies, so serving one again skips
+    both the pipeline and serialization. Listeners only see the first
+    analysis. Complete analyses of fetched postings carry their
+    :func:`analysis_id` as ``key``; the others are not cached.
+    """
+    raw_text, fetched = _posting_text(payload)
+    url, resume_text = payload.job_posting.url, payload.resume_text
+    if not fetched:
+        return EncodedResult(_profile(raw_text, url, resume_text, fetched))
+    version = taxonomy_version()
+    key = analysis_id(raw_text, resume_text, version)
+
+    def analyze() -> EncodedResult:
+        profile = _profile(raw_text, url, resume_text, fetched)
+        # Partial analyses are neither cached nor addressable
+        if profile.skipped_sections:
+            return EncodedResult(profile)
+        result = EncodedResult(profile, key)
+        for listener in list(_result_listeners):
+            try:
+                listener(result)
+            except Exception:
+                logger.exception("result_listener_failed")
+        return result
+
+    return _results.get(key, analyze, version, keep=lambda result: result.key is not None)
+
+
+def analysis_id(
+    raw_text: str, resume_text: Optional[str] = None, version: Optional[str] = None
+) -> str:
+    """
+    Content hash identifying the analysis of ``raw_text`` and ``resume_text``
+    under the skill taxonomy ``version`` (the current one by default).
+    """
+    return content_key(version or taxonomy_version(), raw_text, resume_text)
+
+
+def stored_result(
+    key: str, load: Callable[[str], Optional[bytes]]
+) -> Optional[EncodedResult]:
+    """
+    The result with :func:`analysis_id` ``key``, from the result cache or
+    else from the JSON body ``load(key)`` returns; None if neither has it.
+    """
+
+    def fetch() -> Optional[EncodedResult]:
+        body = load(key)
+        return EncodedResult.from_json(body, key) if body is not None else None
+
+    return _results.get(
+        key, fetch, taxonomy_version(), keep=lambda result: result is not None
+    )
+
+
+def add_result_listener(listener: Callable[[EncodedResult], None]) -> None:
+    """
+    Call ``listener(result)`` for every new result :func:`analyze_encoded`
+    can address by its ``key`` (to store it, say); errors are logged.
+    """
+    if listener not in _result_listeners:
+        _result_listeners.append(listener)
+
+
+def remove_result_listener(listener: Callable[[EncodedResult], None]) -> None:
+    if listener in _result_listeners:
+        _result_listeners.remove(listener)
+
+
+def _posting_text(payload: AnalyzeRequest) -> Tuple[str, bool]:
+    """Step 1: the posting text, given or fetched, and whether it was fetched."""
+    url = payload.job_posting.url
     raw_text = payload.job_posting.text
-    if not raw_text and payload.job_posting.url:
+    fetched = True
+    if not raw_text and url:
         try:
-            raw_text = fetch_job_posting(payload.job_posting.url)
+            raw_text = fetch_job_posting(url)
         except Exception as e:
             raw_text = f"Error fetching URL: {str(e)}"
-    
-    if not raw_text:
-        raw_text = ""
-    
-    # Step 2: Normalize text
-    normalized = normalize_text(raw_text)
+            fetched = False
+    return raw_text or "", fetched
+
+
+def _profile(
+    raw_text: str, url: Optional[str], resume_text: Optional[str], fetched: bool
+) -> JobProfile:
+    return _analyses.do(
+        content_key(raw_text, resume_text),
+        lambda: _publish(
+            raw_text, url, _analyze_text(raw_text, resume_text), fetched
+        ),
+    )
+
+
+def add_listener(listener: Callable[[str, Optional[str], JobProfile], None]) -> None:
+    """
+    Call ``listener(raw_text, url, profile)`` for every posting analyzed.
+
+    Listeners run in the analyzing thread (once per pipeline run, however
+    many identical requests shared it); their errors are logged and never
+    fail the analysis.
+    """
+    if listener not in _listeners:
+        _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[str, Optional[str], JobProfile], None]) -> None:
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def _publish(
+    raw_text: str, url: Optional[str], profile: JobProfile, fetched: bool = True
+) -> JobProfile:
+    # Empty postings and fetch errors are not worth recording
+    if fetched and raw_text.strip():
+        for listener in list(_listeners):
+            try:
+                listener(raw_text, url, profile)
+            except Exception:
+                logger.exception("analysis_listener_failed")
+    return profile
+
+
+def _analyze_text(raw_text: str, resume_text: Optional[str] = None) -> JobProfile:
+    """Run the analysis pipeline (steps 2-12) on fetched posting text."""
+    return _build_response(_extract_facts(raw_text), resume_text)
+
+
+def _extract_facts(raw_text: str) -> PostingFacts:
+    """Steps 2-4, 6, 9 and 10: everything read from the posting text."""
+    if len(raw_text) > settings.ANALYSIS_WINDOW_THRESHOLD_CHARS:
+        return _extract_facts_windowed(raw_text)
+
+    # Step 2: Normalize text and find its sections
+    normalized, sections = normalize_sections(raw_text)
     
     # Step 3: Extract job title
     title = extract_job_title(raw_text)
     
-    # Step 4: Extract explicit skills
-    explicit_skills = extract_skills(normalized)
-    
-    # Step 5: Infer hidden skills
-    hidden_skills = infer_hidden_skills(explicit_skills)
-    
-    # Step 6: Critique requirements
-    critiques = critique_requirements(normalized)
-    
-    # Step 7: Build focus areas
-    focus_areas = build_focus_areas(explicit_skills)
+    # Step 4: Extract explicit skills (from the requirement sections if any),
+    # interview stages and salary in the same pass
+    scan = scan_posting(normalized, section_spans(sections, SKILL_SECTIONS))
+    explicit_skills, salary_range, interview_stages = _scanned_facts(scan)
     
-    # Step 8: Identify role type
-    identified_role = identify_role_type(explicit_skills)
+    # Step 6: Critique requirements (optional stages run under time budgets)
+    skipped_sections: List[str] = []
+    critiques = _run_optional_stage(
+        "critiques",
+        lambda deadline: critique_requirements(normalized, deadline),
+        [],
+        skipped_sections,
+    )
     
     # Step 9: Extract additional metadata
     experience_level = extract_experience_level(normalized)
     education_reqs = extract_education_requirements(normalized)
     
     # Step 10: Analyze job quality
-    quality_analysis = analyze_job_quality(normalized)
+    quality_analysis = _run_optional_stage(
+        "quality",
+        lambda deadline: analyze_job_quality(normalized, deadline, sections),
+        {},
+        skipped_sections,
+    )
+    
+    return PostingFacts(
+        title, explicit_skills, critiques, experience_level, quality_analysis,
+        skipped_sections, salary_range, interview_stages,
+    )
+
+
+def _scanned_facts(scan: SkillCounts) -> Tuple[List[str], Optional[dict], List[str]]:
+    """Ranked skills, salary range and interview stages from the posting scan."""
+    matcher = get_skill_matcher()
+    salary = first_salary(scan.salaries)
+    return (
+        rank_skills(matcher.resolve(scan)),
+        salary.to_dict() if salary is not None else None,
+        matcher.interview_stages(scan),
+    )
+
+
+def _extract_facts_windowed(raw_text: str) -> PostingFacts:
+    """
+    Steps 2-4, 6, 9 and 10 for very large postings, scanned in overlapping
+    windows (see :mod:`ajips.core.pipelines.windowed`).
+
+    Critiques and quality share one signal scan, which runs under the
+    critiques budget; when it runs out both sections are skipped.
+    """
+    budget_ms = settings.STAGE_BUDGETS_MS.get("critiques")
+    scan = analyze_windows(
+        raw_text,
+        size=settings.ANALYSIS_WINDOW_CHARS,
+        overlap=settings.ANALYSIS_WINDOW_OVERLAP_CHARS,
+        workers=settings.ANALYSIS_WINDOW_WORKERS,
+        deadline=Deadline(budget_ms / 1000 if budget_ms else None, "critiques"),
+    )
+    skipped_sections: List[str] = []
+    if scan.requirements is None:
+        logger.warning("stage_skipped", extra={"stage": "critiques", "budget_ms": budget_ms})
+        skipped_sections += ["critiques", "quality"]
+        critiques, quality_analysis = [], {}
+    else:
+        critiques = critiques_from_signals(scan.requirements)
+        quality_analysis = quality_from_signals(scan.requirements)
+    explicit_skills, salary_range, interview_stages = _scanned_facts(scan.skills)
+    return PostingFacts(
+        extract_job_title(raw_text), explicit_skills, critiques, scan.experience_level,
+        quality_analysis, skipped_sections, salary_range, interview_stages,
+    )
+
+
+def _build_response(facts: PostingFacts, resume_text: Optional[str]) -> JobProfile:
+    """Steps 5, 7, 8, 11 and 12, which only need the extracted facts."""
+    (
+        title, explicit_skills, critiques, experience_level, quality_analysis,
+        skipped_sections, salary_range, interview_stages,
+    ) = facts
+    # Steps 5, 7 and 8: Infer hidden skills, build focus areas and identify
+    # the role type (cached per skill set)
+    profile = skill_profile(explicit_skills)
+    hidden_skills = profile.hidden_skills
+    focus_areas = profile.focus_areas
+    identified_role = profile.role_type
     
     # Step 11: Resume alignment (if provided)
     resume_alignment = None
-    if payload.resume_text:
-        resume_alignment = compute_resume_alignment(payload.resume_text, explicit_skills)
+    if resume_text:
+        resume_alignment = compute_resume_alignment(resume_text, explicit_skills)
     
     # Step 12: Generate summary
     summary = generate_summary(
@@ -94,17 +336,62 @@ def build_job_profile(payload: AnalyzeRequest) -> AnalyzeResponse:
         quality_analysis=quality_analysis
     )
     
-    return AnalyzeResponse(
+    # Nothing validates the profile on its way out
+    return JobProfile(
         title=title or identified_role,
+        role_type=identified_role,
+        experience_level=experience_level,
         focus_areas=focus_areas,
         explicit_skills=explicit_skills,
         hidden_skills=hidden_skills,
         critiques=critiques,
+        salary_range=salary_range,
+        interview_stages=interview_stages,
+        quality_score=float(quality_analysis.get("score", 0.0)),
         resume_alignment=resume_alignment,
         summary=summary,
+        skipped_sections=skipped_sections,
     )
 
 
+def _run_optional_stage(
+    stage: str,
+    run: Callable[[Deadline], T],
+    fallback: T,
+    skipped_sections: List[str],
+) -> T:
+    """
+    Run ``run(deadline)`` under the stage's budget from ``STAGE_BUDGETS_MS``.
+
+    A stage that runs out of time yields ``fallback`` and is recorded in
+    ``skipped_sections`` so the rest of the profile is still returned.
+    """
+    budget_ms = settings.STAGE_BUDGETS_MS.get(stage)
+    try:
+        return run(Deadline(budget_ms / 1000 if budget_ms else None, stage))
+    except DeadlineExceeded:
+        logger.warning("stage_skipped", extra={"stage": stage, "budget_ms": budget_ms})
+        skipped_sections.append(stage)
+        return fallback
+
+
+def analyze_record(record: dict) -> dict:
+    """
+    Analyze one posting record into a JSON-ready dict.
+
+    Batch paths (job queue, streaming) receive plain records such as
+    ``{"text": ...}`` or ``{"url": ..., "resume_text": ...}`` and serialize
+    the result straight away.
+    """
+    if not (record.get("text") or record.get("url")):
+        raise ValueError("Posting needs a 'text' or 'url'")
+    payload = AnalyzeRequest(
+        job_posting=JobPostingInput(text=record.get("text"), url=record.get("url")),
+        resume_text=record.get("resume_text"),
+    )
+    return build_job_profile(payload).to_dict()
+
+
 def generate_summary(
     title: str,
     explicit_skills: list,
@@ -140,3 +427,32 @@ def generate_summary(
     parts.append(f"Job posting quality: {grade}")
     
     return " | ".join(parts)
+
+
+# Exercises every stage (including conditional critique rules) so that their
+# patterns are compiled during warm-up rather than on the first request.
+_WARM_UP_POSTING = """Position: Junior Full Stack Engineer
+
+Requirements:
+- 3+ years of Python, React, Kubernetes and Go experience
+- Cloud and database experience, PhD preferred
+Salary: $90,000 - $120,000. Remote or hybrid office location.
+Benefits include health insurance, training and a team culture we value.
+"""
+
+
+def warm_up() -> None:
+    """
+    Load the skill taxonomy, build compiled matchers and compile the critique
+    rules ahead of the first request.
+
+    The server launcher calls this before forking so every worker inherits
+    the prepared state copy-on-write instead of rebuilding it.
+    """
+    get_skill_matcher()
+    build_job_profile(
+        AnalyzeRequest(
+            job_posting=JobPostingInput(text=_WARM_UP_POSTING),
+            resume_text="Python developer with React experience",
+        )
+    )
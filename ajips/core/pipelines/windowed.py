@@ -0,0 +1,276 @@
+"""Windowed analysis for very large postings.
+
+Postings over ``ANALYSIS_WINDOW_THRESHOLD_CHARS`` are not normalized,
+lowercased and tokenized as a whole (several full-size copies plus a token
+list many times the input size). They are cut into overlapping windows
+(:mod:`ajips.core.chunking`), each window is scanned on its own, and the
+per-window results are merged in document order. Only matches that start in a
+window's owned region count, so merged skill counts, interview stages,
+salaries, experience and education levels and critique/quality signals equal
+a whole-text scan. (The title is still searched in the raw text as a whole: a
+search allocates no copies, and its line-based patterns may span more than a
+window's context.)
+
+Windows are scanned ``ANALYSIS_WINDOW_WORKERS`` at a time in a process pool
+(regex scanning holds the GIL, so threads would not help), or one after
+another in the calling thread when that is 0. Either way only a bounded number
+of windows is in memory at once, whatever the input size.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Deque,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from ajips.app.services.critique import (
+    SIGNAL_SECTIONS,
+    RequirementSignals,
+    scan_requirements,
+)
+from ajips.app.services.extraction import (
+    EDUCATION_PATTERNS,
+    EXPERIENCE_LEVEL_PATTERNS,
+    SKILL_SECTIONS,
+    SkillCounts,
+    extract_education_requirements,
+    extract_experience_level,
+    get_skill_matcher,
+)
+from ajips.app.services.normalization import (
+    Section,
+    collapse_whitespace,
+    section_spans,
+    segment_sections,
+)
+from ajips.core.chunking import Window, iter_windows
+from ajips.core.deadline import Deadline, DeadlineExceeded
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Executor, Future
+
+# Most specific first, as in extract_experience_level
+_LEVEL_RANK = {level: rank for rank, (level, _) in enumerate(EXPERIENCE_LEVEL_PATTERNS)}
+_EDUCATION_ORDER = [requirement for requirement, _ in EDUCATION_PATTERNS]
+
+_executor: Optional["Executor"] = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+class WindowScan:
+    """Everything the profile needs from one window (or several, merged)."""
+
+    __slots__ = ("skills", "requirements", "experience_level", "education")
+
+    def __init__(
+        self,
+        skills: SkillCounts,
+        requirements: Optional[RequirementSignals],
+        experience_level: str,
+        education: List[str],
+    ):
+        self.skills = skills
+        # None once the critiques budget ran out
+        self.requirements = requirements
+        self.experience_level = experience_level
+        self.education = education
+
+    def merge(self, later: "WindowScan") -> "WindowScan":
+        """Fold in the scan of the window directly following this one."""
+        self.skills.merge(later.skills)
+        if self.requirements is not None and later.requirements is not None:
+            self.requirements.merge(later.requirements)
+        else:
+            self.requirements = None
+        self.experience_level = min(
+            self.experience_level,
+            later.experience_level,
+            key=lambda level: _LEVEL_RANK.get(level, len(_LEVEL_RANK)),
+        )
+        found = set(self.education) | set(later.education)
+        self.education = [r for r in _EDUCATION_ORDER if r in found] or [
+            "Not Specified"
+        ]
+        return self
+
+
+def scan_window(
+    window: Window,
+    deadline: Optional[Deadline] = None,
+    sections: Sequence[Section] = (),
+    section_names: FrozenSet[str] = frozenset(),
+) -> WindowScan:
+    """
+    Scan one window; runs in pool workers, so it only takes picklable input.
+
+    Extractors see the window normalized and lowercased, as they would the
+    whole posting; ``sections`` are the document's sections clipped to the
+    window (in window offsets) and ``section_names`` all section names the
+    document has, which decide whether a section-scoped extractor looks at
+    its sections or at everything. The window is collapsed piecewise at its
+    owned region and section boundaries so those offsets survive.
+    """
+    raw = window.text
+    offsets = sorted(
+        {window.own_start, window.own_end}
+        | {s.start for s in sections}
+        | {s.end for s in sections}
+    )
+    collapsed, mapped = collapse_whitespace(raw, offsets)
+    position = dict(zip(offsets, mapped))
+    text_lower = collapsed.lower()
+    start = position[window.own_start]
+    end = position[window.own_end]
+    sections = [Section(s.name, position[s.start], position[s.end]) for s in sections]
+
+    requirements: Optional[RequirementSignals] = None
+    if deadline is None or not deadline.expired():
+        scopes = {
+            name: _owned_spans(sections, names, start, end)
+            for name, names in SIGNAL_SECTIONS.items()
+            if section_names.intersection(names)
+        }
+        try:
+            requirements = scan_requirements(
+                text_lower, start, end, deadline, scopes=scopes
+            )
+        except DeadlineExceeded:
+            requirements = None
+
+    skill_spans = (
+        _owned_spans(sections, SKILL_SECTIONS, start, end)
+        if section_names.intersection(SKILL_SECTIONS)
+        else None
+    )
+    # Skills, interview stages and salaries in one pass over the owned region
+    skills = get_skill_matcher().scan(text_lower, start, end, skill_spans)
+
+    return WindowScan(
+        skills=skills,
+        requirements=requirements,
+        experience_level=extract_experience_level(text_lower, start, end),
+        education=extract_education_requirements(text_lower, start, end),
+    )
+
+
+def _owned_spans(
+    sections: Sequence[Section], names: Iterable[str], start: int, end: int
+) -> List[Tuple[int, int]]:
+    """Parts of the named sections that fall inside ``[start, end)``."""
+    spans = (section_spans(sections, names) or []) if sections else []
+    return [(max(s, start), min(e, end)) for s, e in spans if s < end and e > start]
+
+
+def _get_executor(workers: int) -> "Executor":
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            from concurrent.futures import ProcessPoolExecutor
+
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            _executor_workers = workers
+        return _executor
+
+
+def _after_fork_in_child() -> None:
+    # The pool's processes and threads belong to the parent
+    global _executor, _executor_lock
+    _executor = None
+    _executor_lock = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
+
+
+@atexit.register
+def shutdown_executor() -> None:
+    """Stop the window worker pool, if one was started."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
+
+
+def _window_sections(window: Window, sections: Sequence[Section]) -> List[Section]:
+    offset, length = window.offset, len(window.text)
+    return [
+        Section(s.name, max(s.start - offset, 0), min(s.end - offset, length))
+        for s in sections
+        if s.start < offset + length and s.end > offset
+    ]
+
+
+def _scan_all(
+    text: str,
+    windows: Iterable[Window],
+    workers: int,
+    deadline: Optional[Deadline],
+) -> Iterator[WindowScan]:
+    # Headings are found in one pass over the raw text, which copies nothing
+    sections = segment_sections(text)
+    names = frozenset(s.name for s in sections)
+    if workers <= 0:
+        for window in windows:
+            yield scan_window(
+                window, deadline, _window_sections(window, sections), names
+            )
+        return
+
+    executor = _get_executor(workers)
+    # At most two windows per worker are pending at any time
+    pending: Deque["Future"] = deque()
+    try:
+        for window in windows:
+            pending.append(
+                executor.submit(
+                    scan_window,
+                    window,
+                    deadline,
+                    _window_sections(window, sections),
+                    names,
+                )
+            )
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def analyze_windows(
+    text: str,
+    size: int,
+    overlap: int,
+    workers: int = 0,
+    deadline: Optional[Deadline] = None,
+) -> WindowScan:
+    """
+    Scan ``text`` window by window and merge the results.
+
+    ``deadline`` bounds the critique/quality scan only; once it runs out the
+    merged ``requirements`` is None and the remaining windows skip that scan.
+    """
+    scans = _scan_all(text, iter_windows(text, size, overlap), workers, deadline)
+    merged = next(scans)
+    for scan in scans:
+        merged.merge(scan)
+    return merged
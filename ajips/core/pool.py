@@ -0,0 +1,90 @@
+"""Chunked fan-out of a stream over a process pool, with bounded read-ahead.
+
+:func:`imap_chunks` backs both :meth:`ajips.Analyzer.analyze_many` and
+``ajips analyze`` (:mod:`ajips.core.bulk`). Items are sent to the workers in
+chunks, and the input is consumed only as results are taken: at most two
+chunks per worker are in flight, so memory stays bounded however long, or
+unbounded, the stream is.
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Future
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def chunked(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """``items`` in lists of ``size`` (the last one possibly shorter)."""
+    chunk: List[T] = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def imap_chunks(
+    fn: Callable[[List[T]], R],
+    items: Iterable[T],
+    workers: int,
+    chunksize: int,
+    ordered: bool = True,
+    initializer: Optional[Callable[..., Any]] = None,
+    initargs: Sequence[Any] = (),
+) -> Iterator[Tuple[List[T], R]]:
+    """
+    Yield ``(chunk, fn(chunk))`` for chunks of ``items``, computed by a pool
+    of ``workers`` processes.
+
+    Results come in input order, or as chunks complete if ``ordered`` is
+    false. ``fn`` must be picklable (a module-level function). The pool is
+    shut down once the results are exhausted or the iterator is closed;
+    chunks not started by then are cancelled.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=initializer, initargs=tuple(initargs)
+    )
+    pending: Deque[Tuple[List[T], "Future"]] = deque()
+
+    def take() -> Tuple[List[T], R]:
+        if ordered:
+            chunk, future = pending.popleft()
+        else:
+            done, _ = wait([f for _, f in pending], return_when=FIRST_COMPLETED)
+            chunk, future = next(entry for entry in pending if entry[1] in done)
+            pending.remove((chunk, future))
+        return chunk, future.result()
+
+    try:
+        for chunk in chunked(items, chunksize):
+            pending.append((chunk, executor.submit(fn, chunk)))
+            if len(pending) >= 2 * workers:
+                yield take()
+        while pending:
+            yield take()
+    finally:
+        for _, future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
@@ -0,0 +1,275 @@
+"""Token-bucket rate limiting backed by a store shared across worker processes.
+
+Each client costs O(1) state (remaining tokens and the last refill timestamp)
+regardless of how many requests it makes, unlike moving-window limiters that
+keep one entry per request. Buckets live in one of three stores:
+
+- ``memory``: per-process dictionary (single worker, tests)
+- ``sqlite`` / ``sqlite:///path/to/file``: file-backed store shared by every
+  worker on the host; place it on ``/dev/shm`` for a shared-memory store
+- ``redis://host:port/db``: any Redis-compatible server (Redis, Valkey,
+  KeyDB, Dragonfly) including a local stand-in next to the workers
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from ajips.core.sqlite_utils import ConnectionPool
+
+_PERIODS = {
+    "second": 1.0,
+    "minute": 60.0,
+    "hour": 3600.0,
+    "day": 86400.0,
+}
+
+
+class RateLimitExceeded(Exception):
+    """Raised when a client has exhausted its token budget."""
+
+    def __init__(self, budget: str, retry_after: float):
+        super().__init__(f"Rate limit exceeded for '{budget}'")
+        self.budget = budget
+        self.retry_after = retry_after
+
+
+def parse_rate(rate: str) -> Tuple[float, float]:
+    """
+    Parse a rate string such as ``"30/minute"`` or ``"5 per hour"``.
+
+    Returns:
+        Tuple of (bucket capacity, refill rate in tokens per second)
+    """
+    normalized = rate.strip().lower().replace(" per ", "/")
+    try:
+        amount, period = normalized.split("/", 1)
+        capacity = float(amount)
+    except ValueError:
+        raise ValueError(f"Invalid rate limit: {rate!r}")
+    period = period.strip().rstrip("s")
+    if period not in _PERIODS or capacity <= 0:
+        raise ValueError(f"Invalid rate limit: {rate!r}")
+    return capacity, capacity / _PERIODS[period]
+
+
+def _refill(
+    tokens: float, updated: float, now: float, capacity: float, rate: float
+) -> float:
+    return min(capacity, tokens + max(0.0, now - updated) * rate)
+
+
+class MemoryBucketStore:
+    """
+    Per-process bucket store; buckets are not shared between workers.
+
+    Past ``max_keys`` buckets, full ones are dropped (a scan that runs at
+    most once every ``_PRUNE_EVERY`` calls), then the least recently used.
+    """
+
+    _PRUNE_EVERY = 1000
+
+    def __init__(self, max_keys: int = 100_000):
+        # Key -> (tokens, updated, full_at), least recently used first
+        self._buckets: OrderedDict[str, Tuple[float, float, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_keys = max_keys
+        self._calls = 0
+        self._next_prune = 0
+
+    def consume(
+        self, key: str, capacity: float, rate: float, cost: float = 1.0
+    ) -> Tuple[bool, float, float]:
+        """Take ``cost`` tokens; returns (allowed, remaining, retry_after_s)."""
+        now = time.time()
+        with self._lock:
+            bucket = self._buckets.pop(key, None)
+            tokens, updated = (capacity, now) if bucket is None else bucket[:2]
+            tokens = _refill(tokens, updated, now, capacity, rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            # Buckets of different budgets share the store, so each keeps
+            # the time it is full again under its own capacity and rate
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            self._calls += 1
+            if len(self._buckets) > self._max_keys:
+                self._prune(now)
+        retry_after = 0.0 if allowed else (cost - tokens) / rate
+        return allowed, tokens, retry_after
+
+    def _prune(self, now: float) -> None:
+        if self._calls >= self._next_prune:
+            self._next_prune = self._calls + self._PRUNE_EVERY
+            # A full bucket is indistinguishable from a missing one, so drop those
+            full = [
+                key
+                for key, (_, _, full_at) in self._buckets.items()
+                if full_at <= now
+            ]
+            for key in full:
+                del self._buckets[key]
+        while len(self._buckets) > self._max_keys:
+            self._buckets.popitem(last=False)
+
+
+class SQLiteBucketStore:
+    """File-backed bucket store shared by all worker processes on a host."""
+
+    _PRUNE_EVERY = 1000
+    _SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS buckets ("
+        "key TEXT PRIMARY KEY, tokens REAL NOT NULL, "
+        "updated REAL NOT NULL, full_at REAL NOT NULL) WITHOUT ROWID"
+    )
+
+    def __init__(self, path: str):
+        self.path = path
+        self._pool = ConnectionPool(path, self._SCHEMA, synchronous="OFF")
+        self._calls = 0
+
+    def consume(
+        self, key: str, capacity: float, rate: float, cost: float = 1.0
+    ) -> Tuple[bool, float, float]:
+        """Take ``cost`` tokens; returns (allowed, remaining, retry_after_s)."""
+        now = time.time()
+        with self._pool.transaction() as conn:
+            row = conn.execute(
+                "SELECT tokens, updated FROM buckets WHERE key = ?", (key,)
+            ).fetchone()
+            tokens = capacity if row is None else row[0]
+            updated = now if row is None else row[1]
+            tokens = _refill(tokens, updated, now, capacity, rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            full_at = now + (capacity - tokens) / rate
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (key, tokens, updated, full_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, tokens, now, full_at),
+            )
+            self._calls += 1
+            if self._calls % self._PRUNE_EVERY == 0:
+                conn.execute("DELETE FROM buckets WHERE full_at < ?", (now,))
+        retry_after = 0.0 if allowed else (cost - tokens) / rate
+        return allowed, tokens, retry_after
+
+
+# KEYS[1] = bucket key; ARGV = capacity, rate (tokens/s), cost, now (s)
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketStore:
+    """Bucket store on any Redis-compatible server; requires ``redis``."""
+
+    def __init__(self, url: str, prefix: str = "ajips:ratelimit:"):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+        self._prefix = prefix
+
+    def consume(
+        self, key: str, capacity: float, rate: float, cost: float = 1.0
+    ) -> Tuple[bool, float, float]:
+        """Take ``cost`` tokens; returns (allowed, remaining, retry_after_s)."""
+        allowed, tokens = self._script(
+            keys=[self._prefix + key], args=[capacity, rate, cost, time.time()]
+        )
+        tokens = float(tokens)
+        retry_after = 0.0 if allowed else (cost - tokens) / rate
+        return bool(allowed), tokens, retry_after
+
+
+def create_bucket_store(spec: str, data_dir: str = "data"):
+    """Create a bucket store from a ``RATE_LIMIT_STORAGE`` specification."""
+    spec = spec.strip()
+    if spec == "memory":
+        return MemoryBucketStore()
+    if spec == "sqlite":
+        return SQLiteBucketStore(os.path.join(data_dir, "ratelimit.sqlite3"))
+    if spec.startswith("sqlite:///"):
+        return SQLiteBucketStore(spec[len("sqlite:///") :])
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBucketStore(spec)
+    raise ValueError(f"Unsupported rate limit storage: {spec!r}")
+
+
+class RateLimiter:
+    """Named token-bucket budgets (e.g. ``analyze``, ``batch``) over one store."""
+
+    def __init__(self, store, budgets: Dict[str, str]):
+        self.store = store
+        self.budgets = {name: parse_rate(rate) for name, rate in budgets.items()}
+
+    def hit(self, budget: str, key: str, cost: float = 1.0) -> float:
+        """
+        Charge ``cost`` tokens from ``budget`` for ``key``.
+
+        Returns:
+            Tokens remaining in the bucket
+
+        Raises:
+            RateLimitExceeded: If the bucket does not hold enough tokens
+        """
+        capacity, rate = self.budgets[budget]
+        allowed, remaining, retry_after = self.store.consume(
+            f"{budget}:{key}", capacity, rate, cost
+        )
+        if not allowed:
+            raise RateLimitExceeded(budget, retry_after)
+        return remaining
+
+    def limit(self, budget: str) -> int:
+        """Bucket capacity for ``budget``."""
+        return int(self.budgets[budget][0])
+
+
+def client_address(
+    peer: Optional[str], forwarded_for: Optional[str], trusted_proxies: int
+) -> str:
+    """
+    Resolve the real client address behind ``trusted_proxies`` reverse proxies.
+
+    Each trusted proxy appends the address it received the request from to
+    ``X-Forwarded-For``, so the client is the entry ``trusted_proxies`` from
+    the right. Entries further left are client-controlled and ignored.
+    """
+    if trusted_proxies > 0 and forwarded_for:
+        hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+        if hops:
+            candidate = hops[-min(trusted_proxies, len(hops))]
+            try:
+                return str(ipaddress.ip_address(candidate))
+            except ValueError:
+                pass
+    return peer or "unknown"
+
+
+def retry_after_header(retry_after: float) -> str:
+    """Format a ``Retry-After`` header value in whole seconds."""
+    return str(max(1, math.ceil(retry_after)))
@@ -0,0 +1,119 @@
+"""Lightweight records for analysis results.
+
+The pipeline builds these instead of the pydantic models in
+:mod:`ajips.app.api.schemas`: they carry the same fields under the same
+names, but they are plain ``__slots__`` objects that do no validation, so a
+profile costs a few small allocations rather than a model validation per
+focus area and critique. The pydantic models still parse requests and
+describe responses in the OpenAPI schema; results reach the wire through
+:func:`ajips.core.serialization.dumps`, which encodes them without
+validating them again.
+
+Records compare by value, and ``to_dict()`` gives the JSON-ready dict
+``model_dump()`` gave for the matching model.
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+
+class Record:
+    """Base of result records: fields in ``__slots__``, compared by value."""
+
+    __slots__ = ()
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(
+            getattr(self, field) == getattr(other, field) for field in self.__slots__
+        )
+
+    __hash__ = None  # mutable, like the models they stand in for
+
+    def __repr__(self) -> str:
+        fields = ", ".join(
+            f"{field}={getattr(self, field)!r}" for field in self.__slots__
+        )
+        return f"{type(self).__name__}({fields})"
+
+    def to_dict(self) -> dict:
+        return {field: getattr(self, field) for field in self.__slots__}
+
+
+class FocusArea(Record):
+    """A group of related skills and its share of the posting."""
+
+    __slots__ = ("name", "weight", "skills")
+
+    def __init__(self, name: str, weight: float, skills: List[str]):
+        self.name = name
+        self.weight = weight
+        self.skills = skills
+
+
+class CritiqueItem(Record):
+    """One issue found in a posting; ``severity`` is info, warning or critical."""
+
+    __slots__ = ("severity", "message")
+
+    def __init__(self, severity: str, message: str):
+        self.severity = severity
+        self.message = message
+
+
+class JobProfile(Record):
+    """The analysis of one posting, shaped like ``AnalyzeResponse``."""
+
+    __slots__ = (
+        "title",
+        "role_type",
+        "experience_level",
+        "focus_areas",
+        "explicit_skills",
+        "hidden_skills",
+        "critiques",
+        "salary_range",
+        "interview_stages",
+        "quality_score",
+        "resume_alignment",
+        "summary",
+        "skipped_sections",
+    )
+
+    def __init__(
+        self,
+        summary: str,
+        title: Optional[str] = None,
+        role_type: Optional[str] = None,
+        experience_level: Optional[str] = None,
+        focus_areas: Optional[List[FocusArea]] = None,
+        explicit_skills: Optional[List[str]] = None,
+        hidden_skills: Optional[List[str]] = None,
+        critiques: Optional[List[CritiqueItem]] = None,
+        salary_range: Optional[dict] = None,
+        interview_stages: Optional[List[str]] = None,
+        quality_score: float = 0.0,
+        resume_alignment: Optional[float] = None,
+        skipped_sections: Optional[List[str]] = None,
+    ):
+        self.title = title
+        self.role_type = role_type
+        self.experience_level = experience_level
+        self.focus_areas = focus_areas if focus_areas is not None else []
+        self.explicit_skills = explicit_skills if explicit_skills is not None else []
+        self.hidden_skills = hidden_skills if hidden_skills is not None else []
+        self.critiques = critiques if critiques is not None else []
+        self.salary_range = salary_range
+        self.interview_stages = interview_stages if interview_stages is not None else []
+        self.quality_score = quality_score
+        self.resume_alignment = resume_alignment
+        self.summary = summary
+        self.skipped_sections = skipped_sections if skipped_sections is not None else []
+
+    def to_dict(self) -> dict:
+        profile = super().to_dict()
+        profile["focus_areas"] = [area.to_dict() for area in self.focus_areas]
+        profile["critiques"] = [item.to_dict() for item in self.critiques]
+        return profile
@@ -0,0 +1,179 @@
+"""Salary percentiles per skill, role and experience level from KLL sketches.
+
+Each stored posting with a salary adds the midpoint of its range to one
+sketch (:mod:`ajips.core.sketches`) per key it belongs to: every skill, its
+role, its level, each skill and role combined with the level, and ``all``.
+Sketches are kept per currency in the posting store and updated in the
+transaction that stores the posting, so every server worker and job process
+contributes to the same sketches; a sketch's size is bounded by its ``k``
+whatever the number of postings. Shards merge by folding one store's
+sketches into another's (:func:`merge`).
+
+Readers cache each sketch's sorted weights together with its version, so a
+percentile query costs one primary-key lookup and a binary search unless the
+sketch changed since the last query.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ajips.core.sketches import KLLSketch, SortedWeights
+
+ALL = "all"
+SKILL = "skill"
+ROLE = "role"
+LEVEL = "level"
+SKILL_LEVEL = "skill_level"
+ROLE_LEVEL = "role_level"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS salary_sketches (
+    currency TEXT NOT NULL,
+    dimension TEXT NOT NULL,
+    name TEXT NOT NULL COLLATE NOCASE,
+    version INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (currency, dimension, name)
+) WITHOUT ROWID;
+"""
+
+Key = Tuple[str, str]
+
+
+def salary_keys(
+    skills: Iterable[str], role: Optional[str], level: Optional[str]
+) -> List[Key]:
+    """Every (dimension, name) a posting's salary counts towards."""
+    keys: List[Key] = [(ALL, ALL)]
+    skills = sorted({skill.lower() for skill in skills})
+    keys += [(SKILL, skill) for skill in skills]
+    if role:
+        keys.append((ROLE, role))
+    if level:
+        keys.append((LEVEL, level))
+        keys += [(SKILL_LEVEL, f"{skill}|{level}") for skill in skills]
+        if role:
+            keys.append((ROLE_LEVEL, f"{role}|{level}"))
+    return keys
+
+
+def query_key(
+    skill: Optional[str] = None, role: Optional[str] = None, level: Optional[str] = None
+) -> Key:
+    """
+    The sketch answering a query for up to one skill or role and a level.
+
+    Raises:
+        ValueError: For a skill and a role together, which are not tracked
+    """
+    if skill and role:
+        raise ValueError("Salary statistics combine a skill or a role with a level")
+    if skill:
+        skill = skill.lower()
+        return (SKILL_LEVEL, f"{skill}|{level}") if level else (SKILL, skill)
+    if role:
+        return (ROLE_LEVEL, f"{role}|{level}") if level else (ROLE, role)
+    return (LEVEL, level) if level else (ALL, ALL)
+
+
+def add(
+    conn: sqlite3.Connection,
+    currency: str,
+    keys: Sequence[Key],
+    value: float,
+    k: int = 200,
+) -> None:
+    """Add ``value`` to the sketch of each key (call inside a transaction)."""
+    _fold(conn, currency, keys, lambda sketch: sketch.update(value), k)
+
+
+def merge(
+    conn: sqlite3.Connection,
+    entries: Iterable[Tuple[str, str, str, bytes]],
+    k: int = 200,
+) -> int:
+    """
+    Fold ``(currency, dimension, name, sketch bytes)`` entries, such as
+    :func:`export` of another shard, into the stored sketches.
+    """
+    merged = 0
+    for currency, dimension, name, data in entries:
+        other = KLLSketch.from_bytes(data)
+        _fold(
+            conn, currency, [(dimension, name)], lambda sketch: sketch.merge(other), k
+        )
+        merged += 1
+    return merged
+
+
+def export(conn: sqlite3.Connection) -> List[Tuple[str, str, str, bytes]]:
+    return conn.execute(
+        "SELECT currency, dimension, name, data FROM salary_sketches"
+    ).fetchall()
+
+
+def _fold(conn, currency, keys, change, k) -> None:
+    for dimension, name in keys:
+        row = conn.execute(
+            "SELECT version, data FROM salary_sketches "
+            "WHERE currency = ? AND dimension = ? AND name = ?",
+            (currency, dimension, name),
+        ).fetchone()
+        sketch = KLLSketch.from_bytes(row[1]) if row else KLLSketch(k)
+        change(sketch)
+        conn.execute(
+            "INSERT OR REPLACE INTO salary_sketches "
+            "(currency, dimension, name, version, data) VALUES (?, ?, ?, ?, ?)",
+            (currency, dimension, name, (row[0] + 1) if row else 1, sketch.to_bytes()),
+        )
+
+
+class SketchReader:
+    """Percentile queries with a per-process cache of prepared sketches."""
+
+    def __init__(self, max_cached: int = 4096):
+        self.max_cached = max_cached
+        self._cache: Dict[Tuple[str, str, str], Tuple[int, int, SortedWeights]] = {}
+        self._lock = threading.Lock()
+
+    def percentiles(
+        self,
+        conn: sqlite3.Connection,
+        currency: str,
+        key: Key,
+        qs: Sequence[float],
+    ) -> Optional[Dict]:
+        """Count, range and the ``qs`` quantiles of one sketch, or None if empty."""
+        dimension, name = key
+        cache_key = (currency.upper(), dimension, name.lower())
+        row = conn.execute(
+            "SELECT version FROM salary_sketches "
+            "WHERE currency = ? AND dimension = ? AND name = ?",
+            (currency.upper(), dimension, name),
+        ).fetchone()
+        if row is None:
+            return None
+        with self._lock:
+            cached = self._cache.get(cache_key)
+        if cached is None or cached[0] != row[0]:
+            data = conn.execute(
+                "SELECT version, data FROM salary_sketches "
+                "WHERE currency = ? AND dimension = ? AND name = ?",
+                (currency.upper(), dimension, name),
+            ).fetchone()
+            sketch = KLLSketch.from_bytes(data[1])
+            cached = (data[0], sketch.count, sketch.cdf())
+            with self._lock:
+                if len(self._cache) >= self.max_cached:
+                    self._cache.clear()
+                self._cache[cache_key] = cached
+        _, count, cdf = cached
+        return {
+            "count": count,
+            "min": cdf.min,
+            "max": cdf.max,
+            "quantiles": [cdf.quantile(q) for q in qs],
+        }
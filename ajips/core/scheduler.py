@@ -0,0 +1,243 @@
+"""Admission control and priority scheduling for analysis work.
+
+Every analysis takes a slot from an :class:`AdmissionController` before it
+runs. Slots are bounded by an adaptive concurrency limit; callers that find
+no free slot wait in a bounded queue for their priority class, and freed
+slots always go to the highest-priority waiter, so bulk work cannot starve
+interactive users.
+
+The limit follows observed latency (additive increase while latency stays
+near the no-load baseline, multiplicative decrease once it inflates).
+Queueing delay is watched separately: once a caller has waited longer than
+``target_delay`` the controller is overloaded for a short interval, during
+which batch and background work that would have to queue is rejected
+immediately rather than adding to the backlog. Rejections carry a
+``retry_after`` estimate for ``503 Retry-After`` responses.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Iterator, Optional
+
+from ajips.core import metrics
+
+INTERACTIVE = "interactive"
+BATCH = "batch"
+BACKGROUND = "background"
+PRIORITIES = (INTERACTIVE, BATCH, BACKGROUND)
+
+# Longest time a caller of each class waits for a slot before being shed
+DEFAULT_MAX_WAIT = {INTERACTIVE: 5.0, BATCH: 30.0, BACKGROUND: 60.0}
+
+# Latency above this multiple of the no-load baseline shrinks the limit
+_LATENCY_TOLERANCE = 2.0
+_DECREASE_FACTOR = 0.9
+# Samples after which the no-load baseline is re-measured
+_BASELINE_WINDOW = 500
+# How long the controller counts as overloaded after a queueing-delay breach
+_OVERLOAD_INTERVAL_S = 1.0
+
+
+class Overloaded(Exception):
+    """Raised when work is shed instead of queued."""
+
+    def __init__(self, priority: str, retry_after: float):
+        super().__init__(f"Server overloaded, '{priority}' request shed")
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("granted", "event", "enqueued_at")
+
+    def __init__(self):
+        self.granted = False
+        self.event = threading.Event()
+        self.enqueued_at = time.monotonic()
+
+
+class AdmissionController:
+    """Adaptive concurrency limit with per-priority bounded wait queues."""
+
+    def __init__(
+        self,
+        initial_limit: int = 8,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        queue_size: int = 100,
+        target_delay: float = 0.2,
+        max_wait: Optional[Dict[str, float]] = None,
+        name: str = "admission",
+    ):
+        self.min_limit = min_limit
+        self.max_limit = max(max_limit, min_limit)
+        self.queue_size = queue_size
+        self.target_delay = target_delay
+        self.max_wait = dict(DEFAULT_MAX_WAIT, **(max_wait or {}))
+        self._limit = float(min(max(initial_limit, min_limit), self.max_limit))
+        self._in_flight = 0
+        self._queues: Dict[str, Deque[_Waiter]] = {p: deque() for p in PRIORITIES}
+        self._lock = threading.Lock()
+        self._overloaded_until = 0.0
+        self._last_decrease = 0.0
+        self._baseline: Optional[float] = None
+        self._window_min: Optional[float] = None
+        self._samples = 0
+        self._latency_ewma = 0.0
+        self._admitted = dict.fromkeys(PRIORITIES, 0)
+        self._shed = dict.fromkeys(PRIORITIES, 0)
+        metrics.register(name, self.stats)
+
+    @property
+    def limit(self) -> int:
+        return max(self.min_limit, int(self._limit))
+
+    @contextlib.contextmanager
+    def admit(self, priority: str = INTERACTIVE, shed: bool = True) -> Iterator[None]:
+        """
+        Hold a slot for the duration of the block.
+
+        Args:
+            priority: ``interactive``, ``batch`` or ``background``
+            shed: When False the caller waits as long as it takes and is never
+                rejected; for work that is already bounded and paced elsewhere
+                (e.g. records of a stream that applies backpressure)
+
+        Raises:
+            Overloaded: If the work is shed instead of queued
+        """
+        self._acquire(priority, shed)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    def try_acquire(self, priority: str = BATCH) -> bool:
+        """Take a slot only if one is free right now; pair with :meth:`release`."""
+        with self._lock:
+            if not self._has_free_slot(priority):
+                return False
+            self._in_flight += 1
+            self._admitted[priority] += 1
+            return True
+
+    def release(self, latency: float) -> None:
+        """Return a slot taken with :meth:`try_acquire` after ``latency`` seconds."""
+        self._release(latency)
+
+    def abandon(self) -> None:
+        """Return a slot taken with :meth:`try_acquire` for work that never ran."""
+        with self._lock:
+            self._in_flight -= 1
+            self._grant_waiters()
+
+    def check(self, priority: str) -> None:
+        """Raise :class:`Overloaded` if new work of ``priority`` would be shed now."""
+        with self._lock:
+            if self._has_free_slot(priority):
+                return
+            if self._should_shed(priority):
+                self._shed[priority] += 1
+                raise Overloaded(priority, self._retry_after())
+
+    # -- internals (call with self._lock held) -----------------------------
+
+    def _has_free_slot(self, priority: str) -> bool:
+        if self._in_flight >= self.limit:
+            return False
+        # Never overtake a waiting caller of the same or higher priority
+        rank = PRIORITIES.index(priority)
+        return not any(self._queues[p] for p in PRIORITIES[: rank + 1])
+
+    def _should_shed(self, priority: str) -> bool:
+        if len(self._queues[priority]) >= self.queue_size:
+            return True
+        overloaded = time.monotonic() < self._overloaded_until
+        return overloaded and priority != INTERACTIVE
+
+    def _retry_after(self) -> float:
+        queued = sum(len(q) for q in self._queues.values())
+        latency = self._latency_ewma or self.target_delay
+        return max(1.0, (queued + 1) * latency / self.limit)
+
+    def _acquire(self, priority: str, shed: bool) -> None:
+        with self._lock:
+            if self._has_free_slot(priority):
+                self._in_flight += 1
+                self._admitted[priority] += 1
+                return
+            if shed and self._should_shed(priority):
+                self._shed[priority] += 1
+                raise Overloaded(priority, self._retry_after())
+            waiter = _Waiter()
+            self._queues[priority].append(waiter)
+        waiter.event.wait(self.max_wait[priority] if shed else None)
+        with self._lock:
+            if waiter.granted:
+                self._admitted[priority] += 1
+                return
+            self._queues[priority].remove(waiter)
+            self._shed[priority] += 1
+            self._overloaded_until = time.monotonic() + _OVERLOAD_INTERVAL_S
+            raise Overloaded(priority, self._retry_after())
+
+    def _release(self, latency: float) -> None:
+        with self._lock:
+            saturated = self._in_flight >= self.limit
+            self._in_flight -= 1
+            self._update_limit(latency, saturated)
+            self._grant_waiters()
+
+    def _update_limit(self, latency: float, saturated: bool) -> None:
+        self._latency_ewma = (
+            latency
+            if not self._latency_ewma
+            else 0.9 * self._latency_ewma + 0.1 * latency
+        )
+        self._samples += 1
+        if self._window_min is None or latency < self._window_min:
+            self._window_min = latency
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        if self._samples % _BASELINE_WINDOW == 0:
+            # Let the baseline drift up if the workload itself got heavier
+            self._baseline, self._window_min = self._window_min, None
+        now = time.monotonic()
+        if latency > _LATENCY_TOLERANCE * max(self._baseline, 1e-3):
+            # Decrease at most once per baseline latency so one slow burst
+            # does not collapse the limit
+            if now - self._last_decrease >= max(self._baseline, 0.01):
+                self._limit = max(self.min_limit, self._limit * _DECREASE_FACTOR)
+                self._last_decrease = now
+        elif saturated:
+            self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+
+    def _grant_waiters(self) -> None:
+        now = time.monotonic()
+        while self._in_flight < self.limit:
+            queue = next((self._queues[p] for p in PRIORITIES if self._queues[p]), None)
+            if queue is None:
+                return
+            waiter = queue.popleft()
+            if now - waiter.enqueued_at > self.target_delay:
+                self._overloaded_until = now + _OVERLOAD_INTERVAL_S
+            waiter.granted = True
+            self._in_flight += 1
+            waiter.event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "queued": {p: len(q) for p, q in self._queues.items()},
+                "admitted": dict(self._admitted),
+                "shed": dict(self._shed),
+                "overloaded": time.monotonic() < self._overloaded_until,
+                "latency_ms": round(self._latency_ewma * 1000, 2),
+            }
@@ -0,0 +1,69 @@
+"""Encoding of analysis results without re-validation.
+
+:func:`dumps` encodes plain values and result records
+(:mod:`ajips.core.results`) straight to UTF-8 JSON bytes, with ``orjson``
+when it is installed (the ``fast`` extra) and the standard library
+otherwise. :func:`packb` encodes the same values as MessagePack, a compact
+binary form, when ``msgpack`` is installed. Records are expanded through
+their ``to_dict()`` as the encoder reaches them, so no intermediate model is
+built.
+
+:data:`ENCODERS` maps each media type that can be produced here to its
+encoder; NDJSON is one JSON document per line, and MessagePack values can be
+concatenated the same way.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Callable, Dict
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised without the extra
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - exercised with the extra
+    msgpack = None
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+MSGPACK = "application/msgpack"
+
+
+def _default(value):
+    to_dict = getattr(value, "to_dict", None)
+    if to_dict is None:
+        raise TypeError(
+            f"Object of type {type(value).__name__} is not JSON serializable"
+        )
+    return to_dict()
+
+
+def dumps(value) -> bytes:
+    """``value`` as compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(
+        value, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def ndjson_line(value) -> bytes:
+    """``value`` as one NDJSON line."""
+    return dumps(value) + b"\n"
+
+
+def packb(value) -> bytes:
+    """``value`` as MessagePack; requires ``msgpack``."""
+    if msgpack is None:
+        raise RuntimeError("MessagePack encoding requires the msgpack package")
+    return msgpack.packb(value, default=_default)
+
+
+# Media type -> encoder, for the types this process can produce
+ENCODERS: Dict[str, Callable[[object], bytes]] = {JSON: dumps, NDJSON: ndjson_line}
+if msgpack is not None:  # pragma: no cover - exercised with the extra
+    ENCODERS[MSGPACK] = packb
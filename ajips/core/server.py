@@ -0,0 +1,238 @@
+"""Pre-forking production server launcher.
+
+The parent process imports the application and warms up the analysis state
+(skill taxonomy, compiled matchers, critique rules) once, freezes it out of
+the garbage collector's reach and only then forks the workers. Every worker
+therefore shares those pages copy-on-write and starts serving immediately
+instead of paying the import and setup cost itself.
+"""
+
+from __future__ import annotations
+
+import errno
+import gc
+import importlib.util
+import logging
+import os
+import select
+import signal
+import socket
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger("ajips.server")
+
+# Minimum delay between respawns of a worker that keeps crashing
+_RESPAWN_BACKOFF_S = 1.0
+
+
+def available_cpus() -> int:
+    """CPUs this process may actually use (affinity mask and cgroup quota)."""
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+    # Containers commonly cap CPU through a cgroup v2 quota ("max 100000")
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as handle:
+            quota, period = handle.read().split()[:2]
+        if quota != "max":
+            cpus = min(cpus, max(1, int(int(quota) / int(period))))
+    except (OSError, ValueError):
+        pass
+    return max(1, cpus)
+
+
+def event_loop_implementation() -> str:
+    """Use uvloop when it is installed, otherwise the stdlib asyncio loop."""
+    return "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+
+def http_implementation() -> str:
+    """Use httptools when it is installed, otherwise the pure-Python h11."""
+    return "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+
+def preload(started_at: float):
+    """Import the app and warm up shared analysis state before forking."""
+    from ajips.app.api.lazy_routes import load_lazy_routers
+    from ajips.app.main import app
+    from ajips.core.pipelines.job_profile import warm_up
+
+    warm_up()
+    # Workers share the routers too, rather than each importing its own
+    load_lazy_routers(app)
+    # Move everything allocated so far out of GC tracking, so collections in
+    # the workers don't touch (and therefore copy) the shared pages
+    gc.collect()
+    if hasattr(gc, "freeze"):
+        gc.freeze()
+    logger.info(
+        "preload_complete",
+        extra={"elapsed_ms": round((time.monotonic() - started_at) * 1000, 2)},
+    )
+    return app
+
+
+def _bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _build_server(app, host: str, port: int, started_at: float, ready_fd=None):
+    import uvicorn
+
+    class _Server(uvicorn.Server):
+        async def startup(self, sockets=None) -> None:
+            await super().startup(sockets=sockets)
+            app.state.startup_time = time.time()
+            logger.info(
+                "worker_ready",
+                extra={
+                    "pid": os.getpid(),
+                    "time_to_ready_ms": round(
+                        (time.monotonic() - started_at) * 1000, 2
+                    ),
+                },
+            )
+            if ready_fd is not None:
+                os.write(ready_fd, b".")
+
+    config = uvicorn.Config(
+        app,
+        host=host,
+        port=port,
+        loop=event_loop_implementation(),
+        http=http_implementation(),
+        proxy_headers=True,
+    )
+    return _Server(config)
+
+
+def serve(
+    host: str,
+    port: int,
+    workers: Optional[int] = None,
+    started_at: Optional[float] = None,
+) -> None:
+    """
+    Run the API with ``workers`` pre-forked processes sharing one socket.
+
+    Args:
+        host: Interface to bind
+        port: TCP port to bind
+        workers: Worker processes; defaults to the number of usable CPUs
+        started_at: ``time.monotonic()`` at launch, for time-to-ready reporting
+    """
+    started_at = time.monotonic() if started_at is None else started_at
+    workers = workers or available_cpus()
+    sock = _bind_socket(host, port)
+    app = preload(started_at)
+    logger.info(
+        "server_starting",
+        extra={
+            "host": host,
+            "port": port,
+            "workers": workers,
+            "loop": event_loop_implementation(),
+            "http": http_implementation(),
+        },
+    )
+
+    if workers == 1 or not hasattr(os, "fork"):
+        _build_server(app, host, port, started_at).run(sockets=[sock])
+        return
+
+    _Supervisor(app, sock, host, port, workers, started_at).run()
+
+
+class _Supervisor:
+    """Forks workers, reports when all are ready and respawns crashed ones."""
+
+    def __init__(self, app, sock, host, port, workers, started_at):
+        self.app = app
+        self.sock = sock
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.started_at = started_at
+        self.children: Dict[int, float] = {}
+        self.stopping = False
+        self.ready_r, self.ready_w = os.pipe()
+        os.set_blocking(self.ready_r, False)
+
+    def spawn(self) -> None:
+        pid = os.fork()
+        if pid == 0:
+            os.close(self.ready_r)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                server = _build_server(
+                    self.app, self.host, self.port, self.started_at, self.ready_w
+                )
+                server.run(sockets=[self.sock])
+            finally:
+                os._exit(0)
+        self.children[pid] = time.monotonic()
+
+    def stop(self, signum, frame) -> None:
+        self.stopping = True
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> None:
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+        for _ in range(self.workers):
+            self.spawn()
+
+        ready = 0
+        reported = False
+        while self.children:
+            try:
+                readable, _, _ = select.select([self.ready_r], [], [], 0.5)
+                if readable:
+                    ready += len(os.read(self.ready_r, 1024))
+            except (InterruptedError, OSError) as exc:
+                if getattr(exc, "errno", errno.EINTR) != errno.EINTR:
+                    raise
+            if not reported and ready >= self.workers:
+                reported = True
+                logger.info(
+                    "server_ready",
+                    extra={
+                        "workers": self.workers,
+                        "time_to_ready_ms": round(
+                            (time.monotonic() - self.started_at) * 1000, 2
+                        ),
+                    },
+                )
+            self._reap()
+
+        self.sock.close()
+
+    def _reap(self) -> None:
+        while True:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            spawned_at = self.children.pop(pid, None)
+            if self.stopping or spawned_at is None:
+                continue
+            logger.warning("worker_exited", extra={"pid": pid, "status": status})
+            # Avoid a tight fork loop when a worker crashes during startup
+            if time.monotonic() - spawned_at < _RESPAWN_BACKOFF_S:
+                time.sleep(_RESPAWN_BACKOFF_S)
+            self.spawn()
@@ -0,0 +1,318 @@
+"""Similar-posting search: TF-IDF vectors reduced by random-projection LSH.
+
+Each stored posting becomes a sparse vector with two blocks: its skills, and
+the word unigrams and bigrams of its text hashed into ``TEXT_FEATURES``
+columns (scikit-learn's ``HashingVectorizer``, so no vocabulary is kept).
+Features are weighted by sublinear term frequency times smoothed inverse
+document frequency, and each block is scaled to a fixed share of a unit
+vector (``SKILL_SHARE`` for skills). Random hyperplanes reduce the vector to
+a ``BITS``-bit signature: the fraction of bits two signatures differ in
+estimates the angle between the postings, so their cosine similarity is
+about ``cos(pi * hamming / BITS)``.
+
+Signatures and document frequencies are written with the posting, so all
+processes share them. Each process holds an in-memory :class:`SignatureIndex`
+that catches up from the store before answering. The index splits signatures
+into bands of ``BAND_BITS`` bits with one bucket table per band, and a query
+only scores the postings sharing at least one band with it (the newest
+``MAX_BUCKET`` per bucket) by Hamming distance over the full signature, so
+its cost depends on bucket sizes rather than on the number of postings.
+Indexes under ``EXHAUSTIVE_BELOW`` postings are simply scanned in full.
+"""
+
+from __future__ import annotations
+
+import math
+import sqlite3
+import threading
+import zlib
+from array import array
+from typing import Any, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from ajips.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+sklearn_text = lazy_import("sklearn.feature_extraction.text")
+
+BITS = 256
+BAND_BITS = 10
+MAX_BUCKET = 2048
+# Smaller indexes are scanned in full, which is exact and still sub-millisecond
+EXHAUSTIVE_BELOW = 20_000
+TEXT_FEATURES = 2**18
+SKILL_FEATURES = 2**16
+SKILL_SHARE = 0.6
+# Only the start of very long postings is vectorized
+MAX_TEXT_CHARS = 20_000
+# feature_df row holding the number of vectorized postings
+_DOCUMENTS = -1
+_SQL_VARIABLES = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posting_vectors (
+    posting_id INTEGER PRIMARY KEY,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS feature_df (
+    feature INTEGER PRIMARY KEY,
+    df INTEGER NOT NULL
+);
+"""
+
+_vectorizer = None
+_vectorizer_lock = threading.Lock()
+
+
+class Features(NamedTuple):
+    """Feature columns of one posting and their term counts."""
+
+    indices: Any
+    counts: Any
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+
+def _text_vectorizer():
+    global _vectorizer
+    if _vectorizer is None:
+        with _vectorizer_lock:
+            if _vectorizer is None:
+                _vectorizer = sklearn_text.HashingVectorizer(
+                    n_features=TEXT_FEATURES,
+                    ngram_range=(1, 2),
+                    stop_words="english",
+                    alternate_sign=False,
+                    norm=None,
+                    dtype=np.float32,
+                )
+    return _vectorizer
+
+
+def features(text: Optional[str], skills: Iterable[str] = ()) -> Features:
+    """Hashed text n-gram counts followed by one column per skill."""
+    indices, counts = [], []
+    if text and text.strip():
+        row = _text_vectorizer().transform([text[:MAX_TEXT_CHARS]])
+        indices.append(row.indices.astype(np.int64))
+        counts.append(row.data.astype(np.float32))
+    names = sorted({skill.strip().lower() for skill in skills if skill.strip()})
+    if names:
+        columns = {
+            TEXT_FEATURES + zlib.crc32(name.encode("utf-8")) % SKILL_FEATURES
+            for name in names
+        }
+        indices.append(np.fromiter(sorted(columns), dtype=np.int64))
+        counts.append(np.ones(len(columns), dtype=np.float32))
+    if not indices:
+        return Features(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32))
+    return Features(np.concatenate(indices), np.concatenate(counts))
+
+
+def _splitmix64(x: Any) -> Any:
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _hyperplanes(indices: Any) -> Any:
+    """The ±1 hyperplane coordinates of each feature, derived from its index."""
+    words = BITS // 64
+    keys = indices.astype(np.uint64)[:, None] * np.uint64(words) + np.arange(
+        words, dtype=np.uint64
+    )
+    bits = np.unpackbits(_splitmix64(keys).view(np.uint8), axis=1)
+    return bits.astype(np.float32) * 2 - 1
+
+
+def _weights(vector: Features, df: Any, documents: int) -> Any:
+    idf = np.log((1 + documents) / (1 + df)) + 1
+    weights = (1 + np.log(vector.counts)) * idf
+    for block, share in (
+        (vector.indices < TEXT_FEATURES, 1 - SKILL_SHARE),
+        (vector.indices >= TEXT_FEATURES, SKILL_SHARE),
+    ):
+        norm = float(np.linalg.norm(weights[block]))
+        if norm:
+            weights[block] *= math.sqrt(share) / norm
+    return weights.astype(np.float32)
+
+
+def signature(vector: Features, df: Any, documents: int) -> bytes:
+    """``BITS // 8`` bytes: the sign of the weighted vector on each hyperplane."""
+    projection = _weights(vector, df, documents) @ _hyperplanes(vector.indices)
+    return np.packbits(projection > 0).tobytes()
+
+
+def _document_frequencies(conn: sqlite3.Connection, indices: Any) -> Tuple[Any, int]:
+    found = {}
+    keys = [int(index) for index in indices] + [_DOCUMENTS]
+    for start in range(0, len(keys), _SQL_VARIABLES):
+        chunk = keys[start : start + _SQL_VARIABLES]
+        found.update(
+            conn.execute(
+                "SELECT feature, df FROM feature_df WHERE feature IN "
+                f"({', '.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+        )
+    df = np.fromiter((found.get(key, 0) for key in keys[:-1]), dtype=np.float32)
+    return df, found.get(_DOCUMENTS, 0)
+
+
+def add(conn: sqlite3.Connection, posting_id: int, vector: Features) -> Optional[bytes]:
+    """
+    Count ``vector``'s features and store the posting's signature (call inside
+    the transaction storing the posting). Postings without features are not
+    indexed.
+    """
+    if not len(vector):
+        return None
+    conn.executemany(
+        "INSERT INTO feature_df (feature, df) VALUES (?, 1) "
+        "ON CONFLICT (feature) DO UPDATE SET df = df + 1",
+        [(int(index),) for index in vector.indices] + [(_DOCUMENTS,)],
+    )
+    data = signature(vector, *_document_frequencies(conn, vector.indices))
+    conn.execute(
+        "INSERT OR REPLACE INTO posting_vectors (posting_id, signature) VALUES (?, ?)",
+        (posting_id, data),
+    )
+    return data
+
+
+def query_signature(conn: sqlite3.Connection, vector: Features) -> Optional[bytes]:
+    """Signature of a query vector, weighted by the stored frequencies."""
+    if not len(vector):
+        return None
+    return signature(vector, *_document_frequencies(conn, vector.indices))
+
+
+def stored_signature(conn: sqlite3.Connection, posting_id: int) -> Optional[bytes]:
+    row = conn.execute(
+        "SELECT signature FROM posting_vectors WHERE posting_id = ?", (posting_id,)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def _popcount(words: Any) -> Any:
+    """Set bits of each uint64 (SWAR, faster than byte lookup tables in NumPy)."""
+    words = words - ((words >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    words = (words & np.uint64(0x3333333333333333)) + (
+        (words >> np.uint64(2)) & np.uint64(0x3333333333333333)
+    )
+    words = (words + (words >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return (words * np.uint64(0x0101010101010101)) >> np.uint64(56)
+
+
+class SignatureIndex:
+    """Banded LSH over posting signatures, added in increasing posting ID order."""
+
+    def __init__(
+        self, bits: int = BITS, band_bits: int = BAND_BITS, max_bucket: int = MAX_BUCKET
+    ):
+        if bits % 64 or not 0 < band_bits <= min(bits, 24):
+            raise ValueError("bits must be whole words and band_bits fit in them")
+        self.bits = bits
+        self.band_bits = band_bits
+        self.bands = bits // band_bits
+        self.max_bucket = max_bucket
+        self.last_id = 0
+        self._size = 0
+        self._signatures = None
+        self._ids = None
+        # Per band, one bucket per band value holding row numbers, oldest first
+        self._tables: List[List[array]] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _band_values(self, signatures: Any) -> Any:
+        bits = np.unpackbits(signatures, axis=1)[:, : self.bands * self.band_bits]
+        powers = 1 << np.arange(self.band_bits - 1, -1, -1, dtype=np.int64)
+        return bits.reshape(len(signatures), self.bands, self.band_bits) @ powers
+
+    def _reserve(self, rows: int) -> None:
+        if self._signatures is None:
+            capacity = max(1024, rows)
+            self._signatures = np.zeros((capacity, self.bits // 64), dtype=np.uint64)
+            self._ids = np.zeros(capacity, dtype=np.int64)
+            self._tables = [
+                [array("I") for _ in range(1 << self.band_bits)]
+                for _ in range(self.bands)
+            ]
+        elif self._size + rows > len(self._ids):
+            capacity = max(2 * len(self._ids), self._size + rows)
+            signatures = np.zeros((capacity, self.bits // 64), dtype=np.uint64)
+            signatures[: self._size] = self._signatures[: self._size]
+            ids = np.zeros(capacity, dtype=np.int64)
+            ids[: self._size] = self._ids[: self._size]
+            self._signatures, self._ids = signatures, ids
+
+    def add(self, entries: Sequence[Tuple[int, bytes]]) -> int:
+        """Index ``(posting_id, signature)`` pairs; IDs already seen are skipped."""
+        with self._lock:
+            entries = [entry for entry in entries if entry[0] > self.last_id]
+            if not entries:
+                return 0
+            self._reserve(len(entries))
+            start = self._size
+            rows = np.arange(start, start + len(entries), dtype=np.uint32)
+            signatures = np.frombuffer(
+                b"".join(data for _, data in entries), dtype=np.uint8
+            ).reshape(len(entries), self.bits // 8)
+            self._signatures[start : start + len(entries)] = signatures.view(np.uint64)
+            self._ids[start : start + len(entries)] = [pid for pid, _ in entries]
+            for band, values in enumerate(self._band_values(signatures).T):
+                # Group rows by bucket so each bucket is extended once
+                order = np.argsort(values, kind="stable")
+                sorted_values = values[order]
+                bounds = np.flatnonzero(np.diff(sorted_values)) + 1
+                table = self._tables[band]
+                for group in np.split(order, bounds):
+                    table[int(values[group[0]])].frombytes(rows[group].tobytes())
+            self._size += len(entries)
+            self.last_id = entries[-1][0]
+            return len(entries)
+
+    def query(
+        self, data: bytes, limit: int = 10, exclude: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """Up to ``limit`` ``(posting_id, cosine estimate)`` pairs, most similar first."""
+        with self._lock:
+            if not self._size:
+                return []
+            query = np.frombuffer(data, dtype=np.uint8)[None, :]
+            words = query.view(np.uint64)
+            if self._size < EXHAUSTIVE_BELOW:
+                candidates = np.arange(self._size)
+            else:
+                candidates = np.unique(
+                    np.concatenate(
+                        [
+                            np.frombuffer(
+                                self._tables[band][int(value)][-self.max_bucket :],
+                                dtype=np.uint32,
+                            )
+                            for band, value in enumerate(self._band_values(query)[0])
+                        ]
+                    )
+                )
+            ids = np.take(self._ids, candidates)
+            distances = _popcount(
+                np.take(self._signatures, candidates, axis=0) ^ words
+            ).sum(axis=1)
+        if exclude is not None:
+            keep = ids != exclude
+            ids, distances = ids[keep], distances[keep]
+        if len(ids) > limit:
+            top = np.argpartition(distances, limit - 1)[:limit]
+            ids, distances = ids[top], distances[top]
+        # Closest first; ties go to the newest posting
+        order = np.lexsort((-ids, distances))
+        return [
+            (int(ids[i]), round(math.cos(math.pi * int(distances[i]) / self.bits), 4))
+            for i in order
+        ]
@@ -0,0 +1,119 @@
+"""Coalescing of identical concurrent computations ("single flight").
+
+The first caller for a key runs the computation; callers arriving with the
+same key while it is in flight block until it finishes and share its result
+(or exception). Nothing is cached afterwards: the next call after completion
+runs again. Coalescing is per process.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+import urllib.parse
+from typing import Callable, Dict, Hashable, Optional, TypeVar
+
+from ajips.core import metrics
+from ajips.core.forksafe import reset_after_fork
+
+T = TypeVar("T")
+
+# Query parameters that only track where a link was shared from
+_TRACKING_PARAMS = ("fbclid", "gclid", "mc_cid", "mc_eid", "ref", "trk", "trackingId")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Run at most one computation per key at a time and share its outcome."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+        metrics.register(f"singleflight.{name}", self.stats)
+        reset_after_fork(self)
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """Return ``fn()``, or the result of an identical call already running."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def _after_fork(self) -> None:
+        # Their leaders are threads of the parent
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL so that links to the same posting share one key.
+
+    Lowercases the scheme and host, drops default ports, fragments and
+    tracking parameters (``utm_*``, ``gclid``...) and sorts the query.
+    """
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (name, value)
+        for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name not in _TRACKING_PARAMS
+    )
+    return urllib.parse.urlunsplit(
+        (scheme, host, parts.path or "/", urllib.parse.urlencode(query), "")
+    )
+
+
+def content_key(*parts: Optional[str]) -> str:
+    """Stable hash of the given texts (``None`` and ``""`` are distinct)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if part is None:
+            digest.update(b"\x00")
+        else:
+            encoded = part.encode("utf-8", "surrogatepass")
+            digest.update(b"\x01%d:" % len(encoded))
+            digest.update(encoded)
+    return digest.hexdigest()
@@ -0,0 +1,192 @@
+"""KLL quantile sketches (Karnin, Lang and Liberty, 2016).
+
+A sketch summarizes a stream of numbers in ``O(k)`` space so that any
+quantile can be read back with rank error around ``1.7 / k`` (about 1% for
+the default ``k = 200``), however many values went in. Sketches merge: the
+merge of two sketches summarizes both streams with the same guarantee, so
+per-process or per-shard sketches can be combined in any order.
+
+Values live in a stack of *compactors*; level ``h`` holds items of weight
+``2**h``. When a level fills up it is sorted and every other item (from a
+random offset) is promoted to the level above, halving its weight in items
+while keeping ranks unbiased. Lower levels get geometrically smaller
+capacities, so the sketch holds at most about ``3k`` values.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+import random
+import struct
+import sys
+from array import array
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+_FORMAT_VERSION = 1
+# version, k, levels, count, min, max
+_HEADER = struct.Struct("<BHHqdd")
+_LENGTH = struct.Struct("<I")
+
+
+class KLLSketch:
+    """Mergeable quantile sketch of a stream of floats."""
+
+    __slots__ = ("k", "count", "min", "max", "_levels", "_size", "_capacity")
+
+    def __init__(self, k: int = 200):
+        if not 8 <= k <= 65535:
+            raise ValueError("k must be between 8 and 65535")
+        self.k = k
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self._levels: List[array] = [array("d")]
+        self._size = 0
+        self._capacity = self._level_capacity(0)
+
+    def _level_capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _grow(self) -> None:
+        self._levels.append(array("d"))
+        self._capacity = sum(self._level_capacity(h) for h in range(len(self._levels)))
+
+    def update(self, value: float) -> None:
+        value = float(value)
+        if math.isnan(value):
+            return
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self._levels[0].append(value)
+        self._size += 1
+        if self._size >= self._capacity:
+            self._compress()
+
+    def extend(self, values: Iterable[float]) -> None:
+        for value in values:
+            self.update(value)
+
+    def _compress(self) -> None:
+        for level in range(len(self._levels)):
+            items = self._levels[level]
+            if len(items) < self._level_capacity(level):
+                continue
+            if level + 1 >= len(self._levels):
+                self._grow()
+            ordered = sorted(items)
+            # An odd item out stays behind at this level
+            kept = array("d", ordered[-1:] if len(ordered) % 2 else ())
+            pairs = ordered[: len(ordered) - len(kept)]
+            self._levels[level + 1].extend(pairs[random.getrandbits(1) :: 2])
+            self._levels[level] = kept
+            self._size = sum(len(items) for items in self._levels)
+            if self._size < self._capacity:
+                break
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Fold ``other`` into this sketch (``other`` is left unchanged)."""
+        if other.count == 0:
+            return self
+        while len(self._levels) < len(other._levels):
+            self._grow()
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._size = sum(len(items) for items in self._levels)
+        while self._size >= self._capacity:
+            self._compress()
+        return self
+
+    def cdf(self) -> "SortedWeights":
+        """The sketch's weighted items, sorted, for repeated quantile queries."""
+        return SortedWeights(
+            sorted(
+                (value, 1 << level)
+                for level, items in enumerate(self._levels)
+                for value in items
+            ),
+            self.min,
+            self.max,
+        )
+
+    def quantile(self, q: float) -> Optional[float]:
+        return self.cdf().quantile(q)
+
+    def quantiles(self, qs: Sequence[float]) -> List[Optional[float]]:
+        cdf = self.cdf()
+        return [cdf.quantile(q) for q in qs]
+
+    def to_bytes(self) -> bytes:
+        parts = [
+            _HEADER.pack(
+                _FORMAT_VERSION,
+                self.k,
+                len(self._levels),
+                self.count,
+                self.min,
+                self.max,
+            )
+        ]
+        for items in self._levels:
+            if sys.byteorder != "little":  # pragma: no cover
+                items = array("d", items)
+                items.byteswap()
+            parts.append(_LENGTH.pack(len(items)))
+            parts.append(items.tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "KLLSketch":
+        version, k, levels, count, low, high = _HEADER.unpack_from(data)
+        if version != _FORMAT_VERSION:
+            raise ValueError(f"Unsupported sketch format {version}")
+        sketch = cls(k)
+        sketch.count, sketch.min, sketch.max = count, low, high
+        sketch._levels = []
+        offset = _HEADER.size
+        for _ in range(levels):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            items = array("d")
+            items.frombytes(data[offset : offset + 8 * length])
+            if sys.byteorder != "little":  # pragma: no cover
+                items.byteswap()
+            sketch._levels.append(items)
+            offset += 8 * length
+        sketch._capacity = sum(
+            sketch._level_capacity(h) for h in range(len(sketch._levels))
+        )
+        sketch._size = sum(len(items) for items in sketch._levels)
+        return sketch
+
+
+class SortedWeights:
+    """Sorted (value, weight) pairs of a sketch; quantiles by binary search."""
+
+    __slots__ = ("values", "cumulative", "min", "max")
+
+    def __init__(self, pairs: Sequence[Tuple[float, int]], low: float, high: float):
+        self.values = [value for value, _ in pairs]
+        self.cumulative: List[int] = []
+        total = 0
+        for _, weight in pairs:
+            total += weight
+            self.cumulative.append(total)
+        self.min = low
+        self.max = high
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Smallest stored value whose rank reaches ``q`` of the total."""
+        if not self.values:
+            return None
+        if q <= 0:
+            return self.min
+        if q >= 1:
+            return self.max
+        index = bisect.bisect_left(self.cumulative, q * self.cumulative[-1])
+        return self.values[min(index, len(self.values) - 1)]
@@ -0,0 +1,55 @@
+"""Helpers for the embedded SQLite databases kept under ``DATA_DIR``."""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import sqlite3
+import threading
+from typing import Iterator
+
+
+def connect(
+    path: str, timeout: float = 5.0, synchronous: str = "NORMAL"
+) -> sqlite3.Connection:
+    """Open ``path`` in autocommit mode with WAL so readers never block the writer."""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    return conn
+
+
+class ConnectionPool:
+    """One connection per thread and process; sqlite3 connections cross neither."""
+
+    def __init__(self, path: str, schema: str = "", **connect_kwargs):
+        self.path = path
+        self._schema = schema
+        self._connect_kwargs = connect_kwargs
+        self._local = threading.local()
+        # Create the schema eagerly so configuration errors surface at startup
+        self.connection()
+
+    def connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = connect(self.path, **self._connect_kwargs)
+            if self._schema:
+                conn.executescript(self._schema)
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run the block in a write transaction taken up front (``BEGIN IMMEDIATE``)."""
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
@@ -0,0 +1,533 @@
+"""Persistent store of analyzed postings with indexed queries.
+
+Every analyzed posting is kept in SQLite under ``DATA_DIR`` together with its
+analysis, so questions such as "senior postings requiring kafka and go that
+pay over 150k" are answered from indexes instead of re-analyzing text:
+
+* skills and focus areas live in ``(name, posting_id)`` tables, so each
+  required skill is a single index range and several skills intersect;
+* role type, experience level and salary bounds are indexed columns;
+* titles and texts are indexed for full-text search with FTS5 when the
+  SQLite build has it;
+* demand counts per skill, focus area and role are rolled up per day, week
+  and month as postings are stored (:mod:`ajips.core.aggregates`);
+* salaries feed quantile sketches per skill, role and experience level
+  (:mod:`ajips.core.salary_stats`), so percentiles need no scan either;
+* each posting gets a similarity signature, searched through an in-memory
+  LSH index for similar postings (:mod:`ajips.core.similar`).
+
+Postings are keyed by a hash of their text: analyzing the same text again
+updates the stored analysis rather than adding a copy. Resume alignment is
+never stored, since it describes the caller's resume rather than the posting.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from ajips.app.services.enhanced_extraction import extract_salary_range
+from ajips.app.services.extraction import EXPERIENCE_LEVEL_PATTERNS
+from ajips.core import aggregates, salary_stats, similar
+from ajips.core.singleflight import content_key
+from ajips.core.sqlite_utils import ConnectionPool
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    id INTEGER PRIMARY KEY,
+    content_key TEXT NOT NULL UNIQUE,
+    url TEXT,
+    title TEXT,
+    role_type TEXT COLLATE NOCASE,
+    experience_level TEXT COLLATE NOCASE,
+    salary_min INTEGER,
+    salary_max INTEGER,
+    quality_score REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    text TEXT NOT NULL,
+    analysis TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS postings_by_role ON postings (role_type, experience_level);
+CREATE INDEX IF NOT EXISTS postings_by_level ON postings (experience_level);
+CREATE INDEX IF NOT EXISTS postings_by_salary_max ON postings (salary_max);
+CREATE INDEX IF NOT EXISTS postings_by_salary_min ON postings (salary_min);
+CREATE TABLE IF NOT EXISTS posting_skills (
+    skill TEXT NOT NULL,
+    posting_id INTEGER NOT NULL,
+    PRIMARY KEY (skill, posting_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS posting_skills_by_posting ON posting_skills (posting_id);
+CREATE TABLE IF NOT EXISTS posting_focus_areas (
+    focus_area TEXT NOT NULL COLLATE NOCASE,
+    posting_id INTEGER NOT NULL,
+    weight REAL NOT NULL,
+    PRIMARY KEY (focus_area, posting_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS posting_focus_areas_by_posting ON posting_focus_areas (posting_id);
+"""
+
+# External-content FTS table: the text itself is only stored in postings
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS postings_fts
+USING fts5(title, text, content='postings', content_rowid='id');
+"""
+
+_SUMMARY_COLUMNS = (
+    "id",
+    "url",
+    "title",
+    "role_type",
+    "experience_level",
+    "salary_min",
+    "salary_max",
+    "quality_score",
+    "created_at",
+)
+MAX_RESULTS = 500
+
+
+def resolve_experience_level(level: str) -> str:
+    """Map a short level such as ``senior`` or ``staff`` to its stored name."""
+    wanted = level.strip().lower()
+    for name, _ in EXPERIENCE_LEVEL_PATTERNS:
+        if wanted and wanted in name.lower():
+            return name
+    return level.strip()
+
+
+class PostingStore:
+    """SQLite store of postings and their analyses, queried through indexes."""
+
+    def __init__(self, path: str, salary_sketch_k: int = 200):
+        self.path = path
+        self.salary_sketch_k = salary_sketch_k
+        self._pool = ConnectionPool(
+            path, _SCHEMA + aggregates.SCHEMA + salary_stats.SCHEMA + similar.SCHEMA
+        )
+        self._salary_reader = salary_stats.SketchReader()
+        self._similar = similar.SignatureIndex()
+        try:
+            self._pool.connection().executescript(_FTS_SCHEMA)
+            self.full_text = True
+        except sqlite3.OperationalError:
+            logger.warning("SQLite has no FTS5; full-text posting search is off")
+            self.full_text = False
+        self._backfill_aggregates()
+        self._backfill_salary_sketches()
+        self._backfill_vectors()
+
+    def add(self, text: str, analysis: dict, url: Optional[str] = None) -> int:
+        """Store (or refresh) a posting and its analysis; returns its ID."""
+        analysis = dict(analysis, resume_alignment=None)
+        salary = analysis.get("salary_range") or {}
+        key = content_key(text)
+        now = time.time()
+        columns = (
+            url,
+            analysis.get("title"),
+            analysis.get("role_type"),
+            analysis.get("experience_level"),
+            salary.get("min"),
+            salary.get("max"),
+            analysis.get("quality_score"),
+            now,
+            json.dumps(analysis),
+        )
+        demand = _demand(analysis)
+        vector = similar.features(text, analysis.get("explicit_skills") or ())
+        with self._pool.transaction() as conn:
+            row = conn.execute(
+                "SELECT id, created_at FROM postings WHERE content_key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                posting_id = conn.execute(
+                    "INSERT INTO postings (url, title, role_type, experience_level, "
+                    "salary_min, salary_max, quality_score, updated_at, analysis, "
+                    "content_key, created_at, text) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    columns + (key, now, text),
+                ).lastrowid
+                if self.full_text:
+                    conn.execute(
+                        "INSERT INTO postings_fts (rowid, title, text) VALUES (?, ?, ?)",
+                        (posting_id, analysis.get("title") or "", text),
+                    )
+                aggregates.apply(conn, now, {}, demand)
+                # Sketches cannot forget a value, so only first sightings count
+                self._add_salary(conn, analysis, salary)
+                similar.add(conn, posting_id, vector)
+            else:
+                # Same text, so the full-text entry is still current
+                posting_id, created_at = row
+                aggregates.apply(
+                    conn, created_at, self._stored_demand(conn, posting_id), demand
+                )
+                conn.execute(
+                    "UPDATE postings SET url = COALESCE(?, url), title = ?, "
+                    "role_type = ?, experience_level = ?, salary_min = ?, "
+                    "salary_max = ?, quality_score = ?, updated_at = ?, analysis = ? "
+                    "WHERE id = ?",
+                    columns + (posting_id,),
+                )
+                conn.execute(
+                    "DELETE FROM posting_skills WHERE posting_id = ?", (posting_id,)
+                )
+                conn.execute(
+                    "DELETE FROM posting_focus_areas WHERE posting_id = ?",
+                    (posting_id,),
+                )
+            conn.executemany(
+                "INSERT OR IGNORE INTO posting_skills (skill, posting_id) VALUES (?, ?)",
+                [
+                    (skill.lower(), posting_id)
+                    for skill in analysis.get("explicit_skills") or ()
+                ],
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO posting_focus_areas "
+                "(focus_area, posting_id, weight) VALUES (?, ?, ?)",
+                [
+                    (area["name"], posting_id, area["weight"])
+                    for area in analysis.get("focus_areas") or ()
+                ],
+            )
+        return posting_id
+
+    def _stored_demand(
+        self, conn: sqlite3.Connection, posting_id: int
+    ) -> Dict[str, List[str]]:
+        role = conn.execute(
+            "SELECT role_type FROM postings WHERE id = ?", (posting_id,)
+        ).fetchone()[0]
+        return {
+            aggregates.SKILL: [
+                skill
+                for (skill,) in conn.execute(
+                    "SELECT skill FROM posting_skills WHERE posting_id = ?",
+                    (posting_id,),
+                )
+            ],
+            aggregates.FOCUS_AREA: [
+                area
+                for (area,) in conn.execute(
+                    "SELECT focus_area FROM posting_focus_areas WHERE posting_id = ?",
+                    (posting_id,),
+                )
+            ],
+            aggregates.ROLE: [role] if role else [],
+        }
+
+    def _backfill_aggregates(self) -> None:
+        """Count postings stored before demand aggregates existed (runs once)."""
+        conn = self._pool.connection()
+        if conn.execute("SELECT 1 FROM demand LIMIT 1").fetchone() is not None:
+            return
+        with self._pool.transaction() as conn:
+            for posting_id, created_at in conn.execute(
+                "SELECT id, created_at FROM postings"
+            ).fetchall():
+                aggregates.apply(
+                    conn, created_at, {}, self._stored_demand(conn, posting_id)
+                )
+
+    def _add_salary(
+        self, conn: sqlite3.Connection, analysis: dict, salary: dict
+    ) -> None:
+        low = salary.get("min") or salary.get("max")
+        high = salary.get("max") or low
+        if not low:
+            return
+        midpoint = (low + high) / 2
+        salary_stats.add(
+            conn,
+            (salary.get("currency") or "USD").upper(),
+            salary_stats.salary_keys(
+                analysis.get("explicit_skills") or (),
+                analysis.get("role_type"),
+                analysis.get("experience_level"),
+            ),
+            midpoint,
+            self.salary_sketch_k,
+        )
+
+    def _backfill_salary_sketches(self) -> None:
+        """Sketch salaries stored before salary sketches existed (runs once)."""
+        conn = self._pool.connection()
+        if conn.execute("SELECT 1 FROM salary_sketches LIMIT 1").fetchone() is not None:
+            return
+        with self._pool.transaction() as conn:
+            for text, analysis in conn.execute(
+                "SELECT text, analysis FROM postings "
+                "WHERE salary_min IS NOT NULL OR salary_max IS NOT NULL ORDER BY id"
+            ).fetchall():
+                analysis = json.loads(analysis)
+                # Only analyses stored before they had a salary range are rescanned
+                if "salary_range" in analysis:
+                    salary = analysis["salary_range"] or {}
+                else:
+                    salary = extract_salary_range(text) or {}
+                self._add_salary(conn, analysis, salary)
+
+    def salary_percentiles(
+        self,
+        skill: Optional[str] = None,
+        role_type: Optional[str] = None,
+        experience_level: Optional[str] = None,
+        currency: str = "USD",
+        quantiles: Sequence[float] = (0.25, 0.5, 0.9),
+    ) -> Optional[Dict]:
+        """
+        Salary percentiles of stored postings for a skill or a role, optionally
+        at one experience level; None when no such posting had a salary.
+
+        Returns the sketch's ``dimension`` and ``name``, ``currency``,
+        ``count``, ``min``, ``max`` and one value per entry of ``quantiles``.
+
+        Raises:
+            ValueError: For a skill and a role together, or quantiles outside [0, 1]
+        """
+        if any(not 0 <= q <= 1 for q in quantiles):
+            raise ValueError("Quantiles must be between 0 and 1")
+        level = resolve_experience_level(experience_level) if experience_level else None
+        dimension, name = salary_stats.query_key(
+            skill.strip() if skill else None,
+            role_type.strip() if role_type else None,
+            level,
+        )
+        stats = self._salary_reader.percentiles(
+            self._pool.connection(), currency, (dimension, name), quantiles
+        )
+        if stats is not None:
+            stats.update(dimension=dimension, name=name, currency=currency.upper())
+        return stats
+
+    def export_salary_sketches(self) -> List[tuple]:
+        """Every salary sketch as ``(currency, dimension, name, bytes)``."""
+        return salary_stats.export(self._pool.connection())
+
+    def merge_salary_sketches(self, entries: Iterable[tuple]) -> int:
+        """Fold another shard's :meth:`export_salary_sketches` into this store."""
+        with self._pool.transaction() as conn:
+            return salary_stats.merge(conn, entries, self.salary_sketch_k)
+
+    def _backfill_vectors(self) -> None:
+        """Vectorize postings stored before similarity search existed (runs once)."""
+        conn = self._pool.connection()
+        if conn.execute("SELECT 1 FROM posting_vectors LIMIT 1").fetchone() is not None:
+            return
+        if conn.execute("SELECT 1 FROM postings LIMIT 1").fetchone() is None:
+            return
+        with self._pool.transaction() as conn:
+            for posting_id, text in conn.execute(
+                "SELECT id, text FROM postings ORDER BY id"
+            ).fetchall():
+                skills = [
+                    skill
+                    for (skill,) in conn.execute(
+                        "SELECT skill FROM posting_skills WHERE posting_id = ?",
+                        (posting_id,),
+                    )
+                ]
+                similar.add(conn, posting_id, similar.features(text, skills))
+
+    def similar_postings(
+        self,
+        posting_id: Optional[int] = None,
+        text: Optional[str] = None,
+        skills: Sequence[str] = (),
+        limit: int = 10,
+    ) -> Optional[List[Dict]]:
+        """
+        Stored postings most similar to a stored posting, or to a text and
+        skills, each with its estimated cosine ``score``; None for an unknown
+        (or featureless) ``posting_id``.
+        """
+        conn = self._pool.connection()
+        if posting_id is not None:
+            data = similar.stored_signature(conn, posting_id)
+            if data is None:
+                return None
+        else:
+            data = similar.query_signature(conn, similar.features(text, skills))
+            if data is None:
+                return []
+        cursor = conn.execute(
+            "SELECT posting_id, signature FROM posting_vectors WHERE posting_id > ? "
+            "ORDER BY posting_id",
+            (self._similar.last_id,),
+        )
+        for rows in iter(lambda: cursor.fetchmany(50_000), []):
+            self._similar.add(rows)
+        matches = self._similar.query(
+            data, max(1, min(limit, MAX_RESULTS)), exclude=posting_id
+        )
+        if not matches:
+            return []
+        rows = conn.execute(
+            f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM postings WHERE id IN "
+            f"({', '.join('?' * len(matches))})",
+            [match_id for match_id, _ in matches],
+        ).fetchall()
+        by_id = {row[0]: dict(zip(_SUMMARY_COLUMNS, row)) for row in rows}
+        postings = []
+        for match_id, score in matches:
+            if match_id in by_id:
+                postings.append(dict(by_id[match_id], score=score))
+        self._attach_skills(postings)
+        return postings
+
+    def trending(self, **kwargs) -> Dict:
+        """See :func:`ajips.core.aggregates.trending`."""
+        return aggregates.trending(self._pool.connection(), **kwargs)
+
+    def demand_series(self, **kwargs) -> List[Dict]:
+        """See :func:`ajips.core.aggregates.series`."""
+        return aggregates.series(self._pool.connection(), **kwargs)
+
+    def get(self, posting_id: int) -> Optional[Dict]:
+        """A stored posting with its text and analysis, or None."""
+        row = (
+            self._pool.connection()
+            .execute(
+                f"SELECT {', '.join(_SUMMARY_COLUMNS)}, text, analysis "
+                "FROM postings WHERE id = ?",
+                (posting_id,),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        posting = dict(zip(_SUMMARY_COLUMNS, row))
+        posting["text"] = row[-2]
+        posting["analysis"] = json.loads(row[-1])
+        return posting
+
+    def search(
+        self,
+        skills: Sequence[str] = (),
+        focus_areas: Sequence[str] = (),
+        role_type: Optional[str] = None,
+        experience_level: Optional[str] = None,
+        min_salary: Optional[int] = None,
+        max_salary: Optional[int] = None,
+        text: Optional[str] = None,
+        limit: int = 20,
+        before: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Postings matching every given filter, newest first.
+
+        ``skills`` and ``focus_areas`` must all be present. ``min_salary``
+        keeps postings whose range reaches it (top of the range at least
+        ``min_salary``) and ``max_salary`` those starting at or below it.
+        ``text`` is an FTS5 query over titles and texts. Pass the last ID of
+        a page as ``before`` to get the next page.
+
+        Raises:
+            ValueError: For a full-text query without FTS5 or a malformed one
+        """
+        clauses: List[str] = []
+        params: List[object] = []
+        required = _unique(skill.lower() for skill in skills)
+        if required:
+            clauses.append(
+                "id IN ("
+                + " INTERSECT ".join(
+                    "SELECT posting_id FROM posting_skills WHERE skill = ?"
+                    for _ in required
+                )
+                + ")"
+            )
+            params += required
+        for area in _unique(focus_areas):
+            clauses.append(
+                "id IN (SELECT posting_id FROM posting_focus_areas WHERE focus_area = ?)"
+            )
+            params.append(area)
+        if role_type:
+            clauses.append("role_type = ?")
+            params.append(role_type.strip())
+        if experience_level:
+            clauses.append("experience_level = ?")
+            params.append(resolve_experience_level(experience_level))
+        if min_salary is not None:
+            clauses.append("salary_max >= ?")
+            params.append(min_salary)
+        if max_salary is not None:
+            clauses.append("salary_min <= ?")
+            params.append(max_salary)
+        if text:
+            if not self.full_text:
+                raise ValueError("Full-text search is not available")
+            clauses.append(
+                "id IN (SELECT rowid FROM postings_fts WHERE postings_fts MATCH ?)"
+            )
+            params.append(text)
+        if before is not None:
+            clauses.append("id < ?")
+            params.append(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        params.append(max(1, min(limit, MAX_RESULTS)))
+        try:
+            rows = (
+                self._pool.connection()
+                .execute(
+                    f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM postings {where} "
+                    "ORDER BY id DESC LIMIT ?",
+                    params,
+                )
+                .fetchall()
+            )
+        except sqlite3.OperationalError as exc:
+            # FTS5 syntax errors in the user's query
+            raise ValueError(f"Invalid search: {exc}")
+        postings = [dict(zip(_SUMMARY_COLUMNS, row)) for row in rows]
+        self._attach_skills(postings)
+        return postings
+
+    def _attach_skills(self, postings: List[Dict]) -> None:
+        if not postings:
+            return
+        by_id = {posting["id"]: posting for posting in postings}
+        for posting in postings:
+            posting["skills"] = []
+        rows = (
+            self._pool.connection()
+            .execute(
+                "SELECT posting_id, skill FROM posting_skills WHERE posting_id IN "
+                f"({', '.join('?' * len(by_id))})",
+                list(by_id),
+            )
+            .fetchall()
+        )
+        for posting_id, skill in rows:
+            by_id[posting_id]["skills"].append(skill)
+        for posting in postings:
+            posting["skills"].sort()
+
+    def count(self) -> int:
+        return (
+            self._pool.connection()
+            .execute("SELECT COUNT(*) FROM postings")
+            .fetchone()[0]
+        )
+
+
+def _demand(analysis: dict) -> Dict[str, List[str]]:
+    """Names a posting counts towards, per aggregate dimension."""
+    role = analysis.get("role_type")
+    return {
+        aggregates.SKILL: [s.lower() for s in analysis.get("explicit_skills") or ()],
+        aggregates.FOCUS_AREA: [a["name"] for a in analysis.get("focus_areas") or ()],
+        aggregates.ROLE: [role] if role else [],
+    }
+
+
+def _unique(values: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(value.strip() for value in values if value.strip()))
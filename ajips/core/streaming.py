@@ -0,0 +1,166 @@
+"""Incremental NDJSON analysis for streamed request bodies.
+
+Records are parsed line by line as body chunks arrive, analyzed in a bounded
+pool and written back as soon as each finishes, so memory stays proportional
+to the pool size rather than the stream length. No new line is read while
+every slot is busy, and no slot frees up until its result has been taken by
+the response writer, which waits on the client socket: a slow reader or a
+fast writer is throttled through TCP flow control instead of buffering.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import AsyncIterator, Callable, Optional, Tuple
+
+import anyio
+
+from ajips.core.serialization import ndjson_line
+
+
+async def iter_lines(
+    chunks: AsyncIterator[bytes], max_line_bytes: int
+) -> AsyncIterator[Tuple[int, Optional[bytes]]]:
+    """
+    Split a byte stream into non-empty lines numbered from 1.
+
+    Overlong lines are yielded as ``(number, None)`` and their remainder is
+    discarded without being buffered.
+    """
+    buffer = bytearray()
+    number = 0
+    overlong = False
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                if not overlong:
+                    buffer += chunk[start:]
+                    if len(buffer) > max_line_bytes:
+                        overlong = True
+                        buffer.clear()
+                break
+            if overlong:
+                number += 1
+                yield number, None
+                overlong = False
+            else:
+                buffer += chunk[start:end]
+                if len(buffer) > max_line_bytes:
+                    number += 1
+                    yield number, None
+                elif buffer.strip():
+                    number += 1
+                    yield number, bytes(buffer)
+            buffer.clear()
+            start = end + 1
+    if overlong:
+        yield number + 1, None
+    elif buffer.strip():
+        yield number + 1, bytes(buffer)
+
+
+def result_line(
+    seq: int,
+    record: Optional[dict],
+    result=None,
+    error=None,
+    encode: Callable[[dict], bytes] = ndjson_line,
+) -> bytes:
+    """
+    Encode one output line (same shape as batch job results), as NDJSON or
+    with another ``encode`` such as MessagePack.
+    """
+    line = {"seq": seq}
+    if isinstance(record, dict) and record.get("id") is not None:
+        line["id"] = record["id"]
+    if error is None:
+        line["result"] = result
+    else:
+        line["error"] = error
+    return encode(line)
+
+
+async def _analyze_line(
+    seq: int,
+    raw: Optional[bytes],
+    analyze: Callable[[dict], dict],
+    limiter: anyio.CapacityLimiter,
+    max_line_bytes: int,
+    encode: Callable[[dict], bytes],
+) -> bytes:
+    if raw is None:
+        return result_line(
+            seq, None, error=f"Line exceeds {max_line_bytes} bytes", encode=encode
+        )
+    try:
+        record = json.loads(raw)
+    except ValueError:
+        return result_line(seq, None, error="Invalid JSON", encode=encode)
+    if not isinstance(record, dict):
+        return result_line(
+            seq, None, error="Each line must be a JSON object", encode=encode
+        )
+    try:
+        result = await anyio.to_thread.run_sync(analyze, record, limiter=limiter)
+    except Exception as exc:
+        return result_line(
+            seq, record, error=str(exc) or type(exc).__name__, encode=encode
+        )
+    return result_line(seq, record, result, encode=encode)
+
+
+async def analyze_ndjson(
+    chunks: AsyncIterator[bytes],
+    analyze: Callable[[dict], dict],
+    concurrency: int = 4,
+    max_line_bytes: int = 1_000_000,
+    encode: Callable[[dict], bytes] = ndjson_line,
+) -> AsyncIterator[bytes]:
+    """
+    Analyze an NDJSON byte stream, yielding result lines in completion order.
+
+    Every output line carries the record's 1-based position as ``seq`` (blank
+    lines are skipped); malformed or failing records produce an ``error`` line instead of ending the stream.
+    Lines are NDJSON unless ``encode`` produces another self-delimiting form.
+    """
+    limiter = anyio.CapacityLimiter(concurrency)
+    lines = iter_lines(chunks, max_line_bytes)
+    pending = set()
+    reader: Optional[asyncio.Future] = None
+    exhausted = False
+    try:
+        while True:
+            if reader is None and not exhausted and len(pending) < concurrency:
+                reader = asyncio.ensure_future(lines.__anext__())
+            waiting = (pending | {reader}) if reader is not None else pending
+            if not waiting:
+                return
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if reader in done:
+                try:
+                    seq, raw = reader.result()
+                except StopAsyncIteration:
+                    exhausted = True
+                else:
+                    pending.add(
+                        asyncio.ensure_future(
+                            _analyze_line(
+                                seq, raw, analyze, limiter, max_line_bytes, encode
+                            )
+                        )
+                    )
+                reader = None
+            for task in done & pending:
+                pending.discard(task)
+                yield task.result()
+    finally:
+        # Client went away: stop reading; threads already running finish alone
+        for task in pending:
+            task.cancel()
+        if reader is not None:
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+        await lines.aclose()
@@ -0,0 +1,15 @@
+"""Shared test fixtures."""
+
+from unittest.mock import patch
+
+import pytest
+
+from ajips.app.api import dependencies
+
+
+@pytest.fixture(autouse=True)
+def _fresh_rate_limiter():
+    # Rate-limit budgets are per minute; each test starts with full ones
+    # rather than with whatever the tests before it left
+    with patch.object(dependencies, "_limiter", None):
+        yield
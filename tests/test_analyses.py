@@ -0,0 +1,144 @@
+"""Tests for analyses addressable by content hash, ETags and cacheable GETs."""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ajips.app.api import dependencies
+from ajips.app.config import settings
+from ajips.app.main import app
+from ajips.core.analyses import AnalysisStore
+from ajips.core.memo import Memo
+from ajips.core.pipelines import job_profile
+
+POSTING = """Backend Engineer
+Requirements:
+- Go, PostgreSQL and Kubernetes
+- 4+ years building APIs
+Compensation: $130,000 - $160,000 a year.
+"""
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def store(tmp_path):
+    with patch.object(settings, "DATA_DIR", str(tmp_path)), patch.object(
+        dependencies, "_analysis_store", None
+    ), patch.object(job_profile, "_results", Memo("test.results", 8)):
+        dependencies.install_analysis_store()
+        try:
+            yield dependencies.get_analysis_store()
+        finally:
+            job_profile.remove_result_listener(dependencies._store_analysis)
+
+
+def _post(text=POSTING, headers=None):
+    return client.post(
+        "/analyze", json={"job_posting": {"text": text}}, headers=headers
+    )
+
+
+def test_analyses_are_addressable_by_content_hash(store):
+    posted = _post(headers={"Accept-Encoding": "identity"})
+    location = posted.headers["content-location"]
+    assert location == f"/analyses/{job_profile.analysis_id(POSTING)}"
+    assert "cache-control" not in posted.headers
+
+    # Another worker, without the result in memory, serves it from the store
+    with patch.object(job_profile, "_results", Memo("test.results_other", 8)):
+        fetched = client.get(location, headers={"Accept-Encoding": "identity"})
+    assert fetched.status_code == 200
+    assert fetched.content == posted.content
+    assert fetched.headers["etag"] == posted.headers["etag"]
+    assert fetched.headers["cache-control"] == (
+        f"public, max-age={settings.ANALYSIS_MAX_AGE_SECONDS}, immutable"
+    )
+    assert len(store) == 1
+
+    assert client.get("/analyses/" + "0" * 64).status_code == 404
+
+
+def test_conditional_requests_get_not_modified(store):
+    location = _post().headers["content-location"]
+    first = client.get(location, headers={"Accept-Encoding": "identity"})
+    etag = first.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith('W/"')
+
+    for header in (etag, f'"other", W/{etag}', "*"):
+        again = client.get(
+            location,
+            headers={"If-None-Match": header, "Accept-Encoding": "identity"},
+        )
+        assert again.status_code == 304
+        assert again.content == b""
+        assert again.headers["etag"] == etag
+        assert "immutable" in again.headers["cache-control"]
+
+    # Each representation has its own tag
+    compressed = client.get(location, headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.headers["etag"] != etag
+    changed = client.get(
+        location, headers={"If-None-Match": etag, "Accept-Encoding": "gzip"}
+    )
+    assert changed.status_code == 200
+    # Only GET and HEAD are conditional
+    assert _post(headers={"If-None-Match": "*"}).status_code == 200
+
+
+def test_url_analyses_are_cacheable(store):
+    with patch.object(job_profile, "fetch_job_posting", return_value=POSTING):
+        response = client.get("/analyze", params={"url": "https://jobs.test/1"})
+        assert response.status_code == 200
+        assert response.headers["cache-control"] == (
+            f"public, max-age={settings.ANALYZE_URL_MAX_AGE_SECONDS}"
+        )
+        assert response.headers["content-location"].endswith(
+            job_profile.analysis_id(POSTING)
+        )
+        assert "explicit_skills" in response.json()
+        again = client.get(
+            "/analyze",
+            params={"url": "https://jobs.test/1"},
+            headers={"If-None-Match": response.headers["etag"]},
+        )
+        assert again.status_code == 304
+
+    with patch.object(job_profile, "fetch_job_posting", side_effect=OSError("down")):
+        failed = client.get("/analyze", params={"url": "https://jobs.test/2"})
+    assert failed.headers["cache-control"] == "no-store"
+    assert "content-location" not in failed.headers
+
+
+def test_partial_analyses_are_not_addressable(store):
+    analyze = job_profile._analyze_text
+
+    def partial(raw_text, resume_text=None):
+        profile = analyze(raw_text, resume_text)
+        profile.skipped_sections = ["critiques"]
+        return profile
+
+    with patch.object(job_profile, "_analyze_text", partial):
+        response = _post()
+    assert "content-location" not in response.headers
+    assert len(store) == 0
+    assert job_profile._results.stats()["entries"] == 0
+
+
+def test_analysis_ids_follow_the_inputs_and_taxonomy():
+    base = job_profile.analysis_id(POSTING, None, "v1")
+    assert base != job_profile.analysis_id(POSTING, "Go developer", "v1")
+    assert base != job_profile.analysis_id(POSTING, None, "v2")
+    assert base == job_profile.analysis_id(POSTING, None, "v1")
+
+
+def test_store_keeps_the_newest_entries(tmp_path):
+    store = AnalysisStore(str(tmp_path / "analyses.sqlite3"), max_entries=3)
+    for i in range(5):
+        store.add(f"id{i}", b"{}")
+    store.add("id4", b"[]")  # already stored
+    assert len(store) == 3
+    assert store.get("id1") is None
+    assert store.get("id4") == b"{}"
@@ -0,0 +1,123 @@
+"""Tests for the embeddable Analyzer API and fork safety of shared state."""
+
+import os
+import pickle
+import signal
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import ajips
+from ajips.app.api.schemas import AnalyzeRequest, JobPostingInput
+from ajips.core.memo import Memo
+from ajips.core.pipelines import job_profile
+from ajips.core.singleflight import SingleFlight
+
+POSTINGS = [
+    f"""Platform Engineer {i}
+Requirements:
+- {skills}
+- {i + 2}+ years of experience
+Compensation: $120,000 - $150,000 a year.
+"""
+    for i, skills in enumerate(
+        [
+            "Python, Django and PostgreSQL",
+            "Go, Kubernetes and Terraform on AWS",
+            "React, TypeScript and GraphQL",
+            "Java, Spring and Kafka",
+            "Rust, Linux and Docker",
+        ]
+    )
+]
+
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return ajips.Analyzer(chunksize=2)
+
+
+def test_analyze_matches_the_api_pipeline(analyzer):
+    profile = analyzer.analyze(POSTINGS[1], resume_text="Go developer")
+    expected = job_profile.build_job_profile(
+        AnalyzeRequest(
+            job_posting=JobPostingInput(text=POSTINGS[1]), resume_text="Go developer"
+        )
+    )
+    assert profile == expected
+    assert "kubernetes" in profile.explicit_skills
+    assert profile.resume_alignment is not None
+
+
+def test_partitions_are_analyzed_lazily_in_order(analyzer):
+    consumed = []
+
+    def texts():
+        for text in POSTINGS:
+            consumed.append(text)
+            yield text
+
+    results = analyzer.analyze_partition(texts())
+    assert consumed == []
+    first = next(results)
+    assert len(consumed) == 1
+    assert first == analyzer.analyze(POSTINGS[0])
+    assert [p.title for p in results] == [
+        analyzer.analyze(text).title for text in POSTINGS[1:]
+    ]
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_analyze_many_in_worker_processes(analyzer):
+    expected = [analyzer.analyze(text) for text in POSTINGS * 3]
+    assert list(analyzer.analyze_many(POSTINGS * 3, workers=2)) == expected
+    assert list(analyzer.analyze_many(iter(POSTINGS), workers=1)) == expected[:5]
+
+    # Closing early stops the pool without consuming the rest
+    results = analyzer.analyze_many(iter(POSTINGS * 100), workers=2)
+    assert next(results) == expected[0]
+    results.close()
+
+
+def test_analyzer_is_thread_safe(analyzer):
+    expected = [analyzer.analyze(text).to_dict() for text in POSTINGS]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(
+            pool.map(lambda text: analyzer.analyze(text).to_dict(), POSTINGS * 20)
+        )
+    assert results == expected * 20
+
+
+def test_analyzer_and_profiles_pickle(analyzer):
+    clone = pickle.loads(pickle.dumps(analyzer))
+    assert clone.chunksize == 2
+    profile = clone.analyze(POSTINGS[2])
+    assert pickle.loads(pickle.dumps(profile)) == profile
+    with pytest.raises(ValueError):
+        ajips.Analyzer(chunksize=0)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_state_locked_by_other_threads_is_usable_after_fork():
+    memo = Memo("test.fork", 4)
+    flight = SingleFlight("test.fork")
+    memo.get("kept", lambda: 1)
+    inside, release = threading.Event(), threading.Event()
+
+    def hold():
+        with memo._lock:
+            flight.do("key", lambda: (inside.set(), release.wait()))
+
+    thread = threading.Thread(target=hold)
+    thread.start()
+    inside.wait()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - runs in the child
+        signal.alarm(10)  # a deadlock kills the child
+        ok = memo.get("kept", lambda: 2) == 1 and flight.do("key", lambda: 3) == 3
+        os._exit(0 if ok else 1)
+    release.set()
+    thread.join()
+    _, status = os.waitpid(pid, 0)
+    assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
@@ -7,6 +7,7 @@ import pytest
 from fastapi.testclient import TestClient
 
 from ajips.app.main import app
+from ajips.core.encoding import EncodedResult
 
 client = TestClient(app)
 
@@ -26,21 +27,23 @@ def test_version_endpoint():
     assert response.json()["name"] == "AJIPS"
 
 
-@patch("ajips.app.api.routes.build_job_profile")
+@patch("ajips.app.api.routes.analyze_encoded")
 def test_analyze_success(mock_build):
     # Return a dict matching AnalyzeResponse fields
-    mock_build.return_value = {
-        "title": "Test Job",
-        "focus_areas": [],
-        "explicit_skills": [],
-        "hidden_skills": [],
-        "critiques": [],
-        "salary_range": None,
-        "interview_stages": [],
-        "quality_score": 85.0,
-        "resume_alignment": None,
-        "summary": "Test summary",
-    }
+    mock_build.return_value = EncodedResult(
+        {
+            "title": "Test Job",
+            "focus_areas": [],
+            "explicit_skills": [],
+            "hidden_skills": [],
+            "critiques": [],
+            "salary_range": None,
+            "interview_stages": [],
+            "quality_score": 85.0,
+            "resume_alignment": None,
+            "summary": "Test summary",
+        }
+    )
     response = client.post(
         "/analyze",
         json={"job_posting": {"text": "Test job"}, "resume_text": ""},
@@ -49,7 +52,7 @@ def test_analyze_success(mock_build):
     mock_build.assert_called_once()
 
 
-@patch("ajips.app.api.routes.build_job_profile")
+@patch("ajips.app.api.routes.analyze_encoded")
 def test_analyze_value_error(mock_build):
     # Simulate SSRF rejection from ingestion
     from ajips.app.services.ingestion import _is_safe_url
@@ -63,7 +66,7 @@ def test_analyze_value_error(mock_build):
     assert "URL not allowed" in response.json()["detail"]
 
 
-@patch("ajips.app.api.routes.build_job_profile")
+@patch("ajips.app.api.routes.analyze_encoded")
 def test_analyze_unhandled_error(mock_build):
     mock_build.side_effect = RuntimeError("Unexpected")
     response = client.post(
@@ -84,3 +87,66 @@ def test_cors_headers():
     if response.status_code == 200:
         assert "access-control-allow-origin" in response.headers
         assert "access-control-allow-methods" in response.headers
+
+
+def test_lazy_routers_load_on_first_request_or_schema():
+    from fastapi import FastAPI
+
+    from ajips.app.api.lazy_routes import LazyRouter, include_lazy_router
+
+    lazy_app = FastAPI()
+    include_lazy_router(lazy_app, "ajips.app.api.postings", "/postings")
+    lazy_client = TestClient(lazy_app)
+    assert "/postings" in lazy_client.get("/openapi.json").json()["paths"]
+
+    lazy_app = FastAPI()
+    placeholder = include_lazy_router(lazy_app, "ajips.app.api.postings", "/postings")
+    lazy_client = TestClient(lazy_app)
+    assert lazy_client.get("/posting").status_code == 404
+    assert placeholder in lazy_app.routes
+    # The request that loads the router is answered by its routes
+    assert lazy_client.post("/postings").status_code == 405
+    assert not any(isinstance(route, LazyRouter) for route in lazy_app.routes)
+    assert lazy_client.get("/postings", params={"limit": 0}).status_code == 422
+
+
+def test_lazy_routers_are_imported_off_the_event_loop():
+    import asyncio
+    import importlib
+
+    from fastapi import FastAPI
+
+    from ajips.app.api import lazy_routes
+
+    real_import_module = importlib.import_module
+
+    def import_module(name):
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+        return real_import_module(name)
+
+    on_loop = []
+    lazy_app = FastAPI()
+    lazy_routes.include_lazy_router(lazy_app, "ajips.app.api.postings", "/postings")
+    with patch.object(lazy_routes.importlib, "import_module", import_module):
+        assert TestClient(lazy_app).post("/postings").status_code == 405
+    assert on_loop == [False]
+
+
+def test_server_preload_loads_lazy_routers_before_forking():
+    from fastapi import FastAPI
+
+    from ajips.app.api.lazy_routes import LazyRouter, include_lazy_router
+    from ajips.core import server
+
+    lazy_app = FastAPI()
+    include_lazy_router(lazy_app, "ajips.app.api.postings", "/postings")
+    with patch("ajips.app.main.app", lazy_app), patch(
+        "ajips.core.pipelines.job_profile.warm_up"
+    ), patch("ajips.core.server.gc"):
+        assert server.preload(0.0) is lazy_app
+    assert not any(isinstance(route, LazyRouter) for route in lazy_app.routes)
+    assert "/postings" in {route.path for route in lazy_app.routes}
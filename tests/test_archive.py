@@ -0,0 +1,249 @@
+"""Tests for the columnar analysis archive (requires pyarrow)."""
+
+import datetime as dt
+import json
+import multiprocessing
+import os
+import signal
+import time
+from unittest.mock import patch
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from ajips.app.api import dependencies  # noqa: E402
+from ajips.app.config import settings  # noqa: E402
+from ajips.app.main import app  # noqa: E402
+from ajips.cli import main  # noqa: E402
+from ajips.core import bulk  # noqa: E402
+from ajips.core.archive import SCHEMA, AnalysisArchive  # noqa: E402
+from ajips.core.pipelines.job_profile import analyze_posting  # noqa: E402
+
+POSTINGS = [
+    "Senior Python Engineer\nRequirements: Python, Django and AWS.\n"
+    "Salary: $120,000 - $150,000 a year.",
+    "DevOps Engineer\nRequirements: Kubernetes, Terraform and AWS.",
+    "Frontend Engineer\nRequirements: React, TypeScript and GraphQL.",
+]
+
+
+@pytest.fixture(scope="module")
+def profiles():
+    return [analyze_posting(text) for text in POSTINGS]
+
+
+def _fill(archive, profiles, days=3, per_day=10):
+    for day in range(days):
+        for i in range(per_day):
+            archive.add(
+                profiles[i % len(profiles)],
+                f"d{day}-{i}",
+                dt.datetime(2026, 1, 1 + day, 12, tzinfo=dt.timezone.utc),
+            )
+    archive.flush()
+
+
+@pytest.mark.parametrize("fmt", ["arrow", "parquet"])
+def test_results_round_trip_by_date(tmp_path, profiles, fmt):
+    archive = AnalysisArchive(str(tmp_path), fmt, batch_rows=4)
+    _fill(archive, profiles)
+    assert sorted(os.listdir(tmp_path)) == [
+        "date=2026-01-01",
+        "date=2026-01-02",
+        "date=2026-01-03",
+    ]
+    table = archive.scan()
+    assert table.num_rows == 30
+    for name in ("role_type", "explicit_skills", "focus_areas"):
+        assert table.schema.field(name).type == SCHEMA.field(name).type
+    assert archive.scan(["id"], start="2026-01-02").num_rows == 20
+    assert archive.scan(["id"], dt.date(2026, 1, 2), dt.date(2026, 1, 2)).num_rows == 10
+
+    row = archive.scan(end="2026-01-01").filter(
+        pa.compute.equal(archive.scan(end="2026-01-01")["id"], "d0-0")
+    )
+    first = row.to_pylist()[0]
+    expected = profiles[0].to_dict()
+    assert first["explicit_skills"] == expected["explicit_skills"]
+    assert first["focus_areas"] == [area["name"] for area in expected["focus_areas"]]
+    assert first["salary_min"] == 120000 and first["salary_period"] == "year"
+    assert first["date"] == "2026-01-01"
+
+
+def test_skill_frequencies_by_role(tmp_path, profiles):
+    archive = AnalysisArchive(str(tmp_path), batch_rows=7)
+    _fill(archive, profiles)
+    by_role = archive.skill_frequencies(start="2026-01-02")
+    counts = {(r["role_type"], r["skill"]): r["count"] for r in by_role.to_pylist()}
+    python_role = profiles[0].role_type
+    # Seven of each day's ten rows are the first two postings (i % 3 in 0, 1)
+    assert counts[(python_role, "python")] == 2 * 4
+    assert sum(count for (_, skill), count in counts.items() if skill == "aws") == (
+        2 * 7
+    )
+    assert by_role["count"].to_pylist() == sorted(
+        by_role["count"].to_pylist(), reverse=True
+    )
+
+    overall = archive.skill_frequencies(by=None)
+    assert overall.column_names == ["skill", "count"]
+    assert overall.to_pylist()[0] == {"skill": "aws", "count": 21}
+
+    empty = archive.skill_frequencies(end="2025-12-31")
+    assert empty.num_rows == 0 and empty.column_names == ["role_type", "skill", "count"]
+
+
+def test_arrow_scans_are_memory_mapped(tmp_path, profiles):
+    archive = AnalysisArchive(str(tmp_path))
+    _fill(archive, profiles, days=1, per_day=3000)
+    before = pa.total_allocated_bytes()
+    table = archive.scan(["hidden_skills", "explicit_skills"])
+    assert table.num_rows == 3000
+    # The columns point into the mapped file rather than freshly read buffers
+    assert pa.total_allocated_bytes() - before < table.nbytes / 10
+
+
+def test_rows_are_buffered_until_a_batch_or_delay(tmp_path, profiles):
+    archive = AnalysisArchive(str(tmp_path), batch_rows=3, max_delay=3600)
+    archive.add(profiles[0])
+    archive.add(profiles[1])
+    assert archive.scan().num_rows == 0
+    archive.add(profiles[2])
+    assert archive.scan().num_rows == 3
+
+    archive.max_delay = 0
+    archive.add(profiles[0])
+    assert archive.scan().num_rows == 4
+    assert archive.flush() == []
+    with pytest.raises(ValueError):
+        AnalysisArchive(str(tmp_path), "csv")
+
+
+def test_a_trickle_of_rows_is_written_after_max_delay(tmp_path, profiles):
+    archive = AnalysisArchive(str(tmp_path), batch_rows=100, max_delay=0.1)
+    archive.add(profiles[0])
+    # No further row arrives to notice that the first one is due
+    deadline = time.monotonic() + 10
+    while archive.scan().num_rows == 0 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert archive.scan().num_rows == 1
+
+    archive.auto_flush = False
+    archive.add(profiles[1])
+    time.sleep(0.3)
+    assert archive.scan().num_rows == 1
+    archive.close()
+    assert archive.scan().num_rows == 2
+
+
+def _add_in_child(archive, profile):
+    archive.add(profile, "child")
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_forked_children_write_their_own_rows(tmp_path, profiles):
+    archive = AnalysisArchive(str(tmp_path), batch_rows=100)
+    archive.add(profiles[0], "parent")
+    child = multiprocessing.get_context("fork").Process(
+        target=_add_in_child, args=(archive, profiles[1])
+    )
+    child.start()
+    child.join()
+    assert archive.scan(["id"])["id"].to_pylist() == ["child"]
+    archive.close()
+    assert sorted(archive.scan(["id"])["id"].to_pylist()) == ["child", "parent"]
+
+
+def test_cli_archives_results(tmp_path, capsys):
+    source = tmp_path / "postings.jsonl"
+    source.write_text(
+        "".join(
+            json.dumps({"id": f"p{i}", "text": t}) + "\n"
+            for i, t in enumerate(POSTINGS)
+        )
+    )
+    archive_dir = tmp_path / "archive"
+    args = ["analyze", str(source), "--archive", str(archive_dir), "--workers", "0"]
+    assert main(args + ["-q", "--checkpoint", str(tmp_path / "ckpt")]) == 0
+    assert capsys.readouterr().out == ""
+    archive = AnalysisArchive(str(archive_dir))
+    assert sorted(archive.scan(["id"])["id"].to_pylist()) == ["p0", "p1", "p2"]
+
+    output = tmp_path / "out.ndjson"
+    assert main(args + ["--archive-format", "parquet", "-o", str(output), "-q"]) == 0
+    assert len(output.read_text().splitlines()) == 3
+    assert AnalysisArchive(str(archive_dir), "parquet").scan().num_rows == 3
+
+
+def _run_until_killed(source, archive_root, checkpoint, records):
+    analyze, analyzed = bulk._analyze_chunk, []
+
+    def killing(chunk):
+        if len(analyzed) >= records:
+            os.kill(os.getpid(), signal.SIGKILL)
+        analyzed.extend(chunk)
+        return analyze(chunk)
+
+    bulk._analyze_chunk = killing
+    archive = AnalysisArchive(archive_root, max_delay=0)
+    bulk.run(
+        [source],
+        None,
+        None,
+        chunksize=2,
+        checkpoint=checkpoint,
+        checkpoint_every=20,
+        archive=archive,
+    )
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_killed_runs_resume_without_duplicate_archive_rows(tmp_path):
+    source = tmp_path / "postings.jsonl"
+    source.write_text(
+        "".join(
+            json.dumps({"id": f"p{i}", "text": POSTINGS[i % 3]}) + "\n"
+            for i in range(50)
+        )
+    )
+    root, checkpoint = str(tmp_path / "archive"), str(tmp_path / "ckpt")
+    child = multiprocessing.get_context("fork").Process(
+        target=_run_until_killed, args=(str(source), root, checkpoint, 30)
+    )
+    child.start()
+    child.join()
+    assert child.exitcode == -signal.SIGKILL
+    # Only the checkpointed rows were written before the kill
+    assert AnalysisArchive(root).scan(["id"]).num_rows == 20
+
+    archive = AnalysisArchive(root, max_delay=0)
+    progress = bulk.run(
+        [str(source)], None, None, checkpoint=checkpoint, archive=archive
+    )
+    assert (progress.skipped, progress.analyzed) == (20, 30)
+    ids = archive.scan(["id"])["id"].to_pylist()
+    assert sorted(ids) == sorted(f"p{i}" for i in range(50))
+    assert archive.auto_flush
+
+
+def test_api_analyses_are_archived(tmp_path):
+    with patch.object(settings, "DATA_DIR", str(tmp_path)), patch.object(
+        settings, "ARCHIVE_ENABLED", True
+    ), patch.object(dependencies, "_archive", None):
+        dependencies.install_archive()
+        try:
+            response = TestClient(app).post(
+                "/analyze", json={"job_posting": {"text": POSTINGS[1]}}
+            )
+            assert response.status_code == 200
+            dependencies.close_archive()
+        finally:
+            from ajips.core.pipelines import job_profile
+
+            job_profile.remove_listener(dependencies._archive_posting)
+        table = AnalysisArchive(dependencies.archive_path()).scan()
+    assert table.num_rows == 1
+    assert "kubernetes" in table["explicit_skills"].to_pylist()[0]
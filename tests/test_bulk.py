@@ -0,0 +1,170 @@
+"""Tests for offline bulk analysis and the ``ajips analyze`` command."""
+
+import csv
+import gzip
+import io
+import json
+import os
+
+import pytest
+
+from ajips.cli import main
+from ajips.core import bulk
+from ajips.core.bulk import Checkpoint, Progress, iter_items, run
+
+POSTINGS = [
+    "Senior Python Engineer\nRequirements: Python, Django and AWS.\n"
+    "Salary: $120,000 - $150,000 a year.",
+    "Platform Engineer\nRequirements: Go, Kubernetes and Terraform.",
+    "Frontend Engineer\nRequirements: React, TypeScript and GraphQL.",
+]
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    root = tmp_path / "in"
+    (root / "dump").mkdir(parents=True)
+    with open(root / "a.jsonl", "w") as handle:
+        for i, text in enumerate(POSTINGS):
+            handle.write(json.dumps({"id": f"a{i}", "text": text}) + "\n")
+        handle.write("\nnot json\n")
+    with open(root / "b.csv", "w", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["ref", "body", "resume_text"])
+        writer.writerow(["b0", POSTINGS[1], "Go developer"])
+    with gzip.open(root / "dump" / "c.jsonl.gz", "wt") as handle:
+        for text in POSTINGS * 4:
+            handle.write(json.dumps(text) + "\n")
+    (root / "dump" / "d.txt").write_text(POSTINGS[2])
+    (root / "dump" / "notes.bin").write_text("skipped")
+    (root / ".hidden.txt").write_text("skipped")
+    return root
+
+
+def _lines(path):
+    with open(path) as handle:
+        return [json.loads(line) for line in handle]
+
+
+def test_items_are_streamed_from_files_directories_and_dumps(inputs):
+    items = list(iter_items([str(inputs)]))
+    ids = [item.id for item in items]
+    assert [item.seq for item in items] == list(range(1, len(items) + 1))
+    assert ids[:4] == ["a0", "a1", "a2", f"{inputs / 'a.jsonl'}:5"]
+    assert items[3].error == "Invalid JSON"
+    # The CSV has no "text" or "id" column
+    assert items[4].record["text"] is None
+    assert ids[5:7] == [f"{inputs / 'dump' / 'c.jsonl.gz'}:{n}" for n in (1, 2)]
+    assert ids[-1] == str(inputs / "dump" / "d.txt")
+    assert len(items) == 4 + 1 + 12 + 1
+
+    csv_items = list(iter_items([str(inputs / "b.csv")], "auto", "body", "ref"))
+    assert csv_items[0].id == "b0"
+    assert csv_items[0].record["resume_text"] == "Go developer"
+
+    stdin = io.StringIO(json.dumps({"text": POSTINGS[0]}) + "\n")
+    assert next(iter_items(["-"], stdin=stdin)).id == "<stdin>:1"
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_parallel_runs_match_in_process_runs(inputs, tmp_path):
+    serial = run([str(inputs)], str(tmp_path / "serial.ndjson"))
+    run([str(inputs)], str(tmp_path / "ordered.ndjson"), workers=2, chunksize=2)
+    run(
+        [str(inputs)],
+        str(tmp_path / "unordered.ndjson"),
+        workers=2,
+        chunksize=2,
+        ordered=False,
+    )
+    expected = _lines(tmp_path / "serial.ndjson")
+    assert _lines(tmp_path / "ordered.ndjson") == expected
+    unordered = _lines(tmp_path / "unordered.ndjson")
+    assert sorted(unordered, key=lambda line: line["seq"]) == expected
+
+    assert (serial.analyzed, serial.errors) == (18, 2)
+    assert expected[0]["result"]["salary_range"]["min"] == 120000
+    assert expected[3] == {
+        "seq": 4,
+        "id": f"{inputs / 'a.jsonl'}:5",
+        "error": "Invalid JSON",
+    }
+    assert "error" in expected[4]
+
+
+def test_interrupted_runs_resume_from_the_checkpoint(inputs, tmp_path, monkeypatch):
+    output, checkpoint = tmp_path / "out.ndjson", str(tmp_path / "run.ckpt")
+    complete = tmp_path / "complete.ndjson"
+    run([str(inputs)], str(complete))
+
+    analyze = bulk._analyze_chunk
+    calls = []
+
+    def failing(chunk):
+        calls.append(len(chunk))
+        if len(calls) == 4:
+            raise KeyboardInterrupt
+        return analyze(chunk)
+
+    monkeypatch.setattr(bulk, "_analyze_chunk", failing)
+    with pytest.raises(KeyboardInterrupt):
+        run(
+            [str(inputs)],
+            str(output),
+            chunksize=2,
+            checkpoint=checkpoint,
+            checkpoint_every=4,
+        )
+    state = Checkpoint(checkpoint, [str(inputs)])
+    assert state.load() and len(state) == 6
+    # A partly written line after the last save is discarded on resume
+    with open(output, "ab") as handle:
+        handle.write(b'{"seq": 7, "res')
+
+    monkeypatch.undo()
+    progress = run([str(inputs)], str(output), chunksize=2, checkpoint=checkpoint)
+    assert (progress.skipped, progress.analyzed) == (6, 12)
+    assert output.read_bytes() == complete.read_bytes()
+
+    with pytest.raises(ValueError):
+        run([str(inputs / "a.jsonl")], str(output), checkpoint=checkpoint)
+
+
+def test_checkpoint_tracks_out_of_order_completions(tmp_path):
+    state = Checkpoint(str(tmp_path / "ckpt"), ["in"])
+    for seq in (2, 1, 5, 3):
+        state.mark(seq)
+    assert (state.through, state.done) == (3, {5})
+    assert 3 in state and 5 in state and 4 not in state
+    state.save(10)
+    loaded = Checkpoint(state.path, ["in"])
+    assert loaded.load()
+    assert (loaded.through, loaded.done, loaded.output_bytes) == (3, {5}, 10)
+
+
+def test_cli_writes_csv_and_reports_progress(inputs, tmp_path, capsys):
+    output = tmp_path / "profiles.csv"
+    assert (
+        main(["analyze", str(inputs / "a.jsonl"), "-o", str(output), "--workers", "0"])
+        == 0
+    )
+    with open(output, newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    assert [row["id"] for row in rows[:3]] == ["a0", "a1", "a2"]
+    assert rows[0]["salary_min"] == "120000"
+    assert "django" in rows[0]["explicit_skills"].split("; ")
+    assert rows[3]["error"] == "Invalid JSON" and rows[3]["title"] == ""
+    assert "4 analyzed (1 errors)" in capsys.readouterr().err
+
+    assert main(["analyze", str(inputs), "--checkpoint", "ckpt", "-q"]) == 2
+    assert "needs an output file" in capsys.readouterr().err
+
+
+def test_progress_reports_throughput():
+    stream = io.StringIO()
+    progress = Progress(interval=0, stream=stream)
+    progress.add(bulk.Outcome(1, "a", {}, None))
+    progress.add(bulk.Outcome(2, "b", None, "boom"))
+    progress.report()
+    assert stream.getvalue().startswith("2 analyzed (1 errors) in ")
+    assert stream.getvalue().rstrip().endswith("/s")
@@ -0,0 +1,107 @@
+"""Tests for windowed analysis of very large postings."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ajips.app.config import settings
+from ajips.app.services.critique import scan_requirements
+from ajips.app.services.extraction import get_skill_matcher
+from ajips.app.services.normalization import normalize_text
+from ajips.core.chunking import iter_windows
+from ajips.core.pipelines import job_profile, windowed
+
+SECTION = """Position: Senior Full Stack Engineer
+
+We are hiring a platform engineer with deep Python and Go experience.
+Requirements: 12+ years of software engineering, 8 years with Kubernetes,
+machine learning, React, Django, PostgreSQL, Docker and AWS. Junior
+applicants welcome. Bachelor's degree or certification. Remote or office.
+Salary $150,000. Benefits, training and team culture.   Rockstar   ninjas.
+"""
+
+
+def _posting(repeats=40):
+    # Vary the sections so windows see different mixes near their edges
+    return "\n".join(
+        SECTION.replace("Python", "python, node.js" if i % 3 else "Python")
+        + "  " * (i % 4)
+        for i in range(repeats)
+    )
+
+
+def _analyze(text, window_chars=None, workers=0):
+    """Profile ``text`` whole, or in windows of ``window_chars``."""
+    with patch.object(
+        settings, "ANALYSIS_WINDOW_THRESHOLD_CHARS", 0 if window_chars else 10**9
+    ), patch.object(settings, "ANALYSIS_WINDOW_CHARS", window_chars or 1), patch.object(
+        settings, "ANALYSIS_WINDOW_OVERLAP_CHARS", 200
+    ), patch.object(
+        settings, "ANALYSIS_WINDOW_WORKERS", workers
+    ), patch.dict(
+        settings.STAGE_BUDGETS_MS, {"critiques": 0, "quality": 0}
+    ):
+        return job_profile._analyze_text(text).to_dict()
+
+
+def test_windows_partition_text_at_word_starts():
+    text = _posting(5)
+    windows = list(iter_windows(text, size=100, overlap=30))
+    assert len(windows) > 5
+    assert "".join(w.text[w.own_start : w.own_end] for w in windows) == text
+    for window in windows[1:]:
+        # Owned regions start a word; context on each side covers the overlap
+        assert text[window.offset + window.own_start - 1].isspace()
+        assert window.own_start >= 30
+    assert list(iter_windows("", 10, 2))[0].text == ""
+    with pytest.raises(ValueError):
+        list(iter_windows(text, 0, 2))
+
+
+def test_owned_region_scans_merge_to_whole_text_counts():
+    text = normalize_text(_posting(3)).lower()
+    matcher = get_skill_matcher()
+    middle = text.index("machine learning") + 3  # inside a multi-word skill
+    left = matcher.scan(text, 0, middle)
+    right = matcher.scan(text, middle)
+    assert matcher.resolve(left.merge(right)) == matcher.count(text)
+
+    signals = scan_requirements(text, 0, middle).merge(scan_requirements(text, middle))
+    whole = scan_requirements(text)
+    assert signals.present == whole.present
+    assert signals.tech_years == whole.tech_years
+    assert (signals.first_years, signals.max_years) == ("12", 12)
+
+
+@pytest.mark.parametrize("window_chars", [150, 997, 4000])
+def test_windowed_profile_matches_whole_text_profile(window_chars):
+    text = _posting()
+    whole = _analyze(text)
+    assert "python" in whole["explicit_skills"]
+    assert _analyze(text, window_chars) == whole
+
+
+def test_process_pool_windows_match_inline_windows():
+    text = _posting(10)
+    try:
+        assert _analyze(text, 500, workers=2) == _analyze(text, 500)
+    finally:
+        windowed.shutdown_executor()
+
+
+def test_windowed_scan_over_budget_skips_critiques_and_quality():
+    text = _posting()
+    with patch.object(settings, "ANALYSIS_WINDOW_THRESHOLD_CHARS", 0), patch.dict(
+        settings.STAGE_BUDGETS_MS, {"critiques": 1}
+    ), patch.object(windowed, "scan_requirements", side_effect=_slow_scan):
+        profile = job_profile._analyze_text(text)
+    assert profile.skipped_sections == ["critiques", "quality"]
+    assert profile.critiques == []
+    assert "python" in profile.explicit_skills
+
+
+def _slow_scan(text_lower, start, end, deadline):
+    time.sleep(0.002)
+    deadline.check()
+    return scan_requirements(text_lower, start, end)
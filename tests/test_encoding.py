@@ -0,0 +1,172 @@
+"""Tests for content negotiation, compression and pre-encoded cached results."""
+
+import gzip
+import json
+import zlib
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ajips.app.config import settings
+from ajips.app.main import app
+from ajips.core import encoding
+from ajips.core.encoding import (
+    EncodedResult,
+    StreamCompressor,
+    compress,
+    negotiate,
+    negotiate_coding,
+)
+from ajips.core.memo import Memo
+from ajips.core.pipelines import job_profile
+from ajips.core.serialization import ENCODERS, JSON, MSGPACK, NDJSON
+
+POSTING = """Senior Data Engineer
+Requirements:
+- Python, Spark, Airflow and Kafka on AWS
+- 5+ years building batch and streaming pipelines
+Compensation: $150,000 - $180,000 a year.
+"""
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def results():
+    memo = Memo("test.results", 8)
+    with patch.object(job_profile, "_results", memo):
+        yield memo
+
+
+def _analyze(headers=None, text=POSTING):
+    return client.post(
+        "/analyze", json={"job_posting": {"text": text}}, headers=headers
+    )
+
+
+def test_media_type_negotiation():
+    offered = (JSON, NDJSON, MSGPACK)
+    assert negotiate(None, offered) == JSON
+    assert negotiate("*/*", offered) == JSON
+    assert negotiate("application/x-ndjson, application/json;q=0.5", offered) == NDJSON
+    assert negotiate("application/*;q=0.2, application/json;q=0", offered) == NDJSON
+    assert negotiate("application/msgpack", offered) == MSGPACK
+    assert negotiate("text/html", offered) is None
+
+
+def test_coding_negotiation():
+    assert negotiate_coding(None) is None
+    assert negotiate_coding("gzip, deflate", ("zstd", "gzip")) == "gzip"
+    assert negotiate_coding("gzip;q=0.5, zstd", ("zstd", "gzip")) == "zstd"
+    assert negotiate_coding("gzip;q=0", ("gzip",)) is None
+    assert negotiate_coding("*", ("zstd", "gzip")) == "zstd"
+    assert negotiate_coding("br, identity", ("gzip",)) is None
+
+
+def test_stream_compressor_output_decodes_after_every_chunk():
+    lines = [
+        json.dumps({"seq": i, "skills": ["python"] * 20}).encode() for i in range(50)
+    ]
+    compressor = StreamCompressor("gzip")
+    decoder = zlib.decompressobj(31)
+    sent = 0
+    for line in lines:
+        data = compressor.compress(line)
+        sent += len(data)
+        assert decoder.decompress(data) == line
+    sent += len(compressor.finish())
+    assert sent * 4 < sum(map(len, lines))
+    assert gzip.decompress(compress(b"".join(lines), "gzip")) == b"".join(lines)
+
+
+def test_analyze_negotiates_ndjson_and_compresses_large_bodies(results):
+    plain = _analyze({"Accept-Encoding": "identity"})
+    assert plain.headers["content-type"] == JSON
+    assert "content-encoding" not in plain.headers
+    assert "Accept-Encoding" in plain.headers["vary"]
+
+    compressed = _analyze({"Accept-Encoding": "gzip"})
+    assert compressed.headers["content-encoding"] == "gzip"
+    assert compressed.json() == plain.json()
+
+    ndjson = _analyze({"Accept": NDJSON, "Accept-Encoding": "identity"})
+    assert ndjson.headers["content-type"] == NDJSON
+    assert ndjson.content == plain.content + b"\n"
+
+    # Unacceptable types get the default rather than an error
+    assert _analyze({"Accept": "text/html"}).headers["content-type"] == JSON
+
+    with patch.object(settings, "COMPRESSION_MIN_BYTES", len(plain.content) + 1):
+        assert "content-encoding" not in _analyze({"Accept-Encoding": "gzip"}).headers
+    with patch.object(settings, "COMPRESSION_ENABLED", False):
+        assert "content-encoding" not in _analyze({"Accept-Encoding": "gzip"}).headers
+
+
+def test_cached_results_are_served_without_encoding_again(results):
+    runs, encodes = [], []
+    analyze = job_profile._analyze_text
+
+    def counting_analyze(raw_text, resume_text=None):
+        runs.append(raw_text)
+        return analyze(raw_text, resume_text)
+
+    def counting_dumps(value):
+        encodes.append(value)
+        return ENCODERS[NDJSON](value)[:-1]
+
+    with patch.object(job_profile, "_analyze_text", counting_analyze), patch.dict(
+        ENCODERS, {JSON: counting_dumps}
+    ):
+        bodies = [_analyze({"Accept-Encoding": "gzip"}).content for _ in range(3)]
+        assert _analyze({"Accept-Encoding": "identity"}).content == bodies[0]
+        _analyze({"Accept-Encoding": "gzip"}, text=POSTING + "Remote.")
+    assert len(set(bodies)) == 1
+    assert (len(runs), len(encodes)) == (2, 2)
+    assert (results.hits, results.misses) == (3, 2)
+
+
+def test_encoded_result_keeps_each_body():
+    encoded = EncodedResult({"summary": "ok"})
+    assert encoded.body(JSON) is encoded.body(JSON)
+    assert encoded.body(JSON, "gzip") is encoded.body(JSON, "gzip")
+    assert gzip.decompress(encoded.body(JSON, "gzip")) == b'{"summary":"ok"}'
+    with pytest.raises(ValueError):
+        encoded.body(JSON, "br")
+
+
+def test_stream_responses_are_compressed():
+    body = b"".join(
+        json.dumps({"text": POSTING, "id": i}).encode() + b"\n" for i in range(5)
+    )
+    response = client.post(
+        "/analyze/stream", content=body, headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-type"] == NDJSON
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(line["id"] for line in lines) == list(range(5))
+    assert all("python" in line["result"]["explicit_skills"] for line in lines)
+
+
+def test_msgpack_results():
+    msgpack = pytest.importorskip("msgpack")
+    response = _analyze({"Accept": MSGPACK})
+    assert response.headers["content-type"] == MSGPACK
+    assert msgpack.unpackb(response.content) == _analyze().json()
+
+    body = b"".join(
+        json.dumps({"text": POSTING, "id": i}).encode() + b"\n" for i in range(3)
+    )
+    stream = client.post("/analyze/stream", content=body, headers={"Accept": MSGPACK})
+    unpacker = msgpack.Unpacker()
+    unpacker.feed(stream.content)
+    assert sorted(item["id"] for item in unpacker) == [0, 1, 2]
+
+
+def test_zstd_round_trip():
+    zstandard = pytest.importorskip("zstandard")
+    assert encoding.CODINGS[0] == "zstd"
+    body = json.dumps({"skills": ["python"] * 100}).encode()
+    decompressor = zstandard.ZstdDecompressor().decompressobj()
+    assert decompressor.decompress(compress(body, "zstd")) == body
@@ -0,0 +1,111 @@
+"""Cold-start import-time checks and benchmark for the API application.
+
+The application must not import its heavy optional dependencies at startup.
+The timing budgets run with ``pytest -m benchmark`` and use
+``python -X importtime`` in fresh interpreters. Framework modules (FastAPI,
+Starlette, pydantic) are measured separately and subtracted, and what AJIPS
+itself adds is budgeted as a fraction of the framework's own import time
+measured alongside it, taking the median of several runs, so the budget
+holds on slow or loaded machines too. Budgets can be overridden with
+``AJIPS_IMPORT_BUDGET_RATIO`` (AJIPS overhead) and
+``AJIPS_IMPORT_TOTAL_BUDGET_MS`` (whole application).
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, Tuple
+
+import pytest
+
+IMPORT_BUDGET_RATIO = float(os.getenv("AJIPS_IMPORT_BUDGET_RATIO", "0.25"))
+IMPORT_TOTAL_BUDGET_MS = float(os.getenv("AJIPS_IMPORT_TOTAL_BUDGET_MS", "3000"))
+RUNS = 5
+
+FRAMEWORK_IMPORTS = (
+    "import fastapi, fastapi.middleware.cors, fastapi.staticfiles, "
+    "fastapi.responses, pydantic"
+)
+
+# Must only be imported on the code paths that need them
+DEFERRED_MODULES = (
+    "requests",
+    "bs4",
+    "pythonjsonlogger",
+    "numpy",
+    "sklearn",
+    # Routers included lazily (see ajips.app.api.lazy_routes)
+    "ajips.app.api.jobs",
+    "ajips.app.api.postings",
+    "ajips.app.api.trends",
+    "ajips.app.api.salaries",
+)
+
+
+def _import_times(statement: str) -> Dict[str, Tuple[int, int]]:
+    """Map module name to (self_us, cumulative_us) for a fresh interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env={**os.environ, "LOG_FORMAT": "json"},
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+@pytest.fixture(scope="module")
+def import_runs():
+    """(framework, application) import times, measured in alternation."""
+    return [
+        (_import_times(FRAMEWORK_IMPORTS), _import_times("import ajips.app.main"))
+        for _ in range(RUNS)
+    ]
+
+
+@pytest.fixture(scope="module")
+def app_import_runs(import_runs):
+    return [app for _, app in import_runs]
+
+
+def test_heavy_dependencies_are_deferred():
+    imported = set(_import_times("import ajips.app.main"))
+    loaded = [
+        name
+        for name in imported
+        if any(name == mod or name.startswith(mod + ".") for mod in DEFERRED_MODULES)
+    ]
+    assert not loaded, f"Imported at startup: {sorted(loaded)}"
+
+
+@pytest.mark.benchmark
+def test_ajips_import_overhead_within_budget(import_runs):
+    ratios = []
+    for framework, app in import_runs:
+        framework_us = sum(self_us for self_us, _ in framework.values())
+        overhead_us = sum(
+            self_us for name, (self_us, _) in app.items() if name not in framework
+        )
+        ratios.append(overhead_us / framework_us)
+    ratio = statistics.median(ratios)
+    assert ratio <= IMPORT_BUDGET_RATIO, (
+        f"AJIPS adds {ratio:.0%} to the framework's import time "
+        f"(budget {IMPORT_BUDGET_RATIO:.0%})"
+    )
+
+
+@pytest.mark.benchmark
+def test_total_import_time_within_budget(app_import_runs):
+    total_ms = min(run["ajips.app.main"][1] for run in app_import_runs) / 1000
+    assert total_ms <= IMPORT_TOTAL_BUDGET_MS, (
+        f"Importing ajips.app.main took {total_ms:.1f} ms "
+        f"(budget {IMPORT_TOTAL_BUDGET_MS:.0f} ms)"
+    )
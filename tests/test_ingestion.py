@@ -60,7 +60,7 @@ def test_fetch_job_posting_valid_url(mock_is_safe, mock_get):
     mock_response.text = "<html><body><h1>Job Title</h1><p>desc</p></body></html>"
     mock_get.return_value = mock_response
     result = fetch_job_posting("https://example.com/job")
-    assert result == "Job Title desc"
+    assert result == "Job Title\ndesc"
     mock_get.assert_called_once_with("https://example.com/job", timeout=10)
 
 
@@ -90,3 +90,28 @@ def test_fetch_job_posting_empty_content(mock_is_safe, mock_get):
     mock_get.return_value = mock_response
     result = fetch_job_posting("https://example.com/empty")
     assert result is None
+
+
+@patch("ajips.app.services.ingestion.requests.get")
+@patch("ajips.app.services.ingestion._is_safe_url")
+def test_fetched_pages_keep_their_sections(mock_is_safe, mock_get):
+    from fastapi.testclient import TestClient
+
+    from ajips.app.main import app
+
+    mock_is_safe.return_value = True
+    mock_response = MagicMock()
+    mock_response.text = (
+        "<html><body><h1>Backend Engineer</h1>"
+        "<p>About us: we run <b>Kubernetes</b> and Terraform at scale.</p>"
+        "<h2>Requirements</h2><ul><li>5+ years of Python</li>"
+        "<li>Django and PostgreSQL</li></ul>"
+        "<h2>Benefits</h2><p>Free React workshops.<br>Remote.</p></body></html>"
+    )
+    mock_get.return_value = mock_response
+    response = TestClient(app).post(
+        "/analyze", json={"job_posting": {"url": "https://example.com/jobs/sections"}}
+    )
+    assert response.status_code == 200
+    # Only the requirements section counts towards the posting's skills
+    assert response.json()["explicit_skills"] == ["python", "django", "postgresql"]
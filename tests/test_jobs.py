@@ -0,0 +1,166 @@
+"""Tests for the persistent batch job queue and /jobs endpoints."""
+
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ajips.app.api import dependencies
+from ajips.core import jobs
+from ajips.core.jobs import JOB_CANCELLED, JOB_COMPLETED, JobQueue
+
+POSTING = (
+    "Senior Python Engineer\n"
+    "Requirements:\n- 5+ years of Python and Django\n- Experience with AWS\n"
+    "Responsibilities:\n- Build APIs\n"
+)
+
+
+@pytest.fixture
+def job_queue(tmp_path):
+    job_queue = JobQueue(
+        str(tmp_path / "jobs.sqlite3"), workers=2, executor="thread", poll_interval=0.02
+    )
+    yield job_queue
+    job_queue.stop()
+
+
+def _wait_for(job_queue, job_id, status, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = job_queue.get(job_id)
+        if job["status"] == status:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not reach {status}: {job}")
+
+
+def test_submit_poll_and_stream(job_queue):
+    from ajips.core.pipelines import job_profile
+
+    analyze_record = job_profile.analyze_record
+
+    def flaky_analyze(record):
+        if record["text"] == "boom":
+            raise ValueError("boom")
+        return analyze_record(record)
+
+    job_queue.start()
+    with patch.object(job_profile, "analyze_record", flaky_analyze):
+        job_id = job_queue.submit(
+            [{"text": POSTING, "id": "a"}, {"text": POSTING}, {"text": "boom"}]
+        )
+        job = _wait_for(job_queue, job_id, JOB_COMPLETED)
+    assert (job["total"], job["completed"], job["failed"]) == (3, 2, 1)
+
+    lines = [json.loads(line) for line in job_queue.iter_results(job_id)]
+    assert sorted(line["seq"] for line in lines) == [1, 2, 3]
+    by_seq = {line["seq"]: line for line in lines}
+    assert by_seq[1]["id"] == "a"
+    assert "python" in by_seq[1]["result"]["explicit_skills"]
+    assert by_seq[3]["error"] == "boom"
+    assert list(job_queue.iter_results(job_id, skip=2)) == [json.dumps(lines[2])]
+    assert list(job_queue.iter_results(job_id, skip=5)) == []
+
+
+def test_submit_rejects_invalid_batches(job_queue):
+    with pytest.raises(ValueError):
+        job_queue.submit([])
+    with pytest.raises(ValueError):
+        job_queue.submit([{"resume_text": "no posting"}])
+    job_queue.max_items = 2
+    with pytest.raises(ValueError):
+        job_queue.submit({"text": POSTING} for _ in range(3))
+
+
+def test_interrupted_items_resume_after_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    first = JobQueue(path, workers=1, executor="thread")
+    job_id = first.submit([{"text": POSTING}, {"text": POSTING}])
+    # Simulate a dispatcher that claimed an item and then died
+    with first._pool.transaction() as conn:
+        conn.execute("UPDATE items SET status = 'running' WHERE seq = 1")
+
+    second = JobQueue(path, workers=1, executor="thread", poll_interval=0.02)
+    second.start()
+    try:
+        job = _wait_for(second, job_id, JOB_COMPLETED)
+        assert job["completed"] == 2
+        assert len(list(second.iter_results(job_id, follow=False))) == 2
+    finally:
+        second.stop()
+
+
+_run_item = jobs._run_item
+
+
+def _exit_on_crash(payload):
+    if json.loads(payload)["text"] == "crash":
+        os._exit(1)
+    return _run_item(payload)
+
+
+def test_dispatcher_survives_a_dead_pool_process(tmp_path):
+    # Pool processes are forked after the patch, so they run it too
+    with patch.object(jobs, "_run_item", _exit_on_crash):
+        job_queue = JobQueue(
+            str(tmp_path / "jobs.sqlite3"), workers=1, poll_interval=0.02
+        )
+        job_queue.start()
+        try:
+            crashed = job_queue.submit([{"text": "crash"}])
+            job = _wait_for(job_queue, crashed, JOB_COMPLETED)
+            assert (job["completed"], job["failed"]) == (0, 1)
+
+            job_id = job_queue.submit([{"text": POSTING}, {"text": POSTING}])
+            job = _wait_for(job_queue, job_id, JOB_COMPLETED)
+            assert (job["completed"], job["failed"]) == (2, 0)
+            assert job_queue._thread.is_alive()
+        finally:
+            job_queue.stop()
+
+
+def test_cancel_skips_pending_items(job_queue):
+    job_id = job_queue.submit([{"text": POSTING}] * 5)
+    job = job_queue.cancel(job_id)
+    assert job["status"] == JOB_CANCELLED
+    job_queue.start()
+    time.sleep(0.2)
+    assert job_queue.get(job_id)["completed"] == 0
+    assert list(job_queue.iter_results(job_id)) == []
+    assert job_queue.cancel("missing") is None
+
+
+def test_jobs_api(job_queue):
+    from ajips.app.main import app
+
+    job_queue.start()
+    with patch.object(dependencies, "_job_queue", job_queue):
+        client = TestClient(app)
+        response = client.post("/jobs", json={"texts": [POSTING, POSTING]})
+        assert response.status_code == 202
+        job_id = response.json()["id"]
+        assert response.headers["location"] == f"/jobs/{job_id}"
+
+        response = client.get(f"/jobs/{job_id}/results")
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert len(response.text.splitlines()) == 2
+        assert client.get(f"/jobs/{job_id}").json()["status"] == JOB_COMPLETED
+
+        upload = "\n".join(json.dumps({"text": POSTING}) for _ in range(3))
+        response = client.post(
+            "/jobs/upload", files={"file": ("postings.jsonl", upload.encode())}
+        )
+        assert response.status_code == 202
+        assert response.json()["total"] == 3
+
+        response = client.post(
+            "/jobs/upload", files={"file": ("bad.jsonl", b'{"text": "x"}\n{oops')}
+        )
+        assert response.status_code == 400
+        assert client.post("/jobs", json={}).status_code == 400
+        assert client.get("/jobs/missing").status_code == 404
+        assert client.delete("/jobs/missing").status_code == 404
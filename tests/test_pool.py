@@ -0,0 +1,36 @@
+"""Tests for chunked process-pool fan-out."""
+
+import itertools
+
+from ajips.core.pool import chunked, imap_chunks
+
+
+def _total(chunk):
+    return sum(chunk)
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+    assert list(chunked([], 3)) == []
+
+
+def test_imap_chunks_in_order_and_as_completed():
+    results = list(imap_chunks(_total, range(10), workers=2, chunksize=3))
+    assert results == [([0, 1, 2], 3), ([3, 4, 5], 12), ([6, 7, 8], 21), ([9], 9)]
+    unordered = imap_chunks(_total, range(10), workers=2, chunksize=3, ordered=False)
+    assert sorted(results) == sorted(unordered)
+
+
+def test_imap_chunks_reads_ahead_at_most_two_chunks_per_worker():
+    consumed = []
+
+    def stream():
+        for n in itertools.count():
+            consumed.append(n)
+            yield n
+
+    results = imap_chunks(_total, stream(), workers=2, chunksize=5)
+    assert next(results) == ([0, 1, 2, 3, 4], 10)
+    # Four chunks were submitted before the first result was taken
+    assert len(consumed) <= 4 * 5 + 1
+    results.close()
@@ -0,0 +1,161 @@
+"""Tests and benchmark for the single pass behind skills, interview stages and salary.
+
+The benchmark (``pytest -m benchmark``) scans ``AJIPS_SCAN_BENCH_DOCS``
+postings (200 by default) with the skill matcher and with the separate
+passes it replaced (one regex per multi-word skill, a substring search per
+interview keyword and the salary scanner); the single pass must be faster.
+"""
+
+import os
+import random
+import re
+import time
+
+import pytest
+
+from ajips.app.services.constants import INTERVIEW_STAGES
+from ajips.app.services.enhanced_extraction import extract_interview_stages
+from ajips.app.services.extraction import (
+    ALL_SKILLS,
+    MULTI_WORD_SKILLS,
+    SkillMatcher,
+    get_skill_matcher,
+    scan_posting,
+)
+from ajips.app.services.salary import find_salary
+from ajips.core.pipelines import job_profile
+
+BENCH_DOCS = int(os.getenv("AJIPS_SCAN_BENCH_DOCS", "200"))
+
+POSTING = """Senior Backend Engineer
+About us: a data science team of 40 building machine learning products.
+Requirements:
+- Machine learning and deep learning in production, big data pipelines
+- Microservices architecture, rest api design and continuous integration
+- Python, Kubernetes and PostgreSQL
+Interview process: phone screen, coding challenge, system design and onsite.
+Compensation: $140,000 - $170,000 a year.
+"""
+
+
+def _separate_passes(text):
+    """Skills, stages and salary the way they were found before."""
+    text_lower = text.lower()
+    phrases = {}
+    for skill in MULTI_WORD_SKILLS:
+        matches = len(re.findall(r"\b" + re.escape(skill) + r"\b", text_lower))
+        if matches:
+            phrases[skill] = matches
+    stages = [
+        stage
+        for stage, keywords in INTERVIEW_STAGES.items()
+        if any(keyword in text_lower for keyword in keywords)
+    ]
+    return phrases, stages, find_salary(text)
+
+
+def test_phrase_counts_match_one_pattern_per_skill():
+    rng = random.Random(3)
+    words = [w for phrase in MULTI_WORD_SKILLS for w in phrase.split()]
+    words += ["architecture", "design", "phone", "screen", "and", "the"]
+    matcher = SkillMatcher(MULTI_WORD_SKILLS, ALL_SKILLS)
+    for _ in range(50):
+        text = " ".join(rng.choice(words) for _ in range(300))
+        phrases, _, _ = _separate_passes(text)
+        assert matcher.scan(text).phrases == phrases
+
+
+def test_stages_and_salary_come_from_the_whole_posting():
+    text = POSTING.lower()
+    skills_start = text.index("requirements")
+    skills_end = text.index("interview process")
+    scan = scan_posting(POSTING, [(skills_start, skills_end)])
+    matcher = get_skill_matcher()
+
+    # Only the requirements count for skills ("data science" is in About us)
+    assert "machine learning" in matcher.resolve(scan)
+    assert "data science" not in matcher.resolve(scan)
+    assert matcher.interview_stages(scan) == [
+        "phone",
+        "technical",
+        "system_design",
+        "behavioral",
+    ]
+    assert [(s.min, s.max) for s in scan.salaries] == [(140_000, 170_000)]
+
+
+def test_stage_keywords_match_whole_words():
+    assert extract_interview_stages("Our designers code on their phones")["stages"] == [
+        "technical"
+    ]
+    assert extract_interview_stages("Phone screen, then a final round")["stages"] == [
+        "phone",
+        "behavioral",
+    ]
+
+
+def test_salary_range_split_between_scans_is_kept():
+    text = "pay: $90,000 - $120,000 a year. python"
+    matcher = get_skill_matcher()
+    middle = text.index("$120")
+    left = matcher.scan(text, 0, middle)
+    right = matcher.scan(text, middle)
+    assert [(s.min, s.max) for s in left.merge(right).salaries][0] == (
+        90_000,
+        120_000,
+    )
+
+
+def test_profile_reports_salary_stages_and_quality():
+    profile = job_profile._analyze_text(POSTING)
+    assert profile.salary_range == {
+        "min": 140_000,
+        "max": 170_000,
+        "currency": "USD",
+        "period": "year",
+    }
+    assert profile.interview_stages == [
+        "phone",
+        "technical",
+        "system_design",
+        "behavioral",
+    ]
+    assert 0 < profile.quality_score <= 100
+    assert job_profile._analyze_text("Nothing to see").salary_range is None
+
+
+def _docs(count):
+    rng = random.Random(7)
+    lines = POSTING.splitlines()
+    return [" ".join(rng.sample(lines, len(lines)) * 4) for _ in range(count)]
+
+
+def test_single_pass_matches_separate_passes():
+    matcher = SkillMatcher(MULTI_WORD_SKILLS, ALL_SKILLS, None, INTERVIEW_STAGES)
+    for doc in _docs(10):
+        scan = matcher.scan(doc.lower())
+        phrases, stages, salary = _separate_passes(doc)
+        assert scan.phrases == phrases
+        assert matcher.interview_stages(scan) == stages
+        assert (scan.salaries[0].min, scan.salaries[0].max) == (salary.min, salary.max)
+
+
+@pytest.mark.benchmark
+def test_single_pass_outpaces_separate_passes():
+    docs = _docs(BENCH_DOCS)
+    matcher = SkillMatcher(MULTI_WORD_SKILLS, ALL_SKILLS, None, INTERVIEW_STAGES)
+
+    def single_pass(doc):
+        matcher.scan(doc.lower(), spans=())
+
+    best = {single_pass: float("inf"), _separate_passes: float("inf")}
+    for _ in range(5):
+        for scan in best:
+            started = time.perf_counter()
+            for doc in docs:
+                scan(doc)
+            best[scan] = min(best[scan], time.perf_counter() - started)
+    assert best[single_pass] < best[_separate_passes], (
+        f"single pass {best[single_pass]:.3f}s, "
+        f"separate passes {best[_separate_passes]:.3f}s"
+    )
@@ -0,0 +1,162 @@
+"""Unit tests for the shared token-bucket rate limiter."""
+
+import multiprocessing
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ajips.app.api import dependencies
+from ajips.core.encoding import EncodedResult
+from ajips.core.rate_limit import (
+    MemoryBucketStore,
+    RateLimiter,
+    RateLimitExceeded,
+    SQLiteBucketStore,
+    client_address,
+    create_bucket_store,
+    parse_rate,
+)
+
+
+def test_parse_rate():
+    assert parse_rate("30/minute") == (30.0, 0.5)
+    assert parse_rate("5 per hour") == (5.0, 5 / 3600)
+    assert parse_rate("10/seconds") == (10.0, 10.0)
+    with pytest.raises(ValueError):
+        parse_rate("30/fortnight")
+    with pytest.raises(ValueError):
+        parse_rate("lots")
+
+
+def test_memory_bucket_exhausts_and_reports_retry_after():
+    limiter = RateLimiter(MemoryBucketStore(), {"analyze": "3/minute"})
+    for _ in range(3):
+        limiter.hit("analyze", "1.2.3.4")
+    with pytest.raises(RateLimitExceeded) as exc_info:
+        limiter.hit("analyze", "1.2.3.4")
+    assert 0 < exc_info.value.retry_after <= 20
+    # Other clients and other budgets keep their own buckets
+    limiter.hit("analyze", "5.6.7.8")
+
+
+def test_separate_budgets():
+    limiter = RateLimiter(
+        MemoryBucketStore(), {"analyze": "2/minute", "batch": "1/minute"}
+    )
+    limiter.hit("batch", "client")
+    with pytest.raises(RateLimitExceeded):
+        limiter.hit("batch", "client")
+    limiter.hit("analyze", "client")
+    limiter.hit("analyze", "client")
+
+
+def test_bucket_refills_over_time():
+    store = MemoryBucketStore()
+    with patch("ajips.core.rate_limit.time.time", return_value=1000.0):
+        assert store.consume("k", 1, 1.0)[0]
+        assert not store.consume("k", 1, 1.0)[0]
+    with patch("ajips.core.rate_limit.time.time", return_value=1001.0):
+        assert store.consume("k", 1, 1.0)[0]
+
+
+def test_memory_store_prunes_full_buckets():
+    store = MemoryBucketStore(max_keys=10)
+    with patch("ajips.core.rate_limit.time.time", return_value=1000.0):
+        for i in range(10):
+            store.consume(f"client-{i}", 5, 1.0)
+    with patch("ajips.core.rate_limit.time.time", return_value=2000.0):
+        store.consume("client-new", 5, 1.0)
+    assert len(store._buckets) == 1
+
+
+def test_memory_store_judges_buckets_by_their_own_budget():
+    store = MemoryBucketStore(max_keys=2)
+    with patch("ajips.core.rate_limit.time.time", return_value=1000.0):
+        store.consume("batch:a", 1, 1 / 3600)  # full again in an hour
+        store.consume("analyze:b", 100, 100.0)  # full again in a second
+    with patch("ajips.core.rate_limit.time.time", return_value=1010.0):
+        store.consume("analyze:c", 100, 100.0)
+    assert list(store._buckets) == ["batch:a", "analyze:c"]
+    with patch("ajips.core.rate_limit.time.time", return_value=1010.0):
+        assert not store.consume("batch:a", 1, 1 / 3600)[0]
+
+
+def test_memory_store_evicts_least_recently_used_between_prunes():
+    store = MemoryBucketStore(max_keys=3)
+    with patch("ajips.core.rate_limit.time.time", return_value=1000.0):
+        for i in range(4):
+            store.consume(f"client-{i}", 5, 1.0)
+        store.consume("client-1", 5, 1.0)
+        store.consume("client-4", 5, 1.0)
+    # Nothing was full; the scan ran once and the oldest buckets were dropped
+    assert list(store._buckets) == ["client-3", "client-1", "client-4"]
+    assert store._next_prune == store._PRUNE_EVERY + 4
+
+
+def _hit_sqlite(path, results):
+    store = SQLiteBucketStore(path)
+    allowed = sum(store.consume("shared", 10, 0.001)[0] for _ in range(10))
+    results.put(allowed)
+
+
+def test_sqlite_store_is_shared_between_processes(tmp_path):
+    path = str(tmp_path / "buckets.sqlite3")
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    workers = [ctx.Process(target=_hit_sqlite, args=(path, results)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+    total = sum(results.get(timeout=5) for _ in workers)
+    assert total == 10
+
+
+def test_create_bucket_store(tmp_path):
+    assert isinstance(create_bucket_store("memory"), MemoryBucketStore)
+    store = create_bucket_store("sqlite", str(tmp_path))
+    assert store.path == str(tmp_path / "ratelimit.sqlite3")
+    store = create_bucket_store(f"sqlite:///{tmp_path}/other.db")
+    assert store.path.endswith("other.db")
+    with pytest.raises(ValueError):
+        create_bucket_store("memcached://localhost")
+
+
+def test_client_address_trusts_only_configured_proxies():
+    # No trusted proxies: header is client-controlled and ignored
+    assert client_address("10.0.0.2", "203.0.113.9", 0) == "10.0.0.2"
+    # One proxy (nginx): the last hop is the address nginx saw
+    assert client_address("10.0.0.2", "198.51.100.1, 203.0.113.9", 1) == "203.0.113.9"
+    assert client_address("10.0.0.2", "198.51.100.1, 203.0.113.9", 2) == "198.51.100.1"
+    # Malformed entries fall back to the peer address
+    assert client_address("10.0.0.2", "not-an-ip", 1) == "10.0.0.2"
+    assert client_address(None, None, 1) == "unknown"
+
+
+@patch("ajips.app.api.routes.analyze_encoded")
+def test_analyze_endpoint_returns_429_with_retry_after(mock_build):
+    from ajips.app.main import app
+
+    mock_build.return_value = EncodedResult({"summary": "ok"})
+    limiter = RateLimiter(
+        MemoryBucketStore(), {"analyze": "2/minute", "batch": "1/minute"}
+    )
+    client = TestClient(app)
+    with patch.object(dependencies, "_limiter", limiter), patch.object(
+        dependencies.settings, "TRUSTED_PROXY_COUNT", 1
+    ):
+        payload = {"job_posting": {"text": "Test job"}}
+        headers = {"X-Forwarded-For": "203.0.113.7"}
+        for _ in range(2):
+            response = client.post("/analyze", json=payload, headers=headers)
+            assert response.status_code == 200
+        assert response.headers["X-RateLimit-Limit"] == "2"
+        response = client.post("/analyze", json=payload, headers=headers)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+        # A different client behind the same proxy has its own bucket
+        other = client.post(
+            "/analyze", json=payload, headers={"X-Forwarded-For": "203.0.113.8"}
+        )
+        assert other.status_code == 200
@@ -0,0 +1,151 @@
+"""Tests and benchmark for the result records and their serialization.
+
+The benchmark (``pytest -m benchmark``) builds and encodes
+``AJIPS_RESULT_BENCH_DOCS`` profiles (500 by default) as records and as the
+pydantic models FastAPI used to validate and encode; records must take less
+time and allocate less per document.
+"""
+
+import json
+import os
+import time
+import tracemalloc
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ajips.app.api import schemas
+from ajips.app.main import app
+from ajips.core import serialization
+from ajips.core.pipelines import job_profile
+from ajips.core.results import CritiqueItem, FocusArea, JobProfile
+from ajips.core.serialization import dumps
+
+BENCH_DOCS = int(os.getenv("AJIPS_RESULT_BENCH_DOCS", "500"))
+
+POSTING = """Senior Backend Engineer
+Requirements:
+- Entry level role with 5+ years of Python, Kubernetes and PostgreSQL
+- Machine learning, REST API design and continuous integration
+Interview process: phone screen, coding challenge and onsite.
+Compensation: €90,000 - €110,000 a year. Remote.
+"""
+
+
+def _profile():
+    return job_profile._analyze_text(POSTING, "Python and Go developer")
+
+
+def test_encoded_profiles_match_the_response_schema():
+    profile = _profile()
+    assert profile.focus_areas and profile.critiques and profile.salary_range
+    encoded = json.loads(dumps(profile))
+    assert encoded == profile.to_dict()
+    validated = schemas.AnalyzeResponse.model_validate(encoded)
+    assert validated.model_dump(mode="json") == encoded
+
+
+def test_standard_library_fallback_encodes_the_same():
+    profile = _profile()
+    with patch.object(serialization, "orjson", None):
+        fallback = dumps(profile)
+    assert json.loads(fallback) == json.loads(dumps(profile))
+    value = {"pay": "€90k", "areas": [FocusArea("Backend", 0.5, ["python"])]}
+    with patch.object(serialization, "orjson", None):
+        fallback = dumps(value)
+    assert fallback == dumps(value)
+    assert fallback.decode("utf-8").startswith('{"pay":"€90k"')
+
+
+def test_records_compare_by_value():
+    area = FocusArea(name="Backend", weight=0.5, skills=["python"])
+    assert area == FocusArea("Backend", 0.5, ["python"])
+    assert area != FocusArea("Backend", 0.5, ["go"])
+    assert area != CritiqueItem("info", "Backend")
+    assert repr(area) == "FocusArea(name='Backend', weight=0.5, skills=['python'])"
+    profile = JobProfile(summary="s")
+    assert profile.to_dict() == schemas.AnalyzeResponse(summary="s").model_dump()
+
+
+def test_analyze_endpoint_returns_the_encoded_profile():
+    client = TestClient(app)
+    payload = {
+        "job_posting": {"text": POSTING},
+        "resume_text": "Python and Go developer",
+    }
+    response = client.post("/analyze", json=payload)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == _profile().to_dict()
+    # The schema is still documented
+    operation = client.get("/openapi.json").json()["paths"]["/analyze"]["post"]
+    assert operation["responses"]["200"]["content"]["application/json"]["schema"] == {
+        "$ref": "#/components/schemas/AnalyzeResponse"
+    }
+
+
+def _pydantic_path(data):
+    # Models built in the pipeline, then FastAPI's response_model handling:
+    # dump, validate against the model again and encode
+    model = schemas.AnalyzeResponse(
+        **dict(
+            data,
+            focus_areas=[schemas.FocusArea(**area) for area in data["focus_areas"]],
+            critiques=[schemas.CritiqueItem(**item) for item in data["critiques"]],
+        )
+    )
+    validated = schemas.AnalyzeResponse.model_validate(model.model_dump())
+    return json.dumps(
+        validated.model_dump(mode="json"), ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def _record_path(data):
+    return dumps(
+        JobProfile(
+            **dict(
+                data,
+                focus_areas=[FocusArea(**area) for area in data["focus_areas"]],
+                critiques=[CritiqueItem(**item) for item in data["critiques"]],
+            )
+        )
+    )
+
+
+def test_records_encode_like_models():
+    data = _profile().to_dict()
+    assert json.loads(_record_path(data)) == json.loads(_pydantic_path(data))
+
+
+@pytest.mark.benchmark
+def test_records_outpace_models_per_document():
+    data = _profile().to_dict()
+
+    seconds = {_pydantic_path: float("inf"), _record_path: float("inf")}
+    for _ in range(3):
+        for build in seconds:
+            started = time.perf_counter()
+            for _ in range(BENCH_DOCS):
+                build(data)
+            seconds[build] = min(seconds[build], time.perf_counter() - started)
+
+    allocated = {}
+    for build in seconds:
+        tracemalloc.start()
+        try:
+            for _ in range(BENCH_DOCS):
+                build(data)
+            allocated[build] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    report = {
+        build.__name__: (
+            f"{seconds[build] / BENCH_DOCS * 1e6:.1f} us/doc",
+            f"{allocated[build]} B peak",
+        )
+        for build in seconds
+    }
+    assert seconds[_record_path] < seconds[_pydantic_path], report
+    assert allocated[_record_path] < allocated[_pydantic_path], report
@@ -0,0 +1,150 @@
+"""Tests and throughput benchmark for the salary scanner.
+
+The benchmarks (``pytest -m benchmark``) check that scan time grows linearly
+on adversarial input, and scan ``AJIPS_SALARY_BENCH_DOCS`` postings (200 by
+default) with the scanner and with the regex chain it replaced; the scanner
+must be at least as fast.
+"""
+
+import os
+import re
+import time
+
+import pytest
+
+from ajips.app.services.enhanced_extraction import extract_salary_range
+from ajips.app.services.salary import find_salary, parse_number, scan_salaries
+
+BENCH_DOCS = int(os.getenv("AJIPS_SALARY_BENCH_DOCS", "200"))
+
+# The patterns extract_salary_range used to try one after another
+REGEX_CHAIN = [
+    r"\$?(\d+(?:,\d{3})*)k\s*(?:to|-|–)\s*\$?(\d+(?:,\d{3})*)k",
+    r"\$?(\d+(?:,\d{3})*)k",
+    r"\$(\d+(?:,\d{3})*(?:\.\d{2})?)\s*(?:to|-|–)\s*\$?(\d+(?:,\d{3})*(?:\.\d{2})?)",
+    r"\$(\d+(?:,\d{3})*(?:\.\d{2})?)",
+]
+
+POSTING = """Senior Backend Engineer (Remote, 2024)
+About us: founded in 2015, 250 employees in 12 countries, 40 million users.
+Responsibilities:
+- Design APIs handling 10,000 requests per second with p99 under 50 ms
+- Own services in Python 3.11 and Go 1.22 on Kubernetes 1.29
+Requirements:
+- 5+ years of experience, 2-3 years with distributed systems
+Benefits: 25 days of vacation, 401(k) matching up to 4%, $1,500 learning budget.
+"""
+
+
+def _regex_chain(text):
+    text_lower = text.lower()
+    for pattern in REGEX_CHAIN:
+        matches = re.findall(pattern, text_lower, re.IGNORECASE)
+        if matches:
+            return matches[0]
+    return None
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("$50,000 to $100,000 per year", (50_000, 100_000, "USD", "year")),
+        ("Salary range: 50k-100k", (50_000, 100_000, "USD", "year")),
+        ("$50-60k", (50_000, 60_000, "USD", "year")),
+        ("150K-180K USD", (150_000, 180_000, "USD", "year")),
+        ("CA$90k–110k", (90_000, 110_000, "CAD", "year")),
+        ("salary EUR 120.000 to 140.000", (120_000, 140_000, "EUR", "year")),
+        ("120.000 - 140.000 € p.a.", (120_000, 140_000, "EUR", "year")),
+        ("£60,000 - £70,000 gross per year", (60_000, 70_000, "GBP", "year")),
+        ("₹25,00,000 per annum", (2_500_000, 2_500_000, "INR", "year")),
+        ("$45 - $55 per hour", (93_600, 114_400, "USD", "hour")),
+        ("Hourly rate: $45-55", (93_600, 114_400, "USD", "hour")),
+        ("€50/h", (104_000, 104_000, "EUR", "hour")),
+        ("$300 a day", (78_000, 78_000, "USD", "day")),
+        ("$1,500/week", (78_000, 78_000, "USD", "week")),
+        ("€4.500 monthly", (54_000, 54_000, "EUR", "month")),
+        ("Up to $1.2M annually", (1_200_000, 1_200_000, "USD", "year")),
+    ],
+)
+def test_salaries_are_normalized_to_annual_figures(text, expected):
+    salary = find_salary(f"Compensation. {text}. Apply now")
+    assert (salary.min, salary.max, salary.currency, salary.period) == expected
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Timeline: 2-3 weeks, 4 rounds",
+        "We have 10k users",
+        "401k matching",
+        "We raised $20M in our Series B",
+        "Python 3.11, h264, v2.0",
+        "$5 coffee vouchers",
+    ],
+)
+def test_other_figures_are_not_salaries(text):
+    assert find_salary(text) is None
+
+
+def test_ranges_are_preferred_and_offsets_reported():
+    text = "Learning budget of $1,500. Base pay: $120,000 - $150,000 plus equity."
+    first, second = scan_salaries(text)
+    assert (first.min, first.max) == (1_500, 1_500)
+    assert text[second.start : second.end] == "$120,000 - $150,000"
+    assert find_salary(text) == second
+    assert extract_salary_range(text) == {
+        "min": 120_000,
+        "max": 150_000,
+        "currency": "USD",
+        "period": "year",
+    }
+
+
+def test_number_formats():
+    assert parse_number("120,000") == 120_000
+    assert parse_number("50.000") == 50_000
+    assert parse_number("1.234,56") == 1234.56
+    assert parse_number("5,00,000") == 500_000
+    assert parse_number("1.5") == 1.5
+    assert parse_number("1,2,3") is None
+    assert parse_number("1" * 50) is None
+
+
+@pytest.mark.benchmark
+def test_scan_time_is_linear_in_adversarial_input():
+    # A long run of digits sends the old regex chain into quadratic
+    # backtracking (seconds for 5,000 digits); the scanner stays linear.
+    def best(text):
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            list(scan_salaries(text))
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    for unit in ("1", "$1 - ", "1,000k "):
+        small, large = best(unit * 2_500), best(unit * 10_000)
+        assert large < 8 * small + 0.01, unit
+
+
+@pytest.mark.benchmark
+def test_scanner_outpaces_the_regex_chain():
+    docs = [
+        POSTING * 3 + f"Compensation: ${100 + i % 50},000 - ${150 + i % 50},000 a year."
+        for i in range(BENCH_DOCS)
+    ]
+    assert all(_regex_chain(doc) for doc in docs)
+    assert all(find_salary(doc) for doc in docs)
+
+    best = {_regex_chain: float("inf"), find_salary: float("inf")}
+    for _ in range(5):
+        for scan in best:
+            started = time.perf_counter()
+            for doc in docs:
+                scan(doc)
+            best[scan] = min(best[scan], time.perf_counter() - started)
+    megabytes = sum(map(len, docs)) / 1e6
+    assert best[find_salary] <= best[_regex_chain], (
+        f"scanner {megabytes / best[find_salary]:.1f} MB/s, "
+        f"regex chain {megabytes / best[_regex_chain]:.1f} MB/s"
+    )
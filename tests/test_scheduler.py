@@ -0,0 +1,146 @@
+"""Tests for admission control and priority scheduling."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ajips.app.api import dependencies
+from ajips.app.main import app
+from ajips.core.jobs import JOB_COMPLETED, JobQueue
+from ajips.core.scheduler import (
+    BACKGROUND,
+    BATCH,
+    INTERACTIVE,
+    AdmissionController,
+    Overloaded,
+)
+
+
+def _queued(controller, priority, count):
+    deadline = time.time() + 5
+    while controller.stats()["queued"][priority] < count:
+        assert time.time() < deadline
+        time.sleep(0.001)
+
+
+def test_freed_slots_go_to_the_highest_priority_waiter():
+    controller = AdmissionController(initial_limit=1, max_limit=1)
+    order = []
+
+    def worker(priority):
+        with controller.admit(priority):
+            order.append(priority)
+
+    with controller.admit(INTERACTIVE):
+        threads = []
+        for priority in (BACKGROUND, BATCH, INTERACTIVE):
+            thread = threading.Thread(target=worker, args=(priority,))
+            thread.start()
+            _queued(controller, priority, 1)
+            threads.append(thread)
+    for thread in threads:
+        thread.join(5)
+    assert order == [INTERACTIVE, BATCH, BACKGROUND]
+
+
+def test_full_queue_sheds_with_retry_after():
+    controller = AdmissionController(initial_limit=1, max_limit=1, queue_size=1)
+    with controller.admit(INTERACTIVE):
+        waiter = threading.Thread(
+            target=lambda: controller.admit(BATCH).__enter__(), daemon=True
+        )
+        waiter.start()
+        _queued(controller, BATCH, 1)
+        with pytest.raises(Overloaded) as exc_info:
+            with controller.admit(BATCH):
+                pass
+        assert exc_info.value.retry_after >= 1
+        # Other classes have their own queues
+        controller.check(INTERACTIVE)
+    assert controller.stats()["shed"][BATCH] == 1
+
+
+def test_queueing_delay_over_target_sheds_bulk_but_not_interactive():
+    controller = AdmissionController(
+        initial_limit=1, max_limit=1, max_wait={BATCH: 0.05}, target_delay=0.01
+    )
+    with controller.admit(INTERACTIVE):
+        with pytest.raises(Overloaded):
+            with controller.admit(BATCH):
+                pass
+        assert controller.stats()["overloaded"]
+        # While overloaded, bulk work that would queue is rejected at once...
+        started = time.monotonic()
+        with pytest.raises(Overloaded):
+            controller.check(BACKGROUND)
+        assert time.monotonic() - started < 0.05
+        # ...while interactive requests still queue
+        controller.check(INTERACTIVE)
+
+
+def test_limit_adapts_to_latency():
+    controller = AdmissionController(initial_limit=4, max_limit=16)
+    for _ in range(200):
+        for _ in range(controller.limit):
+            assert controller.try_acquire(BATCH)
+        for _ in range(controller.limit):
+            controller.release(0.01)
+    grown = controller.limit
+    assert grown > 4
+
+    for _ in range(50):
+        assert controller.try_acquire(BATCH)
+        controller.release(0.5)
+        time.sleep(0.011)
+    assert controller.limit < grown
+
+
+def test_analyze_returns_503_when_shed():
+    controller = AdmissionController(initial_limit=1, max_limit=1, queue_size=0)
+    with patch.object(dependencies, "_admission", controller):
+        client = TestClient(app)
+        with controller.admit(INTERACTIVE):
+            response = client.post(
+                "/analyze", json={"job_posting": {"text": "Python developer"}}
+            )
+        assert response.status_code == 503
+        assert int(response.headers["retry-after"]) >= 1
+        stats = client.get("/metrics").json()["admission"]
+        assert stats["shed"][INTERACTIVE] >= 1
+
+
+def test_job_dispatch_prefers_batch_over_background(tmp_path):
+    controller = AdmissionController(initial_limit=1, max_limit=1)
+    job_queue = JobQueue(
+        str(tmp_path / "jobs.sqlite3"),
+        workers=1,
+        executor="thread",
+        poll_interval=0.02,
+        admission=controller,
+    )
+    posting = {"text": "Python developer with AWS"}
+    background = job_queue.submit([posting] * 3, priority=BACKGROUND)
+    batch = job_queue.submit([posting] * 3)
+    with pytest.raises(ValueError):
+        job_queue.submit([posting], priority="urgent")
+    job_queue.start()
+    try:
+        for job_id in (batch, background):
+            deadline = time.time() + 30
+            while job_queue.get(job_id)["status"] != JOB_COMPLETED:
+                assert time.time() < deadline
+                time.sleep(0.02)
+    finally:
+        job_queue.stop()
+    order = [
+        row[0]
+        for row in job_queue._pool.connection().execute(
+            "SELECT job_id FROM results ORDER BY id"
+        )
+    ]
+    assert order == [batch] * 3 + [background] * 3
+    assert job_queue.get(background)["priority"] == BACKGROUND
+    assert controller.stats()["in_flight"] == 0
@@ -0,0 +1,99 @@
+"""Tests for section segmentation and section-scoped extraction."""
+
+from ajips.app.services.critique import analyze_job_quality
+from ajips.app.services.extraction import SKILL_SECTIONS, extract_skills
+from ajips.app.services.normalization import (
+    normalize_sections,
+    normalize_text,
+    section_spans,
+    segment_sections,
+)
+
+POSTING = """Senior Backend Engineer
+
+About Us
+We are a health-tech startup. Everyone uses Slack and Jira.
+
+## Key Responsibilities
+- Build services in Python and Go
+
+**Requirements:**
+* 5+ years with PostgreSQL
+Experience with AWS is a must.
+
+Nice to have: Kubernetes
+Perks: free lunch, remote days
+"""
+
+
+def test_headings_are_found_in_one_pass_as_offsets():
+    sections = segment_sections(POSTING)
+    assert [s.name for s in sections] == [
+        "about",
+        "responsibilities",
+        "requirements",
+        "nice_to_have",
+        "benefits",
+    ]
+    starts = [POSTING[s.start : s.start + 12] for s in sections]
+    assert starts == [
+        "About Us\nWe ",
+        "Key Responsi",
+        "Requirements",
+        "Nice to have",
+        "Perks: free ",
+    ]
+    # Sections are contiguous up to the end of the text
+    assert all(a.end == b.start for a, b in zip(sections, sections[1:]))
+    assert sections[-1].end == len(POSTING)
+    # Prose that merely starts with a heading word is not a heading
+    assert segment_sections("Experience with AWS\nrequirements change.") == []
+    assert [s.name for s in segment_sections("- Skills for the job: Go")] == [
+        "requirements"
+    ]
+
+
+def test_heading_words_before_colons_in_prose_open_no_section():
+    prose = "About us: we build things. Our benefits: great. You need experience: lots."
+    assert [s.name for s in segment_sections(prose)] == ["about"]
+    posting = "Requirements:\nPython and Docker. Perks: lunch. We use Kafka and Go.\n"
+    normalized, sections = normalize_sections(posting)
+    assert [s.name for s in sections] == ["requirements"]
+    skills = extract_skills(normalized, section_spans(sections, SKILL_SECTIONS))
+    assert {"python", "docker", "kafka", "go"} <= set(skills)
+
+
+def test_normalized_offsets_point_at_the_same_headings():
+    normalized, sections = normalize_sections("  " + POSTING)
+    assert normalized == normalize_text(POSTING)
+    assert [normalized[s.start : s.start + 5] for s in sections] == [
+        "About",
+        "Key R",
+        "Requi",
+        "Nice ",
+        "Perks",
+    ]
+
+
+def test_skills_come_from_requirement_sections_when_present():
+    normalized, sections = normalize_sections(POSTING)
+    skills = extract_skills(normalized, section_spans(sections, SKILL_SECTIONS))
+    assert {"python", "go", "postgresql", "aws", "kubernetes"} <= set(skills)
+    # Tools the company mentions about itself are not requirements
+    assert "slack" not in skills and "jira" not in skills
+    assert "slack" in extract_skills(normalized)
+    assert section_spans(segment_sections("Python and Slack"), SKILL_SECTIONS) is None
+
+
+def test_benefits_are_judged_from_the_benefits_section():
+    normalized, sections = normalize_sections(POSTING)
+    # "health" in the company blurb no longer counts as a benefit
+    assert "Mentions benefits" in analyze_job_quality(normalized)["positives"]
+    assert "Mentions benefits" not in (
+        analyze_job_quality(normalized, sections=sections)["positives"]
+    )
+    with_insurance = POSTING + "Health insurance and 401k.\n"
+    normalized, sections = normalize_sections(with_insurance)
+    assert "Mentions benefits" in (
+        analyze_job_quality(normalized, sections=sections)["positives"]
+    )
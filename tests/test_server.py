@@ -0,0 +1,45 @@
+"""Unit tests for the server launcher and CLI."""
+
+from unittest.mock import patch
+
+from ajips import cli
+from ajips.app.config import settings
+from ajips.app.services.extraction import get_skill_matcher
+from ajips.core import server
+from ajips.core.pipelines.job_profile import warm_up
+
+
+def test_available_cpus_is_positive():
+    assert server.available_cpus() >= 1
+
+
+def test_implementations_fall_back_without_optional_packages():
+    with patch("ajips.core.server.importlib.util.find_spec", return_value=None):
+        assert server.event_loop_implementation() == "asyncio"
+        assert server.http_implementation() == "h11"
+
+
+def test_warm_up_builds_shared_matcher():
+    get_skill_matcher.cache_clear()
+    warm_up()
+    assert get_skill_matcher.cache_info().currsize == 1
+    assert get_skill_matcher() is get_skill_matcher()
+
+
+def test_serve_command_uses_settings_and_cpu_count():
+    with patch("ajips.core.server.serve") as mock_serve, patch(
+        "ajips.core.server.available_cpus", return_value=1
+    ):
+        assert cli.main(["serve", "--port", "9001"]) == 0
+    kwargs = mock_serve.call_args.kwargs
+    assert kwargs["port"] == 9001
+    assert kwargs["host"] == settings.SERVER_HOST
+    assert kwargs["workers"] == 1
+
+
+def test_serve_command_shares_rate_limits_across_workers():
+    with patch("ajips.core.server.serve"), patch.object(
+        settings, "RATE_LIMIT_STORAGE", "memory"
+    ):
+        cli.main(["serve", "--workers", "4"])
+        assert settings.RATE_LIMIT_STORAGE == "sqlite"
@@ -0,0 +1,162 @@
+"""Tests and latency benchmark for similar-posting search.
+
+The benchmark (``pytest -m benchmark``) fills a signature index with
+``AJIPS_SIMILAR_BENCH_SIZE`` random signatures (100,000 by default; set it to
+1000000 for the full-scale run) and checks top-k latency and recall for
+perturbed copies of stored ones.
+"""
+
+import os
+import time
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from ajips.app.api import dependencies
+from ajips.app.main import app
+from ajips.core import similar
+from ajips.core.store import PostingStore
+
+BENCH_SIZE = int(os.getenv("AJIPS_SIMILAR_BENCH_SIZE", "100000"))
+QUERY_P99_BUDGET_MS = float(os.getenv("AJIPS_SIMILAR_QUERY_P99_MS", "10"))
+
+POSTINGS = {
+    "data": (
+        "Senior Data Engineer. Build streaming pipelines on Kafka and Spark, "
+        "orchestrate them with Airflow and model data in PostgreSQL.",
+        ["kafka", "spark", "airflow", "postgresql"],
+    ),
+    "data-repost": (
+        "Data Engineer (Senior). You will build streaming pipelines with Kafka "
+        "and Spark, schedule them in Airflow and model data in PostgreSQL.",
+        ["kafka", "spark", "airflow", "postgresql"],
+    ),
+    "frontend": (
+        "Frontend Developer. Build accessible components in React and "
+        "TypeScript with our design systems team, tested with Jest.",
+        ["react", "typescript", "jest"],
+    ),
+    "mobile": (
+        "iOS Engineer. Ship our Swift app to millions of users, working with "
+        "designers on SwiftUI screens.",
+        ["swift", "swiftui"],
+    ),
+}
+
+
+def _analysis(title, skills):
+    return {"title": title, "explicit_skills": skills, "focus_areas": []}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PostingStore(str(tmp_path / "postings.sqlite3"))
+    store.ids = {
+        name: store.add(text, _analysis(name, skills))
+        for name, (text, skills) in POSTINGS.items()
+    }
+    return store
+
+
+def test_similar_postings_rank_the_repost_first(store):
+    results = store.similar_postings(posting_id=store.ids["data"], limit=3)
+    assert [r["title"] for r in results][0] == "data-repost"
+    assert store.ids["data"] not in [r["id"] for r in results]
+    assert results[0]["score"] > 0.5 > results[-1]["score"]
+    assert results[0]["skills"] == ["airflow", "kafka", "postgresql", "spark"]
+    assert store.similar_postings(posting_id=12345) is None
+
+    by_skills = store.similar_postings(skills=["React", "jest"], limit=1)
+    assert [r["title"] for r in by_skills] == ["frontend"]
+    assert store.similar_postings(text="", skills=[]) == []
+
+
+def test_incremental_inserts_are_searchable(store):
+    store.similar_postings(posting_id=store.ids["mobile"])
+    new_id = store.add(
+        "Senior iOS Engineer. Ship our Swift app with SwiftUI to millions of users.",
+        _analysis("mobile-2", ["swift", "swiftui"]),
+    )
+    results = store.similar_postings(posting_id=store.ids["mobile"], limit=1)
+    assert [r["id"] for r in results] == [new_id]
+
+    # Re-analysis keeps one signature per posting
+    store.add(*POSTINGS["mobile"][:1], _analysis("mobile", ["swift", "swiftui"]))
+    assert len(store._similar) == len(POSTINGS) + 1
+
+
+def test_existing_postings_are_vectorized(store):
+    store._pool.connection().execute("DELETE FROM posting_vectors")
+    reopened = PostingStore(store.path)
+    results = reopened.similar_postings(posting_id=store.ids["data-repost"], limit=1)
+    assert [r["title"] for r in results] == ["data"]
+
+
+def test_similar_endpoints(store):
+    client = TestClient(app)
+    with patch.object(dependencies, "_posting_store", store):
+        response = client.get(f"/postings/{store.ids['frontend']}/similar")
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == len(POSTINGS) - 1
+        assert client.get("/postings/12345/similar").status_code == 404
+
+        response = client.post(
+            "/postings/similar",
+            json={"text": POSTINGS["data"][0], "skills": ["kafka"], "limit": 2},
+        )
+        assert [r["title"] for r in response.json()["results"]][0] in (
+            "data",
+            "data-repost",
+        )
+        assert client.post("/postings/similar", json={}).status_code == 400
+
+
+def _random_index(rng, size):
+    signatures = rng.integers(0, 256, size=(size, similar.BITS // 8), dtype=np.uint8)
+    index = similar.SignatureIndex()
+    for start in range(0, size, 50_000):
+        index.add(
+            [
+                (row + 1, signatures[row].tobytes())
+                for row in range(start, min(size, start + 50_000))
+            ]
+        )
+    assert len(index) == size
+    return signatures, index
+
+
+def _perturbed(rng, signature):
+    # Flip 32 of 256 bits: cosine similarity about 0.92
+    bits = np.unpackbits(signature)
+    bits[rng.choice(similar.BITS, size=32, replace=False)] ^= 1
+    return np.packbits(bits).tobytes()
+
+
+def test_perturbed_signatures_find_their_originals():
+    rng = np.random.default_rng(7)
+    signatures, index = _random_index(rng, 10_000)
+    found = 0
+    for row in rng.integers(0, len(signatures), size=100):
+        results = index.query(_perturbed(rng, signatures[row]), limit=10)
+        found += bool(results) and results[0][0] == row + 1
+    assert found / 100 >= 0.95
+
+
+@pytest.mark.benchmark
+def test_query_latency_on_a_large_index():
+    rng = np.random.default_rng(11)
+    signatures, index = _random_index(rng, BENCH_SIZE)
+
+    latencies, found = [], 0
+    for row in rng.integers(0, BENCH_SIZE, size=300):
+        query = _perturbed(rng, signatures[row])
+        started = time.perf_counter()
+        results = index.query(query, limit=10)
+        latencies.append(time.perf_counter() - started)
+        found += bool(results) and results[0][0] == row + 1
+
+    p99_ms = float(np.percentile(latencies, 99)) * 1000
+    assert found / 300 >= 0.95
+    assert p99_ms <= QUERY_P99_BUDGET_MS, f"p99 {p99_ms:.2f} ms"
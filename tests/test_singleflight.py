@@ -0,0 +1,131 @@
+"""Tests for coalescing of identical in-flight fetches and analyses."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ajips.app.main import app
+from ajips.app.services import ingestion
+from ajips.core.pipelines import job_profile
+from ajips.core.singleflight import SingleFlight, canonical_url, content_key
+
+
+def _run_concurrently(fn, count=8):
+    with ThreadPoolExecutor(max_workers=count) as pool:
+        futures = [pool.submit(fn) for _ in range(count)]
+        return [future.result() for future in futures]
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight("test")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {"value": 42}
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        leader = pool.submit(flight.do, "key", compute)
+        started.wait(5)
+        followers = [pool.submit(flight.do, "key", compute) for _ in range(4)]
+        while flight.coalesced < 4:
+            time.sleep(0.001)
+        release.set()
+        results = [leader.result()] + [f.result() for f in followers]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {"executions": 1, "coalesced": 4, "in_flight": 0}
+    # Completed calls are not cached
+    flight.do("key", compute)
+    assert len(calls) == 2
+
+
+def test_followers_receive_the_leaders_exception():
+    flight = SingleFlight("test-errors")
+    barrier = threading.Event()
+
+    def fail():
+        barrier.wait(5)
+        raise ValueError("fetch failed")
+
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        futures = [pool.submit(flight.do, "key", fail) for _ in range(3)]
+        while flight.executions + flight.coalesced < 3:
+            time.sleep(0.001)
+        barrier.set()
+        for future in futures:
+            with pytest.raises(ValueError, match="fetch failed"):
+                future.result()
+    assert flight.executions == 1
+
+
+def test_canonical_url():
+    assert canonical_url(
+        "HTTPS://Jobs.Example.com:443/posting/1?utm_source=x&b=2&a=1#apply"
+    ) == ("https://jobs.example.com/posting/1?a=1&b=2")
+    assert canonical_url("http://example.com") == "http://example.com/"
+    assert canonical_url("http://example.com:8080/x?gclid=1") == (
+        "http://example.com:8080/x"
+    )
+
+
+def test_content_key_distinguishes_fields():
+    assert content_key("ab", "c") != content_key("a", "bc")
+    assert content_key("text", None) != content_key("text", "")
+    assert content_key("text", None) == content_key("text", None)
+
+
+def test_identical_url_fetches_are_coalesced():
+    release = threading.Event()
+    downloads = []
+
+    def slow_download(url, timeout_s):
+        downloads.append(url)
+        release.wait(5)
+        return "Python developer"
+
+    with patch.object(ingestion, "_download", slow_download), patch.object(
+        ingestion, "_is_safe_url", return_value=True
+    ):
+        urls = ["https://jobs.example.com/1?utm_source=a"] * 3 + [
+            "https://JOBS.example.com/1#top"
+        ]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(ingestion.fetch_job_posting, url) for url in urls]
+            time.sleep(0.05)
+            release.set()
+            assert [f.result() for f in futures] == ["Python developer"] * 4
+    assert len(downloads) == 1
+
+
+def test_identical_analyses_are_coalesced_and_reported():
+    analyze_text = job_profile._analyze_text
+    runs = []
+
+    def slow_analyze(raw_text, resume_text=None):
+        runs.append(raw_text)
+        time.sleep(0.1)
+        return analyze_text(raw_text, resume_text)
+
+    posting = "Senior Python Engineer with Django and AWS experience"
+    with patch.object(job_profile, "_analyze_text", slow_analyze):
+        client = TestClient(app)
+        responses = _run_concurrently(
+            lambda: client.post("/analyze", json={"job_posting": {"text": posting}}),
+            count=4,
+        )
+    assert all(response.status_code == 200 for response in responses)
+    assert len({response.text for response in responses}) == 1
+    assert len(runs) < 4
+
+    stats = client.get("/metrics").json()["singleflight.analysis"]
+    assert stats["coalesced"] >= 1
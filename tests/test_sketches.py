@@ -0,0 +1,163 @@
+"""Tests for KLL quantile sketches and stored salary percentiles."""
+
+import random
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ajips.app.api import dependencies
+from ajips.app.main import app
+from ajips.core.sketches import KLLSketch
+from ajips.core.store import PostingStore
+
+
+def _rank_error(sketch, values, q):
+    ordered = sorted(values)
+    estimate = sketch.quantile(q)
+    below = sum(1 for value in ordered if value < estimate)
+    return abs(below / len(ordered) - q)
+
+
+def test_sketch_quantiles_are_accurate_in_bounded_space():
+    rng = random.Random(7)
+    values = [rng.lognormvariate(11.5, 0.4) for _ in range(50_000)]
+    sketch = KLLSketch(k=200)
+    sketch.extend(values)
+    assert sketch.count == 50_000
+    assert sketch._size <= 3 * 200
+    for q in (0.1, 0.25, 0.5, 0.9, 0.99):
+        assert _rank_error(sketch, values, q) < 0.02
+    assert sketch.quantile(0) == min(values)
+    assert sketch.quantile(1) == max(values)
+    assert KLLSketch().quantile(0.5) is None
+
+
+def test_merged_sketches_summarize_both_streams():
+    rng = random.Random(3)
+    low = [rng.uniform(50_000, 100_000) for _ in range(20_000)]
+    high = [rng.uniform(100_000, 200_000) for _ in range(20_000)]
+    merged = KLLSketch()
+    merged.extend(low)
+    other = KLLSketch()
+    other.extend(high)
+    merged.merge(other)
+    assert merged.count == 40_000
+    for q in (0.25, 0.5, 0.75):
+        assert _rank_error(merged, low + high, q) < 0.02
+
+
+def test_sketches_round_trip_through_bytes():
+    sketch = KLLSketch(k=64)
+    sketch.extend(range(10_000))
+    restored = KLLSketch.from_bytes(sketch.to_bytes())
+    assert (restored.k, restored.count, restored.min, restored.max) == (
+        64,
+        10_000,
+        0,
+        9_999,
+    )
+    assert restored.quantiles([0.1, 0.5, 0.9]) == sketch.quantiles([0.1, 0.5, 0.9])
+    restored.update(5)
+    assert restored.count == 10_001
+    with pytest.raises(ValueError):
+        KLLSketch(k=4)
+
+
+def _analysis(skills, role="Data Engineer", level="Senior Level", salary=None):
+    return {
+        "title": "Engineer",
+        "explicit_skills": list(skills),
+        "focus_areas": [],
+        "role_type": role,
+        "experience_level": level,
+        "salary_range": salary,
+    }
+
+
+def _salary(low, high, currency="USD"):
+    return {"min": low, "max": high, "currency": currency}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PostingStore(str(tmp_path / "postings.sqlite3"))
+    store.add("a", _analysis(["kafka", "java"], salary=_salary(140_000, 160_000)))
+    store.add("b", _analysis(["kafka"], salary=_salary(180_000, 200_000)))
+    store.add(
+        "c", _analysis(["kafka"], level="Mid Level", salary=_salary(100_000, 120_000))
+    )
+    store.add(
+        "d",
+        _analysis(
+            ["go"], role="Backend Engineer", salary=_salary(90_000, 90_000, "EUR")
+        ),
+    )
+    store.add("e", _analysis(["kafka"]))
+    return store
+
+
+def test_store_percentiles_by_skill_role_and_level(store):
+    kafka = store.salary_percentiles(skill="Kafka", quantiles=[0, 0.5, 1])
+    assert (kafka["dimension"], kafka["name"], kafka["count"]) == ("skill", "kafka", 3)
+    assert kafka["quantiles"] == [110_000, 150_000, 190_000]
+    senior = store.salary_percentiles(skill="kafka", experience_level="senior")
+    assert (senior["name"], senior["count"]) == ("kafka|Senior Level", 2)
+    assert store.salary_percentiles(role_type="data engineer")["count"] == 3
+    assert store.salary_percentiles()["count"] == 3
+    assert store.salary_percentiles(currency="eur", quantiles=[0.5])["quantiles"] == [
+        90_000
+    ]
+    assert store.salary_percentiles(skill="rust") is None
+    with pytest.raises(ValueError):
+        store.salary_percentiles(skill="kafka", role_type="Data Engineer")
+
+
+def test_reanalysis_does_not_count_a_salary_twice(store):
+    store.add("a", _analysis(["kafka", "java"], salary=_salary(140_000, 160_000)))
+    assert store.salary_percentiles(skill="kafka")["count"] == 3
+
+
+def test_shard_sketches_merge_and_backfill(store, tmp_path):
+    shard = PostingStore(str(tmp_path / "shard.sqlite3"))
+    shard.add("x", _analysis(["kafka"], salary=_salary(300_000, 300_000)))
+    assert store.merge_salary_sketches(shard.export_salary_sketches()) == len(
+        shard.export_salary_sketches()
+    )
+    kafka = store.salary_percentiles(skill="kafka", quantiles=[1])
+    assert (kafka["count"], kafka["max"]) == (4, 300_000)
+
+    store._pool.connection().execute("DELETE FROM salary_sketches")
+    reopened = PostingStore(store.path)
+    assert reopened.salary_percentiles(skill="kafka")["count"] == 3
+
+
+def test_salaries_endpoint(store):
+    client = TestClient(app)
+    with patch.object(dependencies, "_posting_store", store):
+        response = client.get(
+            "/salaries",
+            params={
+                "skill": "kafka",
+                "experience_level": "senior",
+                "percentile": [0, 100],
+            },
+        )
+        assert response.status_code == 200
+        assert response.json() == {
+            "dimension": "skill_level",
+            "name": "kafka|Senior Level",
+            "currency": "USD",
+            "count": 2,
+            "min": 150_000,
+            "max": 190_000,
+            "percentiles": {"p0": 150_000, "p100": 190_000},
+        }
+        assert client.get("/salaries", params={"skill": "rust"}).status_code == 404
+        assert (
+            client.get(
+                "/salaries", params={"skill": "kafka", "role_type": "Data Engineer"}
+            ).status_code
+            == 400
+        )
+        assert client.get("/salaries", params={"percentile": 150}).status_code == 400
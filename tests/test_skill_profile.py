@@ -0,0 +1,116 @@
+"""Tests and benchmark for the per-skill-set profile cache.
+
+The benchmark (``pytest -m benchmark``) profiles
+``AJIPS_PROFILE_BENCH_POSTINGS`` postings (2,000 by default) drawing on a
+few recurring skill sets; cached profiles must be faster than computing each
+one.
+"""
+
+import os
+import random
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ajips.app.services import enrichment, skill_profile as module
+from ajips.app.services.enrichment import infer_hidden_skills
+from ajips.app.services.extraction import ALL_SKILLS
+from ajips.app.services.profiling import (
+    build_focus_areas,
+    calculate_skill_diversity,
+    identify_role_type,
+)
+from ajips.app.services.skill_profile import skill_profile, taxonomy_version
+from ajips.core import metrics
+from ajips.core.memo import Memo
+
+BENCH_POSTINGS = int(os.getenv("AJIPS_PROFILE_BENCH_POSTINGS", "2000"))
+
+
+@pytest.fixture
+def profiles():
+    memo = Memo("test.skill_profiles", 3)
+    with patch.object(module, "_profiles", memo):
+        yield memo
+
+
+def _direct(skills):
+    return (
+        infer_hidden_skills(skills),
+        build_focus_areas(skills),
+        identify_role_type(skills),
+        calculate_skill_diversity(skills),
+    )
+
+
+def test_profiles_match_the_stages_in_any_skill_order(profiles):
+    rng = random.Random(11)
+    pool = sorted(ALL_SKILLS)
+    for _ in range(200):
+        skills = rng.sample(pool, rng.randint(0, 12))
+        for order in (skills, skills[::-1]):
+            assert tuple(skill_profile(order)) == _direct(order)
+    # Repeated skills weigh more in focus areas, so they bypass the cache
+    repeated = ["python", "python", "aws"]
+    assert tuple(skill_profile(repeated)) == _direct(repeated)
+
+
+def test_cache_hits_evictions_and_metrics(profiles):
+    sets = [["python", "aws"], ["react", "typescript"], ["go"], ["rust"]]
+    for skills in sets:
+        skill_profile(skills)
+    skill_profile(["aws", "python"])  # evicted by the fourth set
+    skill_profile(["rust"])
+    stats = metrics.collect()["test.skill_profiles"]
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (1, 5, 2)
+    assert stats["entries"] == 3
+    assert stats["hit_rate"] == pytest.approx(1 / 6, abs=1e-4)
+
+
+def test_cached_values_cannot_be_changed_by_callers(profiles):
+    first = skill_profile(["python", "aws", "docker"])
+    first.hidden_skills.clear()
+    first.focus_areas[0].skills.clear()
+    first.diversity["categories"].clear()
+    assert skill_profile(["python", "aws", "docker"]) == _direct(
+        ["python", "aws", "docker"]
+    )
+
+
+def test_taxonomy_change_invalidates_cached_profiles(profiles):
+    before = skill_profile(["python", "aws"])
+    assert "bigquery" not in before.hidden_skills
+    version = taxonomy_version()
+    with patch.dict(enrichment.HIDDEN_SKILL_MAP, {"python": ["bigquery"]}):
+        taxonomy_version.cache_clear()
+        try:
+            assert taxonomy_version() != version
+            assert "bigquery" in skill_profile(["python", "aws"]).hidden_skills
+        finally:
+            taxonomy_version.cache_clear()
+    assert profiles.invalidations == 1
+    assert taxonomy_version() == version
+
+
+@pytest.mark.benchmark
+def test_cached_profiles_outpace_computing_each():
+    rng = random.Random(5)
+    pool = sorted(ALL_SKILLS)
+    recurring = [rng.sample(pool, 8) for _ in range(20)]
+    postings = [rng.sample(s, len(s)) for s in rng.choices(recurring, k=BENCH_POSTINGS)]
+
+    memo = Memo("test.skill_profiles_bench", 4096)
+    with patch.object(module, "_profiles", memo):
+        best = {"cached": float("inf"), "direct": float("inf")}
+        for _ in range(3):
+            started = time.perf_counter()
+            for skills in postings:
+                skill_profile(skills)
+            best["cached"] = min(best["cached"], time.perf_counter() - started)
+            started = time.perf_counter()
+            for skills in postings:
+                _direct(skills)
+            best["direct"] = min(best["direct"], time.perf_counter() - started)
+    assert memo.stats()["hit_rate"] > 0.99
+    assert best["cached"] < best["direct"], best
@@ -0,0 +1,117 @@
+"""Tests and overhead benchmark for variant- and typo-tolerant skill matching.
+
+The benchmark (``pytest -m benchmark``) times the skill matcher with and
+without the variant index on the same postings; the extra cost must stay
+within ``AJIPS_FUZZY_OVERHEAD_PCT`` percent (10 by default).
+"""
+
+import os
+import random
+import re
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ajips.app.config import settings
+from ajips.app.services import extraction
+from ajips.app.services.extraction import (
+    ALL_SKILLS,
+    MULTI_WORD_SKILLS,
+    SkillMatcher,
+    extract_skills,
+)
+from ajips.app.services.skill_variants import SkillVariantIndex, edit_distance
+
+OVERHEAD_BUDGET_PCT = float(os.getenv("AJIPS_FUZZY_OVERHEAD_PCT", "10"))
+
+POSTING = """Senior Backend Engineer
+Requirements:
+- Services in Java and Kotlin on Kubernetes, deployed with Terraform
+- Data in PostgreSQL, Redis and Kafka; dashboards in Grafana
+- Monitoring, on-call and mentoring of junior engineers
+- Strong communication skills and experience with agile teams
+Benefits: remote work, conference budget, net salary review every year.
+"""
+
+
+@pytest.fixture
+def index():
+    return SkillVariantIndex(ALL_SKILLS, MULTI_WORD_SKILLS)
+
+
+@pytest.mark.parametrize(
+    "text, skill",
+    [
+        ("Postgre SQL", "postgresql"),
+        ("Kubernets", "kubernetes"),
+        ("kuberentes", "kubernetes"),
+        ("Node JS", "node.js"),
+        ("nodejs", "node.js"),
+        ("ReactJS", "react"),
+        ("Java Script", "javascript"),
+        ("Mongo DB", "mongodb"),
+        ("SQL Server", "sql server"),
+        ("CI-CD", "ci/cd"),
+        ("Elasticserach", "elasticsearch"),
+    ],
+)
+def test_variants_resolve_to_skills(text, skill):
+    assert extract_skills(f"We use {text} daily.") == [skill]
+
+
+def test_ordinary_words_are_not_read_as_skills(index):
+    for word in ("monitoring", "conference", "confidence", "expresses", "scale", "net"):
+        assert index.lookup(word) is None, word
+    # Only real split points of a skill join two tokens
+    assert extract_skills("the red is blue") == []
+    assert extract_skills("redis is fast") == ["redis"]
+
+
+def test_exact_matches_are_unchanged():
+    exact = SkillMatcher(MULTI_WORD_SKILLS, ALL_SKILLS)
+    assert extract_skills(POSTING) == extraction.rank_skills(
+        exact.count(POSTING.lower())
+    )
+
+
+def test_edit_distance_counts_transpositions_once():
+    assert edit_distance("kubernetes", "kuberentes", 2) == 1
+    assert edit_distance("docker", "dockre", 1) == 1
+    assert edit_distance("python", "typhon", 1) == 2
+    assert edit_distance("short", "a much longer word", 2) == 3
+
+
+def test_variant_matching_can_be_disabled():
+    extraction.get_skill_matcher.cache_clear()
+    try:
+        with patch.object(settings, "FUZZY_SKILL_MATCHING", False):
+            assert extract_skills("Kubernets and Postgre SQL") == []
+    finally:
+        extraction.get_skill_matcher.cache_clear()
+
+
+@pytest.mark.benchmark
+def test_variant_matching_overhead_is_small(index):
+    words = re.findall(r"[\w.+#-]+", POSTING.lower())
+    rng = random.Random(5)
+    docs = [" ".join(rng.choice(words) for _ in range(400)) for _ in range(100)]
+    exact = SkillMatcher(MULTI_WORD_SKILLS, ALL_SKILLS)
+    fuzzy = SkillMatcher(MULTI_WORD_SKILLS, ALL_SKILLS, index)
+
+    for doc in docs:
+        fuzzy.count(doc)
+    # Best of several runs per document, alternating so that machine noise
+    # affects both matchers alike
+    exact_s = fuzzy_s = 0.0
+    for doc in docs:
+        best = [float("inf"), float("inf")]
+        for _ in range(5):
+            for side, matcher in enumerate((exact, fuzzy)):
+                started = time.perf_counter()
+                matcher.count(doc)
+                best[side] = min(best[side], time.perf_counter() - started)
+        exact_s += best[0]
+        fuzzy_s += best[1]
+    overhead_pct = 100 * (fuzzy_s / exact_s - 1)
+    assert overhead_pct <= OVERHEAD_BUDGET_PCT, f"{overhead_pct:.1f}% overhead"
@@ -0,0 +1,72 @@
+"""Tests for per-stage time budgets and partial results."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ajips.app.api.schemas import AnalyzeRequest, JobPostingInput
+from ajips.app.config import settings
+from ajips.app.services.critique import critique_requirements
+from ajips.core.deadline import Deadline, DeadlineExceeded
+from ajips.core.pipelines import job_profile
+
+POSTING = (
+    "Senior Python Engineer. Requirements: 5+ years of Python, Django and AWS. "
+    "Remote. Salary $120,000. We value team culture."
+)
+
+
+def _slow_stage(text, deadline, *args):
+    time.sleep(0.02)
+    deadline.check()
+    return ["unreachable"]
+
+
+def _profile(text=POSTING):
+    return job_profile.build_job_profile(
+        AnalyzeRequest(job_posting=JobPostingInput(text=text))
+    )
+
+
+def test_deadline():
+    assert not Deadline(None).expired()
+    Deadline(0).check()
+    deadline = Deadline(0.001, "critiques")
+    time.sleep(0.002)
+    with pytest.raises(DeadlineExceeded, match="critiques"):
+        deadline.check()
+
+
+def test_tech_age_check_is_linear_and_reports_impossible_experience():
+    start = time.monotonic()
+    critique_requirements("we use rust and go daily. " * 20000)
+    assert time.monotonic() - start < 5
+
+    messages = [c.message for c in critique_requirements("Rust engineer, 12 years")]
+    assert any("Rust/Go has only existed" in message for message in messages)
+
+
+def test_over_budget_critiques_are_skipped_but_skills_returned():
+    with patch.dict(settings.STAGE_BUDGETS_MS, {"critiques": 5}), patch.object(
+        job_profile, "critique_requirements", _slow_stage
+    ):
+        profile = _profile()
+    assert profile.skipped_sections == ["critiques"]
+    assert profile.critiques == []
+    assert "python" in profile.explicit_skills
+    assert profile.focus_areas
+
+
+def test_over_budget_quality_is_skipped():
+    with patch.dict(settings.STAGE_BUDGETS_MS, {"quality": 5}), patch.object(
+        job_profile, "analyze_job_quality", _slow_stage
+    ):
+        profile = _profile()
+    assert profile.skipped_sections == ["quality"]
+    assert "quality: N/A" in profile.summary
+    assert profile.critiques
+
+
+def test_within_budget_nothing_is_skipped():
+    assert _profile().skipped_sections == []
@@ -0,0 +1,165 @@
+"""Tests for the persistent posting store and /postings queries."""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ajips.app.api import dependencies
+from ajips.app.api.schemas import AnalyzeRequest, JobPostingInput
+from ajips.app.config import settings
+from ajips.app.main import app
+from ajips.core.pipelines import job_profile
+from ajips.core.store import PostingStore, resolve_experience_level
+
+KAFKA_GO = """Senior Platform Engineer
+Requirements:
+- 6+ years building services in Go
+- Event streaming with Kafka and PostgreSQL
+Salary: $160,000 - $190,000
+"""
+KAFKA_JAVA = """Mid-level Backend Engineer
+Requirements:
+- Java and Kafka, 3-5 years
+Salary: $110,000 - $130,000
+"""
+GO_ONLY = """Senior Go Developer
+Requirements:
+- Go, Docker and Kubernetes, senior engineers only
+Salary: $170,000 - $200,000
+"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PostingStore(str(tmp_path / "postings.sqlite3"))
+
+
+def _profile(text, url=None, resume_text=None):
+    return job_profile.build_job_profile(
+        AnalyzeRequest(
+            job_posting=JobPostingInput(text=text, url=url), resume_text=resume_text
+        )
+    )
+
+
+def _add(store, text, url=None):
+    return store.add(text, _profile(text).to_dict(), url)
+
+
+def test_indexed_queries_combine_skills_level_and_salary(store):
+    ids = [_add(store, text) for text in (KAFKA_GO, KAFKA_JAVA, GO_ONLY)]
+
+    def titles(**filters):
+        return [p["title"] for p in store.search(**filters)]
+
+    assert titles(skills=["kafka", "Go"]) == ["Senior Platform Engineer"]
+    assert titles(skills=["kafka"]) == [
+        "Mid-level Backend Engineer",
+        "Senior Platform Engineer",
+    ]
+    assert titles(skills=["go"], experience_level="senior", min_salary=180_000) == [
+        "Senior Go Developer",
+        "Senior Platform Engineer",
+    ]
+    assert titles(skills=["kafka"], max_salary=120_000) == [
+        "Mid-level Backend Engineer"
+    ]
+    assert titles(text="kubernetes") == ["Senior Go Developer"]
+    assert titles(skills=["cobol"]) == []
+
+    newest = store.search(limit=1)
+    assert [p["id"] for p in newest] == [ids[2]]
+    assert [p["id"] for p in store.search(before=ids[2])] == ids[1::-1]
+    assert newest[0]["skills"] == sorted(newest[0]["skills"])
+    assert (newest[0]["salary_min"], newest[0]["salary_max"]) == (170_000, 200_000)
+
+    with pytest.raises(ValueError):
+        store.search(text='"unbalanced')
+
+
+def test_same_text_is_updated_not_duplicated(store):
+    first = store.add(KAFKA_GO, _profile(KAFKA_GO, resume_text="Go").to_dict())
+    again = store.add(KAFKA_GO, _profile(KAFKA_GO).to_dict(), "https://x.test/1")
+    assert first == again and store.count() == 1
+    posting = store.get(first)
+    assert posting["url"] == "https://x.test/1"
+    assert posting["text"] == KAFKA_GO
+    assert posting["analysis"]["resume_alignment"] is None
+    assert store.get(first + 1) is None
+
+
+def test_salaries_come_from_the_analysis(store):
+    text = KAFKA_JAVA.replace("Salary: $110,000 - $130,000\n", "")
+    analysis = _profile(text).to_dict()
+    with patch("ajips.core.store.extract_salary_range") as rescan:
+        posting_id = store.add(text, analysis)
+    rescan.assert_not_called()
+    assert store.get(posting_id)["salary_min"] is None
+
+
+def test_experience_level_short_forms():
+    assert resolve_experience_level("senior") == "Senior Level"
+    assert resolve_experience_level("Staff") == "Principal/Staff Level"
+    assert resolve_experience_level("Intern") == "Intern"
+
+
+def test_listeners_receive_analyzed_postings(store):
+    seen = []
+
+    def failing_listener(raw_text, url, profile):
+        raise RuntimeError("listener bug")
+
+    def store_listener(raw_text, url, profile):
+        seen.append(url)
+        store.add(raw_text, profile.to_dict(), url)
+
+    job_profile.add_listener(failing_listener)
+    job_profile.add_listener(store_listener)
+    try:
+        profile = _profile(KAFKA_JAVA)
+        with patch.object(
+            job_profile, "fetch_job_posting", side_effect=ValueError("blocked")
+        ):
+            _profile(None, url="https://example.com/job")
+    finally:
+        job_profile.remove_listener(failing_listener)
+        job_profile.remove_listener(store_listener)
+
+    # Fetch failures are not recorded; listener errors do not fail analysis
+    assert seen == [None]
+    assert profile.role_type and profile.experience_level == "Mid Level"
+    assert store.search(skills=["java"])[0]["role_type"] == profile.role_type
+
+
+def test_postings_endpoints(tmp_path):
+    client = TestClient(app)
+    with patch.object(settings, "DATA_DIR", str(tmp_path)), patch.object(
+        dependencies, "_posting_store", None
+    ):
+        dependencies.install_posting_store()
+        try:
+            assert client.post(
+                "/analyze", json={"job_posting": {"text": KAFKA_GO}}
+            ).status_code == 200
+        finally:
+            job_profile.remove_listener(dependencies._store_posting)
+
+        response = client.get(
+            "/postings",
+            params={"skill": ["kafka", "go"], "experience_level": "senior",
+                    "min_salary": 150000},
+        )
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["title"] for r in results] == ["Senior Platform Engineer"]
+        assert response.json()["next_before"] is None
+
+        posting = client.get(f"/postings/{results[0]['id']}").json()
+        assert posting["text"] == KAFKA_GO
+        assert "kafka" in posting["analysis"]["explicit_skills"]
+        assert client.get("/postings/999").status_code == 404
+        assert client.get("/postings", params={"q": '"open'}).status_code == 400
+
+        with patch.object(settings, "POSTING_STORE_ENABLED", False):
+            assert client.get("/postings").status_code == 404
@@ -0,0 +1,124 @@
+"""Tests for incremental NDJSON analysis and the /analyze/stream endpoint."""
+
+import asyncio
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from ajips.app.main import app
+from ajips.core.streaming import analyze_ndjson, iter_lines
+
+POSTING = (
+    "Backend Engineer\n"
+    "Requirements:\n- 3+ years of Python and PostgreSQL\n- Docker experience\n"
+)
+
+
+async def _chunks(*chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+async def _collect(iterator):
+    return [item async for item in iterator]
+
+
+def test_iter_lines_reassembles_chunks_and_skips_blank_lines():
+    lines = asyncio.run(
+        _collect(
+            iter_lines(_chunks(b'{"a":', b" 1}\n\n", b'{"b": 2}\n{"c"', b": 3}"), 100)
+        )
+    )
+    assert lines == [(1, b'{"a": 1}'), (2, b'{"b": 2}'), (3, b'{"c": 3}')]
+
+
+def test_iter_lines_flags_overlong_lines_without_buffering_them():
+    lines = asyncio.run(
+        _collect(iter_lines(_chunks(b"x" * 8, b"x" * 8, b"x\nok\n", b"y" * 20), 10))
+    )
+    assert lines == [(1, None), (2, b"ok"), (3, None)]
+
+
+def _records(count):
+    return [
+        json.dumps({"text": f"posting {i}", "id": i}).encode() + b"\n"
+        for i in range(count)
+    ]
+
+
+def test_analyze_ndjson_bounds_concurrency_and_reports_errors():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def analyze(record):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.01)
+        with lock:
+            active -= 1
+        if record["id"] == 3:
+            raise ValueError("bad posting")
+        return {"title": record["text"]}
+
+    body = _records(10) + [b"not json\n", b"[1, 2]\n"]
+    lines = asyncio.run(
+        _collect(analyze_ndjson(_chunks(*body), analyze, concurrency=3))
+    )
+    results = {line["seq"]: line for line in map(json.loads, lines)}
+
+    assert sorted(results) == list(range(1, 13))
+    assert results[1] == {"seq": 1, "id": 0, "result": {"title": "posting 0"}}
+    assert results[4]["error"] == "bad posting"
+    assert results[11]["error"] == "Invalid JSON"
+    assert "error" in results[12]
+    assert peak <= 3
+
+
+def test_analyze_ndjson_stops_reading_when_output_is_not_consumed():
+    read = 0
+
+    async def source():
+        nonlocal read
+        for chunk in _records(1000):
+            read += 1
+            yield chunk
+
+    async def take_one():
+        results = analyze_ndjson(source(), lambda record: {}, concurrency=2)
+        await results.__anext__()
+        await asyncio.sleep(0.05)
+        await results.aclose()
+
+    asyncio.run(take_one())
+    assert read <= 4
+
+
+def test_analyze_stream_endpoint():
+    client = TestClient(app)
+    body = b"".join(
+        json.dumps(record).encode() + b"\n"
+        for record in (
+            {"text": POSTING, "id": "a"},
+            {"text": POSTING},
+            {"resume_text": "x"},
+        )
+    )
+    response = client.post(
+        "/analyze/stream",
+        content=body,
+        headers={"content-type": "application/x-ndjson"},
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    results = {
+        line["seq"]: line for line in map(json.loads, response.text.splitlines())
+    }
+    assert results[1]["id"] == "a"
+    assert "python" in results[1]["result"]["explicit_skills"]
+    assert "result" in results[2]
+    assert "error" in results[3]
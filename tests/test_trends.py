@@ -0,0 +1,113 @@
+"""Tests for incrementally maintained demand aggregates and /trends."""
+
+import datetime
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ajips.app.api import dependencies
+from ajips.app.main import app
+from ajips.core import aggregates, store as store_module
+from ajips.core.store import PostingStore
+
+# Monday 2026-03-02 and the Monday before, in UTC
+THIS_WEEK = datetime.datetime(2026, 3, 2, 12, tzinfo=datetime.timezone.utc).timestamp()
+LAST_WEEK = THIS_WEEK - 7 * 86400
+DAY = datetime.date(2026, 3, 2)
+
+
+def _analysis(skills, role="Data Engineer", areas=("Data Engineering",)):
+    return {
+        "title": "Engineer",
+        "explicit_skills": list(skills),
+        "focus_areas": [{"name": a, "weight": 1.0, "skills": []} for a in areas],
+        "role_type": role,
+        "experience_level": "Senior Level",
+    }
+
+
+def _add_at(store, timestamp, text, analysis):
+    with patch.object(store_module.time, "time", return_value=timestamp):
+        return store.add(text, analysis)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PostingStore(str(tmp_path / "postings.sqlite3"))
+    _add_at(store, LAST_WEEK, "a", _analysis(["kafka", "java"]))
+    _add_at(store, LAST_WEEK, "b", _analysis(["java"]))
+    _add_at(store, THIS_WEEK, "c", _analysis(["kafka", "go"]))
+    _add_at(store, THIS_WEEK, "d", _analysis(["Kafka", "rust"], role="Backend Engineer"))
+    return store
+
+
+def test_buckets():
+    assert aggregates.bucket("day", DAY) == "2026-03-02"
+    assert aggregates.bucket("week", DAY) == "2026-W10"
+    assert aggregates.bucket("month", DAY) == "2026-03"
+    assert aggregates.bucket("month", aggregates.previous_day("month", DAY)) == "2026-02"
+    with pytest.raises(ValueError):
+        aggregates.bucket("year", DAY)
+
+
+def test_trending_reports_counts_and_deltas(store):
+    week = store.trending(period="week", day=DAY, order="count")
+    assert (week["bucket"], week["previous_bucket"]) == ("2026-W10", "2026-W09")
+    items = {item["name"]: item for item in week["items"]}
+    assert items["kafka"] == {"name": "kafka", "count": 2, "previous": 1, "delta": 1}
+    assert items["java"] == {"name": "java", "count": 0, "previous": 2, "delta": -2}
+    assert week["items"][0]["name"] == "kafka"
+
+    risers = store.trending(period="week", day=DAY, limit=2)["items"]
+    # Ties on the change go to the more demanded name
+    assert [item["name"] for item in risers] == ["kafka", "go"]
+    month = store.trending(period="month", day=DAY, order="count")
+    assert month["previous_bucket"] == "2026-02"
+    assert month["items"][0] == {"name": "kafka", "count": 2, "previous": 1, "delta": 1}
+    roles = store.trending(dimension="role", period="day", day=DAY, order="count")
+    assert {i["name"]: i["count"] for i in roles["items"]} == {
+        "Data Engineer": 1,
+        "Backend Engineer": 1,
+    }
+    with pytest.raises(ValueError):
+        store.trending(dimension="salary")
+
+
+def test_reanalysis_moves_counts_instead_of_adding(store):
+    _add_at(store, THIS_WEEK + 3600, "c", _analysis(["kafka", "scala"]))
+    items = {
+        i["name"]: i["count"]
+        for i in store.trending(period="day", day=DAY, order="count")["items"]
+    }
+    assert items == {"kafka": 2, "scala": 1, "rust": 1}
+    assert store.demand_series(dimension="skill", name="kafka", period="week") == [
+        {"bucket": "2026-W09", "count": 1},
+        {"bucket": "2026-W10", "count": 2},
+    ]
+
+
+def test_existing_postings_are_backfilled(store):
+    conn = store._pool.connection()
+    conn.execute("DELETE FROM demand")
+    reopened = PostingStore(store.path)
+    items = reopened.trending(period="week", day=DAY, order="count")["items"]
+    assert {i["name"]: i["count"] for i in items}["kafka"] == 2
+
+
+def test_trends_endpoints(store):
+    client = TestClient(app)
+    with patch.object(dependencies, "_posting_store", store):
+        response = client.get(
+            "/trends", params={"period": "week", "date": "2026-03-04", "order": "count"}
+        )
+        assert response.status_code == 200
+        assert response.json()["items"][0] == {
+            "name": "kafka",
+            "count": 2,
+            "previous": 1,
+            "delta": 1,
+        }
+        series = client.get("/trends/skill/Kafka", params={"period": "week"}).json()
+        assert [point["count"] for point in series] == [1, 2]
+        assert client.get("/trends", params={"dimension": "salary"}).status_code == 422